@@ -20,13 +20,15 @@ DETACH=''
 GPU=''
 CONFIG=''
 MODE=''
+FORCE=''
 VOL_MAPS="-v ${PWD}/configs:/configs -v ${PWD}/data:/data -v ${PWD}/experiments:/experiments"
 
 echo "Getting flags"
 #get variables from input
-while getopts 'm:c:rgdn:' OPTION; do
+while getopts 'm:c:rgdfn:' OPTION; do
     case "$OPTION" in
         m) 
+            MODE_NAME=${OPTARG}
             case "${OPTARG}" in
                 "train")
                     MODE=mode_train_models.py
@@ -73,11 +75,15 @@ while getopts 'm:c:rgdn:' OPTION; do
             echo "Registering container detachment"
             DETACH='-d'
             ;;
+        f)
+            echo "Making every plot again"
+            FORCE='--force'
+            ;;
         n)
             N_BATCHES=${OPTARG}
             ;;
         ?)
-          echo "script usage: $(basename \$0) [-m] [-c] [-p] [-r] [-g] [-d]" >&2
+          echo "script usage: $(basename \$0) [-m] [-c] [-p] [-r] [-g] [-d] [-f]" >&2
           exit 1
           ;;
     esac
@@ -109,28 +115,15 @@ then
     if [ -d "$CONFIG" ]
     then
         echo "Entering batch mode..."
-        N_BATCHES=${N_BATCHES:-5}
-
-        for FILE in $(find $CONFIG -name "*.json" | sort )
-        do
-            (
-                echo "Runing config file: $FILE"
-                # ((i=i%N_BATCHES)); ((i++==0)) && wait
-                docker run \
-                  --rm \
-                  $DETACH \
-                  $GPU \
-                  $VOL_MAPS \
-                  $IMAGE_FULL \
-                  python $MODE -c /"$FILE"
-            ) &
-            if [[ $(jobs -r -p | wc -l) -ge $N_BATCHES ]]; then
-                # now there are $N jobs already running, so wait here for any job
-                # to be finished so there is a place to start next one.
-                wait -n
-            fi
-        done
-        wait
+        # one container running the configs in a pool of warm worker processes, scheduled against the memory & cores
+        # available, at most N_BATCHES at a time if given
+        docker run \
+          --rm \
+          $DETACH \
+          $GPU \
+          $VOL_MAPS \
+          $IMAGE_FULL \
+          python mode_batch.py -m $MODE_NAME -c /"$CONFIG" ${N_BATCHES:+-n $N_BATCHES} $FORCE
     else
         docker run \
           --rm \
@@ -138,7 +131,7 @@ then
           $GPU \
           $VOL_MAPS \
           $IMAGE_FULL \
-          python $MODE -c /"$CONFIG"
+          python $MODE -c /"$CONFIG" $FORCE
     fi
 else
     docker run \
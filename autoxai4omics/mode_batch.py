@@ -0,0 +1,107 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from argparse import ArgumentParser
+from pathlib import Path
+from utils.batch import MODES, STATUS_FILE, find_configs, run_batch
+import logging
+import sys
+
+omicLogger = logging.getLogger("OmicLogger")
+
+
+def main(argv=None):
+    """
+    Run a mode on every json config in a config directory, in a pool of warm worker processes scheduled against the
+    memory & cores of the machine, e.g.
+
+        python mode_batch.py -m train -c replicates/ --memory_limit 32000 --cores 16
+
+    The progress is written to `batch_status.json` in the config directory (see `--status`).
+
+    Each config gets the same experiment folder & log as when run alone with `python mode_train_models.py -c ...`.
+    Exits with 1 if any config failed.
+    """
+    parser = ArgumentParser(description="batch executor")
+    parser.add_argument(
+        "-m", "--mode", required=True, choices=list(MODES), help="Mode to run"
+    )
+    parser.add_argument(
+        "-c",
+        "--config",
+        required=True,
+        help="Directory of the config files. Automatically selects from configs/ subdirectory.",
+    )
+    parser.add_argument(
+        "-n",
+        "--n_workers",
+        type=int,
+        default=None,
+        help="Maximum number of configs run at the same time, by default the number of cores",
+    )
+    parser.add_argument(
+        "--memory_limit",
+        type=float,
+        default=None,
+        help="Memory (MB) the running configs may take up together, by default 90%% of the available memory",
+    )
+    parser.add_argument(
+        "--cores",
+        type=int,
+        default=None,
+        help="Cores the running configs may take up together, by default the available cores",
+    )
+    parser.add_argument(
+        "--max_retries",
+        type=int,
+        default=2,
+        help="Times a config killed for lack of memory is retried with less parallelism",
+    )
+    parser.add_argument(
+        "-f",
+        "--force",
+        action="store_true",
+        help="Make every plot again, including those the plot manifest records as up to date.",
+    )
+    parser.add_argument(
+        "--status",
+        default=None,
+        help=f"Path of the progress file, by default {STATUS_FILE} in the config directory",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(name)s - %(asctime)s - %(levelname)s : %(message)s",
+    )
+
+    config_dir = Path.cwd() / "configs" / args.config
+    if not config_dir.is_dir():
+        raise ValueError(f"{config_dir} is not a directory")
+    config_paths = find_configs(config_dir)
+    omicLogger.info(f"Running {args.mode} on {len(config_paths)} configs")
+
+    results = run_batch(
+        config_paths,
+        args.mode,
+        n_workers=args.n_workers,
+        memory_limit_mb=args.memory_limit,
+        core_limit=args.cores,
+        status_path=args.status or config_dir / STATUS_FILE,
+        max_retries=args.max_retries,
+        force=args.force,
+    )
+
+    failed = [path for path, r in results.items() if r["status"] != "completed"]
+    omicLogger.info(
+        f"Batch finished: {len(results) - len(failed)} completed, {len(failed)} failed"
+    )
+    for path in failed:
+        omicLogger.error(f"Failed: {path} ({results[path]['error']})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
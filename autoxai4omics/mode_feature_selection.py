@@ -12,22 +12,23 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from plotting.render import Renderer
+from utils.experiment_index import index_run
 from utils.load import load_data
 from utils.ml.data_split import split_data
 from utils.ml.preprocessing import learn_ml_preprocessing
-from utils.utils import initial_setup, prof_to_csv
-import cProfile
+from utils.profiling import Profiler
+from utils.utils import initial_setup
 import logging
+import time
 
 
-def main():
+def main(config_path=None):
     """
     Central function to tie together preprocessing, running the models, and plotting
     """
 
-    # init the profiler to time function executions
-    pr = cProfile.Profile()
-    pr.enable()
+    started = time.time()
 
     # Do the initial setup
     (
@@ -35,7 +36,12 @@ def main():
         config_dict,
         experiment_folder,
         omicLogger,
-    ) = initial_setup()
+    ) = initial_setup(config_path)
+
+    # trace the stages of the run, and profile it as set in the config
+    profiler = Profiler(config_dict, experiment_folder, "feature").start()
+    # the figures of the run are drawn together once computed
+    renderer = Renderer(config_dict).start()
 
     try:
         omicLogger.info("Loading data...")
@@ -68,15 +74,18 @@ def main():
             y_test,
         )
 
+        renderer.stop()
+        index_run(config_dict, experiment_folder, "feature", started)
         omicLogger.info("Process completed.")
     except Exception as e:
         omicLogger.error(e, exc_info=True)
         logging.error(e, exc_info=True)
+        renderer.stop()
+        profiler.stop()
         raise e
 
-    # save time profile information
-    pr.disable()
-    prof_to_csv(pr, config_dict)
+    # save the trace & profiles
+    profiler.stop()
 
 
 if __name__ == "__main__":
@@ -14,12 +14,16 @@
 
 from metrics.metrics import define_scorers
 from plotting.plot_utils import define_plots
+from plotting.manifest import MULTI_MODEL_PLOTS, PlotManifest, plot_settings
+from plotting.render import Renderer, running_renderer
+from utils.checkpoint import fingerprint
+from utils.experiment_index import index_run
+from utils.lazy import clear_keras_session
 from utils.load import load_previous_AO_data
-from utils.utils import initial_setup, prof_to_csv
-import cProfile
+from utils.profiling import Profiler, traced
+from utils.utils import create_cli_parser, initial_setup
 import logging
-import matplotlib.pyplot as plt
-from tensorflow.keras import backend as K
+import time
 
 
 omicLogger = logging.getLogger("OmicLogger")
@@ -36,11 +40,15 @@ def plot_graphs(
     x_test,
     y_test,
     holdout=False,
+    force=False,
 ):
     """
     Plot graphs as specified by the config. Each plot function is handled separately to be explicit (at the cost of
     length and maintenance). Here you can customize whether you want to graph on train or test based on what arguments
     are given for the data and labels.
+
+    The plots already made from the same models, data, settings & code (as recorded in the plot manifest) are skipped,
+    unless `force`.
     """
     omicLogger.debug("Defining scorers...")
     scorer_dict = define_scorers(
@@ -50,166 +58,240 @@ def plot_graphs(
     omicLogger.debug("Defining graphs...")
     plot_dict = define_plots(config_dict["ml"]["problem_type"])
 
+    manifest = PlotManifest(experiment_folder, force)
+    data_key = fingerprint(feature_names, x, y, x_train, y_train, x_test, y_test)
+    settings = plot_settings(config_dict, holdout)
+
     omicLogger.debug("Begin plotting graphs...")
+    # the figures are drawn together once their data is computed, unless a renderer is already running
+    renderer = Renderer(config_dict).start()
+
+    try:
+        # Loop over every plot method we're using
+        for plot_method in config_dict["plotting"]["plot_method"]:
+            plot_func = traced(plot_method, cat="plot")(plot_dict[plot_method])
+            print(plot_method)
+
+            # the plots comparing the models are made for all of them at once, the others model by model
+            if plot_method in MULTI_MODEL_PLOTS:
+                plots = {plot_method: config_dict["ml"]["model_list"]}
+            else:
+                plots = {
+                    f"{plot_method}_{model_name}": [model_name]
+                    for model_name in config_dict["ml"]["model_list"]
+                }
 
-    # Loop over every plot method we're using
-    for plot_method in config_dict["plotting"]["plot_method"]:
-        plot_func = plot_dict[plot_method]
-        print(plot_method)
-        if plot_method == "barplot_scorer":
-            plot_func(
-                experiment_folder,
-                config_dict["ml"]["model_list"],
-                config_dict["ml"]["fit_scorer"],
-                scorer_dict,
-                x_test,
-                y_test,
-                holdout=holdout,
-            )
-        elif plot_method == "boxplot_scorer":
-            plot_func(
-                experiment_folder,
-                config_dict["ml"]["model_list"],
-                config_dict["ml"]["problem_type"],
-                config_dict["ml"]["seed_num"],
-                config_dict["ml"]["fit_scorer"],
-                scorer_dict,
-                x,
-                y,
-                holdout=holdout,
-            )
-        elif plot_method == "boxplot_scorer_cv_groupby":
-            plot_func(
-                experiment_folder, config_dict, scorer_dict, x, y, holdout=holdout
-            )
-        elif plot_method == "conf_matrix":
-            plot_func(
-                experiment_folder,
-                config_dict["ml"]["model_list"],
-                x_test,
-                y_test,
-                normalize=False,
-                holdout=holdout,
-            )
-        elif plot_method == "corr":
-            plot_func(
-                experiment_folder,
-                config_dict["ml"]["model_list"],
-                x_test,
-                y_test,
-                config_dict["data"]["target"],
-                holdout=holdout,
-            )
-        elif plot_method == "hist":
-            plot_func(
-                experiment_folder,
-                config_dict["ml"]["model_list"],
-                x_test,
-                y_test,
-                config_dict["data"]["target"],
-                holdout=holdout,
-            )
-        elif plot_method == "hist_overlapped":
-            plot_func(
-                experiment_folder,
-                config_dict["ml"]["model_list"],
-                x_test,
-                y_test,
-                config_dict["data"]["target"],
-                holdout=holdout,
-            )
-        elif plot_method == "joint":
-            plot_func(
-                experiment_folder,
-                config_dict["ml"]["model_list"],
-                x_test,
-                y_test,
-                config_dict["data"]["target"],
-                holdout=holdout,
-            )
-        elif plot_method == "joint_dens":
-            plot_func(
-                experiment_folder,
-                config_dict["ml"]["model_list"],
-                x_test,
-                y_test,
-                config_dict["data"]["target"],
-                kind="kde",
-                holdout=holdout,
-            )
-        elif plot_method == "permut_imp_test":
-            plot_func(
-                experiment_folder,
-                config_dict["ml"]["seed_num"],
-                config_dict["ml"]["model_list"],
-                config_dict["ml"]["fit_scorer"],
-                config_dict["ml"]["problem_type"],
-                scorer_dict,
-                feature_names,
-                x_test,
-                y_test,
-                config_dict["plotting"]["top_feats_permImp"],
-                cv="prefit",
-                holdout=holdout,
-            )
-        elif plot_method == "shap_plots":
-            plot_func(
-                experiment_folder,
-                config_dict["ml"]["problem_type"],
-                config_dict["ml"]["model_list"],
-                config_dict["plotting"]["explanations_data"],
-                feature_names,
-                x,
-                x_test,
-                y_test,
-                x_train,
-                config_dict["plotting"]["top_feats_shap"],
-                holdout=holdout,
-            )
-        elif plot_method == "roc_curve":
-            plot_func(
-                experiment_folder,
-                config_dict["ml"]["model_list"],
-                x_test,
-                y_test,
-                holdout=holdout,
-            )
-
-        # elif plot_method == "shap_force_plots":
-        #     plot_func(experiment_folder, config_dict["ml"]["model_list"],config_dict["ml"]["problem_type"], x_test,
-        #               y_test, feature_names, x, y, x_train,
-        #                       data_forexplanations="all", top_exemplars=0.4, save=True)
-        # elif plot_method == "permut_imp_alldata":
-        #     plot_func(experiment_folder, config_dict, scorer_dict, feature_names, x, y,
-        #                       config_dict['plotting']["top_feats_permImp"], cv='prefit')
-        # elif plot_method == "permut_imp_train":
-        #     plot_func(experiment_folder, config_dict, scorer_dict, feature_names, x_train, y_train,
-        #                       config_dict['plotting']["top_feats_permImp"], cv='prefit')
-        # elif plot_method == "permut_imp_5cv":
-        #     plot_func(experiment_folder, config_dict, scorer_dict, feature_names, x, y,
-        #                       config_dict['plotting']["top_feats_permImp"], cv=5)
+            for entry, model_list in plots.items():
+                entry += "_holdout" if holdout else ""
+                key = manifest.key(
+                    plot_dict[plot_method], model_list, data_key, settings
+                )
+                if manifest.up_to_date(entry, key):
+                    omicLogger.info(f"{entry} is up to date, skipping it")
+                    continue
 
+                submitted = len(running_renderer().figures)
+                _plot(
+                    plot_method,
+                    plot_func,
+                    model_list,
+                    config_dict,
+                    experiment_folder,
+                    scorer_dict,
+                    feature_names,
+                    x,
+                    y,
+                    x_train,
+                    y_train,
+                    x_test,
+                    y_test,
+                    holdout,
+                )
+                manifest.record(entry, key, running_renderer().figures[submitted:])
+    finally:
+        # Clear keras and TF sessions/graphs etc.
+        clear_keras_session()
+        renderer.stop()
     omicLogger.debug("Plotting completed")
-    # Clear everything
-    plt.clf()
-    plt.close()
-    # Clear keras and TF sessions/graphs etc.
-    K.clear_session()
 
 
-if __name__ == "__main__":
+def _plot(
+    plot_method,
+    plot_func,
+    model_list,
+    config_dict,
+    experiment_folder,
+    scorer_dict,
+    feature_names,
+    x,
+    y,
+    x_train,
+    y_train,
+    x_test,
+    y_test,
+    holdout,
+):
+    """Call the function of `plot_method` with its arguments, for the models of `model_list`"""
+    if plot_method == "barplot_scorer":
+        plot_func(
+            experiment_folder,
+            model_list,
+            config_dict["ml"]["fit_scorer"],
+            scorer_dict,
+            x_test,
+            y_test,
+            holdout=holdout,
+        )
+    elif plot_method == "boxplot_scorer":
+        plot_func(
+            experiment_folder,
+            model_list,
+            config_dict["ml"]["problem_type"],
+            config_dict["ml"]["seed_num"],
+            config_dict["ml"]["fit_scorer"],
+            scorer_dict,
+            x,
+            y,
+            holdout=holdout,
+        )
+    elif plot_method == "boxplot_scorer_cv_groupby":
+        plot_func(experiment_folder, config_dict, scorer_dict, x, y, holdout=holdout)
+    elif plot_method == "conf_matrix":
+        plot_func(
+            experiment_folder,
+            model_list,
+            x_test,
+            y_test,
+            normalize=False,
+            holdout=holdout,
+        )
+    elif plot_method == "corr":
+        plot_func(
+            experiment_folder,
+            model_list,
+            x_test,
+            y_test,
+            config_dict["data"]["target"],
+            holdout=holdout,
+        )
+    elif plot_method == "hist":
+        plot_func(
+            experiment_folder,
+            model_list,
+            x_test,
+            y_test,
+            config_dict["data"]["target"],
+            holdout=holdout,
+        )
+    elif plot_method == "hist_overlapped":
+        plot_func(
+            experiment_folder,
+            model_list,
+            x_test,
+            y_test,
+            config_dict["data"]["target"],
+            holdout=holdout,
+        )
+    elif plot_method == "joint":
+        plot_func(
+            experiment_folder,
+            model_list,
+            x_test,
+            y_test,
+            config_dict["data"]["target"],
+            holdout=holdout,
+        )
+    elif plot_method == "joint_dens":
+        plot_func(
+            experiment_folder,
+            model_list,
+            x_test,
+            y_test,
+            config_dict["data"]["target"],
+            kind="kde",
+            holdout=holdout,
+        )
+    elif plot_method == "permut_imp_test":
+        plot_func(
+            experiment_folder,
+            config_dict["ml"]["seed_num"],
+            model_list,
+            config_dict["ml"]["fit_scorer"],
+            config_dict["ml"]["problem_type"],
+            scorer_dict,
+            feature_names,
+            x_test,
+            y_test,
+            config_dict["plotting"]["top_feats_permImp"],
+            n_repeats=config_dict["plotting"]["n_repeats_permImp"],
+            adaptive=config_dict["plotting"]["adaptive_permImp"],
+            initial_repeats=config_dict["plotting"]["initial_repeats_permImp"],
+            max_predictions=config_dict["plotting"]["max_predictions_permImp"],
+            correlation_threshold=config_dict["plotting"][
+                "correlation_threshold_permImp"
+            ],
+            processes=config_dict["plotting"]["processes_permImp"],
+            holdout=holdout,
+        )
+    elif plot_method == "shap_plots":
+        plot_func(
+            experiment_folder,
+            config_dict["ml"]["problem_type"],
+            model_list,
+            config_dict["plotting"]["explanations_data"],
+            feature_names,
+            x,
+            x_test,
+            y_test,
+            x_train,
+            config_dict["plotting"]["top_feats_shap"],
+            holdout=holdout,
+            y=y,
+            y_train=y_train,
+            background_size=config_dict["plotting"]["background_size_shap"],
+            background_method=config_dict["plotting"]["background_method_shap"],
+            max_explained=config_dict["plotting"]["max_explained_shap"],
+            nsamples=config_dict["plotting"]["nsamples_shap"],
+            seed=config_dict["ml"]["seed_num"],
+        )
+    elif plot_method == "roc_curve":
+        plot_func(
+            experiment_folder,
+            model_list,
+            x_test,
+            y_test,
+            holdout=holdout,
+        )
+
+    # elif plot_method == "shap_force_plots":
+    #     plot_func(experiment_folder, model_list,config_dict["ml"]["problem_type"], x_test,
+    #               y_test, feature_names, x, y, x_train,
+    #                       data_forexplanations="all", top_exemplars=0.4, save=True)
+    # elif plot_method == "permut_imp_alldata":
+    #     plot_func(experiment_folder, config_dict, scorer_dict, feature_names, x, y,
+    #                       config_dict['plotting']["top_feats_permImp"], cv='prefit')
+    # elif plot_method == "permut_imp_train":
+    #     plot_func(experiment_folder, config_dict, scorer_dict, feature_names, x_train, y_train,
+    #                       config_dict['plotting']["top_feats_permImp"], cv='prefit')
+    # elif plot_method == "permut_imp_5cv":
+    #     plot_func(experiment_folder, config_dict, scorer_dict, feature_names, x, y,
+    #                       config_dict['plotting']["top_feats_permImp"], cv=5)
+
+
+def main(config_path=None, force=False):
     """
     Running this script by itself enables for the plots to be made separately from the creation of the models
 
     Uses the config in the same way as when giving it to run_models.py.
     """
 
-    # init the profiler to time function executions
-    pr = cProfile.Profile()
-    pr.enable()
+    started = time.time()
 
     # Do the initial setup
-    config_path, config_dict, experiment_folder, omicLogger = initial_setup()
+    config_path, config_dict, experiment_folder, omicLogger = initial_setup(config_path)
+
+    # trace the stages of the run, and profile it as set in the config
+    profiler = Profiler(config_dict, experiment_folder, "plotting").start()
 
     try:
         omicLogger.info("Loading data...")
@@ -230,13 +312,19 @@ if __name__ == "__main__":
             y_train,
             x_test,
             y_test,
+            force=force,
         )
+        index_run(config_dict, experiment_folder, "plotting", started)
         omicLogger.info("Process completed.")
     except Exception as e:
         omicLogger.error(e, exc_info=True)
         logging.error(e, exc_info=True)
+        profiler.stop()
         raise e
 
-    # save time profile information
-    pr.disable()
-    prof_to_csv(pr, config_dict)
+    # save the trace & profiles
+    profiler.stop()
+
+
+if __name__ == "__main__":
+    main(force=create_cli_parser().parse_args().force)
@@ -13,26 +13,26 @@
 # limitations under the License.
 
 from sklearn.preprocessing import normalize
+from utils.experiment_index import index_run
 from utils.load import get_data_R2G, load_data, load_model
 from utils.ml.preprocessing import apply_ml_preprocessing
-from utils.utils import assert_best_model_exists, initial_setup, prof_to_csv
-import cProfile
+from utils.profiling import Profiler
+from utils.utils import assert_best_model_exists, initial_setup
 import logging
 import numpy as np
 import os
 import pandas as pd
+import time
 
 
-if __name__ == "__main__":
+def main(config_path=None):
     """
     Running this script by itself enables for the plots to be made separately from the creation of the models
 
     Uses the config in the same way as when giving it to run_models.py.
     """
 
-    # init the profiler to time function executions
-    pr = cProfile.Profile()
-    pr.enable()
+    started = time.time()
 
     # Do the initial setup
     (
@@ -40,7 +40,10 @@ if __name__ == "__main__":
         config_dict,
         experiment_folder,
         omicLogger,
-    ) = initial_setup()
+    ) = initial_setup(config_path)
+
+    # trace the stages of the run, and profile it as set in the config
+    profiler = Profiler(config_dict, experiment_folder, "predict").start()
 
     try:
         omicLogger.info("Checking for Trained models")
@@ -91,13 +94,20 @@ if __name__ == "__main__":
             index=True,
         )
 
+        index_run(
+            config_dict, experiment_folder, "predict", started, best_model=model_name
+        )
         omicLogger.info("Process completed.")
 
     except Exception as e:
         omicLogger.error(e, exc_info=True)
         logging.error(e, exc_info=True)
+        profiler.stop()
         raise e
 
-    # save time profile information
-    pr.disable()
-    prof_to_csv(pr, config_dict)
+    # save the trace & profiles
+    profiler.stop()
+
+
+if __name__ == "__main__":
+    main()
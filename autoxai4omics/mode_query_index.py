@@ -0,0 +1,73 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from argparse import ArgumentParser
+from utils.experiment_index import (
+    best_models,
+    connect,
+    list_runs,
+    metric_summary,
+    query,
+)
+import pandas as pd
+
+
+def main(argv=None):
+    """
+    Query the experiment index (`experiment_index` in the configs), e.g.
+
+        python mode_query_index.py -i /experiments/index.db best
+        python mode_query_index.py -i /experiments/index.db metric f1_score --model XGBClassifier --name "replicate_%"
+        python mode_query_index.py -i /experiments/index.db sql "SELECT mode, COUNT(*) FROM runs GROUP BY mode"
+    """
+    parser = ArgumentParser(description="experiment index query")
+    parser.add_argument(
+        "-i", "--index", required=True, help="Path of the experiment index"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    runs = subparsers.add_parser("runs", help="list the indexed runs")
+    runs.add_argument("--name", help="SQL LIKE pattern the run names must match")
+
+    best = subparsers.add_parser(
+        "best", help="best model of the latest training run per dataset"
+    )
+    best.add_argument("--name", help="SQL LIKE pattern the run names must match")
+
+    metric = subparsers.add_parser(
+        "metric", help="statistics of a metric per model across runs"
+    )
+    metric.add_argument("metric", help="metric name, e.g. f1_score")
+    metric.add_argument("--model", help="SQL LIKE pattern the models must match")
+    metric.add_argument("--split", default="Test", choices=["Train", "Test"])
+    metric.add_argument("--mode", default="train", choices=["train", "test"])
+    metric.add_argument("--name", help="SQL LIKE pattern the run names must match")
+
+    sql = subparsers.add_parser("sql", help="run an SQL query on the index")
+    sql.add_argument("query", help="the SQL query")
+
+    args = parser.parse_args(argv)
+
+    conn = connect(args.index)
+    try:
+        if args.command == "runs":
+            result = list_runs(conn, args.name)
+        elif args.command == "best":
+            result = best_models(conn, args.name)
+        elif args.command == "metric":
+            result = metric_summary(
+                conn, args.metric, args.model, args.split, args.mode, args.name
+            )
+        else:
+            result = query(conn, args.query)
+    finally:
+        conn.close()
+
+    with pd.option_context("display.max_rows", None, "display.width", None):
+        print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,29 +15,28 @@
 
 from metrics.metrics import evaluate_model, define_scorers
 from mode_plotting import plot_graphs
-from pathlib import Path
+from utils.experiment_index import index_run
 from utils.load import get_data_R2G, load_previous_AO_data, load_data, load_model
 from utils.ml.preprocessing import apply_ml_preprocessing
-from utils.save import save_results
+from utils.profiling import Profiler
+from utils.results_store import ResultsStore
 from utils.utils import (
     assert_best_model_exists,
+    create_cli_parser,
     get_model_path,
     initial_setup,
-    prof_to_csv,
 )
-import cProfile
 import logging
-import pandas as pd
+import time
 
-if __name__ == "__main__":
+
+def main(config_path=None, force=False):
     """
     Running this script by itself enables for the plots to be made separately from the creation of the models
 
     Uses the config in the same way as when giving it to run_models.py.
     """
-    # init the profiler to time function executions
-    pr = cProfile.Profile()
-    pr.enable()
+    started = time.time()
 
     # Do the initial setup
     (
@@ -45,7 +44,10 @@ if __name__ == "__main__":
         config_dict,
         experiment_folder,
         omicLogger,
-    ) = initial_setup()
+    ) = initial_setup(config_path)
+
+    # trace the stages of the run, and profile it as set in the config
+    profiler = Profiler(config_dict, experiment_folder, "test").start()
 
     try:
         omicLogger.info("Loading data...")
@@ -74,9 +76,7 @@ if __name__ == "__main__":
                 config_dict, holdout=True
             )
 
-        omicLogger.info("Heldout data transformed. Creating results DataFrame...")
-        # Create dataframe for performance results
-        df_performance_results = pd.DataFrame()
+        omicLogger.info("Heldout data transformed. Creating results store...")
 
         # Construct the filepath to save the results
         results_folder = experiment_folder / "results"
@@ -92,6 +92,12 @@ if __name__ == "__main__":
         else:
             fname = "scores_"
 
+        # Store for the performance results, a run appends a record per model, split & metric
+        results_store = ResultsStore(
+            results_folder, fname + "_performance_results_holdout"
+        )
+        results_store.start_run()
+
         # For each model, load it and then compute performance result
         # Loop over the models
         omicLogger.debug("Begin evaluating models...")
@@ -126,21 +132,15 @@ if __name__ == "__main__":
 
             omicLogger.debug("Saving...")
             # Save the results
-            df_performance_results, fname_perfResults = save_results(
-                results_folder,
-                df_performance_results,
-                performance_results_dict,
-                model_name,
-                fname,
-                suffix="_performance_results_holdout",
-                save_pkl=False,
-                save_csv=True,
-            )
+            results_store.append(model_name, performance_results_dict)
 
             print(
-                f"{model_name} evaluation on hold out complete! Results saved at {Path(fname_perfResults).parents[0]}"
+                f"{model_name} evaluation on hold out complete! Results saved at {results_store.path}"
             )
 
+        # Generate the legacy results csv
+        results_store.write_csv()
+
         omicLogger.debug("Begin plotting graphs")
         # Central func to define the args for the plots
         plot_graphs(
@@ -154,14 +154,20 @@ if __name__ == "__main__":
             x_heldout,
             y_heldout,
             holdout=True,
+            force=force,
         )
+        index_run(config_dict, experiment_folder, "test", started)
         omicLogger.info("Process completed.")
 
     except Exception as e:
         omicLogger.error(e, exc_info=True)
         logging.error(e, exc_info=True)
+        profiler.stop()
         raise e
 
-    # save time profile information
-    pr.disable()
-    prof_to_csv(pr, config_dict)
+    # save the trace & profiles
+    profiler.stop()
+
+
+if __name__ == "__main__":
+    main(force=create_cli_parser().parse_args().force)
@@ -14,24 +14,25 @@
 
 from mode_plotting import plot_graphs
 from models.models import run_models, select_best_model
+from plotting.render import Renderer
+from utils.experiment_index import index_run
 from utils.load import get_data_R2G, load_data
 from utils.ml.data_split import split_data
 from utils.ml.preprocessing import learn_ml_preprocessing
-from utils.utils import initial_setup, copy_best_content, prof_to_csv
-import cProfile
+from utils.profiling import Profiler
+from utils.utils import copy_best_content, create_cli_parser, initial_setup
 import logging
 import numpy as np
 import pandas as pd
+import time
 
 
-def main():
+def main(config_path=None, force=False):
     """
     Central function to tie together preprocessing, running the models, and plotting
     """
 
-    # init the profiler to time function executions
-    pr = cProfile.Profile()
-    pr.enable()
+    started = time.time()
 
     # Do the initial setup
     (
@@ -39,7 +40,12 @@ def main():
         config_dict,
         experiment_folder,
         omicLogger,
-    ) = initial_setup()
+    ) = initial_setup(config_path)
+
+    # trace the stages of the run, and profile it as set in the config
+    profiler = Profiler(config_dict, experiment_folder, "train").start()
+    # the figures of the run are drawn together once computed
+    renderer = Renderer(config_dict).start()
 
     try:
         omicLogger.info("Loading data...")
@@ -134,6 +140,7 @@ def main():
                 y_train,
                 x_test,
                 y_test,
+                force=force,
             )
         else:
             omicLogger.info("No plots desired.")
@@ -150,17 +157,23 @@ def main():
             config_dict["ml"]["fit_scorer"],
             collapse_tax,
         )
+        # the figures are drawn before the best model's are copied
+        renderer.stop()
         copy_best_content(experiment_folder, best_models, collapse_tax)
 
+        index_run(
+            config_dict, experiment_folder, "train", started, best_model=best_models[0]
+        )
         omicLogger.info("Process completed.")
     except Exception as e:
         omicLogger.error(e, exc_info=True)
         logging.error(e, exc_info=True)
+        renderer.stop()
+        profiler.stop()
         raise e
 
-    # save time profile information
-    pr.disable()
-    prof_to_csv(pr, config_dict)
+    # save the trace & profiles
+    profiler.stop()
 
 
 if __name__ == "__main__":
@@ -170,4 +183,4 @@ if __name__ == "__main__":
     multiprocessing.set_start_method("spawn", force=True)
 
     # Run the models
-    main()
+    main(force=create_cli_parser().parse_args().force)
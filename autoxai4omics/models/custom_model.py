@@ -13,16 +13,13 @@
 # limitations under the License.
 
 
-from models.tabauto.keras_model import KerasModel
-from models.tabauto.lgbm_model import LGBMModel
-from models.tabauto.xgboost_model import XGBoostModel
 from sklearn.preprocessing import OneHotEncoder
+from utils.lazy import import_object
 from utils.vars import CLASSIFICATION, REGRESSION
 import joblib
 import logging
 import numpy as np
 import pandas as pd
-import tensorflow
 
 omicLogger = logging.getLogger("OmicLogger")
 
@@ -211,13 +208,14 @@ class CustomModel:
         if config:
             self.verbose = config.get("verbose", False)
 
-        model = MODEL_REF[self.nickname](
+        model = import_object(MODEL_REF[self.nickname])(
             num_inputs,
             num_outputs,
             dataset_type=dataset_type,
             method=METHOD_REF[self.nickname],
             config=config,
             random_state=self.random_state,
+            experiment_folder=self.experiment_folder,
         )
 
         # Assign the model
@@ -354,6 +352,8 @@ class FixedKeras(CustomModel):
         with open(model_path + ".pkl", "rb") as f:
             model = joblib.load(f)
         # Load the model with Keras and set this to the relevant attribute
+        import tensorflow
+
         omicLogger.debug(f"loading: {model_path}.h5")
         model.model = tensorflow.keras.models.load_model(model_path + ".h5")
         return model
@@ -386,6 +386,8 @@ class AutoKeras(CustomModel):
         with open(model_path + ".pkl", "rb") as f:
             model = joblib.load(f)
         # Load the model with Keras and set this to the relevant attribute
+        import tensorflow
+
         omicLogger.debug(f"loading: {model_path}.h5")
         model.model = tensorflow.keras.models.load_model(model_path + ".h5")
         return model
@@ -408,9 +410,10 @@ METHOD_REF = {
     "FixedKeras": "train_dnn_keras",
 }
 
+# the wrapped models, imported on first use as they bring in tensorflow & autokeras, or lightgbm, xgboost & optuna
 MODEL_REF = {
-    "AutoXGBoost": XGBoostModel,
-    "AutoLGBM": LGBMModel,
-    "AutoKeras": KerasModel,
-    "FixedKeras": KerasModel,
+    "AutoXGBoost": "models.tabauto.xgboost_model:XGBoostModel",
+    "AutoLGBM": "models.tabauto.lgbm_model:LGBMModel",
+    "AutoKeras": "models.tabauto.keras_model:KerasModel",
+    "FixedKeras": "models.tabauto.keras_model:KerasModel",
 }
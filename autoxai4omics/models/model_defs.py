@@ -12,35 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from sklearn.ensemble import (
-    AdaBoostClassifier,
-    AdaBoostRegressor,
-    RandomForestClassifier,
-    RandomForestRegressor,
-)
-from sklearn.gaussian_process import GaussianProcessClassifier
-from sklearn.gaussian_process.kernels import RBF
-from sklearn.linear_model import (
-    ElasticNet,
-    Lars,
-    Lasso,
-    LassoLars,
-    LinearRegression,
-    Ridge,
-    SGDRegressor,
-)
-from sklearn.neighbors import KNeighborsClassifier, KNeighborsRegressor
-from sklearn.neural_network import MLPClassifier
-from sklearn.svm import SVC, SVR
-from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
-from models.custom_model import (
-    AutoKeras,
-    AutoLGBM,
-    AutoXGBoost,
-    FixedKeras,
-)
-from xgboost import XGBClassifier, XGBRegressor
-from sklearn.ensemble import GradientBoostingClassifier, GradientBoostingRegressor
+from utils.lazy import import_object
 import models.model_params as model_params
 from utils.vars import CLASSIFICATION, REGRESSION
 import logging
@@ -48,61 +20,69 @@ import logging
 omicLogger = logging.getLogger("OmicLogger")
 
 
+# the estimator of each model as "module:class", imported on first use (see `get_model`)
 MODELS = {
     REGRESSION: {
         "LinearRegression": {
-            "model": LinearRegression,
+            "model": "sklearn.linear_model:LinearRegression",
         },
         "Ridge": {
-            "model": Ridge,
+            "model": "sklearn.linear_model:Ridge",
+            "path": model_params.sk_path.get("ridge"),
         },
         "SGDRegressor": {
-            "model": SGDRegressor,
+            "model": "sklearn.linear_model:SGDRegressor",
+            "random": model_params.sk_random.get("sgd"),
+            "grid": model_params.sk_grid.get("sgd"),
         },
         "ElasticNet": {
-            "model": ElasticNet,
+            "model": "sklearn.linear_model:ElasticNet",
+            "path": model_params.sk_path.get("elasticnet"),
         },
         "Lars": {
-            "model": Lars,
+            "model": "sklearn.linear_model:Lars",
+            "path": model_params.sk_path.get("lars"),
         },
         "Lasso": {
-            "model": Lasso,
+            "model": "sklearn.linear_model:Lasso",
+            "path": model_params.sk_path.get("lasso"),
         },
         "LassoLars": {
-            "model": LassoLars,
+            "model": "sklearn.linear_model:LassoLars",
+            "path": model_params.sk_path.get("lassolars"),
         },
         "RandomForestRegressor": {
-            "model": RandomForestRegressor,
-            "random": model_params.sk_random.get("rf"),
-            "grid": model_params.sk_grid.get("rf"),
-            "single": model_params.single_model.get("rf"),
+            "model": "sklearn.ensemble:RandomForestRegressor",
+            "random": model_params.sk_random.get("rf_regressor"),
+            "grid": model_params.sk_grid.get("rf_regressor"),
+            "single": model_params.single_model.get("rf_regressor"),
         },
         "KNeighborsRegressor": {
-            "model": KNeighborsRegressor,
+            "model": "sklearn.neighbors:KNeighborsRegressor",
             "random": model_params.sk_random.get("knn"),
             "grid": model_params.sk_grid.get("knn"),
             "single": model_params.single_model.get("knn"),
         },
         "DecisionTreeRegressor": {
-            "model": DecisionTreeRegressor,
+            "model": "sklearn.tree:DecisionTreeRegressor",
         },
         "GradientBoostingRegressor": {
-            "model": GradientBoostingRegressor,
+            "model": "sklearn.ensemble:GradientBoostingRegressor",
         },
         "AdaBoostRegressor": {
-            "model": AdaBoostRegressor,
+            "model": "sklearn.ensemble:AdaBoostRegressor",
             "random": model_params.sk_random.get("adaboost"),
             "grid": model_params.sk_grid.get("adaboost"),
             "single": model_params.single_model.get("adaboost"),
         },
         "XGBRegressor": {
-            "model": XGBRegressor,
+            "model": "xgboost:XGBRegressor",
             "random": model_params.sk_random.get("xgboost"),
             "grid": model_params.sk_grid.get("xgboost"),
             "single": model_params.single_model.get("xgboost"),
         },
         "SVR": {
-            "model": SVR,
+            "model": "sklearn.svm:SVR",
             "random": model_params.sk_random.get("svr"),
             "grid": model_params.sk_grid.get("svr"),
             "single": model_params.single_model.get("svr"),
@@ -110,46 +90,46 @@ MODELS = {
     },
     CLASSIFICATION: {
         "XGBClassifier": {
-            "model": XGBClassifier,
+            "model": "xgboost:XGBClassifier",
             "random": model_params.sk_random.get("xgboost"),
             "grid": model_params.sk_grid.get("xgboost"),
             "single": model_params.single_model.get("xgboost"),
         },
         "GradientBoostingClassifier": {
-            "model": GradientBoostingClassifier,
+            "model": "sklearn.ensemble:GradientBoostingClassifier",
         },
         "MLPClassifier": {
-            "model": MLPClassifier,
+            "model": "sklearn.neural_network:MLPClassifier",
         },
         "KNeighborsClassifier": {
-            "model": KNeighborsClassifier,
+            "model": "sklearn.neighbors:KNeighborsClassifier",
             "random": model_params.sk_random.get("knn"),
             "grid": model_params.sk_grid.get("knn"),
             "single": model_params.single_model.get("knn"),
         },
         "SVC": {
-            "model": SVC,
+            "model": "sklearn.svm:SVC",
             "random": model_params.sk_random.get("svc"),
             "grid": model_params.sk_grid.get("svc"),
             "single": model_params.single_model.get("svc"),
         },
         "GaussianProcessClassifier": {
-            "model": GaussianProcessClassifier,
+            "model": "sklearn.gaussian_process:GaussianProcessClassifier",
         },
         "RBF": {
-            "model": RBF,
+            "model": "sklearn.gaussian_process.kernels:RBF",
         },
         "DecisionTreeClassifier": {
-            "model": DecisionTreeClassifier,
+            "model": "sklearn.tree:DecisionTreeClassifier",
         },
         "RandomForestClassifier": {
-            "model": RandomForestClassifier,
+            "model": "sklearn.ensemble:RandomForestClassifier",
             "random": model_params.sk_random.get("rf"),
             "grid": model_params.sk_random.get("rf"),
             "single": model_params.single_model.get("rf"),
         },
         "AdaBoostClassifier": {
-            "model": AdaBoostClassifier,
+            "model": "sklearn.ensemble:AdaBoostClassifier",
             "random": model_params.sk_random.get("adaboost"),
             "grid": model_params.sk_grid.get("adaboost"),
             "single": model_params.single_model.get("adaboost"),
@@ -157,22 +137,28 @@ MODELS = {
     },
     "both": {
         "AutoKeras": {
-            "model": AutoKeras,
+            "model": "models.custom_model:AutoKeras",
         },
         "AutoLGBM": {
-            "model": AutoLGBM,
+            "model": "models.custom_model:AutoLGBM",
         },
         "AutoXGBoost": {
-            "model": AutoXGBoost,
+            "model": "models.custom_model:AutoXGBoost",
         },
         "FixedKeras": {
-            "model": FixedKeras,
+            "model": "models.custom_model:FixedKeras",
             "single": model_params.single_model.get("FixedKeras"),
         },
     },
 }
 
 
+def get_model(problem_type: str, model_name: str) -> type:
+    """The estimator class of a model available for `problem_type`, importing it if needed"""
+    entry = MODELS[problem_type].get(model_name) or MODELS["both"][model_name]
+    return import_object(entry["model"])
+
+
 def form_model_dict(
     problem_type: str, hyper_tunning: [str, None], model_list: list[str]
 ) -> dict[str, tuple[object, dict, bool]]:
@@ -183,15 +169,15 @@ def form_model_dict(
     -------
     dict
         chosen model names are the keys and the values is a tuple containing the model object, the paramaters for the
-        hyper tunning (defaulting to single if none found) and a boolean flag indicating if the parameter are for a
-        single model
+        hyper tunning (falling back to the path settings, then to single if none found) and a boolean flag indicating
+        if the parameter are for a single model
 
     Raises
     ------
     ValueError
         Is raised if problem type is not 'classification' or 'regression'
     ValueError
-        Is raised if hyper_tunning is not one of 'grid', 'random' or None
+        Is raised if hyper_tunning is not one of 'grid', 'random', 'optuna' or None
     ValueError
         Is raised if the model specified in model_name is not available for training
     """
@@ -203,14 +189,17 @@ def form_model_dict(
         )
 
     # check that the hyper_tunning is one of the accepted entries
-    if hyper_tunning not in ["grid", "random", None]:
+    if hyper_tunning not in ["grid", "random", "optuna", None]:
         raise ValueError(
-            f"hyper_tuning must be one of 'grid', 'random' or None. Provided {hyper_tunning}"
+            f"hyper_tuning must be one of 'grid', 'random', 'optuna' or None. Provided {hyper_tunning}"
         )
 
     # if hyper_tunning is none set to 'single' to access appropriate entries
     if hyper_tunning is None:
         hyper_tunning = "single"
+    # optuna samples from the random search spaces
+    elif hyper_tunning == "optuna":
+        hyper_tunning = "random"
 
     # create empty out dict
     model_dict = {}
@@ -228,11 +217,15 @@ def form_model_dict(
             )
 
         # get the model object
-        mdl = combi[model_name]["model"]
+        mdl = import_object(combi[model_name]["model"])
 
         # get the parameters for the specified hyper tunning, will be none if does not exist
         hyper_tunning_params = combi[model_name].get(hyper_tunning)
 
+        # models tuned along their regularisation path use the same settings for any tuning method
+        if hyper_tunning != "single" and not hyper_tunning_params:
+            hyper_tunning_params = combi[model_name].get("path")
+
         # get the single model params as the backup and default to empty dict if none found
         single_tunning_params = combi[model_name].get("single", {})
 
@@ -18,7 +18,7 @@ import scipy.stats as sp
 sk_random = {
     "rf": {
         "n_estimators": sp.randint(20, 200),
-        "max_features": ["auto", "sqrt"],
+        "max_features": ["sqrt"],
         "max_depth": sp.randint(10, 70),
         "min_samples_split": [2, 5, 10],
         "min_samples_leaf": [1, 2, 4],
@@ -37,6 +37,11 @@ sk_random = {
     },
     "knn": {"n_neighbors": sp.randint(2, 20), "metric": ["euclidean", "manhattan"]},
     "adaboost": {"n_estimators": sp.randint(10, 200)},
+    "sgd": {
+        "alpha": 10.0 ** np.arange(-6, 1),
+        "penalty": ["l2", "l1", "elasticnet"],
+        "l1_ratio": [0.15, 0.5, 0.85],
+    },
     "xgboost": {
         "max_depth": sp.randint(2, 8),
         "learning_rate": np.arange(0.05, 0.91, 0.05),
@@ -55,7 +60,7 @@ sk_random = {
 sk_grid = {
     "rf": {
         "n_estimators": range(50, 201, 50),
-        "max_features": ["auto", "sqrt"],
+        "max_features": ["sqrt"],
         "max_depth": range(10, 71, 10),
         "min_samples_split": [2, 5, 10],
         "min_samples_leaf": [1, 2, 4],
@@ -74,6 +79,11 @@ sk_grid = {
     },
     "knn": {"n_neighbors": range(1, 21, 2), "metric": ["euclidean", "manhattan"]},
     "adaboost": {"n_estimators": range(50, 201, 50)},
+    "sgd": {
+        "alpha": 10.0 ** np.arange(-6, 1),
+        "penalty": ["l2", "l1", "elasticnet"],
+        "l1_ratio": [0.15, 0.5, 0.85],
+    },
     "xgboost": {
         "max_depth": range(2, 9, 2),
         "learning_rate": [0.05, 0.10, 0.15, 0.20, 0.25, 0.30],
@@ -88,10 +98,24 @@ sk_grid = {
     # }
 }
 
+# settings for the models tuned along their regularisation path (see models/path_search.py), used for both random
+# and grid tuning
+sk_path = {
+    "lasso": {"n_alphas": 100, "eps": 1e-3},
+    "elasticnet": {
+        "n_alphas": 100,
+        "eps": 1e-3,
+        "l1_ratio": [0.1, 0.5, 0.7, 0.9, 0.95, 0.99, 1.0],
+    },
+    "lassolars": {"n_alphas": 100, "eps": 1e-3},
+    "lars": {"n_nonzero_coefs": 500},
+    "ridge": {"alphas": np.logspace(-3, 5, 33)},
+}
+
 single_model = {
     "rf": {
         "n_estimators": 100,
-        "max_features": "auto",
+        "max_features": "sqrt",
         "max_depth": None,
         "min_samples_split": 2,
         "min_samples_leaf": 1,
@@ -123,6 +147,12 @@ single_model = {
     },
 }
 
+# scikit-learn no longer accepts max_features="auto", which meant "sqrt" for a RandomForestClassifier (the "rf" entries)
+# and all the features (1.0) for a RandomForestRegressor
+for params in [sk_random, sk_grid]:
+    params["rf_regressor"] = {**params["rf"], "max_features": [1.0, "sqrt"]}
+single_model["rf_regressor"] = {**single_model["rf"], "max_features": 1.0}
+
 
 boaas_dict = {
     "rf": {
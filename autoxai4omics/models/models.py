@@ -14,12 +14,25 @@
 
 from models.custom_model import CustomModel
 from models.model_defs import form_model_dict
-from pathlib import Path
+from models.path_search import PATH_SEARCHES
 from plotting.plots_both import plot_model_performance
-from sklearn.model_selection import RandomizedSearchCV, GridSearchCV
-from utils.save import save_model, save_results
+from joblib import effective_n_jobs
+from sklearn.base import clone
+from sklearn.model_selection import GridSearchCV, ParameterGrid, ParameterSampler
+from utils.checkpoint import (
+    CandidateLog,
+    checkpoint_folder,
+    fingerprint,
+    valid_marker,
+    write_marker,
+)
+from utils.profiling import span
+from utils.results_store import ResultsStore
+from utils.save import save_model
 from utils.vars import CLASSIFICATION
 import logging
+import glob
+import joblib
 import metrics.metrics
 import numpy as np
 import os
@@ -30,6 +43,9 @@ import pandas as pd
 n_jobs = -1
 omicLogger = logging.getLogger("OmicLogger")
 
+# number of search candidates cross validated between two writes of the search log, raised to one per core
+CHECKPOINT_CHUNK = 10
+
 
 ########## EVALUATE ##########
 def select_best_model(experiment_folder, problem_type, metric=None, collapse_tax=None):
@@ -41,16 +57,13 @@ def select_best_model(experiment_folder, problem_type, metric=None, collapse_tax
         collapse_tax = ""
 
     omicLogger.debug("selecting best model...")
-    filepath = (
-        experiment_folder
-        / f"results/scores_{collapse_tax}_performance_results_testset.csv"
+    results_store = ResultsStore(
+        experiment_folder / "results",
+        f"scores_{collapse_tax}_performance_results_testset",
     )
 
-    if not os.path.exists(filepath):
-        raise ValueError(f"{filepath} does not exist")
-
-    df = pd.read_csv(filepath)
-    df = df.set_index("model")
+    if not results_store.path.exists():
+        raise ValueError(f"{results_store.path} does not exist")
 
     if problem_type == CLASSIFICATION:
         if metric is None:
@@ -63,23 +76,14 @@ def select_best_model(experiment_folder, problem_type, metric=None, collapse_tax
             metric = "mean_absolute_error"
         low = True
 
-    df_cols = list(
-        set(
-            [
-                x.replace("_Train", "").replace("_Test", "")
-                for x in list(df.columns)
-                if ("PerClass" not in x)
-            ]
-        )
-    )
-    offical_name = [x for x in df_cols if (metric in x.lower())]
+    offical_name = [x for x in results_store.metrics() if (metric in x.lower())]
 
     if len(offical_name) == 0:
         raise ValueError(f"{metric} not in metrics calculated for models")
 
     metric = offical_name[0]
 
-    t_df = df[[metric + "_Train", metric + "_Test"]]
+    t_df = results_store.metric_frame(metric)
 
     plot_model_performance(experiment_folder, t_df, metric, low=low)
 
@@ -112,6 +116,75 @@ def select_best_model(experiment_folder, problem_type, metric=None, collapse_tax
 
 
 ########## WRAPPERS ##########
+def search_candidates(
+    model,
+    candidates: list[dict],
+    x_train,
+    y_train,
+    scorer_dict,
+    fit_scorer: str,
+    log: CandidateLog = None,
+    cv: int = 5,
+):
+    """
+    Cross validate each of the parameter `candidates` and refit the best one (for `fit_scorer`) on all the data.
+
+    The candidates are scored `CHECKPOINT_CHUNK` (or one per core if more) at a time, each chunk by a `GridSearchCV`
+    over their singleton grids, and their scores are appended to `log` as they complete. Candidates already in the log are not run again, so an
+    interrupted search resumes where it stopped. The scores, and so the chosen candidate, are the same as a single
+    `RandomizedSearchCV`/`GridSearchCV` over all of them.
+    """
+    done = log.completed(candidates) if log is not None else {}
+    if done:
+        omicLogger.info(
+            f"Resuming the search after {len(done)} of {len(candidates)} candidates"
+        )
+
+    todo = [i for i in range(len(candidates)) if i not in done]
+    # enough candidates per chunk that its cv fits keep every core busy
+    chunk_size = (
+        max(CHECKPOINT_CHUNK, effective_n_jobs(n_jobs))
+        if log is not None
+        else max(1, len(todo))
+    )
+    for start in range(0, len(todo), chunk_size):
+        chunk = todo[start : start + chunk_size]
+        search = GridSearchCV(
+            estimator=model(),
+            param_grid=[{k: [v] for k, v in candidates[i].items()} for i in chunk],
+            cv=cv,
+            verbose=1,
+            n_jobs=n_jobs,
+            pre_dispatch="2*n_jobs",
+            scoring=scorer_dict,
+            refit=False,
+        )
+        search.fit(x_train, y_train)
+
+        records = [
+            {
+                "index": i,
+                "params": repr(candidates[i]),
+                "scores": {
+                    name: float(search.cv_results_[f"mean_test_{name}"][k])
+                    for name in scorer_dict
+                },
+            }
+            for k, i in enumerate(chunk)
+        ]
+        done.update({r["index"]: r["scores"] for r in records})
+        if log is not None:
+            log.append(records)
+
+    # the first of the best candidates, failed ones (nan) ranking last as in sklearn's searches
+    scores = np.array([done[i][fit_scorer] for i in range(len(candidates))])
+    best = int(np.argmax(np.where(np.isnan(scores), -np.inf, scores)))
+    omicLogger.info(f"Best candidate {best}: mean CV {fit_scorer} {scores[best]:.4f}")
+
+    with span("fit", cat="model", x_train=x_train):
+        return clone(model()).set_params(**candidates[best]).fit(x_train, y_train)
+
+
 def random_search(
     model,
     model_name,
@@ -122,9 +195,10 @@ def random_search(
     seed_num: int,
     scorer_dict,
     fit_scorer: str,
+    log: CandidateLog = None,
 ):
     """
-    Wrapper for using sklearn's RandomizedSearchCV
+    Random search over `param_ranges`, drawing the same `budget` candidates as sklearn's RandomizedSearchCV
     """
     omicLogger.debug("Training with a random search...")
     # If possible, set the random state for the model
@@ -135,29 +209,20 @@ def random_search(
         pass
     # Setup the random search with cross val
     omicLogger.info("Setup the random search with cross val")
-    random_search = RandomizedSearchCV(
-        estimator=model(),
-        param_distributions=param_ranges,
-        n_iter=budget,
-        cv=5,
-        verbose=1,
-        n_jobs=n_jobs,
-        random_state=seed_num,
-        pre_dispatch="2*n_jobs",
-        scoring=scorer_dict,
-        refit=fit_scorer,
-    )
+    candidates = list(ParameterSampler(param_ranges, budget, random_state=seed_num))
 
     # Fit the random search
     omicLogger.info("Fit the random search")
     try:
-        random_search.fit(x_train, y_train)
+        best_estimator = search_candidates(
+            model, candidates, x_train, y_train, scorer_dict, fit_scorer, log=log
+        )
     except ValueError:
         omicLogger.info("!!! ERROR - PLEASE SELECT VALID TARGET AND PREDICTION TASK")
         raise
     # Return the best estimator found
-    omicLogger.info(random_search.best_estimator_)
-    return random_search.best_estimator_
+    omicLogger.info(best_estimator)
+    return best_estimator
 
 
 def grid_search(
@@ -169,9 +234,10 @@ def grid_search(
     seed_num,
     scorer_dict,
     fit_scorer: str,
+    log: CandidateLog = None,
 ):
     """
-    Wrapper for using sklearn's GridSearchCV
+    Grid search over `param_ranges`, with the candidates of sklearn's GridSearchCV
     """
     omicLogger.debug("Training with a grid search...")
     try:
@@ -180,21 +246,14 @@ def grid_search(
     except TypeError:
         pass
 
-    grid_search = GridSearchCV(
-        estimator=model(),
-        param_grid=param_ranges,
-        cv=5,
-        verbose=1,
-        n_jobs=n_jobs,
-        pre_dispatch="2*n_jobs",
-        scoring=scorer_dict,
-        refit=fit_scorer,
+    candidates = list(ParameterGrid(param_ranges))
+    # Fit the grid search
+    best_estimator = search_candidates(
+        model, candidates, x_train, y_train, scorer_dict, fit_scorer, log=log
     )
-    # Fit the random search
-    grid_search.fit(x_train, y_train)
     # Return the best estimator found
-    omicLogger.info(grid_search.best_estimator_)
-    return grid_search.best_estimator_
+    omicLogger.info(best_estimator)
+    return best_estimator
 
 
 def single_model(model, param_ranges, x_train, y_train, seed_num):
@@ -209,7 +268,8 @@ def single_model(model, param_ranges, x_train, y_train, seed_num):
         pass
     omicLogger.debug(f"Setting parameters: {param_ranges}")
     omicLogger.info(model().set_params(**param_ranges))
-    trained_model = model().set_params(**param_ranges).fit(x_train, y_train)
+    with span("fit", cat="model", x_train=x_train):
+        trained_model = model().set_params(**param_ranges).fit(x_train, y_train)
     return trained_model
 
 
@@ -246,15 +306,16 @@ def run_models(
 ):
     """
     Run (and tune if applicable) each of the models sequentially, saving the results and models.
+
+    A model completed by an earlier run on the same settings & data, with its artifacts still in place, is not trained
+    again: its saved results are used instead. The random & grid searches log their candidates' scores as they go, so
+    an interrupted search resumes from them.
     """
     omicLogger.debug("Initialised training & tuning of models...")
 
     # Construct the filepath to save the results
     results_folder = experiment_folder / "results"
 
-    # Create dataframe for performance results
-    df_performance_results = pd.DataFrame()
-
     fname = "scores_"
 
     if config_dict["data"]["data_type"] == "microbiome":
@@ -267,6 +328,10 @@ def run_models(
         elif config_dict["microbiome"]["merge_classes"] is not None:
             fname += "_merge"
 
+    # Store for the performance results, a run appends a record per model, split & metric
+    results_store = ResultsStore(results_folder, fname + "_performance_results_testset")
+    results_store.start_run()
+
     #  Define all the scores
     scorer_dict = metrics.metrics.define_scorers(
         problem_type, config_dict["ml"]["scorer_list"]
@@ -275,6 +340,10 @@ def run_models(
 
     model_dict = form_model_dict(problem_type, hyper_tuning, model_list)
 
+    # The settings & data a model's checkpoint is valid for, the list of the other models does not matter
+    ml_settings = {k: v for k, v in config_dict["ml"].items() if k != "model_list"}
+    data_key = fingerprint(x_train, y_train, x_test, y_test)
+
     # Run each model
     for model_name in model_list:
         omicLogger.debug(f"Training model: {model_name}")
@@ -296,98 +365,180 @@ def run_models(
                 y_test,
             )
 
-        # Random search
-        if hyper_tuning == "random" and not single_model_flag:
-            omicLogger.info("Using random search")
-            # Do a random search to find the best parameters
-            trained_model = random_search(
-                model,
-                model_name,
-                param_ranges,
-                hyper_budget,
-                x_train,
-                y_train,
-                seed_num,
-                scorer_dict,
-                fit_scorer,
-            )
-            omicLogger.info(
-                "=================== Best model from random search: "
-                + model_name
-                + " ===================="
-            )
-            omicLogger.info(trained_model)
+        key = fingerprint(model_name, ml_settings, fname, data_key)
+        results_path = (
+            checkpoint_folder(experiment_folder) / f"{model_name}_results.pkl"
+        )
+        if valid_marker(experiment_folder, model_name, key):
             omicLogger.info(
-                "=================================================================="
+                f"{model_name} already completed, reusing its saved model & results"
             )
+            results_store.append(model_name, joblib.load(results_path))
+            continue
+        search_log = CandidateLog(
+            checkpoint_folder(experiment_folder)
+            / f"{model_name}_{key[:12]}_search.jsonl"
+        )
 
-        # No hyperparameter tuning (and/or the MLPEnsemble is to be run once)
-        elif hyper_tuning is None or single_model_flag:
-            if hyper_budget is not None:
+        with span(f"{model_name} tune", cat="model", x_train=x_train):
+            # Path search, every candidate on the tuning path is derived from shared per-fold computations
+            if (
+                hyper_tuning in ["random", "grid", "optuna"]
+                and not single_model_flag
+                and model in PATH_SEARCHES
+            ):
+                omicLogger.info("Using path search")
+                trained_model = PATH_SEARCHES[model](
+                    model,
+                    model_name,
+                    param_ranges,
+                    x_train,
+                    y_train,
+                    seed_num,
+                    scorer_dict,
+                    fit_scorer,
+                    n_jobs=n_jobs,
+                )
                 omicLogger.info(
-                    f"Hyperparameter tuning budget ({hyper_budget}) is not used without tuning"
+                    "=================== Best model from path search: "
+                    + model_name
+                    + " ===================="
+                )
+                omicLogger.info(trained_model)
+                omicLogger.info(
+                    "=================================================================="
                 )
-            # No tuning, just use the parameters supplied
-            trained_model = single_model(
-                model, param_ranges, x_train, y_train, seed_num
-            )
 
-        # Grid search
-        elif hyper_tuning == "grid":
-            omicLogger.info("Using grid search")
-            if hyper_budget is not None:
+            # Random search
+            elif hyper_tuning == "random" and not single_model_flag:
+                omicLogger.info("Using random search")
+                # Do a random search to find the best parameters
+                trained_model = random_search(
+                    model,
+                    model_name,
+                    param_ranges,
+                    hyper_budget,
+                    x_train,
+                    y_train,
+                    seed_num,
+                    scorer_dict,
+                    fit_scorer,
+                    log=search_log,
+                )
                 omicLogger.info(
-                    f"Hyperparameter tuning budget ({hyper_budget}) is not used in a grid search"
+                    "=================== Best model from random search: "
+                    + model_name
+                    + " ===================="
+                )
+                omicLogger.info(trained_model)
+                omicLogger.info(
+                    "=================================================================="
+                )
+
+            # Optuna search
+            elif hyper_tuning == "optuna" and not single_model_flag:
+                omicLogger.info("Using optuna search")
+                # imports optuna, only needed by this tuning
+                from models.optuna_search import optuna_search
+
+                trained_model = optuna_search(
+                    model,
+                    model_name,
+                    param_ranges,
+                    hyper_budget,
+                    x_train,
+                    y_train,
+                    seed_num,
+                    scorer_dict,
+                    fit_scorer,
+                    experiment_folder,
+                    optuna_config=config_dict["ml"]["optuna_config"],
+                    n_jobs=n_jobs,
+                )
+                omicLogger.info(
+                    "=================== Best model from optuna search: "
+                    + model_name
+                    + " ===================="
+                )
+                omicLogger.info(trained_model)
+                omicLogger.info(
+                    "=================================================================="
+                )
+
+            # No hyperparameter tuning (and/or the MLPEnsemble is to be run once)
+            elif hyper_tuning is None or single_model_flag:
+                if hyper_budget is not None:
+                    omicLogger.info(
+                        f"Hyperparameter tuning budget ({hyper_budget}) is not used without tuning"
+                    )
+                # No tuning, just use the parameters supplied
+                trained_model = single_model(
+                    model, param_ranges, x_train, y_train, seed_num
+                )
+
+            # Grid search
+            elif hyper_tuning == "grid":
+                omicLogger.info("Using grid search")
+                if hyper_budget is not None:
+                    omicLogger.info(
+                        f"Hyperparameter tuning budget ({hyper_budget}) is not used in a grid search"
+                    )
+                trained_model = grid_search(
+                    model,
+                    model_name,
+                    param_ranges,
+                    x_train,
+                    y_train,
+                    seed_num,
+                    scorer_dict,
+                    fit_scorer,
+                    log=search_log,
+                )
+                omicLogger.info(
+                    "=================== Best model from grid search: "
+                    + model_name
+                    + " ===================="
+                )
+                omicLogger.info(trained_model)
+                omicLogger.info(
+                    "=================================================================="
                 )
-            trained_model = grid_search(
-                model,
-                model_name,
-                param_ranges,
-                x_train,
-                y_train,
-                seed_num,
-                scorer_dict,
-                fit_scorer,
-            )
-            omicLogger.info(
-                "=================== Best model from grid search: "
-                + model_name
-                + " ===================="
-            )
-            omicLogger.info(trained_model)
-            omicLogger.info(
-                "=================================================================="
-            )
 
         # Save the best model found
-        save_model(experiment_folder, trained_model, model_name)
+        with span(f"{model_name} save", cat="model"):
+            save_model(experiment_folder, trained_model, model_name)
 
         # Evaluate the best model using all the scores and CV
-        performance_results_dict, predictions = metrics.metrics.evaluate_model(
-            trained_model,
-            config_dict["ml"]["problem_type"],
-            x_train,
-            y_train,
-            x_test,
-            y_test,
-            scorer_dict,
-        )
+        with span(f"{model_name} evaluate", cat="model", x_test=x_test):
+            performance_results_dict, predictions = metrics.metrics.evaluate_model(
+                trained_model,
+                config_dict["ml"]["problem_type"],
+                x_train,
+                y_train,
+                x_test,
+                y_test,
+                scorer_dict,
+            )
         predictions.to_csv(
             results_folder / f"{model_name}_predictions.csv", index=False
         )
 
-        # Save the results
-        df_performance_results, fname_perfResults = save_results(
-            results_folder,
-            df_performance_results,
-            performance_results_dict,
+        # Mark the model as completed, with the artifacts a resumed run needs
+        joblib.dump(performance_results_dict, results_path)
+        write_marker(
+            experiment_folder,
             model_name,
-            fname,
-            suffix="_performance_results_testset",
-            save_pkl=False,
-            save_csv=True,
+            key,
+            sorted(
+                glob.glob(str(experiment_folder / "models" / f"{model_name}_best.*"))
+            )
+            + [results_folder / f"{model_name}_predictions.csv", results_path],
         )
 
-        omicLogger.info(
-            f"{model_name} complete! Results saved at {Path(fname_perfResults).parents[0]}"
-        )
+        # Save the results
+        results_store.append(model_name, performance_results_dict)
+
+        omicLogger.info(f"{model_name} complete! Results saved at {results_store.path}")
+
+    # Generate the legacy results csv
+    results_store.write_csv()
@@ -0,0 +1,304 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from concurrent.futures import ThreadPoolExecutor
+from joblib import effective_n_jobs
+from optuna.distributions import (
+    BaseDistribution,
+    CategoricalDistribution,
+    FloatDistribution,
+    IntDistribution,
+)
+from optuna.trial import TrialState
+from pathlib import Path
+from scipy.stats import rv_discrete
+from sklearn.base import is_classifier
+from sklearn.model_selection import check_cv
+from utils.checkpoint import fingerprint
+from utils.profiling import span
+import logging
+import numpy as np
+import optuna
+import time
+
+omicLogger = logging.getLogger("OmicLogger")
+
+PRUNERS = ["median", "hyperband", "successive_halving", "none"]
+
+
+########## HELPERS ##########
+def to_distribution(values) -> BaseDistribution:
+    """
+    Convert an entry of a random search space (a scipy distribution or a list of values) into an optuna distribution.
+    """
+    if hasattr(values, "support"):
+        low, high = values.support()
+        if isinstance(values.dist, rv_discrete):
+            return IntDistribution(int(low), int(high))
+        return FloatDistribution(
+            float(low),
+            float(high),
+            log=values.dist.name in ["loguniform", "reciprocal"],
+        )
+
+    # optuna only stores python scalars, so unwrap any numpy ones
+    choices = [v.item() if isinstance(v, np.generic) else v for v in values]
+    return CategoricalDistribution(choices)
+
+
+def suggest(trial: optuna.trial.Trial, name: str, distribution: BaseDistribution):
+    """Sample a value for `name` from `distribution` using the public suggest API of the trial"""
+    if isinstance(distribution, IntDistribution):
+        return trial.suggest_int(
+            name,
+            distribution.low,
+            distribution.high,
+            step=distribution.step,
+            log=distribution.log,
+        )
+    if isinstance(distribution, FloatDistribution):
+        return trial.suggest_float(
+            name, distribution.low, distribution.high, log=distribution.log
+        )
+    return trial.suggest_categorical(name, distribution.choices)
+
+
+def create_pruner(
+    name: str, max_resource: int, min_resource: int = 1, reduction_factor: int = 3
+) -> optuna.pruners.BasePruner:
+    """
+    Create the pruner called `name` for trials reporting intermediate values up to step `max_resource`. Pruning
+    decisions start at step `min_resource` and the (successive halving) rungs are `reduction_factor` times apart.
+    """
+    if name == "median":
+        return optuna.pruners.MedianPruner(
+            n_startup_trials=5, n_warmup_steps=min_resource
+        )
+    elif name == "hyperband":
+        return optuna.pruners.HyperbandPruner(
+            min_resource=min_resource,
+            max_resource=max_resource,
+            reduction_factor=reduction_factor,
+        )
+    elif name == "successive_halving":
+        return optuna.pruners.SuccessiveHalvingPruner(
+            min_resource=min_resource, reduction_factor=reduction_factor
+        )
+    elif name == "none":
+        return optuna.pruners.NopPruner()
+    raise ValueError(f"pruner must be one of {PRUNERS}, provided: {name}")
+
+
+def resource_checkpoints(
+    max_resource: int, min_resource: int = 1, reduction_factor: int = 3
+) -> list[int]:
+    """
+    The geometric steps `min_resource * reduction_factor**k` up to `max_resource` (included), i.e. every step a
+    successive halving or hyperband rung can be placed at.
+    """
+    checkpoints = []
+    step = min_resource
+    while step < max_resource:
+        checkpoints.append(step)
+        step *= reduction_factor
+    return checkpoints + [max_resource]
+
+
+def run_trials(
+    study: optuna.Study,
+    objective,
+    n_trials: int,
+    distributions: dict[str, BaseDistribution],
+    n_parallel: int = 1,
+    timeout: float = None,
+) -> None:
+    """
+    Run `n_trials` trials of `objective` on `study`, `n_parallel` at a time.
+
+    The parameters in `distributions` are sampled when the trials are asked for, in batches from the main thread, and
+    the trials are told back in trial order. The sampler therefore sees the same history, and suggests the same
+    parameters, regardless of the order in which the parallel trials finish. A failing trial is logged and recorded as
+    failed instead of aborting the study. No new batch is started once `timeout` seconds have passed.
+    """
+
+    def _run(trial):
+        try:
+            return TrialState.COMPLETE, objective(trial)
+        except optuna.TrialPruned:
+            return TrialState.PRUNED, None
+        except Exception as e:
+            omicLogger.warning(f"Trial {trial.number} failed with {e!r}")
+            return TrialState.FAIL, None
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, n_parallel)) as executor:
+        while n_trials > 0:
+            if timeout is not None and time.monotonic() - start > timeout:
+                omicLogger.info(f"Optuna timeout of {timeout}s reached")
+                break
+
+            batch = [study.ask(distributions) for _ in range(min(n_parallel, n_trials))]
+            for trial, (state, value) in zip(batch, executor.map(_run, batch)):
+                study.tell(trial, value, state=state)
+            n_trials -= len(batch)
+
+
+def finished_trials(study: optuna.Study) -> int:
+    """Number of trials of the study that ran to an end (including pruned and failed ones)"""
+    return len(
+        study.get_trials(
+            deepcopy=False,
+            states=(TrialState.COMPLETE, TrialState.PRUNED, TrialState.FAIL),
+        )
+    )
+
+
+def study_name(model_name: str, *parts) -> str:
+    """
+    Name for a persisted study, made unique to the settings & data it was run with so that a study is only ever
+    resumed by an identical tuning run.
+    """
+    return f"{model_name}_{fingerprint(*parts)[:12]}"
+
+
+########## OBJECTIVE ##########
+class SklearnObjective(object):
+    """
+    Optuna objective for a sklearn estimator: the trial parameters are cross validated, reporting the running mean of
+    the fold scores after every fold so the pruner can stop a hopeless trial early.
+    """
+
+    def __init__(
+        self, model, distributions, fixed_params, x, y, scorer, folds, n_jobs=None
+    ):
+        self.model = model
+        self.distributions = distributions
+        self.fixed_params = fixed_params
+        self.x = x
+        self.y = y
+        self.scorer = scorer
+        self.folds = folds
+        self.n_jobs = n_jobs
+
+    def build(self, params):
+        estimator = self.model(**self.fixed_params, **params)
+        if self.n_jobs is not None and "n_jobs" in estimator.get_params():
+            estimator.set_params(n_jobs=self.n_jobs)
+        return estimator
+
+    def __call__(self, trial):
+        params = {
+            name: suggest(trial, name, dist)
+            for name, dist in self.distributions.items()
+        }
+
+        scores = []
+        for step, (train_idx, test_idx) in enumerate(self.folds):
+            estimator = self.build(params).fit(self.x[train_idx], self.y[train_idx])
+            scores.append(self.scorer(estimator, self.x[test_idx], self.y[test_idx]))
+
+            trial.report(float(np.mean(scores)), step)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+
+        return float(np.mean(scores))
+
+
+########## SEARCH ##########
+def optuna_search(
+    model,
+    model_name,
+    param_ranges,
+    budget: int,
+    x_train,
+    y_train,
+    seed_num: int,
+    scorer_dict,
+    fit_scorer: str,
+    experiment_folder: Path,
+    optuna_config: dict = None,
+    n_jobs: int = -1,
+    cv: int = 5,
+):
+    """
+    Tune a model over its random search space with Optuna (TPE sampler), cross validating each trial with
+    `fit_scorer`.
+
+    The study is stored in `experiment_folder/optuna_studies.db`, an interrupted run with the same settings and data
+    resumes from the trials already finished. The trials run one at a time, each with all the cores, unless
+    `n_parallel_trials` are asked for: the TPE sampler & median pruner only learn from the trials finished before a
+    trial starts, so running many at once degrades the search towards a random one.
+    """
+    omicLogger.debug("Training with an optuna search...")
+    optuna_config = optuna_config or {}
+
+    x_train = np.asarray(x_train)
+    y_train = np.asarray(y_train)
+
+    # If possible, set the random state for the model
+    fixed_params = {}
+    try:
+        _ = model(random_state=0)
+        fixed_params["random_state"] = seed_num
+    except TypeError:
+        pass
+
+    distributions = {
+        name: to_distribution(values)
+        for name, values in param_ranges.items()
+        if name not in fixed_params
+    }
+    folds = list(
+        check_cv(cv, y_train, classifier=is_classifier(model())).split(x_train, y_train)
+    )
+
+    cores = effective_n_jobs(n_jobs)
+    n_parallel = min(optuna_config.get("n_parallel_trials") or 1, budget)
+    objective = SklearnObjective(
+        model,
+        distributions,
+        fixed_params,
+        x_train,
+        y_train,
+        scorer_dict[fit_scorer],
+        folds,
+        n_jobs=max(1, cores // n_parallel),
+    )
+
+    study = optuna.create_study(
+        study_name=study_name(
+            model_name, distributions, fit_scorer, seed_num, cv, x_train, y_train
+        ),
+        storage=f"sqlite:///{Path(experiment_folder) / 'optuna_studies.db'}",
+        load_if_exists=True,
+        direction="maximize",
+        sampler=optuna.samplers.TPESampler(seed=seed_num),
+        pruner=create_pruner(optuna_config.get("pruner", "median"), len(folds)),
+    )
+
+    n_done = finished_trials(study)
+    if n_done:
+        omicLogger.info(f"Resuming {study.study_name} after {n_done} trials")
+    run_trials(
+        study,
+        objective,
+        budget - n_done,
+        distributions,
+        n_parallel=n_parallel,
+        timeout=optuna_config.get("timeout"),
+    )
+
+    if not study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,)):
+        raise ValueError(f"No optuna trial for {model_name} completed successfully")
+
+    omicLogger.info(
+        f"Best {model_name} parameters: {study.best_params} (mean CV {fit_scorer}: {study.best_value:.4f})"
+    )
+    with span("fit", cat="model", x_train=x_train):
+        best_estimator = model(**fixed_params, **study.best_params).fit(
+            x_train, y_train
+        )
+    omicLogger.info(best_estimator)
+    return best_estimator
@@ -0,0 +1,417 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from joblib import Parallel, delayed
+from scipy.interpolate import interp1d
+from sklearn.base import BaseEstimator, ClassifierMixin, RegressorMixin, is_classifier
+from sklearn.linear_model import (
+    ElasticNet,
+    Lars,
+    Lasso,
+    LassoLars,
+    Ridge,
+    RidgeCV,
+    enet_path,
+    lars_path,
+)
+from sklearn.metrics import pairwise_distances_chunked
+from sklearn.model_selection import check_cv
+from sklearn.neighbors import KNeighborsClassifier, KNeighborsRegressor
+from utils.profiling import span
+import logging
+import numpy as np
+
+omicLogger = logging.getLogger("OmicLogger")
+
+
+########## HELPERS ##########
+def candidate_values(values) -> list:
+    """
+    Expand a search space entry into the explicit list of values it covers. Discrete scipy distributions (e.g.
+    `sp.randint`) are expanded over their full support, anything else is assumed to be iterable.
+    """
+    if hasattr(values, "support"):
+        low, high = values.support()
+        return list(range(int(low), int(high) + 1))
+    return list(values)
+
+
+class _PredictedClassifier(ClassifierMixin, BaseEstimator):
+    """A fitted classifier as seen by a scorer, its predictions & probabilities (over `classes`) computed beforehand"""
+
+    def __init__(self, classes=None, pred=None, proba=None):
+        self.classes = classes
+        self.pred = pred
+        self.proba = proba
+
+    @property
+    def classes_(self):
+        return self.classes
+
+    def predict(self, X):
+        return self.pred
+
+    def predict_proba(self, X):
+        return self.proba
+
+
+class _PredictedRegressor(RegressorMixin, BaseEstimator):
+    """A fitted regressor as seen by a scorer, its predictions computed beforehand"""
+
+    def __init__(self, pred=None):
+        self.pred = pred
+
+    def predict(self, X):
+        return self.pred
+
+
+def score_predictions(scorer, y_true, pred, proba=None, classes=None) -> float:
+    """
+    Score precomputed predictions with a sklearn scorer, returning the signed value (greater is better) so it is
+    comparable with the `mean_test_*` values produced by sklearn's searches. The predictions are of a classifier when
+    its `classes` (the columns of `proba`) are given.
+    """
+    if classes is None:
+        estimator = _PredictedRegressor(pred)
+    else:
+        estimator = _PredictedClassifier(classes, pred, proba)
+    # the scorer asks the estimator for its predictions on the data, which are those whatever it is
+    return scorer(estimator, np.empty((len(y_true), 0)), y_true)
+
+
+def kneighbors_chunked(
+    x_fit: np.ndarray,
+    x_query: np.ndarray,
+    n_neighbors: int,
+    metric: str = "euclidean",
+    n_jobs: int = None,
+    working_memory: int = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the `n_neighbors` nearest neighbours of each row of `x_query` within `x_fit`, sorted by distance.
+
+    The distance matrix is never materialised in full: it is computed in row chunks bounded by `working_memory` (MiB,
+    sklearn's global setting when None) and each chunk is reduced to its top-k before the next one is computed.
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        the neighbour distances and the indices into `x_fit`, both of shape (n_query, n_neighbors)
+    """
+
+    def _reduce(dist_chunk, start):
+        ind = np.argpartition(dist_chunk, n_neighbors - 1, axis=1)[:, :n_neighbors]
+        dist = np.take_along_axis(dist_chunk, ind, axis=1)
+        order = np.argsort(dist, axis=1, kind="stable")
+        return np.take_along_axis(dist, order, axis=1), np.take_along_axis(
+            ind, order, axis=1
+        )
+
+    chunks = list(
+        pairwise_distances_chunked(
+            x_query,
+            x_fit,
+            reduce_func=_reduce,
+            metric=metric,
+            n_jobs=n_jobs,
+            working_memory=working_memory,
+        )
+    )
+    distances = np.vstack([c[0] for c in chunks])
+    indices = np.vstack([c[1] for c in chunks])
+    return distances, indices
+
+
+def knn_path_predictions(
+    y_fit: np.ndarray, indices: np.ndarray, classification: bool, n_classes: int = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Derive the uniform-weight KNN predictions for every k in 1..k_max from a single sorted neighbour graph.
+
+    For classification `y_fit` must be label encoded (0..n_classes-1). Returns the predictions of shape
+    (k_max, n_query) and, for classification, the class probabilities of shape (k_max, n_query, n_classes).
+    """
+    k_max = indices.shape[1]
+    neighbour_y = y_fit[indices]
+
+    if classification:
+        one_hot = np.zeros(neighbour_y.shape + (n_classes,), dtype=np.int32)
+        np.put_along_axis(one_hot, neighbour_y[..., None], 1, axis=2)
+        counts = np.cumsum(one_hot, axis=1).transpose(1, 0, 2)
+        # argmax takes the first maximum, i.e. ties go to the lowest class as in KNeighborsClassifier
+        preds = counts.argmax(axis=2)
+        proba = counts / np.arange(1, k_max + 1)[:, None, None]
+        return preds, proba
+
+    preds = np.cumsum(neighbour_y, axis=1) / np.arange(1, k_max + 1)
+    return preds.T, None
+
+
+def alpha_grid(
+    x: np.ndarray,
+    y: np.ndarray,
+    l1_ratio: float = 1.0,
+    eps: float = 1e-3,
+    n_alphas: int = 100,
+) -> np.ndarray:
+    """
+    Log-spaced, decreasing grid of penalties for the lasso/elastic net path (the same grid LassoCV uses). The largest
+    value is the smallest alpha for which all the coefficients are zero.
+    """
+    x_centred = x - x.mean(axis=0)
+    y_centred = y - y.mean()
+    alpha_max = np.abs(x_centred.T @ y_centred).max() / (len(y) * l1_ratio)
+    if alpha_max <= np.finfo(float).resolution:
+        return np.full(n_alphas, np.finfo(float).resolution)
+    return np.logspace(np.log10(alpha_max * eps), np.log10(alpha_max), n_alphas)[::-1]
+
+
+def _lasso_lars_coefs(x, y, alphas):
+    """Coefficients of the LARS-lasso path interpolated at the given alphas, shape (n_features, n_alphas)"""
+    path_alphas, _, coefs = lars_path(x, y, method="lasso")
+    if len(path_alphas) == 1:
+        return np.repeat(coefs, len(alphas), axis=1)
+    return interp1d(
+        path_alphas[::-1],
+        coefs[:, ::-1],
+        axis=1,
+        bounds_error=False,
+        fill_value=(coefs[:, -1], coefs[:, 0]),
+    )(alphas)
+
+
+def _lars_coefs(x, y, n_nonzero_coefs):
+    """Coefficients of the LARS path after each of the given numbers of steps, shape (n_features, n_candidates)"""
+    _, _, coefs = lars_path(x, y, method="lar", max_iter=max(n_nonzero_coefs))
+    # the path can end early (e.g. with fewer samples than features), later candidates then share its last point
+    steps = np.minimum(n_nonzero_coefs, coefs.shape[1] - 1)
+    return coefs[:, steps]
+
+
+def _path_coefs(model, x, y, candidates):
+    """Coefficients for every candidate of the path of `model`, shape (n_features, n_candidates)"""
+    if model is Lars:
+        return _lars_coefs(x, y, [c["n_nonzero_coefs"] for c in candidates])
+    if model is LassoLars:
+        return _lasso_lars_coefs(x, y, np.array([c["alpha"] for c in candidates]))
+
+    # lasso & elastic net, one warm-started coordinate descent path per l1_ratio
+    l1_ratios = list(dict.fromkeys(c.get("l1_ratio", 1.0) for c in candidates))
+    coefs = []
+    for l1_ratio in l1_ratios:
+        alphas = [c["alpha"] for c in candidates if c.get("l1_ratio", 1.0) == l1_ratio]
+        coefs.append(enet_path(x, y, l1_ratio=l1_ratio, alphas=alphas)[1])
+    return np.concatenate(coefs, axis=1)
+
+
+def _path_fold_predictions(model, x_train, y_train, x_test, candidates):
+    """Fit the path on a fold's training part and predict its test part for every candidate at once"""
+    x_mean = x_train.mean(axis=0)
+    y_mean = y_train.mean()
+    coefs = _path_coefs(model, x_train - x_mean, y_train - y_mean, candidates)
+    return (x_test - x_mean) @ coefs + y_mean
+
+
+def linear_path_candidates(model, param_ranges, x_train, y_train) -> list[dict]:
+    """
+    Expand the path settings of a linear model into its ordered list of candidate parameters. The alpha grids are
+    computed on the full training data so that every fold is evaluated at the same points.
+    """
+    if model is Lars:
+        max_coefs = min(param_ranges.get("n_nonzero_coefs", 500), x_train.shape[1])
+        return [{"n_nonzero_coefs": k} for k in range(1, max_coefs + 1)]
+
+    eps = param_ranges.get("eps", 1e-3)
+    n_alphas = param_ranges.get("n_alphas", 100)
+
+    if model is ElasticNet:
+        return [
+            {"alpha": alpha, "l1_ratio": l1_ratio}
+            for l1_ratio in param_ranges.get("l1_ratio", [0.5])
+            for alpha in alpha_grid(x_train, y_train, l1_ratio, eps, n_alphas)
+        ]
+
+    return [
+        {"alpha": alpha} for alpha in alpha_grid(x_train, y_train, 1.0, eps, n_alphas)
+    ]
+
+
+########## SEARCHES ##########
+def knn_path_search(
+    model,
+    model_name,
+    param_ranges,
+    x_train,
+    y_train,
+    seed_num,
+    scorer_dict,
+    fit_scorer: str,
+    n_jobs: int = None,
+    cv: int = 5,
+):
+    """
+    Tune a KNeighbors model over `n_neighbors` (and `metric`) by computing the neighbour graph for the largest k once
+    per metric and CV fold, then deriving the predictions of every smaller k from it.
+
+    This evaluates every `n_neighbors` value covered by the random/grid space, the best candidate is selected on the
+    mean CV `fit_scorer` (first candidate wins ties, as in sklearn's searches) and refit on all of `x_train`.
+    """
+    omicLogger.debug("Training with a neighbour-graph path search...")
+
+    x_train = np.asarray(x_train)
+    y_train = np.asarray(y_train)
+    classification = is_classifier(model())
+
+    k_values = sorted(set(candidate_values(param_ranges.get("n_neighbors", [5]))))
+    metrics = candidate_values(param_ranges.get("metric", ["minkowski"]))
+
+    if classification:
+        classes, y_encoded = np.unique(y_train, return_inverse=True)
+    else:
+        classes, y_encoded = None, y_train.astype(float)
+
+    folds = list(
+        check_cv(cv, y_train, classifier=classification).split(x_train, y_train)
+    )
+
+    # neighbours are searched within the training part of each fold so k can not exceed its size
+    max_fit = min(len(train_idx) for train_idx, _ in folds)
+    k_values = [k for k in k_values if 1 <= k <= max_fit]
+    if not k_values:
+        raise ValueError(
+            f"No n_neighbors candidate for {model_name} is valid for {max_fit} training samples per fold"
+        )
+    k_max = max(k_values)
+    k_index = np.asarray(k_values) - 1
+
+    scorer = scorer_dict[fit_scorer]
+    # mean CV score per (metric, k), in the same candidate order a grid search would use
+    cv_scores = np.zeros((len(metrics), len(k_values)))
+
+    for m, metric in enumerate(metrics):
+        omicLogger.info(f"Computing {k_max}-neighbour graphs with metric: {metric}")
+        for train_idx, test_idx in folds:
+            _, indices = kneighbors_chunked(
+                x_train[train_idx], x_train[test_idx], k_max, metric, n_jobs=n_jobs
+            )
+            preds, proba = knn_path_predictions(
+                y_encoded[train_idx],
+                indices,
+                classification,
+                None if classes is None else len(classes),
+            )
+            y_true = y_train[test_idx]
+            for j, k in enumerate(k_index):
+                pred = classes[preds[k]] if classification else preds[k]
+                cv_scores[m, j] += score_predictions(
+                    scorer, y_true, pred, None if proba is None else proba[k], classes
+                )
+    cv_scores /= len(folds)
+
+    best_m, best_j = np.unravel_index(np.argmax(cv_scores), cv_scores.shape)
+    best_params = {"n_neighbors": k_values[best_j], "metric": metrics[best_m]}
+    omicLogger.info(
+        f"Best {model_name} parameters: {best_params} (mean CV {fit_scorer}: {cv_scores[best_m, best_j]:.4f})"
+    )
+
+    with span("fit", cat="model", x_train=x_train):
+        best_estimator = model(**best_params).fit(x_train, y_train)
+    omicLogger.info(best_estimator)
+    return best_estimator
+
+
+def linear_path_search(
+    model,
+    model_name,
+    param_ranges,
+    x_train,
+    y_train,
+    seed_num,
+    scorer_dict,
+    fit_scorer: str,
+    n_jobs: int = None,
+    cv: int = 5,
+):
+    """
+    Tune Lasso, ElasticNet, LassoLars or Lars along their regularisation path. In each CV fold the whole path (all
+    alphas for each l1_ratio, or all LARS steps) is fitted once with warm starts and every point on it is scored with
+    `fit_scorer`. The best point (first one on ties) is refit on all of `x_train`.
+    """
+    omicLogger.debug("Training with a regularisation path search...")
+
+    x_train = np.asarray(x_train, dtype=float)
+    y_train = np.asarray(y_train, dtype=float)
+    candidates = linear_path_candidates(model, param_ranges, x_train, y_train)
+    omicLogger.info(f"Evaluating {len(candidates)} points on the {model_name} path")
+
+    folds = list(check_cv(cv, y_train, classifier=False).split(x_train, y_train))
+    fold_preds = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(_path_fold_predictions)(
+            model, x_train[train_idx], y_train[train_idx], x_train[test_idx], candidates
+        )
+        for train_idx, test_idx in folds
+    )
+
+    scorer = scorer_dict[fit_scorer]
+    cv_scores = np.zeros(len(candidates))
+    for (_, test_idx), preds in zip(folds, fold_preds):
+        for j in range(len(candidates)):
+            cv_scores[j] += score_predictions(scorer, y_train[test_idx], preds[:, j])
+    cv_scores /= len(folds)
+
+    best = int(np.argmax(cv_scores))
+    omicLogger.info(
+        f"Best {model_name} parameters: {candidates[best]} (mean CV {fit_scorer}: {cv_scores[best]:.4f})"
+    )
+
+    with span("fit", cat="model", x_train=x_train):
+        best_estimator = model(**candidates[best]).fit(x_train, y_train)
+    omicLogger.info(best_estimator)
+    return best_estimator
+
+
+def ridge_path_search(
+    model,
+    model_name,
+    param_ranges,
+    x_train,
+    y_train,
+    seed_num,
+    scorer_dict,
+    fit_scorer: str,
+    n_jobs: int = None,
+    cv: int = 5,
+):
+    """
+    Tune Ridge over its alpha path with the efficient leave-one-out (generalised cross validation) solution, which
+    scores every alpha from a single decomposition of the training data. The alpha is selected with `fit_scorer` and
+    refit on all of `x_train`.
+    """
+    omicLogger.debug("Training with a ridge LOO path search...")
+
+    alphas = candidate_values(param_ranges.get("alphas", [0.1, 1.0, 10.0]))
+    ridge_cv = RidgeCV(alphas=alphas, scoring=scorer_dict[fit_scorer]).fit(
+        x_train, y_train
+    )
+    omicLogger.info(
+        f"Best {model_name} parameters: {{'alpha': {ridge_cv.alpha_}}} (LOO {fit_scorer}: {ridge_cv.best_score_:.4f})"
+    )
+
+    with span("fit", cat="model", x_train=x_train):
+        best_estimator = model(alpha=ridge_cv.alpha_).fit(x_train, y_train)
+    omicLogger.info(best_estimator)
+    return best_estimator
+
+
+# models that are tuned with a path search instead of the generic random/grid searches
+PATH_SEARCHES = {
+    KNeighborsClassifier: knn_path_search,
+    KNeighborsRegressor: knn_path_search,
+    Lasso: linear_path_search,
+    ElasticNet: linear_path_search,
+    LassoLars: linear_path_search,
+    Lars: linear_path_search,
+    Ridge: ridge_path_search,
+}
@@ -20,12 +20,16 @@ import numpy as np
 class BaseModel:
     __metaclass__ = ABCMeta
 
-    def __init__(self, input_dim, output_dim, dataset_type=REGRESSION):
+    def __init__(
+        self, input_dim, output_dim, dataset_type=REGRESSION, experiment_folder=None
+    ):
         self.input_dim = input_dim
         self.output_dim = output_dim
         self.model = None
         self.dataset_type = dataset_type
         self.model_ohe = None
+        # where the model can keep files across runs (e.g. its search state)
+        self.experiment_folder = experiment_folder
 
     @abstractmethod
     def fit_data(self, trainX, trainY, testX=None, testY=None, input_list=None):
@@ -0,0 +1,41 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+import numpy as np
+import tensorflow as tf
+
+
+def make_dataset(
+    x,
+    y,
+    batch_size=32,
+    shuffle=False,
+    seed=None,
+    shuffle_buffer=None,
+    cache=False,
+):
+    """
+    Build a `tf.data` pipeline feeding the in-memory arrays `x` & `y` to keras in batches of `batch_size`.
+
+    The arrays are converted to float32 once so the batches are sliced without any python per-batch work. If `shuffle`
+    is set the samples are reshuffled every epoch with a buffer of `shuffle_buffer` samples (all of them by default)
+    seeded by `seed`. `cache` keeps the converted elements in memory after their first pass, and the next batches are
+    prefetched while the current one is trained on.
+    """
+    x = np.asarray(x, dtype=np.float32)
+    y = np.asarray(y, dtype=np.float32)
+    if x.shape[0] != y.shape[0]:
+        raise ValueError(
+            f"x and y must have the same number of samples, provided: {x.shape[0]} and {y.shape[0]}"
+        )
+
+    dataset = tf.data.Dataset.from_tensor_slices((x, y))
+    if cache:
+        dataset = dataset.cache()
+    if shuffle:
+        dataset = dataset.shuffle(
+            shuffle_buffer or x.shape[0], seed=seed, reshuffle_each_iteration=True
+        )
+    return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
@@ -13,6 +13,9 @@
 # limitations under the License.
 
 import os
+import shutil
+import tempfile
+import time
 import matplotlib.pyplot as plt
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.models import load_model
@@ -22,21 +25,50 @@ from tensorflow.keras import losses
 from tensorflow.keras.optimizers.legacy import Adam
 
 from tensorflow.keras.callbacks import (
+    Callback,
     LearningRateScheduler,
     EarlyStopping,
     ModelCheckpoint,
     TerminateOnNaN,
 )
+from pathlib import Path
+from utils.checkpoint import fingerprint
 from utils.vars import CLASSIFICATION, REGRESSION
 import autokeras as ak
 from .base_model import BaseModel
-from .batch_generator_seq_array import BatchGeneratorSeqArray
+from .dataset_pipeline import make_dataset
 
 
 def to_matrix(data, n):
     return [data[i : i + n] for i in range(0, len(data), n)]
 
 
+class SearchTimeBudget(Callback):
+    """
+    Stop an AutoKeras search once the time.monotonic() `deadline` has passed.
+
+    The trial running at the deadline is stopped at the end of its current epoch, keeping the results it reached, and
+    the `oracle` is capped to the trials started so far so the tuner finishes and returns the best model found. The
+    final fit of the best model, run once no trial is ongoing, is left untouched.
+    """
+
+    def __init__(self, deadline, oracle):
+        super().__init__()
+        self.deadline = deadline
+        self.oracle = oracle
+
+    def __deepcopy__(self, memo):
+        # the tuner deep copies the callbacks for every trial, they must keep referring to the same oracle
+        return SearchTimeBudget(self.deadline, self.oracle)
+
+    def on_epoch_end(self, epoch, logs=None):
+        if not self.oracle.ongoing_trials or time.monotonic() < self.deadline:
+            return
+        print("AutoKeras: time budget reached, stopping the search")
+        self.model.stop_training = True
+        self.oracle.max_trials = len(self.oracle.trials)
+
+
 class KerasModel(BaseModel):
     def __init__(
         self,
@@ -48,8 +80,9 @@ class KerasModel(BaseModel):
         conv1d=False,
         config=None,
         random_state=1234,
+        experiment_folder=None,
     ):
-        super().__init__(input_dim, output_dim, dataset_type)
+        super().__init__(input_dim, output_dim, dataset_type, experiment_folder)
         self.method = method
         self.init_model = init_model
         self.conv1d = conv1d
@@ -70,11 +103,24 @@ class KerasModel(BaseModel):
         self.use_batchnorm = self.config.get("use_batchnorm", True)
         self.max_trials = self.config.get("n_trials", 20)
         self.tuner = self.config.get("tuner", "greedy")
+        self.timeout = self.config.get("timeout", None)
+        self.resume = self.config.get("resume", True)
 
         print("self.config=", self.config)
 
-        tmp_path = "/tmp/autokeras_{}".format(os.getpid())
-        os.system("rm -rf /tmp/autokeras_{}".format(os.getpid()))
+        # the AutoModel is built in fit_data_ak, its trial directory is named after the data it is searched on
+        self.model = None
+
+    def _build_ak(self, project_name):
+        """
+        Build the AutoKeras model searching in `<experiment_folder>/autokeras/<project_name>`. Unless `resume` is off,
+        the trials already in that directory are kept: an interrupted search carries on from them and a finished one
+        is reused as is. Without an experiment folder the search runs in a temporary directory, removed once it ends.
+        """
+        if self.experiment_folder is None:
+            directory = self.tmp_directory = tempfile.mkdtemp(prefix="autokeras_")
+        else:
+            directory = Path(self.experiment_folder) / "autokeras"
 
         if self.dataset_type == REGRESSION:
             input_node = ak.Input()
@@ -90,7 +136,9 @@ class KerasModel(BaseModel):
             model = ak.AutoModel(
                 inputs=input_node,
                 outputs=output_node,
-                directory=tmp_path,
+                directory=directory,
+                project_name=project_name,
+                overwrite=not self.resume,
                 max_trials=self.max_trials,
                 objective=["val_loss"],
                 tuner=self.tuner,
@@ -112,7 +160,9 @@ class KerasModel(BaseModel):
             model = ak.AutoModel(
                 inputs=input_node,
                 outputs=output_node,
-                directory=tmp_path,
+                directory=directory,
+                project_name=project_name,
+                overwrite=not self.resume,
                 max_trials=self.max_trials,
                 objective=["accuracy"],
                 tuner=self.tuner,
@@ -120,9 +170,15 @@ class KerasModel(BaseModel):
                 optimizer=Adam(),
             )
 
-        self.model = model
+        return model
 
     def __init_fx__(self, input_dim, output_dim, dataset_type):
+        self.epochs = self.config.get("n_epochs", 100)
+        self.batch_size = self.config.get("batch_size", 32)
+        self.shuffle = self.config.get("shuffle", True)
+        self.shuffle_buffer = self.config.get("shuffle_buffer", None)
+        self.cache = self.config.get("cache", False)
+
         from tensorflow.random import set_seed
 
         set_seed(self.random_state)
@@ -279,8 +335,39 @@ class KerasModel(BaseModel):
         print("training AutoKeras model...")
         # lr_scheduler = LearningRateScheduler(self._lr_schedule)
         # callbacks = [lr_scheduler]
+        start = time.monotonic()
+        # named after the settings & data, so a search is only ever resumed (or overwritten) by an identical one
+        key = fingerprint(
+            {
+                k: v
+                for k, v in self.config.items()
+                if k not in ["verbose", "timeout", "resume"]
+            },
+            self.random_state,
+            trainX,
+            trainY,
+            testX,
+            testY,
+        )
+        self.model = self._build_ak(f"autokeras_{key[:12]}")
+        try:
+            self._search_ak(start, trainX, trainY, testX, testY)
+        finally:
+            tmp_directory = getattr(self, "tmp_directory", None)
+            if tmp_directory is not None:
+                shutil.rmtree(tmp_directory, ignore_errors=True)
+                self.tmp_directory = None
+
+    def _search_ak(self, start, trainX, trainY, testX, testY):
+        """Search with the AutoModel built, then replace it by the best model it found"""
         callbacks = []
         callbacks.append(TerminateOnNaN())
+        # no EarlyStopping: AutoKeras early-stops the trials itself only when none is given, and then refits the best
+        # model over all the epochs
+        if self.timeout is not None:
+            callbacks.append(
+                SearchTimeBudget(start + self.timeout, self.model.tuner.oracle)
+            )
 
         # train the model
         # choose number of epochs and batch_size
@@ -303,6 +390,8 @@ class KerasModel(BaseModel):
             validation_data=vd,
             callbacks=callbacks,
         )
+        # AutoKeras does not save that the search finished, a resumed one would refit the best model again
+        self.model.tuner.save()
         exported_model = self.model.export_model()
         print(exported_model)
         exported_model.summary()
@@ -325,25 +414,32 @@ class KerasModel(BaseModel):
         callbacks = [lr_scheduler, es]  # ,ckpt]
         # train the model
         # choose number of epochs and batch_size
-        epochs = 50 * 2
-        batch_size = 32
+        epochs = self.epochs
+        batch_size = self.batch_size
 
         print("training Keras model...")
         # history = self.model.fit(trainX, trainY, validation_data=(testX, testY),
         #                         epochs=epochs, batch_size=batch_size, callbacks=callbacks, verbose=2)
 
-        bg_train = BatchGeneratorSeqArray(trainX, trainY, batch_size=batch_size)
+        bg_train = make_dataset(
+            trainX,
+            trainY,
+            batch_size=batch_size,
+            shuffle=self.shuffle,
+            seed=self.random_state,
+            shuffle_buffer=self.shuffle_buffer,
+            cache=self.cache,
+        )
         if (testX is None) and (testY is None):
             bg_val = None
         else:
-            bg_val = BatchGeneratorSeqArray(testX, testY, batch_size=batch_size)
+            bg_val = make_dataset(testX, testY, batch_size=batch_size, cache=self.cache)
         history = self.model.fit(
             bg_train,
             validation_data=bg_val,
             epochs=epochs,
             callbacks=callbacks,
             verbose=2,
-            workers=1,
         )
 
         # Plot training & validation loss values
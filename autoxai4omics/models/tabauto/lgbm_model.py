@@ -13,36 +13,143 @@
 # limitations under the License.
 
 from .base_model import BaseModel
-from sklearn.metrics import accuracy_score
+from joblib import effective_n_jobs
+from models.optuna_search import create_pruner, resource_checkpoints, run_trials
+from optuna.distributions import (
+    CategoricalDistribution,
+    FloatDistribution,
+    IntDistribution,
+)
+from sklearn.model_selection import KFold
 from sklearn.multioutput import MultiOutputRegressor
 from utils.vars import CLASSIFICATION, REGRESSION
 import joblib
 import lightgbm as lgb_core
 import numpy as np
 import optuna
+import queue
 
 
 def to_matrix(data, n):
     return [data[i : i + n] for i in range(0, len(data), n)]
 
 
+def pruning_callback(trial, checkpoints, offset, metric, sign):
+    """
+    LightGBM callback reporting the validation `metric` of a fold to the trial at the given checkpoints, stopping the
+    trial if it is pruned. The steps are counted in boosting rounds trained across the folds, the fold starting after
+    the `offset` rounds the previous folds actually trained (fewer than `num_boost_round` if they stopped early) so
+    that no checkpoint is skipped. The loss is negated (`sign`) for studies that maximise.
+    """
+    checkpoints = set(checkpoints)
+
+    def _callback(env):
+        step = offset + env.iteration + 1
+        if step not in checkpoints:
+            return
+        for data_name, eval_name, value, _ in env.evaluation_result_list:
+            if data_name == "valid" and eval_name == metric:
+                trial.report(sign * value, step)
+                if trial.should_prune():
+                    raise optuna.TrialPruned()
+
+    _callback.order = 25
+    return _callback
+
+
 class LGBMObjective(object):
+    # boosting rounds trained per fold, early stopping permitting
+    num_boost_round = 100
+    # the search space, sampled up front so trials can run in parallel reproducibly (see run_trials)
+    distributions = {
+        "learning_rate": FloatDistribution(0.1, 1, log=True),
+        "lambda_l1": FloatDistribution(1e-8, 10.0, log=True),
+        "lambda_l2": FloatDistribution(1e-8, 10.0, log=True),
+        "num_leaves": IntDistribution(2, 256),
+        "feature_fraction": FloatDistribution(0.4, 1.0),
+        "bagging_fraction": FloatDistribution(0.4, 1.0),
+        "bagging_freq": IntDistribution(1, 7),
+        "min_child_samples": IntDistribution(5, 100),
+    }
+
     def __init__(
-        self, dataset_type, train_x, train_y, test_x, test_y, random_state=123
+        self,
+        dataset_type,
+        train_x,
+        train_y,
+        test_x,
+        test_y,
+        random_state=123,
+        early_stopping_rounds=10,
+        n_threads=-1,
+        checkpoints=None,
+        n_fold_sets=1,
     ):
         # Hold this implementation specific arguments as the fields of the class.
         self.dataset_type = dataset_type
-        self.train_x = train_x
-        self.train_y = train_y
         self.test_x = test_x
         self.test_y = test_y
         self.random_state = random_state
+        self.early_stopping_rounds = early_stopping_rounds
+        self.n_threads = n_threads
+        # the boosting rounds (counted across the folds) at which the trials report to the pruner, None to not prune
+        self.checkpoints = checkpoints
+
+        if self.dataset_type == CLASSIFICATION:
+            num_class = int(np.max(train_y)) + 1
+            # early stopping monitors the first metric, the error gives the accuracy at the best iteration
+            if num_class > 2:
+                self.base_param = {
+                    "objective": "multiclass",
+                    "num_class": num_class,
+                    "metric": ["multi_logloss", "multi_error"],
+                }
+            else:
+                self.base_param = {
+                    "objective": "binary",
+                    "metric": ["binary_logloss", "binary_error"],
+                }
+        else:
+            self.base_param = {"objective": REGRESSION, "metric": "l1"}
+
+        # The folds are split and binned once, every trial trains on these shared datasets. The validation part uses
+        # the bins of its training part and the raw data is freed once constructed. The feature pre-filter depends on
+        # min_child_samples, so it is disabled to let the trials vary it. lgb.train updates the parameters of the
+        # datasets it is given, so each of the `n_fold_sets` trials running at once borrows its own copy of the folds.
+        dataset_param = {
+            "feature_pre_filter": False,
+            "seed": self.random_state,
+            "verbosity": -1,
+        }
+        kf = KFold(n_splits=5, shuffle=True, random_state=55)
+        self.fold_sets = queue.Queue()
+        for _ in range(n_fold_sets):
+            folds = []
+            for train_index, test_index in kf.split(train_x):
+                dtrain = lgb_core.Dataset(
+                    train_x[train_index],
+                    label=train_y[train_index],
+                    params=dataset_param,
+                    free_raw_data=True,
+                ).construct()
+                dvalid = lgb_core.Dataset(
+                    train_x[test_index],
+                    label=train_y[test_index],
+                    params=dataset_param,
+                    reference=dtrain,
+                    free_raw_data=True,
+                ).construct()
+                folds.append((dtrain, dvalid))
+            self.fold_sets.put(folds)
+        self.folds = folds
+
+    @classmethod
+    def max_resource(cls, n_folds=5):
+        """The budget of a full trial, in boosting rounds across the folds"""
+        return n_folds * cls.num_boost_round
 
     def __call__(self, trial):
         # Calculate an objective value by using the extra arguments.
-        train_x = self.train_x
-        train_y = self.train_y
-
         param = {
             "learning_rate": trial.suggest_float("learning_rate", 0.1, 1, log=True),
             "lambda_l1": trial.suggest_float("lambda_l1", 1e-8, 10.0, log=True),
@@ -52,61 +159,15 @@ class LGBMObjective(object):
             "bagging_fraction": trial.suggest_float("bagging_fraction", 0.4, 1.0),
             "bagging_freq": trial.suggest_int("bagging_freq", 1, 7),
             "min_child_samples": trial.suggest_int("min_child_samples", 5, 100),
-            "random_state": self.random_state,
         }
+        param.update(self.base_param)
+        param.update(seed=self.random_state, verbosity=-1, num_threads=self.n_threads)
 
-        if self.dataset_type == CLASSIFICATION:
-            """
-            bst = lgb_core.LGBMClassifier(**param)
-            print("train_y=", train_y)
-            bst.fit(train_x, train_y)
-            print("valid_x=", valid_x)
-            preds = bst.predict(valid_x)
-            print("preds=", preds)
-            pred_labels = np.rint(preds)
-            score = accuracy_score(valid_y, pred_labels)
-            """
-
-            from sklearn.metrics import mean_absolute_error
-            from sklearn.model_selection import KFold
-
-            kf = KFold(n_splits=5, shuffle=True, random_state=55)
-            scores = []
-            for train_index, test_index in kf.split(train_x):
-                lgb_model = lgb_core.LGBMClassifier(**param)
-                lgb_model.fit(train_x[train_index], train_y[train_index])
-                predictions = lgb_model.predict(train_x[test_index])
-                predictions = np.rint(predictions)
-                actuals = train_y[test_index]
-                s = accuracy_score(actuals, predictions)
-                scores.append(s)
-
-        else:
-            """
-            param["objective"] = REGRESSION
-            param["metric"] = "l1"
-            bst = lgb_core.LGBMRegressor(**param)
-            bst.fit(train_x, train_y)
-            preds = bst.predict(valid_x)
-            score = sklearn.metrics.mean_absolute_error(valid_y, preds)
-            """
-
-            from sklearn.metrics import mean_absolute_error
-            from sklearn.model_selection import KFold
-
-            kf = KFold(n_splits=5, shuffle=True, random_state=55)
-            scores = []
-            for train_index, test_index in kf.split(train_x):
-                param["objective"] = REGRESSION
-                param["metric"] = "l1"
-
-                lgb_model = lgb_core.LGBMRegressor(**param)
-                lgb_model.fit(train_x[train_index], train_y[train_index])
-                predictions = lgb_model.predict(train_x[test_index])
-                actuals = train_y[test_index]
-                s = mean_absolute_error(actuals, predictions)
-                print(s)
-                scores.append(s)
+        folds = self.fold_sets.get()
+        try:
+            scores, best_iterations = self._cross_validate(trial, param, folds)
+        finally:
+            self.fold_sets.put(folds)
 
         print("Autolgbm (trial={}): cv scores = {}".format(trial.number, scores))
         min_score = np.min(scores)
@@ -126,10 +187,63 @@ class LGBMObjective(object):
             std_score=std_score,
         )
         trial.set_user_attr("cv_stats", cv_stats)
+        trial.set_user_attr("best_iterations", best_iterations)
         score = avg_score
 
         return score
 
+    def _cross_validate(self, trial, param, folds):
+        """The validation score & best number of rounds of each of the `folds` trained with `param`"""
+        scores = []
+        best_iterations = []
+        # the boosting rounds trained in the previous folds
+        trained = 0
+        for dtrain, dvalid in folds:
+            evals_result = {}
+            callbacks = [
+                lgb_core.early_stopping(
+                    self.early_stopping_rounds,
+                    first_metric_only=True,
+                    verbose=False,
+                ),
+                lgb_core.record_evaluation(evals_result),
+            ]
+            if self.checkpoints:
+                # the loss (first metric) is negated when the study maximises the accuracy
+                loss = (
+                    param["metric"][0] if self.dataset_type == CLASSIFICATION else "l1"
+                )
+                callbacks.append(
+                    pruning_callback(
+                        trial,
+                        self.checkpoints,
+                        offset=trained,
+                        metric=loss,
+                        sign=-1 if self.dataset_type == CLASSIFICATION else 1,
+                    )
+                )
+
+            bst = lgb_core.train(
+                param,
+                dtrain,
+                num_boost_round=self.num_boost_round,
+                valid_sets=[dvalid],
+                valid_names=["valid"],
+                callbacks=callbacks,
+            )
+            if self.dataset_type == CLASSIFICATION:
+                error = evals_result["valid"][param["metric"][-1]]
+                s = 1 - error[bst.best_iteration - 1]
+            else:
+                error = evals_result["valid"]["l1"]
+                s = error[bst.best_iteration - 1]
+            scores.append(s)
+            best_iterations.append(bst.best_iteration)
+            # every round trained, including those after the best one until early stopping
+            trained += len(error)
+
+        return scores, best_iterations
+
 
 class LGBMModel(BaseModel):
     def __init__(
@@ -140,8 +254,9 @@ class LGBMModel(BaseModel):
         method="train_ml_lgbm",
         config=None,
         random_state=123,
+        experiment_folder=None,
     ):
-        super().__init__(input_dim, output_dim, dataset_type)
+        super().__init__(input_dim, output_dim, dataset_type, experiment_folder)
         self.method = method
         self.config = config if config else {}
         self.random_state = random_state
@@ -175,7 +290,16 @@ class LGBMModel(BaseModel):
         print("AutoLGBM: self.config=", self.config)
         self.n_trials = self.config.get("n_trials", 100)
         self.timeout = self.config.get("timeout", None)
-        print("AutoLGBM: n_trials={} timeout={}".format(self.n_trials, self.timeout))
+        self.early_stopping_rounds = self.config.get("early_stopping_rounds", 10)
+        self.n_parallel_trials = self.config.get("n_parallel_trials", 1)
+        self.pruner = self.config.get("pruner", "none")
+        self.min_resource = self.config.get("min_resource", 10)
+        self.reduction_factor = self.config.get("reduction_factor", 3)
+        print(
+            "AutoLGBM: n_trials={} timeout={} n_parallel_trials={}".format(
+                self.n_trials, self.timeout, self.n_parallel_trials
+            )
+        )
 
         self.model = model
 
@@ -202,9 +326,14 @@ class LGBMModel(BaseModel):
             direction = "minimize"
 
         optuna.logging.set_verbosity(optuna.logging.ERROR)
+        # the trial budget is counted in boosting rounds across the folds
+        max_resource = LGBMObjective.max_resource()
         study = optuna.create_study(
             direction=direction,
             sampler=optuna.samplers.TPESampler(seed=self.random_state),
+            pruner=create_pruner(
+                self.pruner, max_resource, self.min_resource, self.reduction_factor
+            ),
         )
         objective = LGBMObjective(
             self.dataset_type,
@@ -213,19 +342,42 @@ class LGBMModel(BaseModel):
             testX,
             testY,
             random_state=self.random_state,
+            early_stopping_rounds=self.early_stopping_rounds,
+            # split the cores between the concurrent trials
+            n_threads=max(1, effective_n_jobs(-1) // self.n_parallel_trials),
+            checkpoints=(
+                None
+                if self.pruner == "none"
+                else resource_checkpoints(
+                    max_resource, self.min_resource, self.reduction_factor
+                )
+            ),
+            n_fold_sets=self.n_parallel_trials,
         )
 
-        study.optimize(objective, n_trials=self.n_trials, timeout=self.timeout)
+        run_trials(
+            study,
+            objective,
+            self.n_trials,
+            objective.distributions,
+            n_parallel=self.n_parallel_trials,
+            timeout=self.timeout,
+        )
         print("best_trial=", study.best_trial)
         print("best_params=", study.best_params)
         cv_stats = study.best_trial.user_attrs["cv_stats"]
 
+        # refit with the number of rounds early stopping settled on in the cross validation
+        param = dict(study.best_params)
+        param["n_estimators"] = int(
+            np.rint(np.mean(study.best_trial.user_attrs["best_iterations"]))
+        )
+
         if self.dataset_type == CLASSIFICATION:
             self.model = lgb_core.LGBMClassifier(
-                random_state=self.random_state, **study.best_params
+                random_state=self.random_state, **param
             )
         else:
-            param = study.best_params
             param["objective"] = REGRESSION
             param["metric"] = "l1"
             self.model = lgb_core.LGBMRegressor(random_state=self.random_state, **param)
@@ -13,12 +13,20 @@
 # limitations under the License.
 
 from .base_model import BaseModel
-from sklearn.metrics import accuracy_score
+from joblib import effective_n_jobs
+from models.optuna_search import create_pruner, resource_checkpoints, run_trials
+from optuna.distributions import (
+    CategoricalDistribution,
+    FloatDistribution,
+    IntDistribution,
+)
+from sklearn.model_selection import KFold
 from sklearn.multioutput import MultiOutputRegressor
 from utils.vars import CLASSIFICATION
 import joblib
 import numpy as np
 import optuna
+import queue
 import xgboost as xgb
 
 
@@ -26,8 +34,47 @@ def to_matrix(data, n):
     return [data[i : i + n] for i in range(0, len(data), n)]
 
 
+class PruningCallback(xgb.callback.TrainingCallback):
+    """
+    Report the validation loss of a fold to the trial at the given checkpoints and stop the trial if it is pruned.
+
+    The steps are counted in boosting rounds trained across the folds so far, the fold starting after the `offset`
+    rounds the previous folds actually trained (fewer than the trial's rounds if they stopped early). The steps are
+    therefore contiguous across the folds and every checkpoint within the rounds a trial trains is reported. A trial
+    that is pruned early stops after a few dozen rounds of its first fold. The loss is negated for studies
+    that maximise so the pruner always compares "greater is better" values.
+    """
+
+    def __init__(self, trial, checkpoints, offset, metric, sign):
+        self.trial = trial
+        self.checkpoints = set(checkpoints)
+        self.offset = offset
+        self.metric = metric
+        self.sign = sign
+
+    def after_iteration(self, model, epoch, evals_log):
+        step = self.offset + epoch + 1
+        if step in self.checkpoints:
+            self.trial.report(self.sign * evals_log["valid"][self.metric][-1], step)
+            if self.trial.should_prune():
+                raise optuna.TrialPruned()
+        return False
+
+
 # (https://optuna.readthedocs.io/en/stable/faq.html#objective-func-additional-args).
 class XGBoostObjective(object):
+    # the search space, sampled up front so trials can run in parallel reproducibly (see run_trials)
+    distributions = {
+        "booster": CategoricalDistribution(["gbtree"]),
+        "lambda": FloatDistribution(1e-8, 1.0, log=True),
+        "alpha": FloatDistribution(1e-8, 1.0, log=True),
+        "n_estimators": IntDistribution(0, 100),
+        "max_depth": IntDistribution(1, 9),
+        "eta": FloatDistribution(1e-8, 1.0, log=True),
+        "gamma": FloatDistribution(1e-8, 1.0, log=True),
+        "grow_policy": CategoricalDistribution(["depthwise", "lossguide"]),
+    }
+
     def __init__(
         self,
         dataset_type,
@@ -37,21 +84,57 @@ class XGBoostObjective(object):
         test_y=None,
         num_class=0,
         random_state=123,
+        early_stopping_rounds=10,
+        n_threads=-1,
+        checkpoints=None,
+        n_fold_sets=1,
     ):
         # Hold this implementation specific arguments as the fields of the class.
         self.dataset_type = dataset_type
-        self.train_x = train_x
-        self.train_y = train_y
         self.test_x = test_x
         self.test_y = test_y
         self.num_class = num_class
         self.random_state = random_state
+        self.early_stopping_rounds = early_stopping_rounds
+        self.n_threads = n_threads
+        # the boosting rounds (counted across the folds) at which the trials report to the pruner, None to not prune
+        self.checkpoints = checkpoints
+
+        # The folds are split and quantised once, every trial trains on these shared matrices. The validation part is
+        # binned with the cuts of its training part. XGBoost does not document training on the same matrices from
+        # several threads, so each of the `n_fold_sets` trials running at once borrows its own copy of the folds.
+        kf = KFold(n_splits=5, shuffle=True, random_state=55)
+        self.fold_sets = queue.Queue()
+        for _ in range(n_fold_sets):
+            folds = []
+            for train_index, test_index in kf.split(train_x):
+                dtrain = xgb.QuantileDMatrix(
+                    train_x[train_index], label=train_y[train_index]
+                )
+                dvalid = xgb.QuantileDMatrix(
+                    train_x[test_index], label=train_y[test_index], ref=dtrain
+                )
+                folds.append((dtrain, dvalid))
+            self.fold_sets.put(folds)
+        self.folds = folds
+
+        if self.dataset_type == CLASSIFICATION:
+            # early stopping monitors the last metric, the error gives the accuracy at the best iteration
+            self.base_param = {
+                "objective": "multi:softprob",
+                "num_class": self.num_class,
+                "eval_metric": ["merror", "mlogloss"],
+            }
+        else:
+            self.base_param = {"objective": "reg:squarederror", "eval_metric": "mae"}
+
+    @classmethod
+    def max_resource(cls, n_folds=5):
+        """The budget of a full trial, in boosting rounds across the folds"""
+        return n_folds * cls.distributions["n_estimators"].high
 
     def __call__(self, trial):
         # Calculate an objective value by using the extra arguments.
-        train_x = self.train_x
-        train_y = self.train_y
-
         param = {
             "verbosity": 1,
             "booster": trial.suggest_categorical("booster", ["gbtree"]),
@@ -77,51 +160,66 @@ class XGBoostObjective(object):
             param["rate_drop"] = trial.suggest_float("rate_drop", 1e-8, 1.0, log=True)
             param["skip_drop"] = trial.suggest_float("skip_drop", 1e-8, 1.0, log=True)
 
-        if self.dataset_type == CLASSIFICATION:
-            from sklearn.model_selection import KFold
+        num_boost_round = max(1, param.pop("n_estimators"))
+        param.update(self.base_param)
+        param.update(tree_method="hist", seed=self.random_state, nthread=self.n_threads)
 
-            kf = KFold(n_splits=5, shuffle=True, random_state=55)
-            scores = []
-            for train_index, test_index in kf.split(train_x):
-                xgb_model = xgb.XGBClassifier(
-                    objective="multi:softmax",
-                    num_class=self.num_class,
-                    n_jobs=-1,
-                    random_state=self.random_state,
-                )
-                xgb_model.set_params(**param)
-                xgb_model.fit(train_x[train_index], train_y[train_index])
-                predictions = xgb_model.predict(train_x[test_index])
-                predictions = np.rint(predictions)
-                actuals = train_y[test_index]
-                s = accuracy_score(actuals, predictions)
-                print(s)
-                scores.append(s)
-            score = sum(scores) / len(scores)
-
-        else:  # 'regression'
-            from sklearn.metrics import mean_absolute_error
-            from sklearn.model_selection import KFold
-
-            kf = KFold(n_splits=5, shuffle=True, random_state=55)
-            scores = []
-            for train_index, test_index in kf.split(train_x):
-                xgb_model = xgb.XGBRegressor(
-                    objective="reg:squarederror",
-                    n_jobs=-1,
-                    random_state=self.random_state,
-                )
-                xgb_model.set_params(**param)
-                xgb_model.fit(train_x[train_index], train_y[train_index])
-                predictions = xgb_model.predict(train_x[test_index])
-                actuals = train_y[test_index]
-                s = mean_absolute_error(actuals, predictions)
-                print(s)
-                scores.append(s)
-            score = sum(scores) / len(scores)
+        folds = self.fold_sets.get()
+        try:
+            scores, best_iterations = self._cross_validate(
+                trial, param, num_boost_round, folds
+            )
+        finally:
+            self.fold_sets.put(folds)
+
+        trial.set_user_attr("best_iterations", best_iterations)
+        score = sum(scores) / len(scores)
 
         return score
 
+    def _cross_validate(self, trial, param, num_boost_round, folds):
+        """The validation score & best number of rounds of each of the `folds` trained with `param`"""
+        scores = []
+        best_iterations = []
+        # the boosting rounds trained in the previous folds
+        trained = 0
+        for dtrain, dvalid in folds:
+            callbacks = []
+            if self.checkpoints:
+                callbacks.append(
+                    PruningCallback(
+                        trial,
+                        self.checkpoints,
+                        offset=trained,
+                        metric=(
+                            "mlogloss" if self.dataset_type == CLASSIFICATION else "mae"
+                        ),
+                        sign=-1 if self.dataset_type == CLASSIFICATION else 1,
+                    )
+                )
+
+            evals_result = {}
+            bst = xgb.train(
+                param,
+                dtrain,
+                num_boost_round=num_boost_round,
+                evals=[(dvalid, "valid")],
+                early_stopping_rounds=self.early_stopping_rounds,
+                evals_result=evals_result,
+                verbose_eval=False,
+                callbacks=callbacks,
+            )
+            if self.dataset_type == CLASSIFICATION:
+                s = 1 - evals_result["valid"]["merror"][bst.best_iteration]
+            else:
+                s = evals_result["valid"]["mae"][bst.best_iteration]
+            scores.append(s)
+            best_iterations.append(bst.best_iteration + 1)
+            # every round trained, including those after the best one until early stopping
+            trained += bst.num_boosted_rounds()
+
+        return scores, best_iterations
+
 
 class XGBoostModel(BaseModel):
     def __init__(
@@ -132,8 +230,9 @@ class XGBoostModel(BaseModel):
         method="train_ml_xgboost",
         config=None,
         random_state=123,
+        experiment_folder=None,
     ):
-        super().__init__(input_dim, output_dim, dataset_type)
+        super().__init__(input_dim, output_dim, dataset_type, experiment_folder)
         self.method = method
         self.config = config if config else {}
         self.random_state = random_state
@@ -196,7 +295,16 @@ class XGBoostModel(BaseModel):
         print("AutoXGB: self.config=", self.config)
         self.n_trials = self.config.get("n_trials", 100)
         self.timeout = self.config.get("timeout", None)
-        print("AutoXGB: n_trials={} timeout={}".format(self.n_trials, self.timeout))
+        self.early_stopping_rounds = self.config.get("early_stopping_rounds", 10)
+        self.n_parallel_trials = self.config.get("n_parallel_trials", 1)
+        self.pruner = self.config.get("pruner", "none")
+        self.min_resource = self.config.get("min_resource", 10)
+        self.reduction_factor = self.config.get("reduction_factor", 3)
+        print(
+            "AutoXGB: n_trials={} timeout={} n_parallel_trials={}".format(
+                self.n_trials, self.timeout, self.n_parallel_trials
+            )
+        )
 
         self.output_dim = output_dim
         self.model = model
@@ -225,9 +333,14 @@ class XGBoostModel(BaseModel):
         else:
             direction = "minimize"
 
+        # the trial budget is counted in boosting rounds across the folds
+        max_resource = XGBoostObjective.max_resource()
         study = optuna.create_study(
             direction=direction,
             sampler=optuna.samplers.TPESampler(seed=self.random_state),
+            pruner=create_pruner(
+                self.pruner, max_resource, self.min_resource, self.reduction_factor
+            ),
         )
 
         objective = XGBoostObjective(
@@ -238,24 +351,48 @@ class XGBoostModel(BaseModel):
             testY,
             num_class=self.output_dim,
             random_state=self.random_state,
+            early_stopping_rounds=self.early_stopping_rounds,
+            # split the cores between the concurrent trials
+            n_threads=max(1, effective_n_jobs(-1) // self.n_parallel_trials),
+            checkpoints=(
+                None
+                if self.pruner == "none"
+                else resource_checkpoints(
+                    max_resource, self.min_resource, self.reduction_factor
+                )
+            ),
+            n_fold_sets=self.n_parallel_trials,
         )
 
-        study.optimize(objective, n_trials=self.n_trials, timeout=self.timeout)
+        run_trials(
+            study,
+            objective,
+            self.n_trials,
+            objective.distributions,
+            n_parallel=self.n_parallel_trials,
+            timeout=self.timeout,
+        )
         print("best_trial=", study.best_trial)
         print("best_params=", study.best_params)
 
+        # refit with the number of rounds early stopping settled on in the cross validation
+        best_params = dict(study.best_params)
+        best_params["n_estimators"] = int(
+            np.rint(np.mean(study.best_trial.user_attrs["best_iterations"]))
+        )
+
         if self.dataset_type == CLASSIFICATION:
             self.model = xgb.XGBClassifier(
                 objective="multi:softmax",
                 num_class=self.output_dim,
                 random_state=self.random_state,
-                **study.best_params
+                **best_params,
             )
         else:
             self.model = xgb.XGBRegressor(
                 objective="reg:squarederror",
                 random_state=self.random_state,
-                **study.best_params
+                **best_params,
             )
 
         self.model.fit(trainX, trainY)
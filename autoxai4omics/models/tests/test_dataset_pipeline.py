@@ -0,0 +1,47 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+import pytest
+import numpy as np
+from ..tabauto.dataset_pipeline import make_dataset
+
+
+RNG = np.random.default_rng(1234)
+X = RNG.normal(size=(50, 4))
+Y = np.eye(2)[RNG.integers(0, 2, size=50)]
+
+
+def _epoch(dataset):
+    xs, ys = zip(*[(x.numpy(), y.numpy()) for x, y in dataset])
+    return np.concatenate(xs), np.concatenate(ys)
+
+
+class Test_make_dataset:
+    def test_batches_in_order(self):
+        dataset = make_dataset(X, Y, batch_size=16)
+        assert [len(y) for _, y in dataset] == [16, 16, 16, 2]
+
+        x, y = _epoch(dataset)
+        assert x.dtype == np.float32
+        assert np.allclose(x, X) and np.array_equal(y, Y)
+
+    @pytest.mark.parametrize("cache", [True, False])
+    def test_seeded_shuffle(self, cache):
+        x, y = _epoch(make_dataset(X, Y, shuffle=True, seed=0, cache=cache))
+        x_again, _ = _epoch(make_dataset(X, Y, shuffle=True, seed=0, cache=cache))
+
+        assert np.array_equal(x, x_again)
+        assert not np.allclose(x, X)
+        # the pairs are shuffled together
+        order = np.argsort(x[:, 0])
+        assert np.array_equal(y[order], Y[np.argsort(X[:, 0].astype(np.float32))])
+
+    def test_reshuffles_every_epoch(self):
+        dataset = make_dataset(X, Y, shuffle=True, seed=0)
+        assert not np.array_equal(_epoch(dataset)[0], _epoch(dataset)[0])
+
+    def test_mismatched_lengths(self):
+        with pytest.raises(ValueError):
+            make_dataset(X, Y[:-1])
@@ -0,0 +1,89 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+import pytest
+import numpy as np
+from utils.vars import CLASSIFICATION
+
+pytest.importorskip("autokeras")
+from autokeras.engine.tuner import AutoTuner  # noqa: E402
+from ..tabauto.keras_model import KerasModel  # noqa: E402
+
+RNG = np.random.default_rng(0)
+X = RNG.normal(size=(40, 4)).astype(np.float32)
+Y = np.eye(2)[(X[:, 0] > 0).astype(int)]
+CONFIG = {"n_epochs": 3, "batch_size": 8, "n_trials": 2, "tuner": "random"}
+
+
+@pytest.fixture
+def final_fits(monkeypatch):
+    """The epochs of every final fit of the best model"""
+    epochs = []
+    final_fit = AutoTuner.final_fit
+
+    def record(self, **kwargs):
+        epochs.append(kwargs["epochs"])
+        return final_fit(self, **kwargs)
+
+    monkeypatch.setattr(AutoTuner, "final_fit", record)
+    return epochs
+
+
+def _fit(folder, **config):
+    model = KerasModel(
+        4,
+        2,
+        CLASSIFICATION,
+        method="train_dnn_autokeras",
+        config={**CONFIG, **config},
+        experiment_folder=folder,
+    )
+    model.fit_data(X[:30], Y[:30], X[30:], Y[30:])
+    return model
+
+
+def _trials(folder):
+    (project,) = (folder / "autokeras").iterdir()
+    return sorted(p.name for p in project.glob("trial_*"))
+
+
+class Test_autokeras:
+    def test_final_fit(self, tmp_path, final_fits):
+        model = _fit(tmp_path)
+
+        assert len(_trials(tmp_path)) == 2
+        # the best model is refitted over all the epochs
+        assert final_fits == [3]
+        assert model.predict_proba(X).shape == (40, 2)
+
+    def test_timeout(self, tmp_path, final_fits):
+        _fit(tmp_path, n_trials=5, timeout=0)
+
+        # the first trial stopped at the deadline & no other started, the final fit run regardless
+        assert len(_trials(tmp_path)) == 1
+        assert final_fits == [3]
+
+    def test_resume(self, tmp_path, final_fits):
+        _fit(tmp_path)
+        trials = _trials(tmp_path)
+
+        # the finished search is reused as is
+        _fit(tmp_path)
+        assert _trials(tmp_path) == trials
+        assert final_fits == [3]
+
+        # or run again from scratch
+        marker = next((tmp_path / "autokeras").iterdir()) / "marker"
+        marker.touch()
+        _fit(tmp_path, resume=False)
+        assert not marker.exists()
+        assert len(_trials(tmp_path)) == 2
+        assert final_fits == [3, 3]
+
+    def test_no_experiment_folder(self, tmp_path, final_fits):
+        model = _fit(None)
+
+        assert final_fits == [3]
+        assert model.tmp_directory is None
@@ -0,0 +1,194 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+import pytest
+import numpy as np
+import optuna
+from ..tabauto import lgbm_model
+from ..tabauto.lgbm_model import LGBMModel, LGBMObjective
+from optuna.trial import TrialState
+from models.optuna_search import create_pruner, resource_checkpoints, run_trials
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import KFold
+from utils.vars import CLASSIFICATION, REGRESSION
+import lightgbm as lgb
+
+RNG = np.random.default_rng(0)
+X = RNG.normal(size=(120, 5))
+LABELS = np.digitize(X[:, 0] + RNG.normal(scale=0.5, size=120), [-0.5, 0.5])
+TARGET = X[:, 0] - 2 * X[:, 1] + RNG.normal(scale=0.2, size=120)
+GOOD = {
+    "learning_rate": 0.3,
+    "lambda_l1": 1e-3,
+    "lambda_l2": 1e-3,
+    "num_leaves": 8,
+    "feature_fraction": 1.0,
+    "bagging_fraction": 1.0,
+    "bagging_freq": 1,
+    "min_child_samples": 5,
+}
+# splits on a few features of a few samples at best
+BAD = {
+    **GOOD,
+    "learning_rate": 0.1,
+    "lambda_l1": 10.0,
+    "lambda_l2": 10.0,
+    "num_leaves": 2,
+    "feature_fraction": 0.4,
+    "min_child_samples": 45,
+}
+CHECKPOINTS = resource_checkpoints(LGBMObjective.max_resource(), 10, 3)
+
+
+def _study(objective, n_trials=6, n_parallel=1):
+    study = optuna.create_study(
+        direction="minimize", sampler=optuna.samplers.TPESampler(seed=0)
+    )
+    run_trials(study, objective, n_trials, LGBMObjective.distributions, n_parallel)
+    return study
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    """The (study, objective) of every search run by the models"""
+    runs = []
+
+    def record(study, objective, *args, **kwargs):
+        runs.append((study, objective))
+        return run_trials(study, objective, *args, **kwargs)
+
+    monkeypatch.setattr(lgbm_model, "run_trials", record)
+    return runs
+
+
+class Test_LGBMObjective:
+    def test_cached_folds(self):
+        # the folds shared by all the trials give the results of folds built for every trial
+        cached = _study(
+            LGBMObjective(REGRESSION, X, TARGET, None, None, random_state=0)
+        )
+        rebuilt = _study(
+            lambda trial: LGBMObjective(
+                REGRESSION, X, TARGET, None, None, random_state=0
+            )(trial)
+        )
+
+        assert cached.best_value == rebuilt.best_value
+        assert cached.best_params == rebuilt.best_params
+        assert [t.value for t in cached.trials] == [t.value for t in rebuilt.trials]
+
+    def test_validation_binning(self):
+        # the validation part is binned with the bins of its training part, as the raw data would be split
+        objective = LGBMObjective(REGRESSION, X, TARGET, None, None, random_state=0)
+        _, test_index = next(KFold(n_splits=5, shuffle=True, random_state=55).split(X))
+        dtrain, dvalid = objective.folds[0]
+        evals_result = {}
+        bst = lgb.train(
+            {"objective": REGRESSION, "metric": "l1", "verbosity": -1},
+            dtrain,
+            num_boost_round=20,
+            valid_sets=[dvalid],
+            valid_names=["valid"],
+            callbacks=[lgb.record_evaluation(evals_result)],
+        )
+
+        assert dvalid.get_ref_chain() == {dtrain, dvalid}
+        # the raw data is freed once binned
+        assert dtrain.data is None and dvalid.data is None
+        predictions = bst.predict(X[test_index])
+        assert evals_result["valid"]["l1"][-1] == pytest.approx(
+            mean_absolute_error(TARGET[test_index], predictions), rel=1e-5
+        )
+
+    def test_pruning_checkpoints(self):
+        objective = LGBMObjective(
+            REGRESSION, X, TARGET, None, None, random_state=0, checkpoints=CHECKPOINTS
+        )
+        study = optuna.create_study(direction="minimize")
+        study.enqueue_trial(GOOD)
+        run_trials(study, objective, 1, LGBMObjective.distributions)
+
+        # the rounds of the folds follow on from each other, whether they ran all 100 rounds or stopped 10 after the best
+        trained = sum(
+            min(100, best + 10)
+            for best in study.trials[0].user_attrs["best_iterations"]
+        )
+        assert trained > 90
+        assert sorted(study.trials[0].intermediate_values) == [
+            c for c in CHECKPOINTS if c <= trained
+        ]
+
+    def test_prunes_bad_trial(self):
+        objective = LGBMObjective(
+            REGRESSION, X, TARGET, None, None, random_state=0, checkpoints=CHECKPOINTS
+        )
+        study = optuna.create_study(
+            direction="minimize",
+            pruner=create_pruner("median", LGBMObjective.max_resource(), 10),
+        )
+        for params in [GOOD] * 5 + [BAD]:
+            study.enqueue_trial(params)
+        run_trials(study, objective, 6, LGBMObjective.distributions)
+
+        assert [t.state for t in study.trials] == [TrialState.COMPLETE] * 5 + [
+            TrialState.PRUNED
+        ]
+        # at the first checkpoint
+        assert list(study.trials[-1].intermediate_values) == [10]
+
+
+class Test_LGBMModel:
+    @pytest.mark.parametrize(
+        "dataset_type, y, n_classes",
+        [(CLASSIFICATION, np.eye(3)[LABELS], 3), (REGRESSION, TARGET, 1)],
+    )
+    def test_refit(self, searches, dataset_type, y, n_classes):
+        model = LGBMModel(
+            5,
+            n_classes,
+            dataset_type,
+            method="train_ml_lgbm_auto",
+            config={"n_trials": 4},
+            random_state=0,
+        )
+        model.fit_data(X, y)
+
+        ((study, _),) = searches
+        # refitted over the mean number of rounds early stopping settled on in the folds
+        n_rounds = int(np.rint(np.mean(study.best_trial.user_attrs["best_iterations"])))
+        assert model.model.get_params()["n_estimators"] == n_rounds
+        assert model.model.booster_.current_iteration() == n_rounds
+        assert model.model.booster_.num_trees() == n_rounds * n_classes
+
+    def test_parallel_trials(self, searches, monkeypatch):
+        monkeypatch.setattr(lgbm_model, "effective_n_jobs", lambda n_jobs: 8)
+        models = []
+        for n_parallel in [1, 2]:
+            model = LGBMModel(
+                5,
+                3,
+                CLASSIFICATION,
+                method="train_ml_lgbm_auto",
+                config={"n_trials": 6, "n_parallel_trials": n_parallel},
+                random_state=0,
+            )
+            model.fit_data(X, np.eye(3)[LABELS])
+            models.append(model)
+
+        (sequential, sequential_objective), (parallel, parallel_objective) = searches
+        # the cores are split between the trials, each running on its own copy of the folds
+        assert sequential_objective.n_threads == 8
+        assert parallel_objective.n_threads == 4
+        assert parallel_objective.fold_sets.qsize() == 2
+        # the startup trials of the sampler are random, so the parallel ones match the sequential ones
+        assert [t.params for t in parallel.trials] == [
+            t.params for t in sequential.trials
+        ]
+        assert [t.value for t in parallel.trials] == pytest.approx(
+            [t.value for t in sequential.trials]
+        )
+        np.testing.assert_allclose(
+            models[1].model.predict_proba(X), models[0].model.predict_proba(X)
+        )
@@ -0,0 +1,27 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+import pytest
+from ..model_defs import form_model_dict
+from utils.vars import CLASSIFICATION, REGRESSION
+
+
+@pytest.mark.parametrize(
+    "problem_type, model_name, max_features",
+    [
+        (CLASSIFICATION, "RandomForestClassifier", "sqrt"),
+        (REGRESSION, "RandomForestRegressor", 1.0),
+    ],
+)
+def test_random_forest_max_features(problem_type, model_name, max_features):
+    # what max_features="auto" meant for each before scikit-learn removed it
+    model, params, _ = form_model_dict(problem_type, None, [model_name])[model_name]
+    assert params["max_features"] == max_features
+    assert model(**params).get_params()["max_features"] == max_features
+
+    for tuning in ["random", "grid"]:
+        _, space, _ = form_model_dict(problem_type, tuning, [model_name])[model_name]
+        assert max_features in space["max_features"]
+        assert "auto" not in space["max_features"]
@@ -0,0 +1,90 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+import pytest
+import numpy as np
+import scipy.stats as sp
+from .. import models
+from metrics.metric_defs import METRICS
+from sklearn.model_selection import RandomizedSearchCV
+from sklearn.tree import DecisionTreeClassifier
+from utils.checkpoint import CandidateLog
+from utils.vars import CLASSIFICATION
+
+
+RNG = np.random.default_rng(1234)
+X = RNG.normal(size=(80, 6))
+Y = (X[:, 0] + RNG.normal(scale=0.5, size=80) > 0).astype(int)
+PARAMS = {"max_depth": sp.randint(1, 8), "min_samples_leaf": [1, 2, 5, 10]}
+SCORERS = {"f1_score": METRICS[CLASSIFICATION]["f1_score"]}
+
+
+def _random_search(log=None):
+    return models.random_search(
+        DecisionTreeClassifier,
+        "DecisionTreeClassifier",
+        dict(PARAMS),
+        12,
+        X,
+        Y,
+        0,
+        SCORERS,
+        "f1_score",
+        log=log,
+    )
+
+
+class Test_random_search:
+    def test_matches_sklearn(self):
+        search = RandomizedSearchCV(
+            DecisionTreeClassifier(),
+            {**PARAMS, "random_state": [0]},
+            n_iter=12,
+            cv=5,
+            random_state=0,
+            scoring=SCORERS,
+            refit="f1_score",
+        ).fit(X, Y)
+        assert _random_search().get_params() == search.best_estimator_.get_params()
+
+    def test_resume(self, tmp_path, monkeypatch):
+        log = CandidateLog(tmp_path / "search.jsonl")
+        monkeypatch.setattr(models, "CHECKPOINT_CHUNK", 5)
+        expected = _random_search(log).get_params()
+        with open(log.path) as f:
+            assert len(f.readlines()) == 12
+
+        # drop the last chunk, as if the search had been interrupted, and check only it is run again
+        with open(log.path) as f:
+            lines = f.readlines()
+        with open(log.path, "w") as f:
+            f.writelines(lines[:10])
+
+        fitted = []
+        fit = models.GridSearchCV.fit
+        monkeypatch.setattr(
+            models.GridSearchCV,
+            "fit",
+            lambda self, *a, **k: fitted.append(len(self.param_grid))
+            or fit(self, *a, **k),
+        )
+        assert _random_search(log).get_params() == expected
+        assert fitted == [2]
+
+    def test_chunk_per_core(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(models, "CHECKPOINT_CHUNK", 5)
+        monkeypatch.setattr(models, "effective_n_jobs", lambda n_jobs: 8)
+        fitted = []
+        fit = models.GridSearchCV.fit
+        monkeypatch.setattr(
+            models.GridSearchCV,
+            "fit",
+            lambda self, *a, **k: fitted.append(len(self.param_grid))
+            or fit(self, *a, **k),
+        )
+
+        _random_search(CandidateLog(tmp_path / "search.jsonl"))
+        # a candidate per core at least
+        assert fitted == [8, 4]
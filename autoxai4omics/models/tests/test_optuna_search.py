@@ -0,0 +1,155 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+import pytest
+import numpy as np
+import optuna
+import scipy.stats as sp
+from .. import optuna_search as os_
+from metrics.metric_defs import METRICS
+from optuna.distributions import (
+    CategoricalDistribution,
+    FloatDistribution,
+    IntDistribution,
+)
+from optuna.trial import TrialState
+from sklearn.tree import DecisionTreeClassifier
+from utils.vars import CLASSIFICATION
+
+
+RNG = np.random.default_rng(1234)
+X = RNG.normal(size=(60, 6))
+Y = (X[:, 0] + RNG.normal(scale=0.5, size=60) > 0).astype(int)
+PARAM_RANGES = {"max_depth": sp.randint(1, 6), "criterion": ["gini", "entropy"]}
+SCORER_DICT = {"f1_score": METRICS[CLASSIFICATION]["f1_score"]}
+
+
+class Test_to_distribution:
+    def test_discrete(self):
+        assert os_.to_distribution(sp.randint(2, 20)) == IntDistribution(2, 19)
+
+    def test_continuous(self):
+        assert os_.to_distribution(sp.uniform(0.1, 0.4)) == FloatDistribution(0.1, 0.5)
+
+    def test_categorical(self):
+        dist = os_.to_distribution(10.0 ** np.arange(-1, 2))
+        assert isinstance(dist, CategoricalDistribution)
+        assert np.allclose(dist.choices, [0.1, 1.0, 10.0])
+        assert all(type(c) is float for c in dist.choices)
+
+
+class Test_create_pruner:
+    @pytest.mark.parametrize(
+        "name", ["median", "hyperband", "successive_halving", "none"]
+    )
+    def test_valid(self, name):
+        assert isinstance(os_.create_pruner(name, 5), optuna.pruners.BasePruner)
+
+    def test_invalid(self):
+        try:
+            os_.create_pruner("asha", 5)
+            assert False
+        except ValueError:
+            assert True
+
+
+class Test_resource_checkpoints:
+    def test_geometric(self):
+        assert os_.resource_checkpoints(500, 10, 3) == [10, 30, 90, 270, 500]
+
+    def test_small_budget(self):
+        assert os_.resource_checkpoints(5, 10, 3) == [5]
+
+
+class Test_run_trials:
+    def objective(self, trial):
+        x = trial.suggest_float("x", -10, 10)
+        if x > 8:
+            raise ValueError("failing trial")
+        return -((x - 2) ** 2)
+
+    def run(self, n_parallel):
+        study = optuna.create_study(
+            direction="maximize", sampler=optuna.samplers.TPESampler(seed=42)
+        )
+        os_.run_trials(
+            study,
+            self.objective,
+            20,
+            {"x": FloatDistribution(-10, 10)},
+            n_parallel=n_parallel,
+        )
+        return study
+
+    def test_reproducible_in_parallel(self):
+        first = [t.params for t in self.run(4).trials]
+        second = [t.params for t in self.run(4).trials]
+
+        assert len(first) == 20
+        assert first == second
+
+    def test_failures_recorded(self):
+        study = self.run(1)
+        failed = [t for t in study.trials if t.state == TrialState.FAIL]
+
+        assert all(t.params["x"] > 8 for t in failed)
+        assert os_.finished_trials(study) == 20
+
+
+class Test_optuna_search:
+    def test_resume(self, tmp_path):
+        args = (
+            DecisionTreeClassifier,
+            "DecisionTreeClassifier",
+            PARAM_RANGES,
+        )
+        kwargs = dict(
+            x_train=X,
+            y_train=Y,
+            seed_num=29292,
+            scorer_dict=SCORER_DICT,
+            fit_scorer="f1_score",
+            experiment_folder=tmp_path,
+            optuna_config={"pruner": "none", "n_parallel_trials": 2},
+        )
+
+        trained = os_.optuna_search(*args, 4, **kwargs)
+        assert isinstance(trained, DecisionTreeClassifier)
+        assert (tmp_path / "optuna_studies.db").exists()
+
+        os_.optuna_search(*args, 6, **kwargs)
+        summaries = optuna.get_all_study_summaries(
+            f"sqlite:///{tmp_path / 'optuna_studies.db'}"
+        )
+        assert len(summaries) == 1
+        assert summaries[0].n_trials == 6
+
+    def test_sequential_by_default(self, tmp_path, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            os_,
+            "run_trials",
+            lambda study, objective, n_trials, distributions, n_parallel, timeout: (
+                calls.append((n_parallel, objective.n_jobs))
+                or study.optimize(objective, n_trials)
+            ),
+        )
+
+        os_.optuna_search(
+            DecisionTreeClassifier,
+            "DecisionTreeClassifier",
+            PARAM_RANGES,
+            3,
+            X,
+            Y,
+            0,
+            SCORER_DICT,
+            "f1_score",
+            tmp_path,
+            n_jobs=4,
+        )
+
+        # one trial at a time, so each learns from all the previous ones, with all the cores
+        assert calls == [(1, 4)]
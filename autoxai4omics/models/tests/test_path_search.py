@@ -0,0 +1,188 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+import pytest
+import numpy as np
+import scipy.stats as sp
+from .. import path_search as ps
+from metrics.metric_defs import METRICS
+from sklearn.linear_model import ElasticNet, Lars, Lasso, LassoLars, Ridge
+from sklearn.model_selection import GridSearchCV
+from sklearn.neighbors import KNeighborsClassifier, KNeighborsRegressor
+from utils.vars import CLASSIFICATION, REGRESSION
+
+
+RNG = np.random.default_rng(1234)
+X = RNG.normal(size=(60, 8))
+Y_CLF = (X[:, 0] + RNG.normal(scale=0.5, size=60) > 0).astype(int) + (X[:, 1] > 1)
+Y_REG = X[:, 0] * 2 + RNG.normal(scale=0.1, size=60)
+
+
+class Test_candidate_values:
+    def test_discrete_distribution(self):
+        assert ps.candidate_values(sp.randint(2, 5)) == [2, 3, 4]
+
+    def test_iterable(self):
+        assert ps.candidate_values(range(1, 6, 2)) == [1, 3, 5]
+
+
+class Test_score_predictions:
+    # multiclass & binary
+    @pytest.mark.parametrize("y", [Y_CLF, Y_CLF > 0])
+    def test_classification(self, y):
+        knn = KNeighborsClassifier().fit(X[:40], y[:40])
+        for name, scorer in METRICS[CLASSIFICATION].items():
+            assert ps.score_predictions(
+                scorer,
+                y[40:],
+                knn.predict(X[40:]),
+                knn.predict_proba(X[40:]),
+                knn.classes_,
+            ) == pytest.approx(scorer(knn, X[40:], y[40:])), name
+
+    def test_regression(self):
+        knn = KNeighborsRegressor().fit(X[:40], Y_REG[:40])
+        for name, scorer in METRICS[REGRESSION].items():
+            assert ps.score_predictions(
+                scorer, Y_REG[40:], knn.predict(X[40:])
+            ) == pytest.approx(scorer(knn, X[40:], Y_REG[40:])), name
+
+
+class Test_kneighbors_chunked:
+    @pytest.mark.parametrize("metric", ["euclidean", "manhattan"])
+    def test_matches_sklearn(self, metric):
+        knn = KNeighborsClassifier(n_neighbors=7, metric=metric).fit(X[:40], Y_CLF[:40])
+        exp_dist, exp_ind = knn.kneighbors(X[40:])
+
+        # force a small working memory so the computation is split into chunks
+        dist, ind = ps.kneighbors_chunked(X[:40], X[40:], 7, metric, working_memory=0)
+
+        assert np.allclose(dist, exp_dist)
+        assert np.array_equal(ind, exp_ind)
+
+
+class Test_knn_path_predictions:
+    def test_classification(self):
+        _, ind = ps.kneighbors_chunked(X[:40], X[40:], 10)
+        preds, proba = ps.knn_path_predictions(Y_CLF[:40], ind, True, 3)
+
+        for k in range(1, 11):
+            knn = KNeighborsClassifier(n_neighbors=k).fit(X[:40], Y_CLF[:40])
+            assert np.array_equal(preds[k - 1], knn.predict(X[40:]))
+            assert np.allclose(proba[k - 1], knn.predict_proba(X[40:]))
+
+    def test_regression(self):
+        _, ind = ps.kneighbors_chunked(X[:40], X[40:], 10)
+        preds, proba = ps.knn_path_predictions(Y_REG[:40], ind, False)
+
+        assert proba is None
+        for k in range(1, 11):
+            knn = KNeighborsRegressor(n_neighbors=k).fit(X[:40], Y_REG[:40])
+            assert np.allclose(preds[k - 1], knn.predict(X[40:]))
+
+
+class Test_knn_path_search:
+    @pytest.mark.parametrize(
+        "model,problem_type,y,fit_scorer",
+        [
+            (KNeighborsClassifier, CLASSIFICATION, Y_CLF, "f1_score"),
+            (KNeighborsClassifier, CLASSIFICATION, Y_CLF, "roc_auc_score"),
+            (KNeighborsRegressor, REGRESSION, Y_REG, "mean_absolute_error"),
+        ],
+    )
+    def test_matches_grid_search(self, model, problem_type, y, fit_scorer):
+        param_ranges = {
+            "n_neighbors": range(1, 21, 2),
+            "metric": ["euclidean", "manhattan"],
+        }
+        scorer_dict = {fit_scorer: METRICS[problem_type][fit_scorer]}
+
+        trained = ps.knn_path_search(
+            model, "knn", param_ranges, X, y, 29292, scorer_dict, fit_scorer
+        )
+        expected = GridSearchCV(
+            model(), param_ranges, cv=5, scoring=scorer_dict, refit=fit_scorer
+        ).fit(X, y)
+
+        assert isinstance(trained, model)
+        assert (
+            trained.get_params()["n_neighbors"] == expected.best_params_["n_neighbors"]
+        )
+        assert trained.get_params()["metric"] == expected.best_params_["metric"]
+
+    def test_invalid_k(self):
+        try:
+            ps.knn_path_search(
+                KNeighborsRegressor,
+                "knn",
+                {"n_neighbors": [500]},
+                X,
+                Y_REG,
+                29292,
+                {"r2_score": METRICS[REGRESSION]["r2_score"]},
+                "r2_score",
+            )
+            assert False
+        except ValueError:
+            assert True
+
+
+class Test_alpha_grid:
+    def test_all_zero_at_max(self):
+        grid = ps.alpha_grid(X, Y_REG, n_alphas=10)
+
+        assert len(grid) == 10
+        assert np.all(np.diff(grid) < 0)
+        assert np.allclose(Lasso(alpha=grid[0]).fit(X, Y_REG).coef_, 0)
+        assert not np.allclose(Lasso(alpha=grid[1]).fit(X, Y_REG).coef_, 0)
+
+
+class Test_linear_path_search:
+    @pytest.mark.parametrize(
+        "model,param_ranges",
+        [
+            (Lasso, {"n_alphas": 10}),
+            (ElasticNet, {"n_alphas": 10, "l1_ratio": [0.5, 0.9]}),
+            (LassoLars, {"n_alphas": 10}),
+            (Lars, {"n_nonzero_coefs": 6}),
+        ],
+    )
+    def test_matches_grid_search(self, model, param_ranges):
+        scorer_dict = {"r2_score": METRICS[REGRESSION]["r2_score"]}
+        candidates = ps.linear_path_candidates(model, param_ranges, X, Y_REG)
+
+        trained = ps.linear_path_search(
+            model, "linear", param_ranges, X, Y_REG, 29292, scorer_dict, "r2_score"
+        )
+        expected = GridSearchCV(
+            model(),
+            [{k: [v] for k, v in c.items()} for c in candidates],
+            cv=5,
+            scoring=scorer_dict,
+            refit="r2_score",
+        ).fit(X, Y_REG)
+
+        assert isinstance(trained, model)
+        for k, v in expected.best_params_.items():
+            assert np.isclose(trained.get_params()[k], v)
+
+    def test_ridge(self):
+        scorer_dict = {
+            "mean_absolute_error": METRICS[REGRESSION]["mean_absolute_error"]
+        }
+
+        trained = ps.ridge_path_search(
+            Ridge,
+            "Ridge",
+            {"alphas": [1e-3, 1e6]},
+            X,
+            Y_REG,
+            29292,
+            scorer_dict,
+            "mean_absolute_error",
+        )
+
+        assert isinstance(trained, Ridge)
+        assert trained.alpha == 1e-3
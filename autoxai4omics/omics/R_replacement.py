@@ -12,9 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from bioinfokit.analys import norm
 from pathlib import Path
 from typing import Union
+from utils import data_cache
 import conorm as cn
 import joblib
 import pandas as pd
@@ -47,7 +47,7 @@ def preprocessing_LO(
 
     """
     file = "file_path" + ("_holdout_data" if holdout else "")
-    data_file = pd.read_csv(data_dict[file], index_col=0)  # sampleID as index
+    data_file = data_cache.read_csv(data_dict[file], index_col=0)  # sampleID as index
 
     # If metadata not provided, drop target prior to filtering
     metafile = "metadata_file" + ("_holdout_data" if holdout else "")
@@ -132,12 +132,16 @@ def apply_learned_processing(
     tmm: bool = False,
     prediction_file: Union[str, Path] = None,
 ) -> pd.DataFrame:
+    # imports matplotlib & statsmodels, only needed for gene expression data
+    from bioinfokit.analys import norm
+
     if holdout is False and prediction is False:
         raise ValueError("One of holdout or prediction need to be true")
 
     if holdout:
         file = "file_path" + ("_holdout_data" if holdout else "")
-        data_file = pd.read_csv(data_dict[file], index_col=0)  # sampleID as index
+        # sampleID as index
+        data_file = data_cache.read_csv(data_dict[file], index_col=0)
 
         # If metadata not provided, drop target prior to filtering
         metafile = "metadata_file" + ("_holdout_data" if holdout else "")
@@ -145,11 +149,12 @@ def apply_learned_processing(
             data_file = data_file.drop(data_dict["target"], axis=0)
 
     elif prediction:
-        data_file = pd.read_csv(prediction_file, index_col=0)  # sampleID as index
+        # sampleID as index
+        data_file = data_cache.read_csv(prediction_file, index_col=0)
 
     # save list of genes kept
     save_name = (
-        f'/experiments/results/{data_dict["name"]}/omics_{data_dict["data_type"]}'
+        f'{data_dict["save_path"]}/results/{data_dict["name"]}/omics_{data_dict["data_type"]}'
         + "_keptGenes.pkl"
     )
     with open(save_name, "rb") as f:
@@ -209,7 +214,7 @@ def preprocessing_others(
 
     # omicLogger.debug('Filtering gene expression data...')
     file = "file_path" + ("_holdout_data" if holdout else "")
-    data_file = pd.read_csv(data_dict[file], index_col=0)  # sampleID as index
+    data_file = data_cache.read_csv(data_dict[file], index_col=0)  # sampleID as index
 
     # If metadata not provided, drop target prior to filtering
     metafile = "metadata_file" + ("_holdout_data" if holdout else "")
@@ -313,9 +318,12 @@ def preprocessing_TMM(
 
     """
 
+    # imports matplotlib & statsmodels, only needed for gene expression data
+    from bioinfokit.analys import norm
+
     # omicLogger.debug('Filtering gene expression data...')
     file = "file_path" + ("_holdout_data" if holdout else "")
-    data_file = pd.read_csv(data_dict[file], index_col=0)  # sampleID as index
+    data_file = data_cache.read_csv(data_dict[file], index_col=0)  # sampleID as index
 
     # If metadata not provided, drop target prior to filtering
     metafile = "metadata_file" + ("_holdout_data" if holdout else "")
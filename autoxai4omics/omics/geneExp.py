@@ -17,8 +17,11 @@ from omics import R_replacement as rrep
 import joblib
 import pandas as pd
 from pathlib import Path
+from utils import data_cache
+from utils.profiling import traced
 
 
+@traced("gene_expression filter")
 def get_data_gene_expression(
     config_dict: dict, holdout: bool = False
 ) -> tuple[pd.DataFrame, ndarray, list[str]]:
@@ -118,7 +121,7 @@ def get_data_gene_expression(
 
     # save list of genes kept
     save_name = (
-        f'/experiments/results/{config_dict["data"]["name"]}/omics_{config_dict["data"]["data_type"]}'
+        f'{config_dict["data"]["save_path"]}/results/{config_dict["data"]["name"]}/omics_{config_dict["data"]["data_type"]}'
         + "_keptGenes.pkl"
     )
     with open(save_name, "wb") as f:
@@ -130,7 +133,7 @@ def get_data_gene_expression(
     if (config_dict["data"][metafile] != "") and (
         config_dict["data"][metafile] is not None
     ):
-        metadata = pd.read_csv(
+        metadata = data_cache.read_csv(
             config_dict["data"]["metadata_file"], index_col=0
         ).sort_index()
         mask = metadata.index.isin(filtered_data.index)
@@ -140,7 +143,7 @@ def get_data_gene_expression(
 
     else:
         file = "file_path" + ("_holdout_data" if holdout else "")
-        unfiltered_data = pd.read_csv(
+        unfiltered_data = data_cache.read_csv(
             config_dict["data"][file], index_col=0
         ).sort_index()
         target_y = unfiltered_data.loc[
@@ -156,6 +159,7 @@ def get_data_gene_expression(
     return filtered_data, y, feature_names
 
 
+@traced("gene_expression filter")
 def get_data_gene_expression_trained(
     config_dict: dict, holdout: bool = False, prediction: bool = False
 ) -> tuple[pd.DataFrame, ndarray, list[str]]:
@@ -202,7 +206,7 @@ def get_data_gene_expression_trained(
         if (config_dict["data"][metafile] != "") and (
             config_dict["data"][metafile] is not None
         ):
-            metadata = pd.read_csv(
+            metadata = data_cache.read_csv(
                 config_dict["data"][metafile], index_col=0
             ).sort_index()
             mask = metadata.index.isin(filtered_data.index)
@@ -212,7 +216,7 @@ def get_data_gene_expression_trained(
 
         else:
             file = "file_path" + ("_holdout_data" if holdout else "")
-            unfiltered_data = pd.read_csv(
+            unfiltered_data = data_cache.read_csv(
                 config_dict["data"][file], index_col=0
             ).sort_index()
             target_y = unfiltered_data.loc[
@@ -14,14 +14,19 @@
 
 from pathlib import Path
 from sklearn.preprocessing import StandardScaler, OneHotEncoder, LabelEncoder
-from typing import Union
-import calour as ca
+from typing import TYPE_CHECKING, Union
+from utils import data_cache
+from utils.profiling import traced
 import joblib
 import logging
 import numpy as np
 import pandas as pd
 import scipy.sparse
 
+# calour is imported when microbiome data is read, it is only needed for the annotations here
+if TYPE_CHECKING:
+    import calour as ca
+
 omicLogger = logging.getLogger("OmicLogger")
 
 
@@ -30,16 +35,27 @@ def create_microbiome_calourexp(
     fpath_meta: Union[Path, str],
     norm_reads: Union[float, int, None] = 1000,
     min_reads: Union[float, int, None] = 1000,
-) -> ca.AmpliconExperiment:
+) -> "ca.AmpliconExperiment":
     """
     Create the experiment from calour using the given minimum number of reads and the number of reads to normalize to
     """
+    import calour as ca
+
     try:
-        exp = ca.read_amplicon(
-            data_file=fpath_biom,
-            sample_metadata_file=fpath_meta,
-            normalize=norm_reads,
-            min_reads=min_reads,
+        exp = data_cache.cached(
+            (
+                "read_amplicon",
+                data_cache.file_key(fpath_biom, fpath_meta),
+                norm_reads,
+                min_reads,
+            ),
+            lambda: ca.read_amplicon(
+                data_file=fpath_biom,
+                sample_metadata_file=fpath_meta,
+                normalize=norm_reads,
+                min_reads=min_reads,
+            ),
+            lambda e: e.copy(),
         )
     except Exception as e:
         omicLogger.error("error with reading amplicon")
@@ -50,11 +66,11 @@ def create_microbiome_calourexp(
 
 def filter_biom(
     config_dict: dict,
-    amp_exp: ca.AmpliconExperiment,
+    amp_exp: "ca.AmpliconExperiment",
     abundance: Union[float, int] = 10,
     prevalence: Union[float, int] = 0.01,
     collapse_tax=None,
-) -> ca.AmpliconExperiment:
+) -> "ca.AmpliconExperiment":
     """
     Filter the biom data using the given abudance and prevalance
 
@@ -69,7 +85,7 @@ def filter_biom(
 
     # save list of ml features kept
     featureToKeep = list(amp_exp.feature_metadata["_feature_id"])
-    save_name = f'/experiments/results/{config_dict["data"]["name"]}/omics_{config_dict["data"]["data_type"]}_keptFeatures.pkl'
+    save_name = f'{config_dict["data"]["save_path"]}/results/{config_dict["data"]["name"]}/omics_{config_dict["data"]["data_type"]}_keptFeatures.pkl'
     with open(save_name, "wb") as f:
         joblib.dump(featureToKeep, f)
 
@@ -97,8 +113,8 @@ def filter_biom(
 
 
 def filter_samples(
-    amp_exp: ca.AmpliconExperiment, filter_obj: dict
-) -> ca.AmpliconExperiment:
+    amp_exp: "ca.AmpliconExperiment", filter_obj: dict
+) -> "ca.AmpliconExperiment":
     """
     Filter the metadata samples using a {col_name: [remove_vals]} construct
 
@@ -113,11 +129,11 @@ def filter_samples(
 
 
 def filter_multiple(
-    amp_exp: ca.AmpliconExperiment,
+    amp_exp: "ca.AmpliconExperiment",
     filter_list: list[dict],
     axis: int = 0,
     negate: bool = True,
-) -> ca.AmpliconExperiment:
+) -> "ca.AmpliconExperiment":
     # Loop over the filter dicts so that we can filter by multiple sets of conditions
     for filter_dict in filter_list:
         # We take our dataframe, and select only the columns we are looking at
@@ -136,15 +152,15 @@ def filter_multiple(
 
 
 def filter_metadata(
-    amp_exp: ca.AmpliconExperiment, col_name: str, to_filter
-) -> ca.AmpliconExperiment:
+    amp_exp: "ca.AmpliconExperiment", col_name: str, to_filter
+) -> "ca.AmpliconExperiment":
     return amp_exp.filter_by_metadata(
         field=col_name, select=to_filter, axis=0, negate=True
     )
 
 
 def modify_classes(
-    amp_exp: ca.AmpliconExperiment, class_col_name, remove_class=None, merge_by=None
+    amp_exp: "ca.AmpliconExperiment", class_col_name, remove_class=None, merge_by=None
 ):
     """
     Helper function to merge and/or remove classes
@@ -161,7 +177,7 @@ def modify_classes(
     return amp_exp
 
 
-def merge_classes(amp_exp: ca.AmpliconExperiment, class_col_name, merge_by):
+def merge_classes(amp_exp: "ca.AmpliconExperiment", class_col_name, merge_by):
     # Get the relevant class column
     class_col = amp_exp.sample_metadata[class_col_name]
     # Loop through the merge_class dict and replace
@@ -172,7 +188,7 @@ def merge_classes(amp_exp: ca.AmpliconExperiment, class_col_name, merge_by):
     return amp_exp
 
 
-def prepare_data(amp_exp: ca.AmpliconExperiment):
+def prepare_data(amp_exp: "ca.AmpliconExperiment"):
     """
     Extract data from calour experiment and transform using StandardScaler
     """
@@ -190,7 +206,7 @@ def prepare_data(amp_exp: ca.AmpliconExperiment):
 
 
 def select_class_col(
-    amp_exp: ca.AmpliconExperiment, encoding=None, index=None, name=None
+    amp_exp: "ca.AmpliconExperiment", encoding=None, index=None, name=None
 ):
     """
     Selects the class column from the metadata either by the index or by name
@@ -226,7 +242,7 @@ def select_class_col(
 
 
 def get_feature_names_calourexp(
-    amp_exp: ca.AmpliconExperiment, config_dict: dict
+    amp_exp: "ca.AmpliconExperiment", config_dict: dict
 ) -> list[str]:
     """
     Get (unique) feature names from the feature metadata to use in e.g. SHAP
@@ -265,7 +281,7 @@ def get_feature_names_calourexp(
     return feature_names
 
 
-def get_feature_names_alternative(amp_exp: ca.AmpliconExperiment) -> list[str]:
+def get_feature_names_alternative(amp_exp: "ca.AmpliconExperiment") -> list[str]:
     inputFeatureData = amp_exp.feature_metadata
     """ Get simple names for taxonomy """
     taxons = inputFeatureData["taxonomy"]
@@ -279,7 +295,7 @@ def get_feature_names_alternative(amp_exp: ca.AmpliconExperiment) -> list[str]:
     return names
 
 
-def get_feature_names_for_abundance(amp_exp: ca.AmpliconExperiment) -> list[str]:
+def get_feature_names_for_abundance(amp_exp: "ca.AmpliconExperiment") -> list[str]:
     inputFeatureData = amp_exp.feature_metadata
     """ Get simple names for taxonomy """
     taxons = inputFeatureData["taxonomy"]
@@ -291,6 +307,7 @@ def get_feature_names_for_abundance(amp_exp: ca.AmpliconExperiment) -> list[str]
     return names
 
 
+@traced("microbiome filter")
 def get_data_microbiome(
     path_file: Union[str, Path], metadata_path: Union[str, Path], config_dict: dict
 ) -> tuple[pd.DataFrame, np.ndarray, list[str]]:
@@ -301,8 +318,8 @@ def get_data_microbiome(
 
     omicLogger.debug("Loading Microbiome data...")
     # Use calour to create an experiment
-    omicLogger.info("Path file: " + path_file)
-    omicLogger.info("Metadata file: " + metadata_path)
+    omicLogger.info(f"Path file: {path_file}")
+    omicLogger.info(f"Metadata file: {metadata_path}")
     if (microbiome_config["norm_reads"] is None) and (
         microbiome_config["min_reads"] is None
     ):
@@ -361,7 +378,7 @@ def get_data_microbiome(
     omicLogger.info(x.shape)
 
     # save normaliser
-    save_name = f'/experiments/results/{config_dict["data"]["name"]}/omics_{config_dict["data"]["data_type"]}_scaler.pkl'
+    save_name = f'{config_dict["data"]["save_path"]}/results/{config_dict["data"]["name"]}/omics_{config_dict["data"]["data_type"]}_scaler.pkl'
     with open(save_name, "wb") as f:
         joblib.dump(SS, f)
 
@@ -393,7 +410,7 @@ def apply_biom_filtering(config_dict, amp_exp, collapse_tax=None):
     omicLogger.info(f"Original data size: {amp_exp.data.shape}")
 
     # save list of genes kept
-    save_name = f'/experiments/results/{config_dict["data"]["name"]}/omics_{config_dict["data"]["data_type"]}_keptFeatures.pkl'
+    save_name = f'{config_dict["data"]["save_path"]}/results/{config_dict["data"]["name"]}/omics_{config_dict["data"]["data_type"]}_keptFeatures.pkl'
     with open(save_name, "rb") as f:
         featureToKeep = joblib.load(f)
 
@@ -429,6 +446,7 @@ def apply_biom_filtering(config_dict, amp_exp, collapse_tax=None):
     return amp_exp
 
 
+@traced("microbiome filter")
 def get_data_microbiome_trained(
     config_dict: dict, holdout: bool = False, prediction: bool = False
 ):
@@ -450,8 +468,8 @@ def get_data_microbiome_trained(
 
     omicLogger.debug("Loading Microbiome data...")
     # Use calour to create an experiment
-    omicLogger.info("Path file: " + path_file)
-    omicLogger.info("Metadata file: " + metadata_path)
+    omicLogger.info(f"Path file: {path_file}")
+    omicLogger.info(f"Metadata file: {metadata_path}")
     if (microbiome_config["norm_reads"] is None) and (
         microbiome_config["min_reads"] is None
     ):
@@ -486,7 +504,7 @@ def get_data_microbiome_trained(
     )
 
     # load scaler
-    save_name = f'/experiments/results/{config_dict["data"]["name"]}/omics_{config_dict["data"]["data_type"]}_scaler.pkl'
+    save_name = f'{config_dict["data"]["save_path"]}/results/{config_dict["data"]["name"]}/omics_{config_dict["data"]["data_type"]}_scaler.pkl'
     with open(save_name, "rb") as f:
         SS = joblib.load(f)
 
@@ -17,8 +17,11 @@ from omics import R_replacement as rrep
 import joblib
 import pandas as pd
 from pathlib import Path
+from utils import data_cache
+from utils.profiling import traced
 
 
+@traced("tabular filter")
 def get_data_tabular(
     config_dict: dict, holdout: bool = False
 ) -> tuple[pd.DataFrame, ndarray, list[str]]:
@@ -73,7 +76,7 @@ def get_data_tabular(
 
     # save list of genes kept
     save_name = (
-        f'/experiments/results/{config_dict["data"]["name"]}/omics_{config_dict["data"]["data_type"]}'
+        f'{config_dict["data"]["save_path"]}/results/{config_dict["data"]["name"]}/omics_{config_dict["data"]["data_type"]}'
         + "_keptGenes.pkl"
     )
     with open(save_name, "wb") as f:
@@ -86,7 +89,9 @@ def get_data_tabular(
     if (config_dict["data"][metafile] != "") and (
         config_dict["data"][metafile] is not None
     ):
-        metadata = pd.read_csv(config_dict["data"][metafile], index_col=0).sort_index()
+        metadata = data_cache.read_csv(
+            config_dict["data"][metafile], index_col=0
+        ).sort_index()
         mask = metadata.index.isin(filtered_data.index)
         filtered_metadata = metadata.loc[mask]
         filtered_metadata.to_csv(metout_file)
@@ -94,7 +99,7 @@ def get_data_tabular(
 
     else:
         file = "file_path" + ("_holdout_data" if holdout else "")
-        unfiltered_data = pd.read_csv(
+        unfiltered_data = data_cache.read_csv(
             config_dict["data"][file], index_col=0
         ).sort_index()
         target_y = unfiltered_data.loc[
@@ -110,6 +115,7 @@ def get_data_tabular(
     return filtered_data, y, feature_names
 
 
+@traced("tabular filter")
 def get_data_tabular_trained(
     config_dict: dict, holdout: bool = False, prediction: bool = False
 ) -> tuple[pd.DataFrame, ndarray, list[str]]:
@@ -152,7 +158,7 @@ def get_data_tabular_trained(
         if (config_dict["data"][metafile] != "") and (
             config_dict["data"][metafile] is not None
         ):
-            metadata = pd.read_csv(
+            metadata = data_cache.read_csv(
                 config_dict["data"][metafile], index_col=0
             ).sort_index()
             mask = metadata.index.isin(filtered_data.index)
@@ -162,7 +168,7 @@ def get_data_tabular_trained(
 
         else:
             file = "file_path" + ("_holdout_data" if holdout else "")
-            unfiltered_data = pd.read_csv(
+            unfiltered_data = data_cache.read_csv(
                 config_dict["data"][file], index_col=0
             ).sort_index()
             target_y = unfiltered_data.loc[
@@ -0,0 +1,75 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Clusters of correlated features, to permute together. The correlations are computed a block of columns at a time, so
+the full features x features matrix is never held, and the features correlated above a threshold are linked into
+clusters (single linkage: a feature joins a cluster if it is correlated to any of its features).
+"""
+
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+import logging
+import numpy as np
+
+omicLogger = logging.getLogger("OmicLogger")
+
+# values of the block of correlations computed at once (32MB of float64)
+MAX_BLOCK_VALUES = 2**22
+
+
+def correlated_pairs(
+    data: np.ndarray, threshold: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    The pairs (i, j), i < j, of the columns of `data` whose absolute Pearson correlation is at least `threshold`.
+    Constant columns are correlated to none.
+    """
+    data = np.asarray(data, dtype=float)
+    n_samples, n_features = data.shape
+    std = data.std(axis=0)
+    # standardised, so the correlations are the dot products of the columns
+    z = np.divide(
+        data - data.mean(axis=0),
+        std * np.sqrt(n_samples),
+        out=np.zeros_like(data),
+        where=std > 0,
+    )
+    block = max(1, MAX_BLOCK_VALUES // n_features)
+
+    rows, cols = [], []
+    for start in range(0, n_features, block):
+        stop = min(start + block, n_features)
+        # the upper triangle only, from the diagonal of the block on
+        corr = z[:, start:stop].T @ z[:, start:]
+        i, j = np.nonzero(np.abs(corr) >= threshold)
+        j += start
+        i += start
+        rows.append(i[i < j])
+        cols.append(j[i < j])
+    return np.concatenate(rows), np.concatenate(cols)
+
+
+def correlated_clusters(data: np.ndarray, threshold: float) -> list[np.ndarray]:
+    """
+    The clusters of the columns of `data` linked by an absolute Pearson correlation of at least `threshold`, as
+    arrays of column indices, ordered by their first column. Uncorrelated features are a cluster of their own.
+    """
+    n_features = np.shape(data)[1]
+    rows, cols = correlated_pairs(data, threshold)
+    graph = coo_matrix(
+        (np.ones(len(rows), dtype=bool), (rows, cols)), shape=(n_features, n_features)
+    )
+    _, labels = connected_components(graph, directed=False)
+
+    # the features sorted by cluster, the clusters numbered in the order of their first feature
+    order = np.argsort(labels, kind="stable")
+    clusters = np.split(order, np.flatnonzero(np.diff(labels[order])) + 1)
+    clusters.sort(key=lambda c: c[0])
+    omicLogger.info(
+        f"{n_features} features in {len(clusters)} clusters correlated above {threshold}, the largest of "
+        f"{max(len(c) for c in clusters)}"
+    )
+    return clusters
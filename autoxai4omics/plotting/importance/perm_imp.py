@@ -14,21 +14,40 @@
 
 
 from models.custom_model import CustomModel
-from tensorflow.keras import backend as K
+from plotting.importance.correlation import correlated_clusters
+from plotting.importance.permutation import (
+    adaptive_permutation_importance,
+    permutation_importance,
+    ranking_uncertainty,
+    top_ranked,
+)
+from plotting.render import plot
+from utils.checkpoint import fingerprint
+from utils.lazy import clear_keras_session
 from utils.load import load_model
-from utils.save import save_fig
+from utils.profiling import span
 from utils.utils import get_model_path, pretty_names
 from utils.vars import CLASSIFICATION
-import eli5
 import logging
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import seaborn as sns
-import time
 
 omicLogger = logging.getLogger("OmicLogger")
 
+# the clusters of correlated features of each dataset & threshold, shared by the plots of the models
+_CLUSTERS = {}
+
+
+def feature_clusters(data, threshold: float) -> list[np.ndarray]:
+    """The clusters of the features of `data` correlated above `threshold`, computed once per dataset"""
+    key = fingerprint(np.asarray(data), threshold)
+    if key not in _CLUSTERS:
+        with span("permutation importance clusters", cat="plot", data=data):
+            _CLUSTERS[key] = correlated_clusters(data, threshold)
+    return _CLUSTERS[key]
+
 
 def permut_importance(
     experiment_folder,
@@ -41,26 +60,43 @@ def permut_importance(
     data,
     labels,
     num_features,
-    cv=None,
+    n_repeats=5,
+    adaptive=False,
+    initial_repeats=3,
+    max_predictions=None,
+    correlation_threshold=None,
+    processes=None,
     save=True,
     holdout=False,
 ):
     """
-    Use ELI5's permutation importance to assess the importance of the features.
-
-    Note that in scikit-learn 0.21 there should be a version of this in the new model inspection module.
-    This may be useful to use/watch for the future.
+    Use permutation importance to assess the importance of the features for the fitted models, the decrease of their
+    score when a feature is shuffled, over `n_repeats` shuffles. If `adaptive`, every feature is shuffled
+    `initial_repeats` times and only those whose rank among the top `num_features` is uncertain are shuffled more, up
+    to `n_repeats` times and `max_predictions` predictions of shuffled data per model. Given a `correlation_threshold`,
+    the clusters of features correlated above it are shuffled together and ranked as one.
     """
     omicLogger.debug("Creating permut_importance...")
     omicLogger.info(feature_names)
     omicLogger.info(type(feature_names))
 
+    names = np.asarray(feature_names)
+    if correlation_threshold is None:
+        groups, members = None, None
+    else:
+        groups = feature_clusters(data, correlation_threshold)
+        members = ["; ".join(names[g]) for g in groups]
+        names = np.array(
+            [
+                names[g[0]] if len(g) == 1 else f"{names[g[0]]} (+{len(g) - 1})"
+                for g in groups
+            ]
+        )
+
     # Loop over the defined models
     for model_name in model_list:
         if model_name == "mlp_ens":
             continue
-        # Define the figure object
-        fig, ax = plt.subplots()
         # Load the model
         model_path = get_model_path(experiment_folder, model_name)
         omicLogger.info(f"Plotting permutation importance for {model_name}")
@@ -81,28 +117,43 @@ def permut_importance(
             if model.labels_test is not None:
                 model.labels_test = None
 
-        importances = eli5.sklearn.PermutationImportance(
-            model,
-            scoring=scorer_func,
-            random_state=seed_num,
-            cv=cv,
-        ).fit(data, labels)
-
-        a = np.asarray(importances.results_)
-
-        # Get the top x indices of the features
-        top_indices = np.argsort(np.median(a, axis=0))[::-1][:num_features]
-
-        # Get the names of these features
-        if isinstance(feature_names, list):
-            top_features = np.array(feature_names)[top_indices]
-        else:
-            top_features = feature_names.values[top_indices]
-
-        # Get the top values
-        top_values = a[:, top_indices]
-        # Split the array up for the boxplot func
-        top_values = [top_values[:, i] for i in range(top_values.shape[1])]
+        with span(f"{model_name} permutation importance", cat="plot", data=data):
+            if adaptive:
+                importances = adaptive_permutation_importance(
+                    model,
+                    data,
+                    labels,
+                    scorer_func,
+                    top_n=num_features,
+                    max_repeats=n_repeats,
+                    initial_repeats=initial_repeats,
+                    max_predictions=max_predictions,
+                    seed=seed_num,
+                    n_jobs=processes,
+                    groups=groups,
+                )
+            else:
+                importances = list(
+                    permutation_importance(
+                        model,
+                        data,
+                        labels,
+                        scorer_func,
+                        n_repeats=n_repeats,
+                        seed=seed_num,
+                        n_jobs=processes,
+                        groups=groups,
+                    ).T
+                )
+
+        # Get the top x indices of the features, by the mean importance their uncertainty is reported for
+        top_indices = top_ranked(importances, num_features)
+
+        # Get the names of these features, or clusters named by their first feature
+        top_features = names[top_indices]
+
+        # Get the top values, a number of repeats per feature
+        top_values = [importances[i] for i in top_indices]
 
         top_feature_info = {
             "Features_names": top_features,
@@ -112,42 +163,41 @@ def permut_importance(
         df_topfeature_info = pd.DataFrame(
             top_feature_info, columns=["Features_names", "Features_importance_value"]
         )
+        # with the uncertainty of their ranking
+        df_topfeature_info = df_topfeature_info.join(
+            ranking_uncertainty(importances).iloc[top_indices].reset_index(drop=True)
+        )
+        if members is not None:
+            df_topfeature_info["Cluster_members"] = [members[i] for i in top_indices]
 
-        if cv == "prefit":
-            df_topfeature_info.to_csv(
-                f"{experiment_folder / 'results' / 'permutimp_TopFeatures_info'}_{model_name}"
-                + ".csv"
-            )
-        else:
-            df_topfeature_info.to_csv(
-                f"{experiment_folder / 'results' / 'permutimp_TopFeatures_info'}_{model_name}_cv-{cv}"
-                + ".csv"
-            )
-
-        # Make a horizontal boxplot ordered by the magnitude
-
-        ax = sns.boxplot(
-            pd.DataFrame(top_values, index=top_features).T, orient="h", ax=ax
+        df_topfeature_info.to_csv(
+            f"{experiment_folder / 'results' / 'permutimp_TopFeatures_info'}_{model_name}"
+            + ".csv"
         )
-        if problem_type == CLASSIFICATION:
-            ax.set_xlabel(f"{pretty_names(fit_scorer, 'score')} Decrease")
-        else:
-            ax.set_xlabel(f"{pretty_names(fit_scorer, 'score')} Increase")
-            ax.set_ylabel("Features")
 
         # Save the plot
         if save:
             fname = f"{experiment_folder / 'graphs' / 'permutimp'}_{model_name}"
             fname += "_holdout" if holdout else ""
-
-            save_fig(fig, fname)
-
-        plt.draw()
-        plt.tight_layout()
-        plt.pause(0.001)
-        time.sleep(2)
-        # Close the figure to ensure we start anew
-        plt.clf()
-        plt.close()
+            plot(
+                "plotting.importance.perm_imp:draw_permutation_importance",
+                fname,
+                top_features=top_features,
+                top_values=top_values,
+                fit_scorer=fit_scorer,
+                problem_type=problem_type,
+            )
         # Clear keras and TF sessions/graphs etc.
-        K.clear_session()
+        clear_keras_session()
+
+
+def draw_permutation_importance(top_features, top_values, fit_scorer, problem_type):
+    fig, ax = plt.subplots()
+    # Make a horizontal boxplot ordered by the magnitude
+    sns.boxplot(pd.DataFrame(top_values, index=top_features).T, orient="h", ax=ax)
+    if problem_type == CLASSIFICATION:
+        ax.set_xlabel(f"{pretty_names(fit_scorer, 'score')} Decrease")
+    else:
+        ax.set_xlabel(f"{pretty_names(fit_scorer, 'score')} Increase")
+        ax.set_ylabel("Features")
+    return fig
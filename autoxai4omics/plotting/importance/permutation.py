@@ -0,0 +1,320 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Permutation importance: how much the score of a fitted model drops when the values of a feature are shuffled, measured
+`n_repeats` times. Several permuted copies of the data are stacked to be predicted in a single call, which is where
+most of the time goes for KNN, SVC or Keras models, and the features are shared out between processes. Groups of
+features (e.g. clusters of correlated features) can be permuted together, the same shuffle for all the features of a
+group, instead of one feature at a time.
+"""
+
+from joblib import Parallel, delayed
+from models.custom_model import CustomModel
+from sklearn import config_context
+from utils.scheduler import available_cores
+import logging
+import numpy as np
+import pandas as pd
+
+omicLogger = logging.getLogger("OmicLogger")
+
+# values of the permuted copies predicted at once (64MB of float64)
+MAX_BATCH_VALUES = 2**23
+# a worker takes a while to start & receive the model, not worth it for fewer permuted copies
+COPIES_PER_WORKER = 160
+# the confidence intervals of the importances are the mean +- this many standard errors (95%)
+CONFIDENCE_Z = 1.96
+# the methods a scorer gets its predictions from
+RESPONSE_METHODS = ["predict", "predict_proba", "decision_function"]
+
+
+def permutation(seed: int, repeat: int, feature: int, n_samples: int) -> np.ndarray:
+    """
+    The order the samples are shuffled into for a feature on a repeat, the same whichever process or batch computes
+    it
+    """
+    return np.random.default_rng([seed, repeat, feature]).permutation(n_samples)
+
+
+class _Stack(object):
+    """Permuted copies of the data stacked one under the other, predicted once by the method a scorer asks for"""
+
+    def __init__(self, model, data: np.ndarray, columns):
+        self.model = model
+        self.data = data
+        self.columns = columns
+        self.rows = data.shape[0]
+        self.stacked = None
+        self.responses = {}
+
+    def fill(self, copies: list[tuple[np.ndarray, np.ndarray]]) -> None:
+        """Set the copies to the data with the features of each (features, permutation) shuffled"""
+        if self.stacked is None or self.stacked.shape[0] < len(copies) * self.rows:
+            self.stacked = np.tile(self.data, (len(copies), 1))
+        for i, (features, order) in enumerate(copies):
+            self.stacked[i * self.rows : (i + 1) * self.rows][:, features] = self.data[
+                np.ix_(order, features)
+            ]
+        self.copies = copies
+        self.responses = {}
+
+    def restore(self) -> None:
+        for i, (features, _) in enumerate(self.copies):
+            self.stacked[i * self.rows : (i + 1) * self.rows][:, features] = self.data[
+                :, features
+            ]
+
+    def response(self, method: str, copy: int) -> np.ndarray:
+        if method not in self.responses:
+            stacked = self.stacked[: len(self.copies) * self.rows]
+            if self.columns is not None:
+                stacked = pd.DataFrame(stacked, columns=self.columns)
+            self.responses[method] = np.asarray(getattr(self.model, method)(stacked))
+        return self.responses[method][copy * self.rows : (copy + 1) * self.rows]
+
+
+class _Copy(object):
+    """
+    The model as seen by a scorer on one of the copies of a stack: its predictions are those of the stack for that
+    copy, anything else (classes, tags, ...) is the model's
+    """
+
+    def __init__(self, stack: _Stack, copy: int):
+        self._stack = stack
+        self._copy = copy
+
+    def __getattr__(self, name):
+        attribute = getattr(self._stack.model, name)
+        if name not in RESPONSE_METHODS:
+            return attribute
+
+        def response(X):
+            return self._stack.response(name, self._copy)
+
+        # named as the method, which sklearn checks
+        response.__name__ = name
+        return response
+
+
+def _permuted_scores(
+    model,
+    data: np.ndarray,
+    columns,
+    labels,
+    scorer,
+    groups: list[np.ndarray],
+    copies: list[tuple[int, int]],
+    seed: int,
+) -> np.ndarray:
+    """The scores of the model on each of the `copies`, the data with the features of a (group, repeat) permuted"""
+    batch_size = int(np.clip(MAX_BATCH_VALUES // max(data.size, 1), 1, len(copies)))
+    stack = _Stack(model, data, columns)
+    scores = np.empty(len(copies))
+
+    for start in range(0, len(copies), batch_size):
+        batch = copies[start : start + batch_size]
+        stack.fill(
+            [(groups[g], permutation(seed, r, g, data.shape[0])) for g, r in batch]
+        )
+        # the inputs were checked when scoring the data as it is
+        with config_context(skip_parameter_validation=True, assume_finite=True):
+            for i in range(len(batch)):
+                scores[start + i] = scorer(_Copy(stack, i), data, labels)
+        stack.restore()
+    return scores
+
+
+class _Permuter(object):
+    """
+    Scores a fitted model on copies of the data with a feature, or a group of features (column indices), permuted,
+    split between `n_jobs` processes (by default one per available core) unless the model is a `CustomModel`, whose
+    Tensorflow graphs stay in this process
+    """
+
+    def __init__(
+        self,
+        model,
+        data,
+        labels,
+        scorer,
+        seed: int = 0,
+        n_jobs: int = None,
+        groups: list[np.ndarray] = None,
+    ):
+        # the score of the data as it is, shared by all the features
+        self.baseline = scorer(model, data, labels)
+        self.model = model
+        self.columns = data.columns if isinstance(data, pd.DataFrame) else None
+        self.data = np.asarray(data)
+        if groups is None:
+            groups = [[f] for f in range(self.data.shape[1])]
+        self.groups = [np.asarray(g) for g in groups]
+        self.labels = labels
+        self.scorer = scorer
+        self.seed = seed
+        self.n_jobs = (
+            1 if isinstance(model, CustomModel) else n_jobs or available_cores()
+        )
+        # the permuted copies of the data predicted so far
+        self.predictions = 0
+
+    def decreases(self, copies: list[tuple[int, int]]) -> np.ndarray:
+        """The decrease of the score on each of the `copies`, (group, repeat) pairs"""
+        workers = min(self.n_jobs, len(copies) // COPIES_PER_WORKER)
+        args = (
+            self.model,
+            self.data,
+            self.columns,
+            self.labels,
+            self.scorer,
+            self.groups,
+        )
+        if workers <= 1:
+            scores = _permuted_scores(*args, copies, self.seed)
+        else:
+            chunks = np.array_split(np.arange(len(copies)), workers)
+            scores = np.hstack(
+                Parallel(n_jobs=workers)(
+                    delayed(_permuted_scores)(
+                        *args, [copies[i] for i in chunk], self.seed
+                    )
+                    for chunk in chunks
+                )
+            )
+        self.predictions += len(copies)
+        return self.baseline - scores
+
+
+def permutation_importance(
+    model,
+    data,
+    labels,
+    scorer,
+    n_repeats: int = 5,
+    seed: int = 0,
+    n_jobs: int = None,
+    groups: list[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    The decrease of the score of the fitted `model` on `data` when each feature is permuted, as an array of
+    `n_repeats` x features. `scorer` is called as `scorer(model, data, labels)`, greater being better as for the
+    scorers of `metrics.metric_defs`. Given `groups` of features (their column indices), the features of a group are
+    permuted together, giving a decrease per group.
+    """
+    permuter = _Permuter(model, data, labels, scorer, seed, n_jobs, groups)
+    n_features = len(permuter.groups)
+    omicLogger.info(f"Permuting {n_features} features {n_repeats} times...")
+
+    copies = [(f, r) for r in range(n_repeats) for f in range(n_features)]
+    return permuter.decreases(copies).reshape(n_repeats, n_features)
+
+
+def confidence_intervals(
+    importances: list[np.ndarray],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """The mean importance of each feature with the bounds of its confidence interval, unbounded if permuted once"""
+    means = np.array([np.mean(i) for i in importances])
+    errors = np.array(
+        [
+            np.std(i, ddof=1) / np.sqrt(len(i)) if len(i) > 1 else np.inf
+            for i in importances
+        ]
+    )
+    return means, means - CONFIDENCE_Z * errors, means + CONFIDENCE_Z * errors
+
+
+def top_ranked(importances: list[np.ndarray], top_n: int) -> np.ndarray:
+    """
+    The indices of the `top_n` features of greatest mean importance, the statistic the confidence intervals, ranks &
+    adaptive repeats are about
+    """
+    means = np.array([np.mean(i) for i in importances])
+    return np.argsort(-means, kind="stable")[:top_n]
+
+
+def adaptive_permutation_importance(
+    model,
+    data,
+    labels,
+    scorer,
+    top_n: int,
+    max_repeats: int = 30,
+    initial_repeats: int = 3,
+    max_predictions: int = None,
+    seed: int = 0,
+    n_jobs: int = None,
+    groups: list[np.ndarray] = None,
+) -> list[np.ndarray]:
+    """
+    Permutation importance spending its repeats on the features whose rank matters. Every feature is permuted
+    `initial_repeats` times, then those whose confidence interval straddles the cutoff between the `top_n` features &
+    the rest are permuted `initial_repeats` more times, closest to the cutoff first, until they are clear of it, reach
+    `max_repeats` or `max_predictions` permuted copies of the data have been predicted. Returns the decreases of the
+    score of each feature (or group of features), as many as it was permuted.
+    """
+    permuter = _Permuter(model, data, labels, scorer, seed, n_jobs, groups)
+    n_features = len(permuter.groups)
+    importances = [[] for _ in range(n_features)]
+    copies = [(f, r) for r in range(initial_repeats) for f in range(n_features)]
+    if max_predictions is not None and max_predictions < len(copies):
+        omicLogger.warning(
+            f"A budget of {max_predictions} predictions is less than the {len(copies)} of permuting each feature "
+            f"{initial_repeats} times, spending those only"
+        )
+
+    while copies:
+        omicLogger.info(
+            f"Permuting {len({f for f, _ in copies})} features {len(copies)} times in total..."
+        )
+        for (f, _), decrease in zip(copies, permuter.decreases(copies)):
+            importances[f].append(decrease)
+        if top_n >= n_features:
+            break
+
+        means, low, high = confidence_intervals(importances)
+        # midway between the last of the top features & the first of the rest
+        ranked = means[top_ranked(importances, top_n + 1)]
+        cutoff = (ranked[top_n - 1] + ranked[top_n]) / 2
+        repeated = np.array([len(i) for i in importances])
+        uncertain = np.flatnonzero(
+            (low <= cutoff) & (cutoff <= high) & (low < high) & (repeated < max_repeats)
+        )
+        # the most uncertain first, their distance to the cutoff in widths of their interval
+        uncertain = uncertain[
+            np.argsort(np.abs(means - cutoff)[uncertain] / (high - low)[uncertain])
+        ]
+        copies = [
+            (f, r)
+            for f in uncertain
+            for r in range(repeated[f], min(repeated[f] + initial_repeats, max_repeats))
+        ]
+        if max_predictions is not None:
+            copies = copies[: max(max_predictions - permuter.predictions, 0)]
+
+    omicLogger.info(
+        f"Predicted {permuter.predictions} permuted copies of the data, instead of {n_features * max_repeats}"
+    )
+    return [np.array(i) for i in importances]
+
+
+def ranking_uncertainty(importances: list[np.ndarray]) -> pd.DataFrame:
+    """
+    The mean importance of each feature with its confidence interval, number of repeats and the range of ranks it
+    could take: from 1 + the features certainly above it to the features possibly above it, itself included
+    """
+    means, low, high = confidence_intervals(importances)
+    sorted_low, sorted_high = np.sort(low), np.sort(high)
+    n_features = len(importances)
+    return pd.DataFrame(
+        {
+            "Importance_mean": means,
+            "Importance_CI_low": low,
+            "Importance_CI_high": high,
+            "N_repeats": [len(i) for i in importances],
+            "Rank_best": 1 + n_features - np.searchsorted(sorted_low, high, "right"),
+            "Rank_worst": n_features - np.searchsorted(sorted_high, low, "left"),
+        }
+    )
@@ -0,0 +1,111 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+The manifest of the plots of an experiment, so plotting again only computes the plots whose inputs changed. Each plot
+(of a model, or of all the models for the plots comparing them) is recorded with the figures it drew and a key made of
+the hashes of the saved models, of the data, of the plotting settings and of the code of the plot.
+"""
+
+from pathlib import Path
+from utils.checkpoint import atomic_write_json, file_fingerprint, fingerprint
+import inspect
+import json
+import logging
+
+omicLogger = logging.getLogger("OmicLogger")
+
+MANIFEST_FILE = "plot_manifest.json"
+# the plots comparing all the models in a single figure, the others are computed model by model
+MULTI_MODEL_PLOTS = ["barplot_scorer", "boxplot_scorer", "boxplot_scorer_cv_groupby"]
+# the settings that do not change what the plots show
+IGNORED_SETTINGS = {
+    "plotting": ["plot_method", "render_processes"],
+    "ml": ["model_list"],
+}
+
+
+def model_fingerprint(experiment_folder: Path, model_name: str) -> str:
+    """Hash of the files a model was saved to in `models/` (`<model_name>_best.pkl`, its `.h5`, folders, ...)"""
+    paths = []
+    for path in sorted((Path(experiment_folder) / "models").glob(f"{model_name}_*")):
+        if path.is_dir():
+            paths += sorted(p for p in path.rglob("*") if p.is_file())
+        else:
+            paths.append(path)
+    return file_fingerprint(*paths)
+
+
+def code_fingerprint(plot_func) -> str:
+    """Hash of the source of the module of a plot, which holds both the computation & the drawing of its figures"""
+    plot_func = inspect.unwrap(plot_func)
+    return file_fingerprint(inspect.getsourcefile(plot_func))
+
+
+def plot_settings(config_dict: dict, holdout: bool) -> dict:
+    """The settings of the config the plots depend on"""
+    settings = {"holdout": holdout}
+    for section in ["data", "ml", "plotting"]:
+        settings[section] = {
+            k: v
+            for k, v in (config_dict.get(section) or {}).items()
+            if k not in IGNORED_SETTINGS.get(section, [])
+        }
+    return settings
+
+
+class PlotManifest(object):
+    """
+    The plots computed in `experiment_folder`, saved to `graphs/plot_manifest.json`. A plot is up to date when its key
+    is the one recorded and the figures it drew are all there. With `force`, none is.
+    """
+
+    def __init__(self, experiment_folder: Path, force: bool = False):
+        self.experiment_folder = Path(experiment_folder)
+        self.path = self.experiment_folder / "graphs" / MANIFEST_FILE
+        self.force = force
+        self._models = {}
+        self.entries = {}
+        if self.path.exists():
+            try:
+                with open(self.path) as f:
+                    self.entries = json.load(f)
+            except ValueError:
+                omicLogger.warning(f"Ignoring unreadable plot manifest {self.path}")
+
+    def model_fingerprint(self, model_name: str) -> str:
+        if model_name not in self._models:
+            self._models[model_name] = model_fingerprint(
+                self.experiment_folder, model_name
+            )
+        return self._models[model_name]
+
+    def key(
+        self, plot_func, model_list: list[str], data_key: str, settings: dict
+    ) -> str:
+        """The key of a plot of the models of `model_list`"""
+        return fingerprint(
+            [(m, self.model_fingerprint(m)) for m in model_list],
+            data_key,
+            settings,
+            code_fingerprint(plot_func),
+        )
+
+    def up_to_date(self, entry: str, key: str) -> bool:
+        if self.force or entry not in self.entries:
+            return False
+        recorded = self.entries[entry]
+        if recorded["key"] != key:
+            omicLogger.info(f"{entry} inputs changed, plotting it again")
+            return False
+        missing = [f for f in recorded["figures"] if not Path(f).exists()]
+        if missing:
+            omicLogger.info(f"{entry} figures {missing} are missing, plotting it again")
+            return False
+        return True
+
+    def record(self, entry: str, key: str, figures: list[str]) -> None:
+        self.entries[entry] = {"key": key, "figures": figures}
+        atomic_write_json(self.path, self.entries)
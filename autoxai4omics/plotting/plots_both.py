@@ -14,11 +14,11 @@
 
 
 from models.custom_model import CustomModel
+from plotting.render import plot
 from sklearn.model_selection import GroupShuffleSplit, KFold, StratifiedKFold
 from sklearn.preprocessing import LabelEncoder
-from tensorflow.keras import backend as K
+from utils.lazy import clear_keras_session
 from utils.load import load_model
-from utils.save import save_fig
 from utils.utils import get_model_path, pretty_names
 from utils.vars import CLASSIFICATION, REGRESSION
 import logging
@@ -26,7 +26,6 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import seaborn as sns
-import time
 
 omicLogger = logging.getLogger("OmicLogger")
 
@@ -38,9 +37,24 @@ def plot_model_performance(experiment_folder, data, metric, low, save=True):
     """
     omicLogger.debug(f"Creating model performance scatter according to {metric}...")
 
-    ax = sns.scatterplot(
+    if save:
+        plotname = "model_performance_" + metric
+        fname = f"{experiment_folder / 'graphs' /plotname }"
+        plot(
+            "plotting.plots_both:draw_model_performance",
+            fname,
+            data=data,
+            metric=metric,
+            low=low,
+        )
+
+
+def draw_model_performance(data, metric, low):
+    fig, ax = plt.subplots()
+    sns.scatterplot(
         x=data[metric + "_Train"].tolist(),
         y=data[metric + "_Test"].tolist(),
+        ax=ax,
     )
     ax_min = data.min().min() * 0.75
     ax_max = 1 if not low else data.max().max()
@@ -55,17 +69,7 @@ def plot_model_performance(experiment_folder, data, metric, low, save=True):
         test = row[metric + "_Test"]
         train = row[metric + "_Train"]
         ax.text(train + 0.02, test, str(model))
-
-    fig = plt.gcf()
-    if save:
-        plotname = "model_performance_" + metric
-        fname = f"{experiment_folder / 'graphs' /plotname }"
-        save_fig(fig, fname)
-    # Close the figure to ensure we start anew
-    plt.clf()
-    plt.close()
-    # Clear keras and TF sessions/graphs etc.
-    K.clear_session()
+    return fig
 
 
 def opt_k_plot(experiment_folder, sr_n, save=True):
@@ -74,8 +78,18 @@ def opt_k_plot(experiment_folder, sr_n, save=True):
     """
     omicLogger.debug("Creating opt_k_plot...")
 
-    ax = sns.scatterplot(
-        x=sr_n["r_m"].tolist(), y=sr_n["r_std"].tolist(), hue=np.log10(sr_n.index)
+    if save:
+        fname = f"{experiment_folder / 'graphs' / 'feature_selection_scatter'}"
+        plot("plotting.plots_both:draw_opt_k", fname, sr_n=sr_n)
+
+
+def draw_opt_k(sr_n):
+    fig, ax = plt.subplots()
+    sns.scatterplot(
+        x=sr_n["r_m"].tolist(),
+        y=sr_n["r_std"].tolist(),
+        hue=np.log10(sr_n.index),
+        ax=ax,
     )
     ax.set_title("Performance of various k features")
 
@@ -84,16 +98,7 @@ def opt_k_plot(experiment_folder, sr_n, save=True):
     ax.set(xlabel="Calibrated mean", ylabel="Calibrated std")
     ax.axvline(0, -m, m)
     ax.axhline(0, -m, m)
-
-    fig = plt.gcf()
-    if save:
-        fname = f"{experiment_folder / 'graphs' / 'feature_selection_scatter'}"
-        save_fig(fig, fname)
-    # Close the figure to ensure we start anew
-    plt.clf()
-    plt.close()
-    # Clear keras and TF sessions/graphs etc.
-    K.clear_session()
+    return fig
 
 
 def feat_acc_plot(experiment_folder, acc, save=True):
@@ -103,20 +108,18 @@ def feat_acc_plot(experiment_folder, acc, save=True):
     """
     omicLogger.debug("Creating feat_acc_plot...")
 
-    ax = sns.lineplot(x=list(acc.keys()), y=list(acc.values()), marker="o")
+    if save:
+        fname = f"{experiment_folder / 'graphs' / 'feature_selection_accuracy'}"
+        plot("plotting.plots_both:draw_feat_acc", fname, acc=acc)
+
+
+def draw_feat_acc(acc):
+    fig, ax = plt.subplots()
+    sns.lineplot(x=list(acc.keys()), y=list(acc.values()), marker="o", ax=ax)
     ax.set_title("Feature selection model accuracy")
     ax.set(xlabel="Number of selected features", ylabel="Model error")
     ax.set(xscale="log")
-
-    fig = plt.gcf()
-    if save:
-        fname = f"{experiment_folder / 'graphs' / 'feature_selection_accuracy'}"
-        save_fig(fig, fname)
-    # Close the figure to ensure we start anew
-    plt.clf()
-    plt.close()
-    # Clear keras and TF sessions/graphs etc.
-    K.clear_session()
+    return fig
 
 
 def barplot_scorer(
@@ -133,8 +136,6 @@ def barplot_scorer(
     Create a barplot for all models in the folder using the fit_scorer from the config.
     """
     omicLogger.debug("Creating barplot_scorer...")
-    # Create the plot objects
-    fig, ax = plt.subplots()
     # Container for the scores
     all_scores = []
     # Loop over the models
@@ -149,30 +150,29 @@ def barplot_scorer(
         score = np.abs(scorer_dict[fit_scorer](model, data, true_labels))
         all_scores.append(score)
         # Clear keras and TF sessions/graphs etc.
-        K.clear_session()
+        clear_keras_session()
+    if save:
+        fname = f"{experiment_folder / 'graphs' / 'barplot'}_{fit_scorer}"
+        fname += "_holdout" if holdout else ""
+        plot(
+            "plotting.plots_both:draw_barplot_scorer",
+            fname,
+            model_list=model_list,
+            fit_scorer=fit_scorer,
+            all_scores=all_scores,
+        )
+
+
+def draw_barplot_scorer(model_list, fit_scorer, all_scores):
+    fig, ax = plt.subplots()
     pretty_model_names = [pretty_names(name, "model") for name in model_list]
     # Make the barplot
     sns.barplot(x=pretty_model_names, y=all_scores, ax=ax)
-    # ax.set_xticklabels(pretty_model_names)
-    plt.xticks(rotation=90)
+    ax.tick_params(axis="x", rotation=90)
     ax.set_ylabel(pretty_names(fit_scorer, "score"))
     ax.set_xlabel("Model")
     ax.set_title("Performance on test data")
-    if save:
-        fname = f"{experiment_folder / 'graphs' / 'barplot'}_{fit_scorer}"
-        fname += "_holdout" if holdout else ""
-        save_fig(fig, fname)
-
-    plt.draw()
-    plt.tight_layout()
-    plt.pause(0.001)
-    time.sleep(2)
-    # Close the figure to ensure we start anew
-    plt.clf()
-    plt.close()
-
-    # Clear keras and TF sessions/graphs etc.
-    K.clear_session()
+    return fig
 
 
 def boxplot_scorer_cv_groupby(
@@ -188,8 +188,6 @@ def boxplot_scorer_cv_groupby(
     Create a graph of boxplots for all models in the folder, using the specified fit_scorer from the config.
     """
     omicLogger.debug("Creating boxplot_scorer_cv_groupby...")
-    # Create the plot objects
-    fig, ax = plt.subplots()
     # Container for the scores
     all_scores = []
     omicLogger.info(f"Size of data for boxplot: {data.shape}")
@@ -252,28 +250,20 @@ def boxplot_scorer_cv_groupby(
         fname += "_holdout" if holdout else ""
         df = pd.DataFrame(d)
         df.to_csv(fname + ".csv")
+        # Clear keras and TF sessions/graphs etc.
+        clear_keras_session()
 
-    pretty_model_names = [
-        pretty_names(name, "model") for name in config_dict["ml"]["model_list"]
-    ]
-
-    # Make the boxplot
-    sns.boxplot(pd.DataFrame(all_scores, index=pretty_model_names).T, ax=ax, width=0.4)
-    # Format the graph
-    ax.set_xlabel("ML Methods")
-
-    fig = plt.gcf()
     # Save the graph
     if save:
         fname = f"{experiment_folder / 'graphs' / 'boxplot_GroupShuffleSplit_CV'}_{config_dict['ml']['fit_scorer']}"
         fname += "_holdout" if holdout else ""
-        save_fig(fig, fname)
-
-    # Close the figure to ensure we start anew
-    plt.clf()
-    plt.close()
-    # Clear keras and TF sessions/graphs etc.
-    K.clear_session()
+        plot(
+            "plotting.plots_both:draw_boxplot_scorer",
+            fname,
+            model_list=config_dict["ml"]["model_list"],
+            all_scores=all_scores,
+            rotate_labels=False,
+        )
 
 
 def boxplot_scorer_cv(
@@ -296,8 +286,6 @@ def boxplot_scorer_cv(
     exemplars of each fold
     """
     omicLogger.debug("Creating boxplot_scorer_cv...")
-    # Create the plot objects
-    fig, ax = plt.subplots()
     # Container for the scores
     all_scores = []
     omicLogger.info(f"Size of data for boxplot: {data.shape}")
@@ -358,24 +346,29 @@ def boxplot_scorer_cv(
         fname += "_holdout" if holdout else ""
         df = pd.DataFrame(d)
         df.to_csv(fname + ".csv")
+        # Clear keras and TF sessions/graphs etc.
+        clear_keras_session()
+
+    # Save the graph
+    if save:
+        fname = f"{experiment_folder / 'graphs' / 'boxplot'}_{fit_scorer}"
+        fname += "_holdout" if holdout else ""
+        plot(
+            "plotting.plots_both:draw_boxplot_scorer",
+            fname,
+            model_list=model_list,
+            all_scores=all_scores,
+        )
 
+
+def draw_boxplot_scorer(model_list, all_scores, rotate_labels=True):
+    fig, ax = plt.subplots()
     pretty_model_names = [pretty_names(name, "model") for name in model_list]
 
     # Make the boxplot
     sns.boxplot(pd.DataFrame(all_scores, index=pretty_model_names).T, ax=ax, width=0.4)
     # Format the graph
     ax.set_xlabel("ML Methods")
-    plt.xticks(rotation=90)
-
-    fig = plt.gcf()
-    # Save the graph
-    if save:
-        fname = f"{experiment_folder / 'graphs' / 'boxplot'}_{fit_scorer}"
-        fname += "_holdout" if holdout else ""
-        save_fig(fig, fname)
-
-    # Close the figure to ensure we start anew
-    plt.clf()
-    plt.close()
-    # Clear keras and TF sessions/graphs etc.
-    K.clear_session()
+    if rotate_labels:
+        ax.tick_params(axis="x", rotation=90)
+    return fig
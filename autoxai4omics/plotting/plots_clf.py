@@ -14,16 +14,15 @@
 
 
 from itertools import cycle
+from plotting.render import plot
 from sklearn.metrics import auc, confusion_matrix, roc_curve
-from tensorflow.keras import backend as K
+from utils.lazy import clear_keras_session
 from utils.load import load_model
-from utils.save import save_fig
 from utils.utils import get_model_path
 import logging
 import matplotlib.cm as cmx
 import matplotlib.pyplot as plt
 import numpy as np
-import time
 
 omicLogger = logging.getLogger("OmicLogger")
 
@@ -37,8 +36,6 @@ def roc_curve_plot(
     omicLogger.debug("Creating roc_curve_plot...")
     # Loop over the defined models
     for model_name in model_list:
-        # Define the figure object
-        fig, ax = plt.subplots()
         # Load the model
         model_path = get_model_path(experiment_folder, model_name)
 
@@ -63,39 +60,44 @@ def roc_curve_plot(
             )
             roc_auc[i] = auc(fpr[i], tpr[i])
 
-        ourcolors = cycle(["aqua", "darkorange", "cornflowerblue"])
-        for i, color in zip(range(len(class_names)), ourcolors):
-            plt.plot(
-                fpr[i],
-                tpr[i],
-                color=color,
-                label="ROC curve of class {0} (area = {1:0.2f})".format(
-                    class_names[i], roc_auc[i]
-                ),
-            )
-
-        plt.plot([0, 1], [0, 1], color="navy", linestyle="--")
-        plt.xlim([0.0, 1.0])
-        plt.ylim([0.0, 1.05])
-        plt.xlabel("False Positive Rate")
-        plt.ylabel("True Positive Rate")
-        plt.title(f"Receiver operating characteristic - {model_name}")
-        plt.legend(loc="lower right")
-
         # Save or show the plot
         if save:
             fname = f"{experiment_folder / 'graphs' / 'roc_curve'}_{model_name}"
             fname += "_holdout" if holdout else ""
-            save_fig(fig, fname)
-        plt.draw()
-        plt.tight_layout()
-        plt.pause(0.001)
-        time.sleep(2)
-        # Close the figure to ensure we start anew
-        plt.clf()
-        plt.close()
+            plot(
+                "plotting.plots_clf:draw_roc_curve",
+                fname,
+                model_name=model_name,
+                class_names=class_names,
+                fpr=fpr,
+                tpr=tpr,
+                roc_auc=roc_auc,
+            )
         # Clear keras and TF sessions/graphs etc.
-        K.clear_session()
+        clear_keras_session()
+
+
+def draw_roc_curve(model_name, class_names, fpr, tpr, roc_auc):
+    fig, ax = plt.subplots()
+    ourcolors = cycle(["aqua", "darkorange", "cornflowerblue"])
+    for i, color in zip(range(len(class_names)), ourcolors):
+        ax.plot(
+            fpr[i],
+            tpr[i],
+            color=color,
+            label="ROC curve of class {0} (area = {1:0.2f})".format(
+                class_names[i], roc_auc[i]
+            ),
+        )
+
+    ax.plot([0, 1], [0, 1], color="navy", linestyle="--")
+    ax.set_xlim([0.0, 1.0])
+    ax.set_ylim([0.0, 1.05])
+    ax.set_xlabel("False Positive Rate")
+    ax.set_ylabel("True Positive Rate")
+    ax.set_title(f"Receiver operating characteristic - {model_name}")
+    ax.legend(loc="lower right")
+    return fig
 
 
 def conf_matrix_plot(
@@ -113,8 +115,6 @@ def conf_matrix_plot(
     omicLogger.debug("Creating conf_matrix_plot...")
     # Loop over the defined models
     for model_name in model_list:
-        # Define the figure object
-        fig, ax = plt.subplots()
         # Load the model
         model_path = get_model_path(experiment_folder, model_name)
 
@@ -131,49 +131,54 @@ def conf_matrix_plot(
             conf_matrix = (
                 conf_matrix.astype("float") / conf_matrix.sum(axis=1)[:, np.newaxis]
             )
-        # Plot the confusion matrix
-        im = ax.imshow(conf_matrix, interpolation="nearest", cmap=cmx.binary)
-        ax.figure.colorbar(im, ax=ax)
         # Try to get the class names
         try:
             class_names = model.classes_.tolist()
-            ax.set_xticklabels(class_names)
-            ax.set_yticklabels(class_names)
         except AttributeError:
             omicLogger.info("Unable to get class names automatically")
             class_names = None
-        # Setup the labels/ticks
-        ax.set_xticks(np.arange(conf_matrix.shape[1]))
-        ax.tick_params(axis="x", rotation=50)
-        ax.set_yticks(np.arange(conf_matrix.shape[0]))
-        ax.set_xlabel("Predicted Class")
-        ax.set_ylabel("True Class")
-        # Add the text annotations
-        fmt = ".2f" if normalize else "d"
-        # Threshold for black or white text
-        thresh = conf_matrix.max() / 2.0
-        for i in range(conf_matrix.shape[0]):
-            for j in range(conf_matrix.shape[1]):
-                # Use white text if the colour is too dark
-                ax.text(
-                    j,
-                    i,
-                    format(conf_matrix[i, j], fmt),
-                    ha="center",
-                    va="center",
-                    color="white" if conf_matrix[i, j] > thresh else "black",
-                )
         # Save or show the plot
         if save:
             fname = f"{experiment_folder / 'graphs' / 'conf_matrix'}_{model_name}"
             fname += "_holdout" if holdout else ""
-            save_fig(fig, fname)
-        plt.draw()
-        plt.tight_layout()
-        plt.pause(0.001)
-        time.sleep(2)
-        # Close the figure to ensure we start anew
-        plt.clf()
-        plt.close()
+            plot(
+                "plotting.plots_clf:draw_conf_matrix",
+                fname,
+                conf_matrix=conf_matrix,
+                class_names=class_names,
+                normalize=normalize,
+            )
         # Clear keras and TF sessions/graphs etc.
-        K.clear_session()
+        clear_keras_session()
+
+
+def draw_conf_matrix(conf_matrix, class_names, normalize):
+    fig, ax = plt.subplots()
+    # Plot the confusion matrix
+    im = ax.imshow(conf_matrix, interpolation="nearest", cmap=cmx.binary)
+    ax.figure.colorbar(im, ax=ax)
+    # Setup the labels/ticks
+    ax.set_xticks(np.arange(conf_matrix.shape[1]))
+    ax.set_yticks(np.arange(conf_matrix.shape[0]))
+    if class_names is not None:
+        ax.set_xticklabels(class_names)
+        ax.set_yticklabels(class_names)
+    ax.tick_params(axis="x", rotation=50)
+    ax.set_xlabel("Predicted Class")
+    ax.set_ylabel("True Class")
+    # Add the text annotations
+    fmt = ".2f" if normalize else "d"
+    # Threshold for black or white text
+    thresh = conf_matrix.max() / 2.0
+    for i in range(conf_matrix.shape[0]):
+        for j in range(conf_matrix.shape[1]):
+            # Use white text if the colour is too dark
+            ax.text(
+                j,
+                i,
+                format(conf_matrix[i, j], fmt),
+                ha="center",
+                va="center",
+                color="white" if conf_matrix[i, j] > thresh else "black",
+            )
+    return fig
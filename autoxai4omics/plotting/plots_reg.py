@@ -12,15 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from tensorflow.keras import backend as K
-from utils.save import save_fig
+from plotting.render import plot
+from utils.lazy import clear_keras_session
 from utils.utils import get_model_path
 import logging
 import matplotlib.pyplot as plt
 import numpy as np
 import scipy.stats as sp
 import seaborn as sns
-import time
 from utils.load import load_model
 
 omicLogger = logging.getLogger("OmicLogger")
@@ -45,26 +44,26 @@ def histograms(
         # Get the predictions
         y_pred = model.predict(x_test)
 
-        plt.hist([y_test, y_pred], label=["True", "Predicted"], alpha=0.5, bins=50)
-        plt.legend(loc="upper right")
-        axes = plt.gca()
-        axes.set_ylim([0, 27])
-        fig = plt.gcf()
-
         if save:
             fname = f"{experiment_folder / 'graphs' / 'hist_overlap'}_{model_name}"
             fname += "_holdout" if holdout else ""
-            save_fig(fig, fname)
-        plt.draw()
-        plt.tight_layout()
-        plt.pause(0.001)
-        time.sleep(2)
-        # Close the figure to ensure we start anew
-        plt.clf()
-        plt.close()
+            plot(
+                "plotting.plots_reg:draw_histograms",
+                fname,
+                y_test=y_test,
+                y_pred=y_pred,
+            )
 
         # Clear keras and TF sessions/graphs etc.
-        K.clear_session()
+        clear_keras_session()
+
+
+def draw_histograms(y_test, y_pred):
+    fig, ax = plt.subplots()
+    ax.hist([y_test, y_pred], label=["True", "Predicted"], alpha=0.5, bins=50)
+    ax.legend(loc="upper right")
+    ax.set_ylim([0, 27])
+    return fig
 
 
 def correlation_plot(
@@ -83,45 +82,47 @@ def correlation_plot(
     omicLogger.debug("Creating correlation_plot...")
     # Loop over the defined models
     for model_name in model_list:
-        # Define the figure object
-        fig, ax = plt.subplots()
-
         model_path = get_model_path(experiment_folder, model_name)
 
         omicLogger.info(f"Plotting Correlation Plot for {model_name}")
         model = load_model(model_name, model_path)
         # Get the predictions
         y_pred = model.predict(x_test)
-        # Calc the confusion matrix
-        ax.scatter(y_test, y_pred, c="black", s=5, alpha=0.8)
-        # Set the axis labels
-        ax.set_xlabel("True Value")
-        ax.set_ylabel("Predicted Value")
-        # Set the title
-        ax.set_title(f"Correlation for {class_name} using {model_name}")
-        # Add a best fit line
-        if fit_line:
-            ax.plot(
-                np.unique(y_test),
-                np.poly1d(np.polyfit(y_test, y_pred, 1))(np.unique(y_test)),
-                linestyle="dashed",
-                linewidth=2,
-                color="dimgrey",
-            )
         # Save or show the plot
         if save:
             fname = f"{experiment_folder / 'graphs' / 'corr_scatter'}_{model_name}"
             fname += "_holdout" if holdout else ""
-            save_fig(fig, fname)
-        plt.draw()
-        plt.tight_layout()
-        plt.pause(0.001)
-        time.sleep(2)
-        # Close the figure to ensure we start anew
-        plt.clf()
-        plt.close()
+            plot(
+                "plotting.plots_reg:draw_correlation",
+                fname,
+                y_test=y_test,
+                y_pred=y_pred,
+                class_name=class_name,
+                model_name=model_name,
+                fit_line=fit_line,
+            )
         # Clear keras and TF sessions/graphs etc.
-        K.clear_session()
+        clear_keras_session()
+
+
+def draw_correlation(y_test, y_pred, class_name, model_name, fit_line):
+    fig, ax = plt.subplots()
+    ax.scatter(y_test, y_pred, c="black", s=5, alpha=0.8)
+    # Set the axis labels
+    ax.set_xlabel("True Value")
+    ax.set_ylabel("Predicted Value")
+    # Set the title
+    ax.set_title(f"Correlation for {class_name} using {model_name}")
+    # Add a best fit line
+    if fit_line:
+        ax.plot(
+            np.unique(y_test),
+            np.poly1d(np.polyfit(y_test, y_pred, 1))(np.unique(y_test)),
+            linestyle="dashed",
+            linewidth=2,
+            color="dimgrey",
+        )
+    return fig
 
 
 def distribution_hist(
@@ -135,9 +136,6 @@ def distribution_hist(
     omicLogger.debug("Creating distribution_hist...")
     # Loop over the defined models
     for model_name in model_list:
-        # Define the figure object
-        fig, (ax_left, ax_right) = plt.subplots(1, 2, figsize=(18, 10))
-
         # Load the model
         model_path = get_model_path(experiment_folder, model_name)
 
@@ -145,29 +143,32 @@ def distribution_hist(
         model = load_model(model_name, model_path)
         # Get the predictions
         y_pred = model.predict(x_test)
-        # Left histograms
-        ax_left.hist(y_test, bins=20, zorder=1, color="black", label="True")
-        ax_left.hist(y_pred, bins=20, zorder=2, color="grey", label="Predicted")
-        # Right histograms (exactly the same, just different zorder)
-        ax_right.hist(y_test, bins=20, zorder=2, color="black", label="True")
-        ax_right.hist(y_pred, bins=20, zorder=1, color="grey", label="Predicted")
-        # Create a single legend
-        handles, labels = ax_right.get_legend_handles_labels()
-        # Add the legend
-        fig.legend(handles, labels, loc="right")
         if save:
             fname = f"{experiment_folder / 'graphs' / 'hist'}_{model_name}"
             fname += "_holdout" if holdout else ""
-            save_fig(fig, fname)
-        plt.draw()
-        plt.tight_layout()
-        plt.pause(0.001)
-        time.sleep(2)
-        # Close the figure to ensure we start anew
-        plt.clf()
-        plt.close()
+            plot(
+                "plotting.plots_reg:draw_distribution_hist",
+                fname,
+                y_test=y_test,
+                y_pred=y_pred,
+            )
         # Clear keras and TF sessions/graphs etc.
-        K.clear_session()
+        clear_keras_session()
+
+
+def draw_distribution_hist(y_test, y_pred):
+    fig, (ax_left, ax_right) = plt.subplots(1, 2, figsize=(18, 10))
+    # Left histograms
+    ax_left.hist(y_test, bins=20, zorder=1, color="black", label="True")
+    ax_left.hist(y_pred, bins=20, zorder=2, color="grey", label="Predicted")
+    # Right histograms (exactly the same, just different zorder)
+    ax_right.hist(y_test, bins=20, zorder=2, color="black", label="True")
+    ax_right.hist(y_pred, bins=20, zorder=1, color="grey", label="Predicted")
+    # Create a single legend
+    handles, labels = ax_right.get_legend_handles_labels()
+    # Add the legend
+    fig.legend(handles, labels, loc="right")
+    return fig
 
 
 def joint_plot(
@@ -193,7 +194,26 @@ def joint_plot(
         model = load_model(model_name, model_path)
         # Get the predictions
         y_pred = model.predict(x_test)
-        sns.set(style="white")
+        if save:
+            if kind == "kde":
+                fname = f"{experiment_folder / 'graphs' / 'joint_kde'}_{model_name}"
+            else:
+                fname = f"{experiment_folder / 'graphs' / 'joint'}_{model_name}"
+
+            fname += "_holdout" if holdout else ""
+            plot(
+                "plotting.plots_reg:draw_joint",
+                fname,
+                y_test=y_test,
+                y_pred=y_pred,
+                kind=kind,
+            )
+        # Clear keras and TF sessions/graphs etc.
+        clear_keras_session()
+
+
+def draw_joint(y_test, y_pred, kind):
+    with sns.axes_style("white"):
         # Make the joint plot
         plot = sns.jointplot(
             x=y_test,
@@ -210,41 +230,19 @@ def joint_plot(
             marginal_kws={"color": "midnightblue"},
         )
 
-        # Set the labels
-        plot.ax_joint.set_xlabel("True Value")
-        plot.ax_joint.set_ylabel("Predicted Value")
-        x0, x1 = plot.ax_joint.get_xlim()
-        y0, y1 = plot.ax_joint.get_ylim()
-        lims = [max(x0, y0), min(x1, y1)]
-        plot.ax_joint.plot(lims, lims, ":k")
-
-        # Extract only the pearson val (ignore the p-value)
-        def pearson(x, y):
-            return sp.pearsonr(x, y)[0]
-
-        # Add this value to the graph (warning: deprecated in the future)
-        plot.annotate(
-            pearson,
-            loc="upper right",
-            stat="Pearson's",
-            borderpad=0.2,
-            mode=None,
-            edgecolor=None,
-        )
-        if save:
-            if kind == "kde":
-                fname = f"{experiment_folder / 'graphs' / 'joint_kde'}_{model_name}"
-            else:
-                fname = f"{experiment_folder / 'graphs' / 'joint'}_{model_name}"
-
-            fname += "_holdout" if holdout else ""
-            save_fig(plot, fname)
-        plt.draw()
-        plt.tight_layout()
-        plt.pause(0.001)
-        time.sleep(2)
-        # Close the figure to ensure we start anew
-        plt.clf()
-        plt.close()
-        # Clear keras and TF sessions/graphs etc.
-        K.clear_session()
+    # Set the labels
+    plot.ax_joint.set_xlabel("True Value")
+    plot.ax_joint.set_ylabel("Predicted Value")
+    x0, x1 = plot.ax_joint.get_xlim()
+    y0, y1 = plot.ax_joint.get_ylim()
+    lims = [max(x0, y0), min(x1, y1)]
+    plot.ax_joint.plot(lims, lims, ":k")
+
+    # Add the pearson correlation (ignoring the p-value), JointGrid.annotate was removed in seaborn 0.12
+    plot.ax_joint.legend(
+        handles=[],
+        title=f"Pearson's = {sp.pearsonr(np.ravel(y_test), np.ravel(y_pred))[0]:.2f}",
+        loc="upper right",
+        borderpad=0.2,
+    )
+    return plot.fig
@@ -0,0 +1,151 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+The drawing of the figures, split from the computation of what they show. The plot functions compute the data of each
+figure (scores, predictions, SHAP values, ...) and hand it to `plot` with the function drawing it. While a `Renderer` is
+running the data is saved to `graphs/plot_data/` and the figures are drawn when it stops, on the Agg backend, by a pool
+of processes. Otherwise the figure is drawn straight away.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+from typing import Union
+from utils.lazy import import_object
+from utils.profiling import span
+from utils.vars import PLOT_DATA_FOLDER
+import joblib
+import logging
+import multiprocessing
+
+omicLogger = logging.getLogger("OmicLogger")
+
+# the renderer collecting the figures of the current run, None when they are drawn straight away
+_RENDERER = None
+# a worker takes a second or two to start (importing matplotlib, seaborn, shap, ...), not worth it for fewer figures
+FIGURES_PER_WORKER = 4
+
+
+def use_agg() -> None:
+    """Draw with the Agg backend, which renders to files only"""
+    import matplotlib
+
+    if matplotlib.get_backend().lower() != "agg":
+        matplotlib.use("Agg")
+
+
+def draw_figure(
+    draw: str, fname: str, data: dict, fig_format: str = "png", dpi: int = 200
+) -> str:
+    """
+    Draw a figure with `draw` ("module:function", returning the figure) from its `data`, and save it to
+    `fname`.`fig_format`
+    """
+    use_agg()
+    import matplotlib.pyplot as plt
+    from utils.save import save_fig
+
+    fig = import_object(draw)(**data)
+    try:
+        save_fig(fig, fname, dpi=dpi, fig_format=fig_format)
+    finally:
+        plt.close(fig)
+    return f"{fname}.{fig_format}"
+
+
+def draw_saved_figure(path: Path, fig_format: str, dpi: int) -> str:
+    """Draw the figure of the plot data saved to `path`"""
+    job = joblib.load(path)
+    return draw_figure(job["draw"], job["fname"], job["data"], fig_format, dpi)
+
+
+def plot_data_path(fname: str) -> Path:
+    """Where the data of the figure `fname` is saved, in `plot_data` next to it"""
+    fname = Path(fname)
+    return fname.parent / PLOT_DATA_FOLDER / f"{fname.name}.joblib"
+
+
+def plot(draw: str, fname: str, **data) -> None:
+    """
+    Plot the figure `fname` (its path without the extension) drawn by `draw` ("module:function") from the keyword
+    `data`. Queued to the current renderer if one is running, drawn straight away otherwise.
+    """
+    if _RENDERER is not None:
+        _RENDERER.submit(draw, fname, data)
+    else:
+        draw_figure(draw, fname, data)
+
+
+def running_renderer() -> Union["Renderer", None]:
+    """The renderer collecting the figures, None when they are drawn straight away"""
+    return _RENDERER
+
+
+class Renderer(object):
+    """
+    Collects the figures plotted while running (between `start` and `stop`) to draw them together when it stops, in
+    parallel, with the format & dpi set in the `plotting` section of the config. Started while another one is running,
+    it leaves the figures to that one.
+    """
+
+    def __init__(self, config_dict: dict):
+        config = config_dict.get("plotting") or {}
+        self.fig_format = config.get("fig_format") or "png"
+        self.dpi = config.get("dpi") or 200
+        self.processes = config.get("render_processes") or joblib.cpu_count()
+        self.jobs = []
+        # the files of the figures submitted so far
+        self.figures = []
+        self.running = False
+
+    def start(self) -> "Renderer":
+        global _RENDERER
+        if _RENDERER is None:
+            _RENDERER = self
+            self.running = True
+        return self
+
+    def submit(self, draw: str, fname: str, data: dict) -> None:
+        """Save the data of a figure to draw when stopping"""
+        path = plot_data_path(fname)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        joblib.dump({"draw": draw, "fname": str(fname), "data": data}, path)
+        if path not in self.jobs:
+            self.jobs.append(path)
+            self.figures.append(f"{fname}.{self.fig_format}")
+
+    def stop(self) -> list[str]:
+        """Draw the figures collected, also when the run failed so those computed up to the failure are kept"""
+        global _RENDERER
+        if not self.running:
+            return []
+        _RENDERER = None
+        self.running = False
+        jobs, self.jobs = self.jobs, []
+        with span("render figures", cat="plot", figures=len(jobs)):
+            return self.render(jobs)
+
+    def render(self, jobs: list[Path]) -> list[str]:
+        """Draw the figures of the plot data saved to `jobs`, returning the files written"""
+        workers = min(self.processes, len(jobs) // FIGURES_PER_WORKER)
+        omicLogger.info(
+            f"Drawing {len(jobs)} figures with {max(workers, 1)} process(es)..."
+        )
+        if workers <= 1:
+            return [draw_saved_figure(job, self.fig_format, self.dpi) for job in jobs]
+
+        # spawned, as forking a process holding tensorflow or openmp threads can deadlock
+        with ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            return list(
+                pool.map(
+                    draw_saved_figure,
+                    jobs,
+                    repeat(self.fig_format),
+                    repeat(self.dpi),
+                )
+            )
@@ -0,0 +1,124 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+The data the model-agnostic SHAP explainers work from: the background the features are replaced from, a summary of the
+training set computed once per dataset and shared by the models, and the rows explained, subsampled to a maximum
+keeping the proportions of the classes (or of the quantiles of the target of a regression).
+"""
+
+from typing import Union
+from utils.checkpoint import fingerprint
+from utils.vars import CLASSIFICATION
+import logging
+import numpy as np
+import pandas as pd
+
+omicLogger = logging.getLogger("OmicLogger")
+
+BACKGROUND_METHODS = ["kmeans", "stratified", "minibatch_kmeans"]
+# the quantiles of the target a regression is stratified on
+REGRESSION_STRATA = 5
+# the backgrounds of each dataset & settings, shared by the plots of the models
+_BACKGROUNDS = {}
+
+
+def strata(labels, problem_type: str) -> np.ndarray:
+    """The stratum of each sample: its class, or the quantile of its target for a regression"""
+    labels = np.asarray(labels).ravel()
+    if problem_type == CLASSIFICATION:
+        return labels
+    edges = np.quantile(labels, np.linspace(0, 1, REGRESSION_STRATA + 1)[1:-1])
+    return np.digitize(labels, edges)
+
+
+def stratified_sample(
+    groups: np.ndarray, size: int, seed: int = 0
+) -> Union[np.ndarray, None]:
+    """
+    The sorted indices of `size` samples drawn with the proportions of the `groups` (the largest remainders rounded
+    up), None when there are no more samples than that
+    """
+    if size >= len(groups):
+        return None
+    rng = np.random.default_rng(seed)
+    names, counts = np.unique(groups, return_counts=True)
+    shares = counts * size / len(groups)
+    taken = np.floor(shares).astype(int)
+    taken[np.argsort(taken - shares)[: size - taken.sum()]] += 1
+    return np.sort(
+        np.concatenate(
+            [
+                rng.choice(np.flatnonzero(groups == name), n, replace=False)
+                for name, n in zip(names, taken)
+            ]
+        )
+    )
+
+
+def minibatch_kmeans(data: pd.DataFrame, size: int, seed: int = 0):
+    """
+    Like `shap.kmeans`, the `size` means of the data weighted by the samples they stand for and rounded to the nearest
+    value of each feature, but found by mini-batches, for large training sets
+    """
+    from shap.utils._legacy import DenseData
+    from sklearn.cluster import MiniBatchKMeans
+
+    values = data.to_numpy(dtype=float)
+    kmeans = MiniBatchKMeans(n_clusters=size, random_state=seed, n_init=3).fit(values)
+    centers = kmeans.cluster_centers_
+    # the nearest value of each feature, a discrete feature keeping valid values
+    for j in range(values.shape[1]):
+        column = np.sort(values[:, j])
+        right = np.clip(np.searchsorted(column, centers[:, j]), 1, len(column) - 1)
+        left = column[right - 1]
+        centers[:, j] = np.where(
+            centers[:, j] - left <= column[right] - centers[:, j], left, column[right]
+        )
+    weights = np.bincount(kmeans.labels_, minlength=size).astype(float)
+    return DenseData(centers, list(data.columns), None, weights)
+
+
+def summarise(
+    data: pd.DataFrame,
+    size: int,
+    method: str = "kmeans",
+    groups: np.ndarray = None,
+    seed: int = 0,
+):
+    """
+    The background of `size` samples summarising `data` with `method`: the means of "kmeans", those of
+    "minibatch_kmeans" or the samples of a "stratified" sample on the `groups` (random without)
+    """
+    if size >= len(data):
+        return data
+    if method == "kmeans":
+        import shap
+
+        return shap.kmeans(data, size)
+    if method == "minibatch_kmeans":
+        return minibatch_kmeans(data, size, seed)
+    if method == "stratified":
+        if groups is None:
+            groups = np.zeros(len(data))
+        return data.iloc[stratified_sample(groups, size, seed)]
+    raise ValueError(f"Unknown background method {method}, one of {BACKGROUND_METHODS}")
+
+
+def shared_background(
+    data: pd.DataFrame,
+    size: int,
+    method: str = "kmeans",
+    groups: np.ndarray = None,
+    seed: int = 0,
+):
+    """The background of `summarise`, computed once for the same data & settings"""
+    key = fingerprint(data, size, method, groups, seed)
+    if key not in _BACKGROUNDS:
+        omicLogger.info(
+            f"Summarising the {len(data)} training samples into a SHAP background of {size} by {method}"
+        )
+        _BACKGROUNDS[key] = summarise(data, size, method, groups, seed)
+    return _BACKGROUNDS[key]
@@ -0,0 +1,126 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+SHAP values of Keras models from their gradients: the expected gradients of `shap.GradientExplainer`, the gradients
+along the straight paths from each background sample to the sample explained, averaged over the background &
+multiplied by the difference to it. The path points of many samples are stacked and differentiated in a single call of
+a compiled `tf.function`, instead of a `model.predict` per perturbed sample as with the KernelExplainer. The values are
+laid out as the plots expect them from shap: samples x features x classes for a classifier, samples x features for a
+regression.
+"""
+
+import logging
+import numpy as np
+
+omicLogger = logging.getLogger("OmicLogger")
+
+# the models explained from the gradients of their Keras network
+KERAS_MODELS = ["FixedKeras", "AutoKeras"]
+# the points of the path from a background sample to a sample (midpoints of as many equal steps)
+PATH_STEPS = 32
+# values of the gradients of the path points computed at once (64MB of float32)
+MAX_BATCH_VALUES = 2**24
+
+
+def keras_model(model):
+    """
+    The Keras network of a model: that of a loaded FixedKeras/AutoKeras (`model.model`) or of the `KerasModel` it
+    wraps in training (`model.model.model`). None if there is none.
+    """
+    for network in [model, getattr(model, "model", None)]:
+        network = getattr(network, "model", None)
+        if type(network).__module__.split(".")[0] in [
+            "keras",
+            "tensorflow",
+            "tf_keras",
+        ]:
+            return network
+    return None
+
+
+class KerasGradientExplainer(object):
+    """
+    Explains a Keras network like a `shap.GradientExplainer`, through `shap_values(X)` & `expected_value`, from a
+    `background`: an array or DataFrame of samples, or the weighted means of `shap.kmeans`. The paths are integrated
+    with the midpoint rule, so the values are deterministic and sum, up to the integration error, to the difference
+    between the output of a sample and the expected output over the background.
+    """
+
+    def __init__(self, network, background, steps: int = PATH_STEPS):
+        import tensorflow as tf
+
+        self.network = network
+        if hasattr(background, "weights"):
+            # the means of shap.kmeans, weighted by the samples they stand for
+            background, weights = background.data, background.weights
+        else:
+            weights = np.ones(len(background))
+        background = np.asarray(background, dtype=np.float32)
+        self.background = tf.constant(background)
+        self.weights = tf.constant(
+            np.asarray(weights) / np.sum(weights), dtype=tf.float32
+        )
+        self.alphas = tf.constant((np.arange(steps) + 0.5) / steps, dtype=tf.float32)
+        # the shape of a sample as the network takes it (e.g. features x 1 for a Conv1D)
+        sample_shape = tuple(network.input_shape[1:])
+
+        n_features = background.shape[1]
+        outputs = self._outputs(background)
+        self.classifier = outputs.shape[1] > 1
+        self.expected_value = outputs.T @ self.weights.numpy()
+        if not self.classifier:
+            self.expected_value = self.expected_value[0]
+        # the samples whose paths are differentiated at once
+        self.chunk = max(
+            1, MAX_BATCH_VALUES // (steps * background.size * outputs.shape[1])
+        )
+
+        @tf.function(
+            input_signature=[tf.TensorSpec([None, n_features], tf.float32)],
+            reduce_retracing=True,
+        )
+        def attributions(x):
+            # samples x background x features
+            differences = x[:, None, :] - self.background[None, :, :]
+            # samples x steps x background x features
+            points = (
+                self.background[None, None, :, :]
+                + self.alphas[None, :, None, None] * differences[:, None, :, :]
+            )
+            points = tf.reshape(points, [-1, n_features])
+            with tf.GradientTape() as tape:
+                tape.watch(points)
+                outputs = self.network(
+                    tf.reshape(points, (-1,) + sample_shape), training=False
+                )
+                outputs = tf.reshape(outputs, [tf.shape(points)[0], -1])
+            # points x outputs x features, averaged over the steps
+            gradients = tape.batch_jacobian(outputs, points)
+            gradients = tf.reshape(
+                gradients,
+                [tf.shape(x)[0], len(self.alphas), len(background), -1, n_features],
+            )
+            gradients = tf.reduce_mean(gradients, axis=1)
+            # samples x outputs x features, weighted over the background
+            return tf.einsum("nbof,nbf,b->nfo", gradients, differences, self.weights)
+
+        self._attributions = attributions
+
+    def _outputs(self, X) -> np.ndarray:
+        outputs = self.network(
+            np.reshape(X, (-1,) + tuple(self.network.input_shape[1:])), training=False
+        )
+        return np.reshape(np.asarray(outputs), (len(X), -1))
+
+    def shap_values(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        values = np.concatenate(
+            [
+                self._attributions(X[start : start + self.chunk]).numpy()
+                for start in range(0, len(X), self.chunk)
+            ]
+        )
+        return values if self.classifier else values[..., 0]
@@ -0,0 +1,84 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+SHAP values of XGBoost & LightGBM models computed by the boosting libraries themselves, the TreeSHAP of their own
+(multithreaded) code through `pred_contribs`/`pred_contrib`, instead of converting the model for `shap.TreeExplainer`.
+The values are laid out as the plots expect them from shap: samples x features for a regression or a binary AutoLGBM,
+samples x features x classes otherwise.
+"""
+
+import logging
+import numpy as np
+
+omicLogger = logging.getLogger("OmicLogger")
+
+# the models explained from their boosting library, the AutoXGBoost & AutoLGBM ones through the estimator they wrap
+NATIVE_TREE_MODELS = ["XGBClassifier", "XGBRegressor", "AutoXGBoost", "AutoLGBM"]
+# the binary classifiers whose plots take the values of the positive class only, as shap gives them
+POSITIVE_CLASS_ONLY = ["AutoLGBM"]
+
+
+def tree_estimator(model):
+    """
+    The XGBoost or LightGBM estimator of a model: itself, or the one wrapped by an AutoXGBoost/AutoLGBM (`model.model`
+    being the `XGBoostModel`/`LGBMModel` of the training). None if there is none.
+    """
+    for estimator in [model, getattr(getattr(model, "model", None), "model", None)]:
+        if type(estimator).__module__.split(".")[0] in ["xgboost", "lightgbm"]:
+            return estimator
+    return None
+
+
+class NativeTreeExplainer(object):
+    """
+    Explains an XGBoost or LightGBM estimator (sklearn API) like a `shap.TreeExplainer`, through `shap_values(X)` &
+    `expected_value`, the latter set once values are computed. With `positive_class_only`, the values of a binary
+    classifier are those of the positive class alone, otherwise the negative class is given the opposite values (the
+    contributions to the log odds of one being those against the other).
+    """
+
+    def __init__(self, estimator, positive_class_only: bool = False):
+        self.estimator = estimator
+        self.positive_class_only = positive_class_only
+        self.expected_value = None
+
+    def contributions(self, X) -> np.ndarray:
+        """The contributions of the features to the raw output, the bias last: samples x (outputs x) features + 1"""
+        if type(self.estimator).__module__.startswith("xgboost"):
+            import xgboost as xgb
+
+            booster = self.estimator.get_booster()
+            try:
+                # the trees up to the best round, as the estimator predicts after early stopping
+                iteration_range = (0, self.estimator.best_iteration + 1)
+            except AttributeError:
+                iteration_range = (0, 0)
+            return booster.predict(
+                xgb.DMatrix(np.asarray(X), feature_names=booster.feature_names),
+                pred_contribs=True,
+                iteration_range=iteration_range,
+            )
+
+        contributions = np.asarray(self.estimator.predict(X, pred_contrib=True))
+        n_classes = len(getattr(self.estimator, "classes_", []))
+        if n_classes > 2:
+            # the classes one after the other
+            contributions = contributions.reshape(len(contributions), n_classes, -1)
+        return contributions
+
+    def shap_values(self, X) -> np.ndarray:
+        contributions = self.contributions(X)
+        values, bias = contributions[..., :-1], contributions[..., -1]
+        if values.ndim == 3:
+            # samples x features x classes
+            values = values.transpose(0, 2, 1)
+            self.expected_value = bias.mean(axis=0)
+        elif hasattr(self.estimator, "classes_") and not self.positive_class_only:
+            values = np.stack([-values, values], axis=-1)
+            self.expected_value = np.array([-bias.mean(), bias.mean()])
+        else:
+            self.expected_value = bias.mean()
+        return values
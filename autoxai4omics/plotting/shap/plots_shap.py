@@ -12,43 +12,67 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from tensorflow.keras import backend as K
+from plotting.render import plot
+from plotting.shap.background import shared_background, strata, stratified_sample
+from plotting.shap.gradient import KERAS_MODELS, KerasGradientExplainer, keras_model
+from plotting.shap.native_tree import (
+    NATIVE_TREE_MODELS,
+    POSITIVE_CLASS_ONLY,
+    NativeTreeExplainer,
+    tree_estimator,
+)
+from utils.lazy import clear_keras_session
 from utils.load import load_model
-from utils.save import save_fig
+from utils.profiling import span
 from utils.utils import get_model_path, pretty_names
 from utils.vars import CLASSIFICATION, REGRESSION
 import logging
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-import shap
-import time
 
 omicLogger = logging.getLogger("OmicLogger")
 
 
-def select_explainer(model, model_name: str, df_train, problem_type: str):
+def select_explainer(
+    model, model_name: str, df_train, problem_type: str, background=None
+):
     """
-    Select the appropriate SHAP explainer for each model
+    Select the appropriate SHAP explainer for each model, the model-agnostic & Keras ones working from the
+    `background` summarising `df_train` (by default its 5 kmeans)
     """
+    import shap
+
+    if background is None:
+        background = shap.kmeans(df_train, 5)
+    # XGBoost & LightGBM compute the SHAP values themselves
+    estimator = tree_estimator(model) if model_name in NATIVE_TREE_MODELS else None
+    # FixedKeras & AutoKeras are explained from the gradients of their network
+    network = keras_model(model) if model_name in KERAS_MODELS else None
+
     # Select the right explainer
     # Note that, for a multi-class (non-binary) problem gradboost cannot use the TreeExplainer
-    if model_name in ["xgboost", "RandomForestClassifier"]:
+    if estimator is not None:
+        explainer = NativeTreeExplainer(
+            estimator, positive_class_only=model_name in POSITIVE_CLASS_ONLY
+        )
+    elif network is not None:
+        explainer = KerasGradientExplainer(network, background)
+    elif model_name in ["xgboost", "RandomForestClassifier"]:
         explainer = shap.TreeExplainer(model)
     elif model_name in ["mlp_keras"]:
         explainer = shap.DeepExplainer(model.model, df_train.values)
     elif model_name in ["AutoLGBM", "AutoXGBoost"]:
         explainer = shap.TreeExplainer(model.model.model)
     else:
-        # KernelExplainer can be very slow, so use their KMeans to speed it up
+        # KernelExplainer can be very slow, so use a summary of the training set (e.g. its KMeans) to speed it up
         # Results are approximate
-        df_train_km = shap.kmeans(df_train, 5)
         # For classification we use the predict_proba
         if problem_type == CLASSIFICATION:
-            explainer = shap.KernelExplainer(model.predict_proba, df_train_km)
+            explainer = shap.KernelExplainer(model.predict_proba, background)
         # Otherwise just use predict
         elif problem_type == REGRESSION:
-            explainer = shap.KernelExplainer(model.predict, df_train_km)
+            explainer = shap.KernelExplainer(model.predict, background)
     return explainer
 
 
@@ -130,7 +154,7 @@ def shap_force_plots(
             )
             # Clear everything
         # Clear keras and TF sessions/graphs etc.
-        K.clear_session()
+        clear_keras_session()
 
 
 def shap_force_reg(
@@ -174,35 +198,20 @@ def shap_force_reg(
         names.append("closest")
         # Create a plot for each of the selected exemplars
     for name, exemplar_index in zip(names, exemplar_indices):
-        # Create the plot
-        fig = shap.force_plot(
-            explainer.expected_value,
-            shap_values[exemplar_index],
-            data[exemplar_index],
-            feature_names=feature_names,
-            matplotlib=True,
-            show=False,
-            text_rotation=30,
-        )
-        # Setup the title
-        fig.suptitle(
-            f"SHAP Force Plot for top exemplar using {pretty_names(model_name, 'model')} for {class_col}"
-            + f"({name})",
-            fontsize=16,
-            y=1.4,
-        )
         # Save the plot
         if save:
             fname = f"{experiment_folder / 'graphs' / 'shap_force_single'}_{model_name}_{name}"
             fname += "_holdout" if holdout else ""
-            save_fig(fig, fname)
-        plt.draw()
-        plt.tight_layout()
-        plt.pause(0.001)
-        time.sleep(2)
-        # Close the figure to ensure we start anew
-        plt.clf()
-        plt.close()
+            plot(
+                "plotting.shap.plots_shap:draw_force_plot",
+                fname,
+                expected_value=explainer.expected_value,
+                shap_values=shap_values[exemplar_index],
+                features=data[exemplar_index],
+                feature_names=feature_names,
+                title=f"SHAP Force Plot for top exemplar using {pretty_names(model_name, 'model')} for {class_col}"
+                + f"({name})",
+            )
 
 
 def shap_force_clf(
@@ -239,41 +248,80 @@ def shap_force_clf(
     )
     # omicLogger.info(class_exemplars)
     for i, (class_index, class_name) in enumerate(zip(class_exemplars, class_names)):
-        # Close the figure to ensure we start anew
-        plt.clf()
-        plt.close()
         # exemplar_data = df_test.iloc[class_index, :]
         exemplar_data = data[class_index, :]
-        # Create the force plot
-        fig = shap.force_plot(
-            explainer.expected_value[i],
-            shap_values[i][class_index],
-            exemplar_data,
-            feature_names=feature_names,
-            matplotlib=True,
-            show=False,
-            text_rotation=30,
-        )
         # Need to add label/text on the side for the class name
         omicLogger.info(f"{pretty_names(model_name, 'model')}")
-        fig.suptitle(
-            f"SHAP Force Plot for top exemplar using {pretty_names(model_name, 'model')} with class "
-            + f"{class_name}",
-            fontsize=16,
-            y=1.4,
-        )
         # Save the plot
         if save:
             fname = f"{experiment_folder / 'graphs' / 'shap_force_single'}_{model_name}_class{class_name}"
             fname += "_holdout" if holdout else ""
-            save_fig(fig, fname)
-        plt.draw()
-        plt.tight_layout()
-        plt.pause(0.001)
-        time.sleep(2)
-        # Close the figure to ensure we start anew
-        plt.clf()
-        plt.close()
+            plot(
+                "plotting.shap.plots_shap:draw_force_plot",
+                fname,
+                expected_value=explainer.expected_value[i],
+                shap_values=shap_values[i][class_index],
+                features=exemplar_data,
+                feature_names=feature_names,
+                title=f"SHAP Force Plot for top exemplar using {pretty_names(model_name, 'model')} with class "
+                + f"{class_name}",
+            )
+
+
+def draw_force_plot(expected_value, shap_values, features, feature_names, title):
+    import shap
+
+    # Create the force plot
+    fig = shap.force_plot(
+        expected_value,
+        shap_values,
+        features,
+        feature_names=feature_names,
+        matplotlib=True,
+        show=False,
+        text_rotation=30,
+    )
+    # Setup the title
+    fig.suptitle(title, fontsize=16, y=1.4)
+    return fig
+
+
+def draw_summary_plot(shap_values, features, cmap=None, recolor=None, **kwargs):
+    """
+    SHAP's summary plot, coloured by the colour map `cmap` (for the bar plots) or with its artists recoloured with the
+    colour map `recolor` (for the dot plots), the `kwargs` are given to `shap.summary_plot`
+    """
+    import shap
+
+    plt.figure()
+    if cmap is not None:
+        kwargs["color"] = plt.get_cmap(cmap)
+    if np.ndim(shap_values) == 3:
+        # samples x features x classes, which shap would take for interaction values, as a list of the classes
+        shap_values = list(np.moveaxis(shap_values, -1, 0))
+    shap.summary_plot(shap_values, features, show=False, **kwargs)
+    fig = plt.gcf()
+    if recolor is not None:
+        my_cmap = plt.get_cmap(recolor)
+
+        # Change the colormap of the artists
+        for fc in fig.get_children():
+            for fcc in fc.get_children():
+                if hasattr(fcc, "set_cmap"):
+                    fcc.set_cmap(my_cmap)
+    return fig
+
+
+def draw_abundance(objects, abundance):
+    # Bar plot of average abundance across all the samples of the top genera
+    fig, ax = plt.subplots()
+    y_pos = np.arange(len(objects))
+    ax.barh(y_pos, abundance, align="center", color="black")
+    ax.set_yticks(y_pos)
+    ax.set_yticklabels(objects)
+    ax.invert_yaxis()
+    ax.set_xlabel("Average abundance (%)")
+    return fig
 
 
 def summary_SHAPdotplot_perclass(
@@ -303,24 +351,16 @@ def summary_SHAPdotplot_perclass(
             )
 
         # Plot shap bar plot
-        shap.summary_plot(
-            exemplars_selected,
-            exemplar_X_test,
+        plot(
+            "plotting.shap.plots_shap:draw_summary_plot",
+            fname,
+            shap_values=exemplars_selected,
+            features=exemplar_X_test,
             plot_type="dot",
             color_bar="000",
             max_display=num_top,
             feature_names=feature_names,
-            show=False,
         )
-        fig = plt.gcf()
-        save_fig(fig, fname)
-        plt.draw()
-        plt.tight_layout()
-        plt.pause(0.001)
-        time.sleep(2)
-        # Close the figure to ensure we start anew
-        plt.clf()
-        plt.close()
 
         if not holdout:
             fname = f"{experiment_folder / 'results' / 'shapley_values'}_{data_forexplanations}_{model_name}"
@@ -370,34 +410,17 @@ def summary_SHAPdotplot_perclass(
                 )
 
             # Plot shap bar plot
-            shap.summary_plot(
-                exemplars_selected[:, :, i],
-                exemplar_X_test,
+            plot(
+                "plotting.shap.plots_shap:draw_summary_plot",
+                fname,
+                shap_values=exemplars_selected[:, :, i],
+                features=exemplar_X_test,
+                recolor="viridis",
                 plot_type="dot",
                 color_bar="000",
                 max_display=num_top,
                 feature_names=feature_names,
-                show=False,
             )
-            my_cmap = plt.get_cmap("viridis")
-
-            # Change the colormap of the artists
-            for fc in plt.gcf().get_children():
-                for fcc in fc.get_children():
-                    if hasattr(fcc, "set_cmap"):
-                        fcc.set_cmap(my_cmap)
-            fig = plt.gcf()
-            save_fig(fig, fname)
-            plt.draw()
-            plt.tight_layout()
-            plt.pause(0.001)
-            time.sleep(2)
-            # Close the figure to ensure we start anew
-            plt.clf()
-            plt.close()
-
-    plt.clf()
-    plt.close()
 
 
 def get_exemplars(x_test, y_test, model, problem_type, pcAgreementLevel):
@@ -548,7 +571,20 @@ def shap_plots(
     pcAgreementLevel=10,
     save=True,
     holdout=False,
+    y=None,
+    y_train=None,
+    background_size=5,
+    background_method="kmeans",
+    max_explained=None,
+    nsamples=None,
+    seed=0,
 ):
+    """
+    The SHAP plots of each model. The model-agnostic explainers work from a background of `background_size` samples
+    summarising the training set by `background_method` (see `plotting.shap.background`), shared by the models, and
+    take `nsamples` evaluations of the model per row explained (shap's default if None). At most `max_explained` rows
+    are explained, drawn keeping the proportions of the classes (or of the quantiles of a regression target).
+    """
     omicLogger.debug("Creating shap_plots...")
 
     if explanations_data == "all" or "test" or "train" or "exemplars":
@@ -567,6 +603,15 @@ def shap_plots(
     omicLogger.info(feature_names)
     omicLogger.info(len(feature_names))
 
+    with span("SHAP background", cat="shap", background=df_train):
+        background = shared_background(
+            df_train,
+            background_size,
+            background_method,
+            groups=None if y_train is None else strata(y_train, problem_type),
+            seed=seed,
+        )
+
     # Loop over the defined models
     for model_name in model_list:
         # Load the model
@@ -583,22 +628,51 @@ def shap_plots(
         model = load_model(model_name, model_path)
 
         # Select the right explainer from SHAP
-        explainer = select_explainer(model, model_name, df_train, problem_type)
+        with span(f"{model_name} SHAP explainer", cat="shap", background=df_train):
+            explainer = select_explainer(
+                model, model_name, df_train, problem_type, background
+            )
 
         # Get the exemplars on the test set -- maybe to modify to include probability
         exemplar_X_test = get_exemplars(
             x_test, y_test, model, problem_type, pcAgreementLevel
         )
-
-        shap_values, data, data_indx = compute_shap_vals(
-            experiment_folder,
-            data_forexplanations,
-            explainer,
-            x,
-            x_train,
-            x_test,
-            exemplar_X_test,
-        )
+        # the labels of each set, to keep their proportions when explaining some of the rows
+        labels = {"all": y, "train": y_train, "test": y_test}
+        if (
+            max_explained is not None
+            and data_forexplanations == "exemplars"
+            and len(exemplar_X_test)
+        ):
+            # the exemplars are predicted right
+            labels["exemplars"] = model.predict(exemplar_X_test)
+
+        with span(
+            f"{model_name} SHAP values",
+            cat="shap",
+            explained={
+                "all": x,
+                "train": x_train,
+                "test": x_test,
+                "exemplars": exemplar_X_test,
+            }.get(data_forexplanations, x_train),
+            # a dense array of values per class
+            outputs=len(np.unique(y_test)) if problem_type == CLASSIFICATION else 1,
+        ):
+            shap_values, data, data_indx = compute_shap_vals(
+                experiment_folder,
+                data_forexplanations,
+                explainer,
+                x,
+                x_train,
+                x_test,
+                exemplar_X_test,
+                labels=labels,
+                problem_type=problem_type,
+                max_explained=max_explained,
+                nsamples=nsamples,
+                seed=seed,
+            )
         # Handle regression and classification differently and store the shap_values in shap_values_selected
 
         # Classification
@@ -650,33 +724,21 @@ def shap_plots(
         df.to_csv(fname + ".csv")
 
         # Bar plot of average abundance across all the samples of the top genera
-
-        y_pos = np.arange(len(objects))
-        plt.barh(y_pos, abundance, align="center", color="black")
-        plt.yticks(y_pos, objects)
-        plt.gca().invert_yaxis()
-        plt.xlabel("Average abundance (%)")
-
-        fig = plt.gcf()
-
         if save:
             fname = (
                 f"{experiment_folder / 'graphs' / 'abundance_top_features_exemplars'}_{data_forexplanations}_"
                 + f"{model_name}"
             )
             fname += "_holdout" if holdout else ""
-            save_fig(fig, fname)
-
-        plt.draw()
-        plt.tight_layout()
-        plt.pause(0.001)
-        time.sleep(2)
-        # Close the figure to ensure we start anew
-        plt.clf()
-        plt.close()
+            plot(
+                "plotting.shap.plots_shap:draw_abundance",
+                fname,
+                objects=objects,
+                abundance=abundance,
+            )
 
         # Clear keras and TF sessions/graphs etc.
-        K.clear_session()
+        clear_keras_session()
 
 
 def shap_summary_plot(
@@ -701,13 +763,12 @@ def shap_summary_plot(
 
         omicLogger.info(f"Plotting SHAP for {model_name}")
         model = load_model(model_name, model_path)
-        # Define the figure object
-        fig, ax = plt.subplots()
         # Select the right explainer from SHAP
         shap_dict[model_name][0]
         # Calculate the shap values
         shap_values = shap_dict[model_name][1]
         # Handle regression and classification differently
+        class_names = None
         if problem_type == CLASSIFICATION:
             # Try to get the class names
             try:
@@ -716,34 +777,22 @@ def shap_summary_plot(
                 omicLogger.info(
                     "Unable to get class names automatically - classes will be encoded"
                 )
-                class_names = None
 
+        if save:
+            fname = f"{experiment_folder / 'graphs' / 'shap_summary'}_{model_name}"
+            fname += "_holdout" if holdout else ""
             # Use SHAP's summary plot
-            shap.summary_plot(
-                shap_values,
-                df_test,
+            plot(
+                "plotting.shap.plots_shap:draw_summary_plot",
+                fname,
+                shap_values=shap_values,
+                features=df_test,
                 plot_type="violin",
-                show=False,
                 class_names=class_names,
             )
-        elif problem_type == REGRESSION:
-            shap.summary_plot(shap_values, df_test, plot_type="violin", show=False)
-        # Get the figure object
-        fig = plt.gcf()
-        if save:
-            fname = f"{experiment_folder / 'graphs' / 'shap_summary'}_{model_name}"
-            fname += "_holdout" if holdout else ""
-            save_fig(fig, fname)
-        plt.draw()
-        plt.tight_layout()
-        plt.pause(0.001)
-        time.sleep(2)
-        # Close the figure to ensure we start anew
-        plt.clf()
-        plt.close()
 
         # Clear keras and TF sessions/graphs etc.
-        K.clear_session()
+        clear_keras_session()
 
 
 def compute_shap_vals(
@@ -754,39 +803,64 @@ def compute_shap_vals(
     x_train,
     x_test,
     exemplar_X_test,
+    labels=None,
+    problem_type=None,
+    max_explained=None,
+    nsamples=None,
+    seed=0,
 ):
-    # Compute SHAP values for desired data (either test set x_test, or exemplar_X_test or the entire dataset x)
+    """
+    Compute SHAP values for desired data (either test set x_test, or exemplar_X_test or the entire dataset x), at
+    most `max_explained` of its rows, drawn with the proportions of their `labels` (a dict of the labels of each set),
+    with `nsamples` evaluations of the model per row for the KernelExplainer
+    """
+    import shap
+
     data_indx = pd.read_csv(
         experiment_folder / "transformed_model_input_data.csv",
         index_col=0,
         usecols=["SampleID", "set"],
     )
     if data_forexplanations == "all":
-        shap_values = explainer.shap_values(x)
         data = x
         data_indx = data_indx.index
 
     elif data_forexplanations == "train":
-        shap_values = explainer.shap_values(x_train)
         data = x_train
         data_indx = data_indx[data_indx.set == "Train"].index
 
     elif data_forexplanations == "test":
-        shap_values = explainer.shap_values(x_test)
         data = x_test
         data_indx = data_indx[data_indx.set == "Test"].index
 
     elif data_forexplanations == "exemplars":
-        shap_values = explainer.shap_values(exemplar_X_test)
         data = exemplar_X_test
         data_indx = data_indx[data_indx.set == "Test"].index
 
     # otherwise assume train set
     else:
-        shap_values = explainer.shap_values(x_train)
+        data_forexplanations = "train"
         data = x_train
         data_indx = data_indx[data_indx.set == "Train"].index
 
+    if max_explained is not None:
+        set_labels = (labels or {}).get(data_forexplanations)
+        if set_labels is None or len(set_labels) != len(data):
+            groups = np.zeros(len(data))
+        else:
+            groups = strata(set_labels, problem_type)
+        rows = stratified_sample(groups, max_explained, seed)
+        if rows is not None:
+            omicLogger.info(f"Explaining {len(rows)} of the {len(data)} samples")
+            if len(data_indx) == len(data):
+                data_indx = data_indx[rows]
+            data = data.iloc[rows] if isinstance(data, pd.DataFrame) else data[rows]
+
+    kwargs = {}
+    if nsamples is not None and isinstance(explainer, shap.KernelExplainer):
+        kwargs["nsamples"] = nsamples
+    shap_values = explainer.shap_values(data, **kwargs)
+
     return shap_values, data, data_indx
 
 
@@ -817,58 +891,24 @@ def shap_plot_clf(
 
     # Produce and save SHAP bar plot
 
-    if model_name == "xgboost" and len(class_names) == 2:
-        # Use SHAP's summary plot
-        shap.summary_plot(
-            shap_values_selected,
-            data,
-            plot_type="bar",
-            max_display=num_top,
-            color=plt.get_cmap("Set3"),
-            feature_names=feature_names,
-            show=False,
-            class_names=class_names,
-        )
-        fig = plt.gcf()
-
-        # Save the plot for multi-class classification
-        if save:
-            fname = f"{experiment_folder / 'graphs' / 'shap_bar_plot'}_{data_forexplanations}_{model_name}"
-            fname += "_holdout" if holdout else ""
-            save_fig(fig, fname)
-        plt.draw()
-        plt.tight_layout()
-        plt.pause(0.001)
-        time.sleep(2)
-        # Close the figure to ensure we start anew
-        plt.clf()
-        plt.close()
-
-    else:
+    # Save the plot for multi-class classification
+    if save:
+        fname = f"{experiment_folder / 'graphs' / 'shap_bar_plot'}_{data_forexplanations}_{model_name}"
+        fname += "_holdout" if holdout else ""
         # Use SHAP's summary plot
-        shap.summary_plot(
-            shap_values_selected,
-            data,
+        plot(
+            "plotting.shap.plots_shap:draw_summary_plot",
+            fname,
+            shap_values=shap_values_selected,
+            features=data,
+            cmap=(
+                "Set3" if model_name == "xgboost" and len(class_names) == 2 else None
+            ),
             plot_type="bar",
             max_display=num_top,
             feature_names=feature_names,
-            show=False,
             class_names=class_names,
         )
-        fig = plt.gcf()
-
-        # Save the plot for multi-class classification
-        if save:
-            fname = f"{experiment_folder / 'graphs' / 'shap_bar_plot'}_{data_forexplanations}_{model_name}"
-            fname += "_holdout" if holdout else ""
-            save_fig(fig, fname)
-        plt.draw()
-        plt.tight_layout()
-        plt.pause(0.001)
-        time.sleep(2)
-        # Close the figure to ensure we start anew
-        plt.clf()
-        plt.close()
 
     (
         objects,
@@ -897,10 +937,8 @@ def shap_plot_clf(
         holdout,
     )
 
-    plt.clf()
-    plt.close()
     # Clear keras and TF sessions/graphs etc.
-    K.clear_session()
+    clear_keras_session()
 
     return objects, abundance, shap_values_mean_sorted
 
@@ -935,63 +973,38 @@ def shap_plot_reg(
         df_shapley_values.index.name = "SampleID"
         df_shapley_values.to_csv(fname + ".csv")
 
-    # Plot shap bar plot
-    shap.summary_plot(
-        shap_values_selected,
-        data,
-        plot_type="bar",
-        color_bar="000",
-        max_display=num_top,
-        feature_names=feature_names,
-        show=False,
-    )
-    fig = plt.gcf()
-
-    # Save the plot
+    # Save the plots
     if save:
+        # Plot shap bar plot
         fname = f"{experiment_folder / 'graphs' / 'shap_bar_plot'}_{data_forexplanations}_{model_name}"
         fname += "_holdout" if holdout else ""
-        save_fig(fig, fname)
-
-    plt.tight_layout()
-    plt.draw()
-    plt.pause(0.001)
-    time.sleep(2)
-    # Close the figure to ensure we start anew
-    plt.clf()
-    plt.close()
-    # Clear keras and TF sessions/graphs etc.
-    K.clear_session()
-
-    #  #Produce and save dot plot for regression
+        plot(
+            "plotting.shap.plots_shap:draw_summary_plot",
+            fname,
+            shap_values=shap_values_selected,
+            features=data,
+            plot_type="bar",
+            color_bar="000",
+            max_display=num_top,
+            feature_names=feature_names,
+        )
 
-    shap.summary_plot(
-        shap_values_selected,
-        data,
-        plot_type="dot",
-        color_bar="000",
-        max_display=num_top,
-        feature_names=feature_names,
-        show=False,
-    )
-    fig = plt.gcf()
-    # Save the plot
-    if save:
+        #  #Produce and save dot plot for regression
         fname = f"{experiment_folder / 'graphs' / 'shap_dot_plot'}_{data_forexplanations}_{model_name}"
         fname += "_holdout" if holdout else ""
-        save_fig(fig, fname)
-
-    plt.tight_layout()
-    plt.draw()
-    plt.pause(0.001)
-    time.sleep(2)
-
-    # Close the figure to ensure we start anew
-    plt.clf()
-    plt.close()
+        plot(
+            "plotting.shap.plots_shap:draw_summary_plot",
+            fname,
+            shap_values=shap_values_selected,
+            features=data,
+            plot_type="dot",
+            color_bar="000",
+            max_display=num_top,
+            feature_names=feature_names,
+        )
 
     # Clear keras and TF sessions/graphs etc.
-    K.clear_session()
+    clear_keras_session()
 
     # Plot abundance bar plot feature from SHAP
     class_names = []
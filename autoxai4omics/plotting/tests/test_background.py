@@ -0,0 +1,99 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from ..shap import background
+from utils.vars import CLASSIFICATION, REGRESSION
+import numpy as np
+import pandas as pd
+import pytest
+
+rng = np.random.default_rng(0)
+DATA = pd.DataFrame(
+    rng.integers(0, 4, size=(300, 5)).astype(float),
+    columns=[f"f{i}" for i in range(5)],
+)
+# 3 classes of 180, 90 & 30 samples
+LABELS = np.repeat([0, 1, 2], [180, 90, 30])
+
+
+def test_stratified_sample():
+    rows = background.stratified_sample(LABELS, 40, seed=3)
+
+    assert len(rows) == len(set(rows)) == 40
+    assert (np.diff(rows) > 0).all()
+    assert np.bincount(LABELS[rows]).tolist() == [24, 12, 4]
+    np.testing.assert_array_equal(
+        rows, background.stratified_sample(LABELS, 40, seed=3)
+    )
+    assert background.stratified_sample(LABELS, 300) is None
+
+
+def test_stratified_sample_remainders():
+    # shares of 3.33, 1.67 & 1: the largest remainder rounded up
+    rows = background.stratified_sample(np.repeat([0, 1, 2], [20, 10, 6]), 6)
+
+    assert np.bincount(np.repeat([0, 1, 2], [20, 10, 6])[rows]).tolist() == [3, 2, 1]
+
+
+def test_strata():
+    np.testing.assert_array_equal(background.strata(LABELS, CLASSIFICATION), LABELS)
+
+    target = rng.normal(size=500)
+    quantiles = background.strata(target, REGRESSION)
+
+    assert np.bincount(quantiles).tolist() == [100] * background.REGRESSION_STRATA
+    assert (
+        target[quantiles == 0].max() < target[quantiles == 1].min()
+    ), "the strata are ordered by the target"
+
+
+def test_minibatch_kmeans():
+    pytest.importorskip("shap")
+
+    summary = background.minibatch_kmeans(DATA, 6)
+
+    assert summary.data.shape == (6, 5)
+    # the share of the samples each mean stands for
+    assert summary.weights.sum() == pytest.approx(1)
+    # rounded to the values the features take
+    assert np.isin(summary.data, np.arange(4)).all()
+
+
+@pytest.mark.parametrize("method", ["kmeans", "minibatch_kmeans"])
+def test_summarise_means(method):
+    pytest.importorskip("shap")
+
+    assert background.summarise(DATA, 4, method).data.shape == (4, 5)
+
+
+def test_summarise_stratified():
+    summary = background.summarise(DATA, 30, "stratified", groups=LABELS)
+
+    assert summary.shape == (30, 5)
+    assert np.bincount(LABELS[DATA.index.get_indexer(summary.index)]).tolist() == [
+        18,
+        9,
+        3,
+    ]
+    # the data itself when no larger than the background
+    pd.testing.assert_frame_equal(
+        background.summarise(DATA.head(3), 30, "stratified"), DATA.head(3)
+    )
+
+
+def test_shared_background(monkeypatch):
+    calls = []
+    monkeypatch.setattr(background, "_BACKGROUNDS", {})
+    monkeypatch.setattr(
+        background,
+        "summarise",
+        lambda data, size, method, groups, seed: calls.append(size) or size,
+    )
+
+    for _ in range(3):
+        background.shared_background(DATA, 10, "stratified", LABELS)
+    background.shared_background(DATA, 20, "stratified", LABELS)
+
+    assert calls == [10, 20]
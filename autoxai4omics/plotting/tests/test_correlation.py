@@ -0,0 +1,41 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from ..importance import correlation
+import numpy as np
+import pytest
+
+rng = np.random.default_rng(0)
+BASE = rng.normal(size=(100, 4))
+# 3 noisy copies of each of the 4 base features, interleaved, then a constant feature
+DATA = np.hstack(
+    [BASE + 0.05 * rng.normal(size=BASE.shape) for _ in range(3)] + [np.ones((100, 1))]
+)
+
+
+@pytest.mark.parametrize("block_values", [correlation.MAX_BLOCK_VALUES, 13, 1])
+def test_correlated_pairs(block_values, monkeypatch):
+    monkeypatch.setattr(correlation, "MAX_BLOCK_VALUES", block_values)
+    expected = np.abs(np.corrcoef(DATA[:, :-1].T)) >= 0.9
+
+    rows, cols = correlation.correlated_pairs(DATA, 0.9)
+
+    assert (rows < cols).all()
+    assert sorted(zip(rows.tolist(), cols.tolist())) == [
+        (i, j) for i, j in zip(*np.nonzero(np.triu(expected, 1)))
+    ]
+
+
+def test_correlated_clusters():
+    clusters = correlation.correlated_clusters(DATA, 0.9)
+
+    assert [c.tolist() for c in clusters] == [
+        [0, 4, 8],
+        [1, 5, 9],
+        [2, 6, 10],
+        [3, 7, 11],
+        [12],
+    ]
+    assert len(correlation.correlated_clusters(DATA, 1.0)) == DATA.shape[1]
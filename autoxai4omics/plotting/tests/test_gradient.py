@@ -0,0 +1,107 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from ..shap import gradient
+from sklearn.linear_model import LinearRegression
+from types import SimpleNamespace
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+
+rng = np.random.default_rng(0)
+X = rng.normal(size=(40, 6)).astype(np.float32)
+BACKGROUND = rng.normal(size=(5, 6)).astype(np.float32)
+
+
+def network(outputs: int, activation: str = None, hidden: bool = False):
+    tf.keras.utils.set_random_seed(0)
+    layers = [tf.keras.Input(shape=(6,))]
+    if hidden:
+        layers.append(tf.keras.layers.Dense(16, activation="relu"))
+    layers.append(tf.keras.layers.Dense(outputs, activation=activation))
+    return tf.keras.Sequential(layers)
+
+
+def test_linear_regression():
+    net = network(1)
+    weights = net.layers[-1].get_weights()[0][:, 0]
+
+    explainer = gradient.KerasGradientExplainer(net, BACKGROUND)
+    values = explainer.shap_values(X)
+
+    assert values.shape == (40, 6)
+    # exact for a linear network: the weights times the difference to the mean background
+    np.testing.assert_allclose(
+        values, (X - BACKGROUND.mean(axis=0)) * weights, rtol=1e-4, atol=1e-5
+    )
+    assert explainer.expected_value == pytest.approx(
+        net(BACKGROUND).numpy().mean(), rel=1e-5
+    )
+
+
+def test_classifier_completeness(monkeypatch):
+    net = network(3, "softmax", hidden=True)
+    explainer = gradient.KerasGradientExplainer(net, BACKGROUND)
+
+    values = explainer.shap_values(X)
+
+    assert values.shape == (40, 6, 3)
+    assert explainer.expected_value.shape == (3,)
+    # the values of a sample sum to its output minus the expected one
+    np.testing.assert_allclose(
+        values.sum(axis=1), net(X).numpy() - explainer.expected_value, atol=5e-3
+    )
+    # the same a sample at a time
+    monkeypatch.setattr(gradient, "MAX_BATCH_VALUES", 1)
+    chunked = gradient.KerasGradientExplainer(net, BACKGROUND)
+    assert chunked.chunk == 1
+    np.testing.assert_allclose(chunked.shap_values(X), values, rtol=1e-4, atol=1e-6)
+
+
+def test_kmeans_background():
+    shap = pytest.importorskip("shap")
+    net = network(1)
+    weights = net.layers[-1].get_weights()[0][:, 0]
+    summary = shap.kmeans(X, 3)
+
+    values = gradient.KerasGradientExplainer(net, summary).shap_values(X[:4])
+
+    # the background weighted by the samples its means stand for
+    mean = summary.weights @ summary.data / summary.weights.sum()
+    np.testing.assert_allclose(values, (X[:4] - mean) * weights, rtol=1e-4, atol=1e-5)
+
+
+def test_sample_shape():
+    tf.keras.utils.set_random_seed(0)
+    net = tf.keras.Sequential(
+        [
+            tf.keras.Input(shape=(6, 1)),
+            tf.keras.layers.Conv1D(4, 3, activation="relu"),
+            tf.keras.layers.Flatten(),
+            tf.keras.layers.Dense(2, activation="softmax"),
+        ]
+    )
+    explainer = gradient.KerasGradientExplainer(net, BACKGROUND)
+
+    values = explainer.shap_values(X[:5])
+
+    assert values.shape == (5, 6, 2)
+    np.testing.assert_allclose(
+        values.sum(axis=1),
+        net(X[:5, :, None]).numpy() - explainer.expected_value,
+        atol=5e-3,
+    )
+
+
+def test_keras_model():
+    net = network(1)
+
+    # loaded, or wrapped by the KerasModel of the training
+    assert gradient.keras_model(SimpleNamespace(model=net)) is net
+    assert (
+        gradient.keras_model(SimpleNamespace(model=SimpleNamespace(model=net))) is net
+    )
+    assert gradient.keras_model(LinearRegression()) is None
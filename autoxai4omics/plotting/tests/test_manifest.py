@@ -0,0 +1,84 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from .. import manifest
+from ..plots_both import barplot_scorer
+from ..plots_clf import conf_matrix_plot
+import pytest
+
+
+@pytest.fixture
+def experiment(tmp_path):
+    (tmp_path / "models").mkdir()
+    (tmp_path / "models" / "rf_best.pkl").write_bytes(b"rf")
+    (tmp_path / "models" / "knn_best.pkl").write_bytes(b"knn")
+    (tmp_path / "graphs").mkdir()
+    return tmp_path
+
+
+def record(experiment, plot_manifest, key, name="conf_matrix_rf.png"):
+    figure = experiment / "graphs" / name
+    figure.write_bytes(b"figure")
+    plot_manifest.record("conf_matrix_rf", key, [str(figure)])
+    return figure
+
+
+def test_up_to_date(experiment):
+    plot_manifest = manifest.PlotManifest(experiment)
+    key = plot_manifest.key(conf_matrix_plot, ["rf"], "data", {"dpi": 200})
+    assert not plot_manifest.up_to_date("conf_matrix_rf", key)
+
+    record(experiment, plot_manifest, key)
+
+    # also when loaded again by the next run
+    assert manifest.PlotManifest(experiment).up_to_date("conf_matrix_rf", key)
+    assert not manifest.PlotManifest(experiment, force=True).up_to_date(
+        "conf_matrix_rf", key
+    )
+
+
+def test_missing_figure(experiment):
+    plot_manifest = manifest.PlotManifest(experiment)
+    key = plot_manifest.key(conf_matrix_plot, ["rf"], "data", {})
+    record(experiment, plot_manifest, key).unlink()
+
+    assert not manifest.PlotManifest(experiment).up_to_date("conf_matrix_rf", key)
+
+
+def test_key(experiment):
+    plot_manifest = manifest.PlotManifest(experiment)
+    key = plot_manifest.key(barplot_scorer, ["rf", "knn"], "data", {"dpi": 200})
+
+    assert key == manifest.PlotManifest(experiment).key(
+        barplot_scorer, ["rf", "knn"], "data", {"dpi": 200}
+    )
+    assert key != plot_manifest.key(barplot_scorer, ["knn", "rf"], "data", {"dpi": 200})
+    assert key != plot_manifest.key(
+        barplot_scorer, ["rf", "knn"], "other", {"dpi": 200}
+    )
+    assert key != plot_manifest.key(barplot_scorer, ["rf", "knn"], "data", {"dpi": 100})
+    assert key != plot_manifest.key(
+        conf_matrix_plot, ["rf", "knn"], "data", {"dpi": 200}
+    )
+
+    (experiment / "models" / "knn_best.pkl").write_bytes(b"knn retrained")
+    assert key != manifest.PlotManifest(experiment).key(
+        barplot_scorer, ["rf", "knn"], "data", {"dpi": 200}
+    )
+
+
+def test_plot_settings():
+    config_dict = {
+        "data": {"name": "x"},
+        "ml": {"model_list": ["rf"], "fit_scorer": "f1_score"},
+        "plotting": {"plot_method": ["conf_matrix"], "render_processes": 2, "dpi": 80},
+    }
+
+    assert manifest.plot_settings(config_dict, holdout=True) == {
+        "holdout": True,
+        "data": {"name": "x"},
+        "ml": {"fit_scorer": "f1_score"},
+        "plotting": {"dpi": 80},
+    }
@@ -0,0 +1,91 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from ..shap import native_tree
+import numpy as np
+import pytest
+
+shap = pytest.importorskip("shap")
+xgb = pytest.importorskip("xgboost")
+lgb = pytest.importorskip("lightgbm")
+
+rng = np.random.default_rng(0)
+X = rng.normal(size=(200, 8))
+Y_BINARY = (X[:, 0] + X[:, 1] > 0).astype(int)
+Y_MULTI = np.digitize(X[:, 0], [-0.5, 0.5])
+Y_REG = 2 * X[:, 0] + X[:, 1]
+
+
+class Wrapped(object):
+    """An AutoXGBoost/AutoLGBM holding the estimator in the model of its training"""
+
+    def __init__(self, estimator):
+        self.model = type("TrainingModel", (), {"model": estimator})()
+
+
+@pytest.mark.parametrize(
+    "estimator, labels",
+    [
+        (xgb.XGBClassifier(n_estimators=20), Y_MULTI),
+        (
+            xgb.XGBClassifier(objective="multi:softmax", num_class=2, n_estimators=20),
+            Y_BINARY,
+        ),
+        (xgb.XGBRegressor(n_estimators=20), Y_REG),
+        (lgb.LGBMClassifier(n_estimators=20, verbose=-1), Y_MULTI),
+        (lgb.LGBMRegressor(n_estimators=20, verbose=-1), Y_REG),
+    ],
+)
+def test_same_as_tree_explainer(estimator, labels):
+    estimator.fit(X, labels)
+    expected = shap.TreeExplainer(estimator)
+    explainer = native_tree.NativeTreeExplainer(estimator)
+
+    values = explainer.shap_values(X)
+
+    np.testing.assert_allclose(values, expected.shap_values(X), atol=1e-4)
+    np.testing.assert_allclose(
+        explainer.expected_value, expected.expected_value, atol=1e-4
+    )
+
+
+@pytest.mark.parametrize(
+    "estimator, positive_class_only",
+    [
+        (xgb.XGBClassifier(n_estimators=20), False),
+        (lgb.LGBMClassifier(n_estimators=20, verbose=-1), False),
+        (lgb.LGBMClassifier(n_estimators=20, verbose=-1), True),
+    ],
+)
+def test_binary(estimator, positive_class_only):
+    estimator.fit(X, Y_BINARY)
+    # the values of the positive class, in log odds
+    expected = shap.TreeExplainer(estimator).shap_values(X)
+    explainer = native_tree.NativeTreeExplainer(estimator, positive_class_only)
+
+    values = explainer.shap_values(X)
+
+    if positive_class_only:
+        np.testing.assert_allclose(values, expected, atol=1e-4)
+    else:
+        assert values.shape == (200, 8, 2)
+        np.testing.assert_allclose(values[:, :, 1], expected, atol=1e-4)
+        np.testing.assert_allclose(values[:, :, 0], -expected, atol=1e-4)
+        # the values & expected value add up to the log odds of each class
+        margin = values[:, :, 1].sum(axis=1) + explainer.expected_value[1]
+        np.testing.assert_allclose(
+            margin,
+            np.log(estimator.predict_proba(X)[:, 1] / estimator.predict_proba(X)[:, 0]),
+            atol=1e-4,
+        )
+
+
+def test_tree_estimator():
+    estimator = xgb.XGBRegressor(n_estimators=2).fit(X, Y_REG)
+
+    assert native_tree.tree_estimator(estimator) is estimator
+    assert native_tree.tree_estimator(Wrapped(estimator)) is estimator
+    assert native_tree.tree_estimator(Wrapped(None)) is None
+    assert native_tree.tree_estimator(object()) is None
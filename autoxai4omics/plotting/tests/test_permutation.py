@@ -0,0 +1,205 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from ..importance import permutation
+from metrics.metric_defs import METRICS
+from sklearn.linear_model import LinearRegression
+from sklearn.neighbors import KNeighborsClassifier
+from utils.vars import CLASSIFICATION, REGRESSION
+import numpy as np
+import pandas as pd
+import pytest
+
+rng = np.random.default_rng(0)
+X = rng.normal(size=(60, 6))
+# only the first two features matter
+Y_REG = 3 * X[:, 0] + X[:, 1]
+Y_CLF = (X[:, 0] + 0.5 * X[:, 1] > 0).astype(int)
+
+
+class CountingKNN(KNeighborsClassifier):
+    """Counts the calls to predict & predict_proba"""
+
+    calls = 0
+
+    def predict(self, X):
+        CountingKNN.calls += 1
+        return super().predict(X)
+
+    def predict_proba(self, X):
+        CountingKNN.calls += 1
+        return super().predict_proba(X)
+
+
+def permuted_loop(model, data, labels, scorer, n_repeats, seed):
+    """The permutation importance of each feature on its own, one predict per feature & repeat"""
+    baseline = scorer(model, data, labels)
+    importances = np.empty((n_repeats, data.shape[1]))
+    for r in range(n_repeats):
+        for f in range(data.shape[1]):
+            permuted = data.copy()
+            permuted[:, f] = data[permutation.permutation(seed, r, f, len(data)), f]
+            importances[r, f] = baseline - scorer(model, permuted, labels)
+    return importances
+
+
+@pytest.mark.parametrize(
+    "model, labels, scorer",
+    [
+        (LinearRegression(), Y_REG, METRICS[REGRESSION]["mean_squared_error"]),
+        (KNeighborsClassifier(), Y_CLF, METRICS[CLASSIFICATION]["f1_score"]),
+        (KNeighborsClassifier(), Y_CLF, METRICS[CLASSIFICATION]["roc_auc_score"]),
+    ],
+)
+def test_permutation_importance(model, labels, scorer, monkeypatch):
+    model.fit(X, labels)
+    # a few copies per batch
+    monkeypatch.setattr(permutation, "MAX_BATCH_VALUES", 4 * X.size)
+
+    importances = permutation.permutation_importance(
+        model, X, labels, scorer, n_repeats=3, seed=7
+    )
+
+    assert importances.shape == (3, 6)
+    np.testing.assert_allclose(
+        importances, permuted_loop(model, X, labels, scorer, n_repeats=3, seed=7)
+    )
+    assert np.median(importances, axis=0)[:2].min() > np.abs(importances[:, 2:]).max()
+
+
+def test_batched_predictions():
+    model = CountingKNN().fit(X, Y_CLF)
+    CountingKNN.calls = 0
+
+    permutation.permutation_importance(
+        model, X, Y_CLF, METRICS[CLASSIFICATION]["f1_score"], n_repeats=5
+    )
+
+    # the baseline, then all the permuted copies at once
+    assert CountingKNN.calls == 2
+
+
+def test_dataframe():
+    data = pd.DataFrame(X, columns=[f"f{i}" for i in range(6)])
+    model = LinearRegression().fit(data, Y_REG)
+    scorer = METRICS[REGRESSION]["r2_score"]
+
+    np.testing.assert_allclose(
+        permutation.permutation_importance(model, data, Y_REG, scorer, seed=1),
+        permutation.permutation_importance(model, X, Y_REG, scorer, seed=1),
+    )
+
+
+def test_processes(monkeypatch):
+    model = LinearRegression().fit(X, Y_REG)
+    scorer = METRICS[REGRESSION]["mean_absolute_error"]
+    serial = permutation.permutation_importance(model, X, Y_REG, scorer, n_jobs=1)
+    monkeypatch.setattr(permutation, "COPIES_PER_WORKER", 10)
+
+    parallel = permutation.permutation_importance(model, X, Y_REG, scorer, n_jobs=3)
+
+    np.testing.assert_allclose(parallel, serial)
+
+
+def test_adaptive_permutation_importance(monkeypatch):
+    data = rng.normal(size=(80, 40))
+    # 3 features clearly on top, 2 all but as important around the cutoff of the top 4
+    labels = data[:, :5] @ np.array([5.0, 4.0, 3.0, 0.41, 0.4])
+    model = LinearRegression().fit(data, labels)
+    scorer = METRICS[REGRESSION]["mean_squared_error"]
+    predicted = []
+    monkeypatch.setattr(
+        permutation._Permuter,
+        "decreases",
+        lambda self, copies, decreases=permutation._Permuter.decreases: (
+            predicted.extend(copies) or decreases(self, copies)
+        ),
+    )
+
+    importances = permutation.adaptive_permutation_importance(
+        model, data, labels, scorer, top_n=4, max_repeats=30, initial_repeats=3
+    )
+
+    repeats = np.array([len(i) for i in importances])
+    assert len(predicted) == repeats.sum() < 40 * 30
+    # only the features near the cutoff are permuted again
+    assert (repeats[5:] == 3).all()
+    assert repeats[3:5].max() > 3
+    assert set(permutation.top_ranked(importances, 3)) == {0, 1, 2}
+    # the same permutations as the fixed number of repeats
+    np.testing.assert_allclose(
+        importances[0],
+        permutation.permutation_importance(model, data, labels, scorer, n_repeats=3)[
+            :, 0
+        ],
+    )
+
+
+def test_adaptive_budget():
+    data = rng.normal(size=(50, 20))
+    labels = data[:, :4].sum(axis=1)
+    model = LinearRegression().fit(data, labels)
+
+    importances = permutation.adaptive_permutation_importance(
+        model,
+        data,
+        labels,
+        METRICS[REGRESSION]["r2_score"],
+        top_n=2,
+        max_repeats=50,
+        initial_repeats=2,
+        max_predictions=45,
+    )
+
+    assert sum(len(i) for i in importances) == 45
+
+
+def test_ranking_uncertainty():
+    importances = [
+        np.array([1.0, 1.1, 0.9]),
+        np.array([0.95, 1.05, 1.0]),
+        np.array([0.0, 0.01, -0.01]),
+        np.array([0.0, 0.0]),
+    ]
+
+    uncertainty = permutation.ranking_uncertainty(importances)
+
+    assert uncertainty["N_repeats"].tolist() == [3, 3, 3, 2]
+    np.testing.assert_allclose(uncertainty["Importance_mean"], [1.0, 1.0, 0.0, 0.0])
+    assert uncertainty["Rank_best"].tolist() == [1, 1, 3, 3]
+    assert uncertainty["Rank_worst"].tolist() == [2, 2, 4, 4]
+
+
+def test_top_ranked():
+    # the first feature is ahead by its mean, behind by its median
+    importances = [np.array([0.0, 0.1, 3.0]), np.array([0.5, 0.6, 0.4]), np.zeros(3)]
+
+    top = permutation.top_ranked(importances, 1)
+
+    assert top.tolist() == [0]
+    # consistent with the range of ranks reported
+    assert permutation.ranking_uncertainty(importances)["Rank_best"][top[0]] == 1
+
+
+def test_groups():
+    # the first feature twice, the model sharing its weight between the copies
+    data = np.hstack([X[:, :1], X])
+    model = LinearRegression().fit(data, Y_REG)
+    scorer = METRICS[REGRESSION]["mean_squared_error"]
+    ungrouped = permutation.permutation_importance(model, data, Y_REG, scorer)
+
+    np.testing.assert_allclose(
+        permutation.permutation_importance(
+            model, data, Y_REG, scorer, groups=[[f] for f in range(7)]
+        ),
+        ungrouped,
+    )
+    grouped = permutation.permutation_importance(
+        model, data, Y_REG, scorer, groups=[[0, 1], [2], [3], [4], [5], [6]]
+    )
+
+    assert grouped.shape == (5, 6)
+    # permuted together, the copies lose what either of them alone would not
+    assert np.median(grouped[:, 0]) > 1.5 * np.median(ungrouped[:, :2].sum(axis=1))
@@ -0,0 +1,168 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from .. import render
+import numpy as np
+import pandas as pd
+import pytest
+import time
+
+rng = np.random.default_rng(0)
+Y_TRUE = rng.normal(size=30)
+SHAP_VALUES = rng.normal(size=(30, 4))
+FEATURES = rng.normal(size=(30, 4))
+FEATURE_NAMES = ["a", "b", "c", "d"]
+
+# the data of a figure of each draw function
+DRAWS = {
+    "plotting.plots_both:draw_model_performance": dict(
+        data=pd.DataFrame(
+            {"F1_Train": [0.9, 0.8], "F1_Test": [0.7, 0.75]}, index=["rf", "knn"]
+        ),
+        metric="F1",
+        low=False,
+    ),
+    "plotting.plots_both:draw_opt_k": dict(
+        sr_n=pd.DataFrame({"r_m": [0.1, -0.2, 0.3], "r_std": [1, 0, -1]}, [10, 20, 40])
+    ),
+    "plotting.plots_both:draw_feat_acc": dict(acc={10: 0.3, 20: 0.2, 40: 0.25}),
+    "plotting.plots_both:draw_barplot_scorer": dict(
+        model_list=["rf", "knn"], fit_scorer="f1_score", all_scores=[0.8, 0.7]
+    ),
+    "plotting.plots_both:draw_boxplot_scorer": dict(
+        model_list=["rf", "knn"], all_scores=[[0.8, 0.7, 0.9], [0.6, 0.7, 0.65]]
+    ),
+    "plotting.plots_clf:draw_roc_curve": dict(
+        model_name="rf",
+        class_names=[0, 1],
+        fpr={0: [0, 0.5, 1], 1: [0, 0.2, 1]},
+        tpr={0: [0, 0.8, 1], 1: [0, 0.9, 1]},
+        roc_auc={0: 0.7, 1: 0.85},
+    ),
+    "plotting.plots_clf:draw_conf_matrix": dict(
+        conf_matrix=np.array([[5, 1], [2, 4]]), class_names=["x", "y"], normalize=False
+    ),
+    "plotting.plots_reg:draw_histograms": dict(y_test=Y_TRUE, y_pred=Y_TRUE + 0.1),
+    "plotting.plots_reg:draw_correlation": dict(
+        y_test=Y_TRUE,
+        y_pred=Y_TRUE + 0.1,
+        class_name="y",
+        model_name="rf",
+        fit_line=True,
+    ),
+    "plotting.plots_reg:draw_distribution_hist": dict(
+        y_test=Y_TRUE, y_pred=Y_TRUE + 0.1
+    ),
+    "plotting.plots_reg:draw_joint": dict(
+        y_test=Y_TRUE, y_pred=Y_TRUE + rng.normal(size=30), kind="reg"
+    ),
+    "plotting.importance.perm_imp:draw_permutation_importance": dict(
+        top_features=np.array(["a", "b"]),
+        top_values=[np.array([0.2, 0.3]), np.array([0.1, 0.05])],
+        fit_scorer="f1_score",
+        problem_type="classification",
+    ),
+    "plotting.shap.plots_shap:draw_force_plot": dict(
+        expected_value=0.5,
+        shap_values=SHAP_VALUES[0],
+        features=FEATURES[0],
+        feature_names=FEATURE_NAMES,
+        title="force",
+    ),
+    "plotting.shap.plots_shap:draw_summary_plot": dict(
+        shap_values=SHAP_VALUES,
+        features=FEATURES,
+        recolor="viridis",
+        plot_type="dot",
+        feature_names=FEATURE_NAMES,
+    ),
+    "plotting.shap.plots_shap:draw_abundance": dict(
+        objects=FEATURE_NAMES, abundance=[4, 3, 2, 1]
+    ),
+}
+
+
+@pytest.fixture(autouse=True)
+def no_sleeping(monkeypatch):
+    def sleep(seconds):
+        raise AssertionError("the figures are drawn without waiting")
+
+    monkeypatch.setattr(time, "sleep", sleep)
+
+
+@pytest.mark.parametrize("draw", list(DRAWS))
+def test_draw_figure(draw, tmp_path):
+    written = render.draw_figure(draw, tmp_path / "figure", DRAWS[draw], "png", 50)
+
+    assert written == f"{tmp_path / 'figure'}.png"
+    assert (tmp_path / "figure.png").stat().st_size > 0
+
+
+def test_plot_without_renderer(tmp_path):
+    render.plot(
+        "plotting.plots_both:draw_feat_acc",
+        tmp_path / "feature_selection_accuracy",
+        **DRAWS["plotting.plots_both:draw_feat_acc"],
+    )
+
+    assert (tmp_path / "feature_selection_accuracy.png").exists()
+    assert not (tmp_path / render.PLOT_DATA_FOLDER).exists()
+
+
+def test_renderer(tmp_path):
+    renderer = render.Renderer(
+        {"plotting": {"fig_format": "svg", "dpi": 50, "render_processes": 1}}
+    ).start()
+    # started inside another, a renderer leaves the figures to it
+    inner = render.Renderer({}).start()
+    for name in ["conf_matrix_rf", "conf_matrix_knn"]:
+        render.plot(
+            "plotting.plots_clf:draw_conf_matrix",
+            tmp_path / name,
+            **DRAWS["plotting.plots_clf:draw_conf_matrix"],
+        )
+    assert inner.stop() == []
+    assert not list(tmp_path.glob("*.svg"))
+
+    written = renderer.stop()
+
+    assert sorted(written) == [
+        f"{tmp_path / 'conf_matrix_knn'}.svg",
+        f"{tmp_path / 'conf_matrix_rf'}.svg",
+    ]
+    assert (tmp_path / render.PLOT_DATA_FOLDER / "conf_matrix_rf.joblib").exists()
+    assert render._RENDERER is None
+
+
+def test_renderer_processes(tmp_path):
+    renderer = render.Renderer({"plotting": {"render_processes": 2}}).start()
+    names = [f"hist_overlap_{i}" for i in range(2 * render.FIGURES_PER_WORKER)]
+    for name in names:
+        render.plot(
+            "plotting.plots_reg:draw_histograms",
+            tmp_path / name,
+            **DRAWS["plotting.plots_reg:draw_histograms"],
+        )
+
+    written = renderer.stop()
+
+    assert written == [f"{tmp_path / name}.png" for name in names]
+    assert all((tmp_path / f"{name}.png").exists() for name in names)
+
+
+def test_summary_plot_per_class():
+    from ..shap.plots_shap import draw_summary_plot
+
+    fig = draw_summary_plot(
+        np.stack([SHAP_VALUES, -SHAP_VALUES], axis=-1),
+        FEATURES,
+        plot_type="bar",
+        feature_names=FEATURE_NAMES,
+        class_names=["x", "y"],
+    )
+
+    # a bar per class, not the interactions of the features
+    assert "interaction" not in fig.axes[0].get_xlabel()
+    assert [t.get_text() for t in fig.axes[0].get_legend().get_texts()] == ["x", "y"]
@@ -0,0 +1,316 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from multiprocessing.connection import wait
+from pathlib import Path
+from threadpoolctl import threadpool_limits
+from typing import Union
+from utils import data_cache
+from utils.lazy import clear_keras_session
+from utils.scheduler import (
+    BatchStatus,
+    JobEstimate,
+    Resources,
+    available_cores,
+    available_memory_mb,
+    estimate_job,
+)
+import gc
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+omicLogger = logging.getLogger("OmicLogger")
+
+# the batch status file, left out of the configs
+STATUS_FILE = "batch_status.json"
+# share of the memory the jobs may take up by default, leaving room for the os & the estimates' errors
+MEMORY_FRACTION = 0.9
+# by how much the memory estimate of a job killed for lack of memory grows before its retry
+OOM_MEMORY_FACTOR = 1.5
+# the module running each mode through its main(config_path)
+MODES = {
+    "train": "mode_train_models",
+    "test": "mode_testing_holdout",
+    "predict": "mode_predict",
+    "plotting": "mode_plotting",
+    "feature": "mode_feature_selection",
+}
+# the modes whose main takes `force`, to redo what their manifests record as done
+FORCE_MODES = ["train", "test", "plotting"]
+
+
+########## CONFIGS ##########
+def find_configs(config_dir: Union[Path, str]) -> list[Path]:
+    """The json configs in `config_dir` and its sub-folders, in the order the batch runs them"""
+    return sorted(p for p in Path(config_dir).rglob("*.json") if p.name != STATUS_FILE)
+
+
+def input_key(config_path: Path) -> Union[tuple, None]:
+    """The input files a config parses, configs sharing them are preferably run by the same worker"""
+    try:
+        with open(config_path) as f:
+            data = json.load(f).get("data", {})
+        return (data.get("file_path"), data.get("metadata_file"))
+    except (OSError, ValueError, AttributeError):
+        # left for the worker to report properly
+        return None
+
+
+########## WORKER ##########
+def _reset_state() -> None:
+    """Release what a config left behind in the worker before the next one runs"""
+    if "matplotlib.pyplot" in sys.modules:
+        sys.modules["matplotlib.pyplot"].close("all")
+    clear_keras_session()
+    gc.collect()
+
+
+def _worker_loop(conn, module_name: str, force: bool = False) -> None:
+    """
+    Body of a worker process: import the mode once, then run the configs received through `conn` until told to stop,
+    sending back the outcome of each, with `force` if given. Each config runs with its joblib, BLAS & OpenMP parallelism limited to the cores
+    it was given. A config failing only fails its own run, the worker carries on.
+    """
+    # as when the modes run alone, this handles pickling issues when cloning for cross-validation
+    multiprocessing.set_start_method("spawn", force=True)
+    module = importlib.import_module(module_name)
+    # only the input of the last config is kept, the worker's memory estimate does not account for more
+    data_cache.enable(max_entries=2)
+
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        config_path, cores = job
+
+        start = time.monotonic()
+        try:
+            os.environ["LOKY_MAX_CPU_COUNT"] = str(cores)
+            with threadpool_limits(limits=cores):
+                if force:
+                    module.main(config_path, force=True)
+                else:
+                    module.main(config_path)
+            status, error = "completed", None
+        except (Exception, SystemExit) as e:
+            status, error = "failed", repr(e)
+        finally:
+            _reset_state()
+        conn.send((status, time.monotonic() - start, error))
+    conn.close()
+
+
+class Worker(object):
+    """A warm worker process, fed the configs to run through a pipe"""
+
+    def __init__(self, context, module_name: str, force: bool = False):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_loop, args=(child_conn, module_name, force)
+        )
+        self.process.start()
+        child_conn.close()
+        self.config_path = None
+        self.estimate = None
+        self.input = None
+        self.started = None
+
+    @property
+    def busy(self) -> bool:
+        return self.config_path is not None
+
+    def submit(
+        self, config_path: Path, key: Union[tuple, None], estimate: JobEstimate
+    ) -> None:
+        self.conn.send((str(config_path), estimate.cores))
+        self.config_path = config_path
+        self.estimate = estimate
+        self.input = key
+        self.started = time.monotonic()
+
+    def done(self) -> Path:
+        config_path, self.config_path = self.config_path, None
+        return config_path
+
+    def stop(self, timeout: float = 30) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+
+
+########## POOL ##########
+def _idle_worker(workers: list[Worker], key: Union[tuple, None]) -> Union[Worker, None]:
+    """An idle worker for a config, preferably one whose last config had the same input (its data is already parsed)"""
+    idle = [w for w in workers if not w.busy]
+    for worker in idle:
+        if key is not None and worker.input == key:
+            return worker
+    return idle[0] if idle else None
+
+
+def _out_of_memory(status: str, error: Union[str, None], exitcode: int = None) -> bool:
+    """Whether a job failed for lack of memory: killed by the OOM killer (SIGKILL) or raising a MemoryError"""
+    if exitcode is not None:
+        return exitcode == -9
+    return status != "completed" and (error or "").startswith("MemoryError")
+
+
+def run_batch(
+    config_paths: list[Path],
+    mode: str,
+    n_workers: int = None,
+    memory_limit_mb: float = None,
+    core_limit: int = None,
+    status_path: Union[Path, None] = None,
+    max_retries: int = 2,
+    module_name: str = None,
+    force: bool = False,
+) -> dict[str, dict]:
+    """
+    Run `mode` on each of the `config_paths` in a pool of up to `n_workers` (by default one per core) warm worker
+    processes, each importing the mode (tensorflow, shap, calour, ...) once and keeping the input files it parsed for
+    the next configs sharing them.
+
+    The memory & cores each config needs are estimated from its input file, models and budget (see `estimate_job`).
+    Configs start longest first, as long as the running ones stay within `memory_limit_mb` (by default 90% of the
+    memory of the machine or container) and `core_limit` (by default the available cores); smaller configs fill in
+    the room left by larger ones. A config too large for the limits runs on its own.
+
+    Every config keeps its own experiment folder & log as when run alone. A failing config, or a worker dying while
+    running it, fails that config only, the dead worker is replaced. A config killed for lack of memory is retried up
+    to `max_retries` times with half the cores and a larger memory estimate. The progress is written to
+    `status_path` (see `BatchStatus`). With `force`, the modes of `FORCE_MODES` redo the plots their manifests record
+    as up to date. Returns the outcome of each config by path.
+    """
+    module_name = module_name or MODES[mode]
+    if force and mode not in FORCE_MODES:
+        omicLogger.warning(f"The {mode} mode has nothing to force, ignoring it")
+        force = False
+    context = multiprocessing.get_context("spawn")
+
+    resources = Resources(
+        memory_limit_mb or available_memory_mb() * MEMORY_FRACTION,
+        core_limit or available_cores(),
+    )
+    n_workers = n_workers or resources.cores
+    estimates = {p: estimate_job(p, resources.cores) for p in config_paths}
+    keys = {p: input_key(p) for p in config_paths}
+    attempts = {p: 0 for p in config_paths}
+    # longest first, sorted keeps the path order among equal estimates
+    pending = sorted(config_paths, key=lambda p: -estimates[p].cost)
+    status = BatchStatus(status_path, resources, estimates)
+    status.write()
+
+    results = {}
+    workers = []
+
+    def _admit():
+        for config_path in list(pending):
+            running = sum(w.busy for w in workers)
+            if running >= n_workers:
+                return
+
+            estimate = estimates[config_path]
+            if not resources.fits(estimate):
+                if running:
+                    continue
+                omicLogger.warning(
+                    f"{config_path} is estimated to need {estimate.memory_mb:.0f}MB & {estimate.cores} cores, over "
+                    f"the limits of {resources.memory_mb:.0f}MB & {resources.cores} cores, running it on its own"
+                )
+
+            worker = _idle_worker(workers, keys[config_path])
+            if worker is None:
+                worker = Worker(context, module_name, force)
+                workers.append(worker)
+
+            pending.remove(config_path)
+            attempts[config_path] += 1
+            omicLogger.info(
+                f"Running config file: {config_path} (~{estimate.memory_mb:.0f}MB, {estimate.cores} cores)"
+            )
+            worker.submit(config_path, keys[config_path], estimate)
+            resources.take(estimate)
+            status.start(config_path, estimate, attempts[config_path])
+
+    def _finish(worker, job_status, duration, error, exitcode=None):
+        resources.release(worker.estimate)
+        estimate = worker.estimate
+        config_path = worker.done()
+
+        if (
+            _out_of_memory(job_status, error, exitcode)
+            and attempts[config_path] <= max_retries
+        ):
+            estimates[config_path] = JobEstimate(
+                estimate.memory_mb * OOM_MEMORY_FACTOR,
+                max(1, estimate.cores // 2),
+                estimate.cost,
+                estimate.cells,
+            )
+            omicLogger.warning(
+                f"{config_path} ran out of memory ({error}), retrying with {estimates[config_path].cores} cores"
+            )
+            # it keeps its place among the longest jobs
+            pending.insert(0, config_path)
+            status.retry(config_path)
+            return
+
+        results[str(config_path)] = {
+            "status": job_status,
+            "duration_s": duration,
+            "error": error,
+        }
+        status.finish(config_path, results[str(config_path)])
+        log = omicLogger.info if job_status == "completed" else omicLogger.error
+        log(
+            f"{config_path} {job_status} in {duration:.1f}s"
+            + (f": {error}" if error else "")
+        )
+
+    try:
+        while pending or any(w.busy for w in workers):
+            _admit()
+
+            busy = [w for w in workers if w.busy]
+            ready = wait([w.conn for w in busy] + [w.process.sentinel for w in busy])
+            for worker in busy:
+                if worker.conn in ready:
+                    try:
+                        _finish(worker, *worker.conn.recv())
+                        continue
+                    except (EOFError, OSError):
+                        pass
+                elif worker.process.sentinel not in ready:
+                    continue
+
+                # the worker died while running its config, a new one will be started when needed
+                worker.process.join()
+                exitcode = worker.process.exitcode
+                _finish(
+                    worker,
+                    "failed",
+                    time.monotonic() - worker.started,
+                    f"worker exited with code {exitcode}",
+                    exitcode,
+                )
+                worker.conn.close()
+                workers.remove(worker)
+    finally:
+        for worker in workers:
+            worker.stop()
+
+    return results
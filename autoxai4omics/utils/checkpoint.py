@@ -0,0 +1,172 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from pathlib import Path
+import hashlib
+import json
+import logging
+import numpy as np
+import os
+import pandas as pd
+
+omicLogger = logging.getLogger("OmicLogger")
+
+CHECKPOINT_FOLDER = "checkpoints"
+
+
+########## HASHING ##########
+def _update(digest, part):
+    if isinstance(part, (pd.DataFrame, pd.Series)):
+        part = part.to_numpy()
+    if isinstance(part, np.ndarray):
+        digest.update(f"{part.dtype}{part.shape}".encode())
+        if part.dtype == object:
+            # the bytes of an object array are pointers, hash the values instead
+            digest.update(json.dumps(part.tolist(), default=str).encode())
+        else:
+            digest.update(np.ascontiguousarray(part).tobytes())
+    elif isinstance(part, dict):
+        digest.update(json.dumps(part, sort_keys=True, default=repr).encode())
+    else:
+        digest.update(repr(part).encode())
+
+
+def fingerprint(*parts) -> str:
+    """
+    Hash of the given arrays, dataframes, dicts & other values (through their repr), stable across processes so it can
+    tell whether results saved by an earlier run were computed from the same settings & data.
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        _update(digest, part)
+    return digest.hexdigest()
+
+
+def file_fingerprint(*paths, chunk_size: int = 1 << 20) -> str:
+    """Hash of the contents of the given files"""
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def checkpoint_folder(experiment_folder: Path) -> Path:
+    """The folder holding the checkpoints of an experiment, created if needed"""
+    folder = Path(experiment_folder) / CHECKPOINT_FOLDER
+    folder.mkdir(parents=True, exist_ok=True)
+    return folder
+
+
+def atomic_write_json(path: Path, obj) -> None:
+    """Write `obj` as json to `path` through a temporary file, so an interrupted write never leaves a partial file"""
+    tmp = Path(f"{path}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(obj, f, indent=4, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+########## MODEL MARKERS ##########
+def marker_path(experiment_folder: Path, model_name: str) -> Path:
+    return checkpoint_folder(experiment_folder) / f"{model_name}_complete.json"
+
+
+def _artifact_entry(path: Path) -> dict:
+    return {"path": str(path), "size": os.path.getsize(path)}
+
+
+def write_marker(
+    experiment_folder: Path, model_name: str, key: str, artifacts: list[Path]
+) -> None:
+    """
+    Mark `model_name` as completed for the settings & data hashed in `key`, listing the `artifacts` (with their sizes)
+    it produced.
+    """
+    atomic_write_json(
+        marker_path(experiment_folder, model_name),
+        {
+            "model": model_name,
+            "key": key,
+            "artifacts": [_artifact_entry(a) for a in artifacts],
+        },
+    )
+
+
+def valid_marker(experiment_folder: Path, model_name: str, key: str) -> bool:
+    """
+    Whether `model_name` was completed by an earlier run for the same `key` and all the artifacts it listed are still
+    in place, unchanged in size.
+    """
+    path = marker_path(experiment_folder, model_name)
+    if not path.exists():
+        return False
+
+    try:
+        with open(path) as f:
+            marker = json.load(f)
+    except ValueError:
+        omicLogger.warning(f"Ignoring unreadable checkpoint marker {path}")
+        return False
+
+    if marker.get("key") != key:
+        omicLogger.info(f"{model_name} checkpoint is for other settings or data")
+        return False
+
+    for artifact in marker["artifacts"]:
+        if (
+            not os.path.exists(artifact["path"])
+            or os.path.getsize(artifact["path"]) != artifact["size"]
+        ):
+            omicLogger.info(
+                f"{model_name} checkpoint artifact {artifact['path']} is missing or changed"
+            )
+            return False
+    return True
+
+
+########## SEARCH LOGS ##########
+class CandidateLog(object):
+    """
+    Append-only JSON lines log of the cross validation scores of the candidates of a hyperparameter search, one line
+    per candidate holding its index, the repr of its parameters and its mean test scores. Lines cut short by an
+    interruption are ignored when the log is read back.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def completed(self, candidates: list[dict]) -> dict[int, dict]:
+        """The scores logged for `candidates`, by candidate index"""
+        done = {}
+        if not self.path.exists():
+            return done
+
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                index = record["index"]
+                if index < len(candidates) and record["params"] == repr(
+                    candidates[index]
+                ):
+                    done[index] = record["scores"]
+        return done
+
+    def append(self, records: list[dict]) -> None:
+        with open(self.path, "a+") as f:
+            # end a line cut short by an interruption so the records start on their own lines
+            if f.tell() > 0:
+                f.seek(f.tell() - 1)
+                if f.read(1) != "\n":
+                    f.write("\n")
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
@@ -0,0 +1,73 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Union
+from utils.profiling import traced
+import logging
+import os
+import pandas as pd
+
+omicLogger = logging.getLogger("OmicLogger")
+
+# the parsed input files by key, None while caching is disabled
+_CACHE: Union[OrderedDict, None] = None
+_MAX_ENTRIES = 0
+
+
+def enable(max_entries: int = 8) -> None:
+    """
+    Keep the last `max_entries` parsed input files in memory, so the configs run one after the other by a batch
+    worker only parse a shared input file once. Disabled by default as a single run reads each file once anyway.
+    """
+    global _CACHE, _MAX_ENTRIES
+    _CACHE = OrderedDict()
+    _MAX_ENTRIES = max_entries
+
+
+def disable() -> None:
+    global _CACHE
+    _CACHE = None
+
+
+def file_key(*paths) -> tuple:
+    """Identity of the given files, changing whenever one of them is modified"""
+    key = []
+    for path in paths:
+        if path is None or path == "":
+            key.append(None)
+            continue
+        stat = os.stat(path)
+        key.append((str(Path(path).resolve()), stat.st_mtime_ns, stat.st_size))
+    return tuple(key)
+
+
+def cached(key: tuple, load: Callable, copy: Callable):
+    """
+    The object loaded by `load`, parsed at most once per `key` while caching is enabled. Each caller gets its own
+    `copy` of the cached object, so in place modifications never leak from one config into the next.
+    """
+    if _CACHE is None:
+        return load()
+
+    if key in _CACHE:
+        omicLogger.debug(f"Reusing the parsed {key[0]}")
+        _CACHE.move_to_end(key)
+    else:
+        _CACHE[key] = load()
+        while len(_CACHE) > _MAX_ENTRIES:
+            _CACHE.popitem(last=False)
+    return copy(_CACHE[key])
+
+
+@traced("read")
+def read_csv(path: Union[Path, str], **kwargs) -> pd.DataFrame:
+    """`pd.read_csv` of an input file, through the cache"""
+    return cached(
+        ("read_csv", file_key(path), tuple(sorted(kwargs.items()))),
+        lambda: pd.read_csv(path, **kwargs),
+        lambda df: df.copy(),
+    )
@@ -0,0 +1,310 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from datetime import datetime
+from pathlib import Path
+from typing import Union
+from utils.checkpoint import file_fingerprint, fingerprint
+from utils.results_store import ResultsStore
+import json
+import logging
+import os
+import pandas as pd
+import sqlite3
+import time
+import uuid
+
+omicLogger = logging.getLogger("OmicLogger")
+
+# the performance results recorded by each mode, by the suffix of their store
+MODE_RESULTS = {
+    "train": "_performance_results_testset",
+    "test": "_performance_results_holdout",
+}
+# the experiment sub-folders whose files are recorded as artifacts
+ARTIFACT_FOLDERS = ["models", "results", "best_model", "graphs"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    status TEXT NOT NULL,
+    config_hash TEXT NOT NULL,
+    data_fingerprint TEXT,
+    experiment_folder TEXT NOT NULL,
+    problem_type TEXT,
+    best_model TEXT,
+    started TEXT NOT NULL,
+    finished TEXT NOT NULL,
+    duration_s REAL NOT NULL,
+    config TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    model TEXT NOT NULL,
+    split TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL,
+    value_json TEXT
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    path TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS file_fingerprints (
+    file_stats TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_name ON runs(name);
+CREATE INDEX IF NOT EXISTS runs_data ON runs(data_fingerprint);
+CREATE INDEX IF NOT EXISTS metrics_lookup ON metrics(metric, model, split);
+CREATE INDEX IF NOT EXISTS metrics_run ON metrics(run_id);
+CREATE INDEX IF NOT EXISTS artifacts_run ON artifacts(run_id);
+"""
+
+
+def connect(index_path: Union[str, Path], timeout: float = 60) -> sqlite3.Connection:
+    """
+    Open (creating it if needed) the experiment index at `index_path`. The index is in WAL mode so readers never block
+    the writers, and a writer waits up to `timeout` seconds for the others to finish their transactions.
+    """
+    Path(index_path).parent.mkdir(parents=True, exist_ok=True)
+    # transactions are handled explicitly
+    conn = sqlite3.connect(str(index_path), timeout=timeout, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA busy_timeout={int(timeout * 1000)}")
+    conn.execute("PRAGMA foreign_keys=ON")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def write_run(
+    conn: sqlite3.Connection, run: dict, metrics: list[dict], artifacts: list[dict]
+) -> None:
+    """
+    Insert a run with its metrics & artifacts in a single transaction, taking the write lock up front (BEGIN
+    IMMEDIATE) so concurrent writers queue instead of failing half way.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            f"INSERT OR REPLACE INTO runs ({', '.join(run)}) VALUES ({', '.join('?' * len(run))})",
+            list(run.values()),
+        )
+        conn.executemany(
+            "INSERT INTO metrics (run_id, model, split, metric, value, value_json) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    run["run_id"],
+                    m["model"],
+                    m["split"],
+                    m["metric"],
+                    m["value"],
+                    m["value_json"],
+                )
+                for m in metrics
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO artifacts (run_id, kind, path) VALUES (?, ?, ?)",
+            [(run["run_id"], a["kind"], a["path"]) for a in artifacts],
+        )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def data_fingerprint(conn: sqlite3.Connection, *paths) -> str:
+    """
+    The file_fingerprint of `paths`, cached in the index by the path, size & modification time of the files so the
+    inputs shared by many runs are only hashed again when they change.
+    """
+    stats = fingerprint(
+        [
+            (str(Path(p).resolve()), os.stat(p).st_size, os.stat(p).st_mtime_ns)
+            for p in paths
+        ]
+    )
+    row = conn.execute(
+        "SELECT fingerprint FROM file_fingerprints WHERE file_stats = ?", (stats,)
+    ).fetchone()
+    if row is not None:
+        return row[0]
+
+    value = file_fingerprint(*paths)
+    conn.execute(
+        "INSERT OR REPLACE INTO file_fingerprints (file_stats, fingerprint) VALUES (?, ?)",
+        (stats, value),
+    )
+    return value
+
+
+########## COLLECTION ##########
+def _metric_rows(experiment_folder: Path, mode: str) -> list[dict]:
+    suffix = MODE_RESULTS.get(mode)
+    if suffix is None:
+        return []
+
+    rows = []
+    for path in sorted((Path(experiment_folder) / "results").glob(f"*{suffix}.jsonl")):
+        records = ResultsStore(path.parent, path.stem).records()
+        for model, split, metric, value in records[
+            ["model", "split", "metric", "value"]
+        ].itertuples(index=False):
+            scalar = isinstance(value, (int, float)) or value is None
+            rows.append(
+                {
+                    "model": model,
+                    "split": split,
+                    "metric": metric,
+                    "value": value if scalar else None,
+                    "value_json": None if scalar else json.dumps(value),
+                }
+            )
+    return rows
+
+
+def _artifact_rows(experiment_folder: Path) -> list[dict]:
+    rows = []
+    for kind in ARTIFACT_FOLDERS:
+        folder = Path(experiment_folder) / kind
+        if folder.is_dir():
+            rows += [
+                {"kind": kind, "path": str(p)}
+                for p in sorted(folder.rglob("*"))
+                if p.is_file()
+            ]
+    return rows
+
+
+def index_run(
+    config_dict: dict,
+    experiment_folder: Path,
+    mode: str,
+    started: float,
+    best_model: str = None,
+) -> Union[str, None]:
+    """
+    Record a completed run of `mode` in the experiment index set in the config (`experiment_index`), doing
+    nothing if none is set. `started` is the time.time() the run started at.
+
+    The run is recorded with a hash of its settings (the config without the data & index entries, shared by replicates
+    over different datasets), a fingerprint of its input files, the performance results of the latest run of the mode,
+    the files of the experiment folder and the selected best model. A failure to index is logged, not raised, so it
+    never fails the run itself. Returns the id of the indexed run.
+    """
+    index_path = config_dict.get("experiment_index")
+    if not index_path:
+        return None
+
+    try:
+        conn = connect(index_path)
+    except Exception as e:
+        omicLogger.error(f"Failed to record the run in the index {index_path}: {e!r}")
+        return None
+
+    try:
+        data = config_dict["data"]
+        finished = time.time()
+        run = {
+            "run_id": uuid.uuid4().hex,
+            "name": data["name"],
+            "mode": mode,
+            "status": "completed",
+            "config_hash": fingerprint(
+                {
+                    k: v
+                    for k, v in config_dict.items()
+                    if k not in ["data", "experiment_index"]
+                }
+            ),
+            "data_fingerprint": data_fingerprint(
+                conn,
+                *[
+                    p
+                    for p in [data.get("file_path"), data.get("metadata_file")]
+                    if p is not None
+                ],
+            ),
+            "experiment_folder": str(experiment_folder),
+            "problem_type": config_dict["ml"]["problem_type"],
+            "best_model": best_model,
+            "started": datetime.fromtimestamp(started).isoformat(
+                timespec="milliseconds"
+            ),
+            "finished": datetime.fromtimestamp(finished).isoformat(
+                timespec="milliseconds"
+            ),
+            "duration_s": finished - started,
+            "config": json.dumps(config_dict, default=str),
+        }
+
+        write_run(
+            conn,
+            run,
+            _metric_rows(experiment_folder, mode),
+            _artifact_rows(experiment_folder),
+        )
+    except Exception as e:
+        omicLogger.error(f"Failed to record the run in the index {index_path}: {e!r}")
+        return None
+    finally:
+        conn.close()
+
+    omicLogger.info(f"Run recorded in the index {index_path} as {run['run_id']}")
+    return run["run_id"]
+
+
+########## QUERIES ##########
+def query(conn: sqlite3.Connection, sql: str, params=()) -> pd.DataFrame:
+    return pd.read_sql_query(sql, conn, params=params)
+
+
+def list_runs(conn: sqlite3.Connection, name: str = None) -> pd.DataFrame:
+    """The indexed runs, optionally those with a name matching the SQL LIKE pattern `name`"""
+    return query(
+        conn,
+        "SELECT run_id, name, mode, best_model, finished, duration_s, config_hash, data_fingerprint FROM runs "
+        "WHERE name LIKE ? ORDER BY finished",
+        (name or "%",),
+    )
+
+
+def best_models(conn: sqlite3.Connection, name: str = None) -> pd.DataFrame:
+    """The best model selected by the latest training run of each dataset (by data fingerprint)"""
+    return query(
+        conn,
+        "SELECT name, data_fingerprint, best_model, finished, experiment_folder FROM runs r "
+        "WHERE mode = 'train' AND name LIKE ? AND finished = ("
+        "  SELECT MAX(finished) FROM runs WHERE mode = 'train' AND data_fingerprint IS r.data_fingerprint"
+        ") ORDER BY name",
+        (name or "%",),
+    )
+
+
+def metric_summary(
+    conn: sqlite3.Connection,
+    metric: str,
+    model: str = None,
+    split: str = "Test",
+    mode: str = "train",
+    name: str = None,
+    stats: tuple[str] = ("count", "median", "mean", "std", "min", "max"),
+) -> pd.DataFrame:
+    """
+    Statistics of `metric` on `split` for each model (or only `model`) across the runs of `mode`, e.g. across the
+    replicates of a config when `name` matches their names.
+    """
+    df = query(
+        conn,
+        "SELECT m.model, m.value FROM metrics m JOIN runs r ON m.run_id = r.run_id "
+        "WHERE m.metric = ? AND m.split = ? AND r.mode = ? AND r.name LIKE ? AND m.model LIKE ? "
+        "AND m.value IS NOT NULL",
+        (metric, split, mode, name or "%", model or "%"),
+    )
+    return df.groupby("model")["value"].agg(list(stats))
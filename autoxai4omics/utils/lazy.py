@@ -0,0 +1,26 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Deferred imports of the heavy dependencies (tensorflow, autokeras, lightgbm, xgboost, shap, calour, ...), so a mode
+only pays for those of the models, data & plots it actually uses
+"""
+
+import functools
+import importlib
+import sys
+
+
+@functools.lru_cache(maxsize=None)
+def import_object(path: str):
+    """The object at `path`, given as "package.module:name", importing its module on the first call"""
+    module_name, _, name = path.partition(":")
+    return getattr(importlib.import_module(module_name), name)
+
+
+def clear_keras_session() -> None:
+    """Clear the keras session & graphs, if tensorflow was imported (i.e. a keras model was used)"""
+    if "tensorflow" in sys.modules:
+        sys.modules["tensorflow"].keras.backend.clear_session()
@@ -17,6 +17,8 @@ from numpy import ndarray
 from omics import geneExp, metabolomic, microbiome, tabular
 from pathlib import Path
 from typing import Literal, Union
+from utils import data_cache
+from utils.profiling import traced
 from utils.save import save_transformed_data
 import joblib
 import json
@@ -70,7 +72,7 @@ def get_non_omic_data(
     """
     omicLogger.debug("Inserting data into DataFrames...")
     # Read the data
-    data = pd.read_csv(path_file)
+    data = data_cache.read_csv(path_file)
 
     # check if the first column is meant to be the index
     # Assumption is that if the first column name is empty/none then it is meant to be an index
@@ -89,7 +91,7 @@ def get_non_omic_data(
 
         else:  # it assumes the data does not contain the target column
             # Read the metadata file
-            metadata = pd.read_csv(metadata_path, index_col=0).sort_index()
+            metadata = data_cache.read_csv(metadata_path, index_col=0).sort_index()
             y = metadata[target].values
             data_notarget = data
 
@@ -213,6 +215,7 @@ def load_data_main(config_dict: dict) -> tuple[pd.DataFrame, ndarray, list[str]]
     return x, y, features_names
 
 
+@traced("load")
 def get_data_R2G(
     config_dict: dict,
     prediction: bool = False,
@@ -268,7 +271,7 @@ def get_data_R2G(
         omicLogger.info(f"loading data from {data_path}")
 
     # load df
-    r2g_df = pd.read_csv(data_path, index_col=0)
+    r2g_df = data_cache.read_csv(data_path, index_col=0)
 
     # validate dataframe
     omicLogger.info("validating loaded dataframe")
@@ -345,6 +348,7 @@ def validate_r2g_dataset(r2g_df: pd.DataFrame):
         )
 
 
+@traced("load")
 def load_data(
     config_dict: dict, mode: Literal["main", "holdout", "prediction"] = "main"
 ) -> tuple[pd.DataFrame, ndarray, list[str]]:
@@ -384,6 +388,7 @@ def load_data(
         )
 
 
+@traced("load")
 def load_previous_AO_data(
     experiment_folder: Path,
 ) -> tuple[list[str], ndarray, ndarray, ndarray, ndarray, ndarray, ndarray]:
@@ -0,0 +1,341 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from pathlib import Path
+from typing import Union
+from utils.checkpoint import atomic_write_json
+import logging
+import os
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+
+omicLogger = logging.getLogger("OmicLogger")
+
+# copies of its input arrays a stage holds at its peak, by the end of the stage's name
+STAGE_COPIES = {
+    # the parser's buffers on top of the dataframe
+    "read": 3,
+    "load": 3,
+    "filter": 3,
+    "split": 2,
+    # the quantiles of the QuantileTransformer & the transformed copy
+    "standardise": 3,
+    "feature selection": 3,
+    "balance": 2,
+    # the concatenation of train & test on top of both
+    "preprocessing": 3,
+    # a copy per cross validation fold & parallel job
+    "tune": 6,
+    "fit": 2,
+    "evaluate": 2,
+    # times the outputs of the model, as the values are a dense array per class
+    "SHAP values": 2,
+}
+# allocation sites listed in the report, by their innermost frames
+TOP_ALLOCATORS = 15
+ALLOCATION_FRAMES = 5
+# growth of the memory since the last tracemalloc snapshot worth taking a new one
+SNAPSHOT_GROWTH = 1.05
+
+
+########## MEASURES ##########
+def rss_mb() -> float:
+    """The current resident memory of the process"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, IndexError):
+        return float("nan")
+
+
+def peak_rss_mb() -> float:
+    """The peak resident memory of the process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KiB elsewhere
+    peak = peak / 1e6 if sys.platform == "darwin" else peak * 1024 / 1e6
+    # the kernel updates its high water mark lazily, it can lag behind the current memory
+    return max(peak, rss_mb())
+
+
+def named_arrays(args: dict) -> dict[str, dict]:
+    """The array sizes among the args of a span by name, the items of a list (e.g. the returned values) by index"""
+    arrays = {}
+    for name, value in args.items():
+        if isinstance(value, dict) and "shape" in value:
+            arrays[name] = value
+        elif isinstance(value, list):
+            for i, item in enumerate(value):
+                if isinstance(item, dict) and "shape" in item:
+                    arrays[f"{name}[{i}]"] = item
+    return arrays
+
+
+def expected_memory_mb(
+    name: str,
+    arrays: dict[str, dict],
+    rss: float,
+    input_mb: float = 0,
+    outputs: int = 1,
+) -> Union[float, None]:
+    """
+    The memory a stage is expected to reach: the memory at its start plus the copies it makes of its input arrays (see
+    `STAGE_COPIES`), or of the input file when it is given none (e.g. when loading it). None for the stages without a
+    known footprint.
+    """
+    copies = next((c for s, c in STAGE_COPIES.items() if name.endswith(s)), None)
+    if copies is None:
+        return None
+    inputs_mb = sum(a["mb"] for a in arrays.values()) or input_mb
+    return rss + copies * outputs * inputs_mb
+
+
+########## PROFILER ##########
+class MemoryProfiler(threading.Thread):
+    """
+    Samples the resident memory of the process every `interval` seconds and at the start & end of every span of the
+    main thread (it is a listener of the `Tracer`), attributing each sample to the innermost span running then. This
+    gives the peak memory of each stage, the stage & the arrays (as attached to the spans) at the overall peak and,
+    with `trace_allocations`, the top tracemalloc allocation sites near that peak.
+
+    A warning is logged when a stage starts that is expected to go over `memory_limit_mb` (see `expected_memory_mb`),
+    from the sizes of its inputs or, before any are known, of the input file (`input_mb`).
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        memory_limit_mb: Union[float, None] = None,
+        input_mb: float = 0,
+        trace_allocations: bool = False,
+    ):
+        super().__init__(daemon=True, name="MemoryProfiler")
+        self.interval = interval
+        self.memory_limit_mb = memory_limit_mb
+        self.input_mb = input_mb
+        self.trace_allocations = trace_allocations
+        self.thread_id = threading.get_ident()
+        self.origin = time.perf_counter()
+        self.samples = []
+        self.stack = []
+        self.stages = []
+        self.warnings = []
+        self.peak = {"rss_mb": 0}
+        self.allocators = None
+        self._snapshot_rss = 0
+        self._started_tracemalloc = False
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def _now(self) -> float:
+        return time.perf_counter() - self.origin
+
+    def _top_allocators(self) -> list[dict]:
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+        return [
+            {
+                # the innermost frames, most recent last
+                "traceback": [f"{f.filename}:{f.lineno}" for f in stat.traceback],
+                "mb": round(stat.size / 1e6, 3),
+                "count": stat.count,
+            }
+            for stat in snapshot.statistics("traceback")[:TOP_ALLOCATORS]
+        ]
+
+    def _sample(self, rss: float = None) -> None:
+        rss = rss_mb() if rss is None else rss
+        with self._lock:
+            t = self._now()
+            stack = list(self.stack)
+            self.samples.append(
+                (round(t, 3), round(rss, 1), stack[-1]["name"] if stack else None)
+            )
+            for entry in stack:
+                entry["peak_rss_mb"] = max(entry["peak_rss_mb"], rss)
+
+            if rss > self.peak["rss_mb"]:
+                arrays = {}
+                for entry in stack:
+                    arrays.update(entry["arrays"])
+                self.peak = {
+                    "rss_mb": round(rss, 1),
+                    "time_s": round(t, 3),
+                    "stage": stack[-1]["name"] if stack else None,
+                    "stack": [entry["name"] for entry in stack],
+                    "arrays": arrays,
+                }
+                if (
+                    self.trace_allocations
+                    and tracemalloc.is_tracing()
+                    and rss > self._snapshot_rss * SNAPSHOT_GROWTH
+                ):
+                    self._snapshot_rss = rss
+                    self.allocators = {
+                        "rss_mb": round(rss, 1),
+                        "stage": self.peak["stage"],
+                        "top": self._top_allocators(),
+                    }
+
+    ########## TRACER LISTENER ##########
+    def enter(self, name: str, args: dict) -> None:
+        if threading.get_ident() != self.thread_id:
+            return
+        rss = rss_mb()
+        arrays = named_arrays(args)
+        expected = expected_memory_mb(
+            name, arrays, rss, self.input_mb, args.get("outputs", 1)
+        )
+        if (
+            expected is not None
+            and self.memory_limit_mb
+            and expected > self.memory_limit_mb
+        ):
+            omicLogger.warning(
+                f"{name} is expected to take up ~{expected:.0f}MB, over the memory limit of "
+                f"{self.memory_limit_mb:.0f}MB (at {rss:.0f}MB with inputs {arrays or f'~{self.input_mb:.0f}MB'})"
+            )
+            self.warnings.append(
+                {
+                    "stage": name,
+                    "expected_mb": round(expected),
+                    "memory_limit_mb": round(self.memory_limit_mb),
+                }
+            )
+        with self._lock:
+            self.stack.append(
+                {
+                    "name": name,
+                    "depth": len(self.stack),
+                    "start_s": round(self._now(), 3),
+                    "rss_start_mb": round(rss, 1),
+                    "peak_rss_mb": rss,
+                    "expected_mb": round(expected) if expected is not None else None,
+                    "arrays": arrays,
+                }
+            )
+        self._sample(rss)
+
+    def exit(self, name: str, event: dict) -> None:
+        if threading.get_ident() != self.thread_id:
+            return
+        rss = rss_mb()
+        self._sample(rss)
+        with self._lock:
+            entry = self.stack.pop()
+        entry.update(
+            end_s=round(self._now(), 3),
+            rss_end_mb=round(rss, 1),
+            peak_rss_mb=round(entry["peak_rss_mb"], 1),
+            growth_mb=round(entry["peak_rss_mb"] - entry["rss_start_mb"], 1),
+            arrays={**entry["arrays"], **named_arrays(event["args"])},
+        )
+        self.stages.append(entry)
+
+    ########## THREAD ##########
+    def start(self) -> None:
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start(ALLOCATION_FRAMES)
+            self._started_tracemalloc = True
+        super().start()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+    ########## REPORT ##########
+    def to_dict(self) -> dict:
+        return {
+            "interval_s": self.interval,
+            "memory_limit_mb": (
+                round(self.memory_limit_mb) if self.memory_limit_mb else None
+            ),
+            "input_mb": round(self.input_mb, 1),
+            "peak": self.peak,
+            "top_allocators": self.allocators,
+            "warnings": self.warnings,
+            "stages": sorted(self.stages, key=lambda s: s["start_s"]),
+            "samples": self.samples,
+        }
+
+    def plot_timeline(self, path: Path) -> None:
+        """The resident memory over time, over the top level stages (children of the mode's span) and the peak"""
+        # drawn without pyplot, whatever its backend
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(12, 5))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+
+        ax.plot(
+            [s[0] for s in self.samples],
+            [s[1] for s in self.samples],
+            color="black",
+            linewidth=1,
+        )
+        colours = {}
+        for stage in sorted(self.stages, key=lambda s: s["start_s"]):
+            if stage["depth"] != 1:
+                continue
+            label = None
+            if stage["name"] not in colours:
+                colours[stage["name"]] = f"C{len(colours) % 10}"
+                label = stage["name"]
+            ax.axvspan(
+                stage["start_s"],
+                stage["end_s"],
+                color=colours[stage["name"]],
+                alpha=0.25,
+                label=label,
+            )
+
+        if self.peak.get("time_s") is not None:
+            ax.plot(self.peak["time_s"], self.peak["rss_mb"], "o", color="red")
+            ax.annotate(
+                f"peak {self.peak['rss_mb']:.0f}MB ({self.peak['stage']})",
+                (self.peak["time_s"], self.peak["rss_mb"]),
+                textcoords="offset points",
+                xytext=(5, 5),
+            )
+        # only drawn when close enough not to flatten the curve
+        if self.memory_limit_mb and self.memory_limit_mb <= 2 * self.peak["rss_mb"]:
+            ax.axhline(
+                self.memory_limit_mb, linestyle="--", color="red", label="memory limit"
+            )
+
+        ax.set_xlabel("Time (s)")
+        ax.set_ylabel("Resident memory (MB)")
+        if colours:
+            ax.legend(loc="upper left", bbox_to_anchor=(1.01, 1), fontsize="small")
+        fig.savefig(path, bbox_inches="tight", dpi=100)
+
+    def write(self, experiment_folder: Path, mode: str) -> None:
+        """Write the report to `memory_profile_<mode>.json` and its timeline to `memory_timeline_<mode>.png`"""
+        experiment_folder = Path(experiment_folder)
+        atomic_write_json(
+            experiment_folder / f"memory_profile_{mode}.json", self.to_dict()
+        )
+        self.plot_timeline(experiment_folder / f"memory_timeline_{mode}.png")
+
+        omicLogger.info(
+            f"Peak memory {self.peak['rss_mb']:.0f}MB in {' > '.join(self.peak.get('stack', []))}"
+        )
+        for stage in sorted(self.stages, key=lambda s: -s["growth_mb"])[:5]:
+            omicLogger.info(
+                f"{stage['name']}: +{stage['growth_mb']:.0f}MB up to {stage['peak_rss_mb']:.0f}MB"
+            )
+        omicLogger.info(
+            f"Memory profile saved at {experiment_folder / f'memory_profile_{mode}.json'}"
+        )
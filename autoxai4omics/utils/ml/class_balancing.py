@@ -15,12 +15,14 @@
 from numpy import ndarray
 from pandas.core.frame import DataFrame
 from typing import Union
+from utils.profiling import traced
 import imblearn
 import logging
 
 omicLogger = logging.getLogger("OmicLogger")
 
 
+@traced("balance")
 def oversample_data(
     x_train: Union[ndarray, DataFrame],
     y_train: Union[ndarray, DataFrame],
@@ -85,6 +87,7 @@ def oversample_data(
     return x_resampled, y_resampled, oversample.sample_indices_
 
 
+@traced("balance")
 def undersample_data(
     x_train: Union[ndarray, DataFrame],
     y_train: Union[ndarray, DataFrame],
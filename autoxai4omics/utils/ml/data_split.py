@@ -18,6 +18,7 @@ from pandas.core.frame import DataFrame
 from sklearn.model_selection import GroupShuffleSplit, GroupKFold, train_test_split
 from sklearn.preprocessing import LabelEncoder
 from typing import Union
+from utils.profiling import traced
 from utils.vars import CLASSIFICATION, REGRESSION
 import logging
 import os
@@ -29,6 +30,7 @@ omicLogger = logging.getLogger("OmicLogger")
 ################### SPLIT DATA ###################
 
 
+@traced("split")
 def split_data(x, y, config_dict):
     """Split the data according to the config (i.e normal split or stratify by groups)."""
     omicLogger.debug("Splitting data...")
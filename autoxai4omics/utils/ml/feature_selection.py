@@ -14,17 +14,17 @@
 
 
 from metrics.metric_defs import METRICS
-from models.model_defs import MODELS
+from models.model_defs import get_model
 from sklearn.feature_selection import VarianceThreshold
 from sklearn.pipeline import Pipeline
 from typing import Union
 from utils.ml.feature_selection_defs import FS_KBEST_METRICS, FS_METHODS
+from utils.profiling import traced
 import logging
 import math
 import numpy as np
 from numpy.typing import ArrayLike
 import pandas as pd
-from plotting.plots_both import feat_acc_plot, opt_k_plot
 
 omicLogger = logging.getLogger("OmicLogger")
 
@@ -56,7 +56,7 @@ def manual_feat_selection(x, y, k_select, method_dict, problem_type):
         omicLogger.debug(
             f"Using {method_dict['name']} with {method_dict['estimator']}..."
         )
-        estimator = MODELS[problem_type][method_dict["estimator"]]["model"](
+        estimator = get_model(problem_type, method_dict["estimator"])(
             random_state=42, n_jobs=-1
         )
         fs_method = FS_METHODS[method_dict["name"]](
@@ -94,7 +94,7 @@ def train_eval_feat_selection_model(
 
     # init the model and metric functions
     omicLogger.debug(f"Init model {eval_model} and metric {eval_metric}")
-    selection_model = MODELS[problem_type][eval_model]["model"]
+    selection_model = get_model(problem_type, eval_model)
     metric = METRICS[problem_type][eval_metric]
 
     # init the model
@@ -140,6 +140,9 @@ def k_selector(experiment_folder, acc, top=True, low=True, save=True):
             ["r_m", "r_std"]
         ].std()  # normalise the values
 
+        # imports matplotlib & seaborn, not needed when the features are not selected automatically
+        from plotting.plots_both import opt_k_plot
+
         opt_k_plot(experiment_folder, sr_n, save)
 
         if low:
@@ -200,6 +203,8 @@ def auto_feat_selection(
         )
 
     # plot feat-acc
+    from plotting.plots_both import feat_acc_plot
+
     feat_acc_plot(experiment_folder, acc, save)
 
     omicLogger.info("Selecting optimum k")
@@ -253,6 +258,7 @@ def generate_k_candicates(
     return n_feature_candicates
 
 
+@traced("feature selection")
 def feat_selection(
     experiment_folder, x, y, features_names, problem_type, FS_dict, save=True
 ) -> tuple[Union[pd.DataFrame, np.ndarray], list[str], Pipeline]:
@@ -9,6 +9,7 @@ from typing import Union
 from utils.ml.class_balancing import oversample_data, undersample_data
 from utils.ml.feature_selection import feat_selection
 from utils.ml.standardisation import standardize_data
+from utils.profiling import traced
 from utils.save import save_transformed_data
 from utils.utils import assert_data_transformers_exists, transform_data
 from utils.vars import CLASSIFICATION
@@ -19,6 +20,7 @@ import numpy as np
 omicLogger = logging.getLogger("OmicLogger")
 
 
+@traced("preprocessing")
 def learn_ml_preprocessing(
     config_dict: dict,
     experiment_folder: Path,
@@ -115,6 +117,7 @@ def learn_ml_preprocessing(
     return x, y, features_names, x_train, x_test, y_train
 
 
+@traced("preprocessing")
 def apply_ml_preprocessing(
     config_dict: dict, experiment_folder: Path, x_to_transform: DataFrame
 ) -> DataFrame:
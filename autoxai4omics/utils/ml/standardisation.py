@@ -13,12 +13,14 @@
 # limitations under the License.
 
 from sklearn.preprocessing import QuantileTransformer
+from utils.profiling import traced
 import logging
 import scipy.sparse
 
 omicLogger = logging.getLogger("OmicLogger")
 
 
+@traced("standardise")
 def standardize_data(data):
     """
     Standardize the input X using Standard Scaler
@@ -3,7 +3,7 @@
 # This software is released under the MIT License.
 # https://opensource.org/licenses/MIT
 
-from typing import Literal
+from typing import Literal, Union
 from pydantic import BaseModel, confloat, PositiveInt
 
 Dropout = confloat(strict=True, ge=0, le=1)
@@ -18,3 +18,5 @@ class AutoKerasModel(BaseModel):
     use_batchnorm: bool = True
     n_trials: PositiveInt = 4
     tuner: Literal["bayesian", "greedy", "hyperband", "random"] = "bayesian"
+    timeout: Union[PositiveInt, None] = None
+    resume: bool = True
@@ -3,10 +3,17 @@
 # This software is released under the MIT License.
 # https://opensource.org/licenses/MIT
 
-from pydantic import BaseModel, PositiveInt
+from pydantic import BaseModel, Field, PositiveInt
+from typing import Literal
+from typing_extensions import Annotated
 
 
 class AutoLgbmModel(BaseModel):
     verbose: bool = False
     n_trials: PositiveInt = 10
     timeout: PositiveInt = 1000
+    early_stopping_rounds: PositiveInt = 10
+    n_parallel_trials: PositiveInt = 1
+    pruner: Literal["none", "median", "hyperband", "successive_halving"] = "none"
+    min_resource: PositiveInt = 10
+    reduction_factor: Annotated[int, Field(ge=2)] = 3
@@ -10,7 +10,9 @@ from .microbiome_model import MicrobiomeModel
 from .ml_model import MlModel
 from .plotting_model import PlottingModel
 from .prediction_model import PredictionModel
+from .profiling_model import ProfilingModel
 from .tabular_model import TabularModel
+from pathlib import Path
 from pydantic import BaseModel, model_validator, Field
 from typing import Union
 from typing_extensions import Annotated
@@ -65,6 +67,18 @@ class ConfigModel(BaseModel):
             description="A subsection containing setting if a prediction job is to be run, this field can be None if not."
         ),
     ] = None
+    profiling: Annotated[
+        ProfilingModel,
+        Field(
+            description="A subsection corresponding to the profiling of the job's performance"
+        ),
+    ] = ProfilingModel()
+    experiment_index: Annotated[
+        Union[Path, None],
+        Field(
+            description="Path of an SQLite index recording every completed run of every mode (created if needed). None to not index the runs."
+        ),
+    ] = None
 
     @model_validator(mode="after")
     def check(self):
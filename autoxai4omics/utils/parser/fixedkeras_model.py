@@ -0,0 +1,16 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from pydantic import BaseModel, PositiveInt
+from typing import Union
+
+
+class FixedKerasModel(BaseModel):
+    n_epochs: PositiveInt = 100
+    batch_size: PositiveInt = 32
+    verbose: bool = False
+    shuffle: bool = True
+    shuffle_buffer: Union[PositiveInt, None] = None
+    cache: bool = False
@@ -7,6 +7,8 @@ from .autokeras_model import AutoKerasModel
 from .autolgbm_model import AutoLgbmModel
 from .autoxgboost_model import AutoXgboostModel
 from .featureSelection_model import FeatureSelectionModel
+from .fixedkeras_model import FixedKerasModel
+from .optuna_model import OptunaModel
 from metrics.metric_defs import METRICS
 from models.model_defs import MODELS
 from pydantic import BaseModel, NonNegativeInt, confloat, model_validator, Field
@@ -33,13 +35,13 @@ class MlModel(BaseModel):
     # TODO: consider making hyper tuning a submodel
     # TODO: add None to hyper tunning method
     hyper_tuning: Annotated[
-        Literal["random", "grid"],
+        Literal["random", "grid", "optuna"],
         Field(description="The hyper_tunning method to use during the job."),
     ] = "random"
     hyper_budget: Annotated[
         NonNegativeInt,
         Field(
-            description='The budget to give for hyper tuning, only used if hyper_tuning is "random".'
+            description='The budget to give for hyper tuning, only used if hyper_tuning is "random" or "optuna".'
         ),
     ] = 50
     # TODO: consider making a stratification /split submodel
@@ -102,6 +104,18 @@ class MlModel(BaseModel):
             description="settings to be used for AutoXgboost if chosen to be train. Can be set to None if not selected."
         ),
     ] = AutoXgboostModel()
+    fixedkeras_config: Annotated[
+        Union[FixedKerasModel, None],
+        Field(
+            description="settings to be used for FixedKeras if chosen to be train. Can be set to None if not selected."
+        ),
+    ] = FixedKerasModel()
+    optuna_config: Annotated[
+        Union[OptunaModel, None],
+        Field(
+            description='settings to be used for the optuna search if hyper_tuning is "optuna". Can be set to None otherwise.'
+        ),
+    ] = OptunaModel()
     feature_selection: Annotated[
         Union[FeatureSelectionModel, None],
         Field(
@@ -113,6 +127,8 @@ class MlModel(BaseModel):
     def check(self):
         if self.hyper_tuning == "grid":
             self.hyper_budget = None
+        if self.hyper_tuning != "optuna":
+            self.optuna_config = None
 
         if self.fit_scorer is None:
             self.fit_scorer = (
@@ -150,6 +166,8 @@ class MlModel(BaseModel):
             self.autolgbm_config = None
         if "AutoXGBoost" not in self.model_list:
             self.autoxgboost_config = None
+        if "FixedKeras" not in self.model_list:
+            self.fixedkeras_config = None
 
         if self.feature_selection:
             self.feature_selection.validateWithProblemType(self.problem_type)
@@ -0,0 +1,29 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from pydantic import BaseModel, Field, PositiveInt
+from typing import Literal, Union
+from typing_extensions import Annotated
+
+
+class OptunaModel(BaseModel):
+    pruner: Annotated[
+        Literal["median", "hyperband", "successive_halving", "none"],
+        Field(
+            description="The pruner used to stop unpromising trials early, based on their running mean CV score."
+        ),
+    ] = "median"
+    n_parallel_trials: Annotated[
+        PositiveInt,
+        Field(
+            description="The number of trials to run at once, the cores are split between them. A trial only learns from those finished before it starts, so a few at most."
+        ),
+    ] = 1
+    timeout: Annotated[
+        Union[PositiveInt, None],
+        Field(
+            description="Time in seconds after which no new trials are started for a model. If None there is no limit."
+        ),
+    ] = None
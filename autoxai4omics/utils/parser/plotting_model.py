@@ -26,25 +26,136 @@ class PlottingModel(BaseModel):
             description="The number of top features to plot if permutation plot is desired to be plotted."
         ),
     ] = 20
+    n_repeats_permImp: Annotated[
+        Union[PositiveInt, None],
+        Field(
+            description="The number of times each feature is shuffled for the permutation importance."
+        ),
+    ] = 5
+    adaptive_permImp: Annotated[
+        Union[bool, None],
+        Field(
+            description="Permute the features near the cutoff of the top features more times, up to n_repeats_permImp, instead of every feature n_repeats_permImp times."
+        ),
+    ] = False
+    initial_repeats_permImp: Annotated[
+        Union[int, None],
+        Field(
+            ge=2,
+            description="The number of times every feature is shuffled before the adaptive permutation importance repeats those near the cutoff.",
+        ),
+    ] = 3
+    max_predictions_permImp: Annotated[
+        Union[PositiveInt, None],
+        Field(
+            description="The most permuted copies of the data predicted by the adaptive permutation importance of a model, unlimited by default."
+        ),
+    ] = None
+    correlation_threshold_permImp: Annotated[
+        Union[float, None],
+        Field(
+            gt=0,
+            le=1,
+            description="If given, the features correlated (absolute Pearson correlation) at least this much are clustered & permuted together.",
+        ),
+    ] = None
+    processes_permImp: Annotated[
+        Union[PositiveInt, None],
+        Field(
+            description="The number of processes computing the permutation importance, by default one per available core."
+        ),
+    ] = None
     top_feats_shap: Annotated[
         Union[PositiveInt, None],
         Field(
             description="The number of top features to plot if shap plots are selected."
         ),
     ] = 20
+    background_size_shap: Annotated[
+        Union[PositiveInt, None],
+        Field(
+            description="The number of samples of the background summarising the training set that the model-agnostic shap explainers replace the features from, and the gradients of the Keras models are integrated from."
+        ),
+    ] = 5
+    background_method_shap: Annotated[
+        Literal["kmeans", "stratified", "minibatch_kmeans", None],
+        Field(
+            description="How the background is made: the weighted means of kmeans, a sample stratified by class (or quantile of the target), or the means of a mini-batch kmeans for large training sets."
+        ),
+    ] = "kmeans"
+    max_explained_shap: Annotated[
+        Union[PositiveInt, None],
+        Field(
+            description="If given, the most samples explained, a sample stratified by class (or quantile of the target) of the explanations_data."
+        ),
+    ] = None
+    nsamples_shap: Annotated[
+        Union[PositiveInt, None],
+        Field(
+            description="The number of evaluations of the model per sample explained by the model-agnostic shap explainer, by default that of shap."
+        ),
+    ] = None
     explanations_data: Annotated[
         Literal["test", "exemplars", "all", None],
         Field(description="Which sets of the data to used for the shap calculations."),
     ] = "all"
+    fig_format: Annotated[
+        Literal["png", "pdf", "svg", "jpg", "tif"],
+        Field(description="The file format of the figures."),
+    ] = "png"
+    dpi: Annotated[
+        PositiveInt,
+        Field(description="The resolution (dots per inch) of the figures."),
+    ] = 200
+    render_processes: Annotated[
+        Union[PositiveInt, None],
+        Field(
+            description="The number of processes drawing the figures, by default one per available core."
+        ),
+    ] = None
+
+    def fill_defaults(self, fields: List[str]):
+        """Set the `fields` given as null to their defaults, the plots they are for needing a value"""
+        for field in fields:
+            if getattr(self, field) is None:
+                setattr(self, field, self.model_fields[field].default)
 
     @model_validator(mode="after")
     def check(self):
         if "shap_plots" not in self.plot_method:
             self.top_feats_shap = None
             self.explanations_data = None
+            self.background_size_shap = None
+            self.background_method_shap = None
+            self.max_explained_shap = None
+            self.nsamples_shap = None
+        else:
+            self.fill_defaults(
+                ["top_feats_shap", "background_size_shap", "background_method_shap"]
+            )
 
         if "permut_imp_test" not in self.plot_method:
             self.top_feats_permImp = None
+            self.n_repeats_permImp = None
+            self.adaptive_permImp = None
+            self.initial_repeats_permImp = None
+            self.max_predictions_permImp = None
+            self.correlation_threshold_permImp = None
+        else:
+            self.fill_defaults(
+                [
+                    "top_feats_permImp",
+                    "n_repeats_permImp",
+                    "adaptive_permImp",
+                    "initial_repeats_permImp",
+                ]
+            )
+        if self.adaptive_permImp and (
+            self.initial_repeats_permImp > self.n_repeats_permImp
+        ):
+            raise ValueError(
+                "initial_repeats_permImp must be at most n_repeats_permImp, the most repeats of a feature"
+            )
 
         return self
 
@@ -0,0 +1,55 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from pydantic import BaseModel, Field, PositiveFloat
+from typing import Union
+from typing_extensions import Annotated
+
+
+class ProfilingModel(BaseModel):
+    trace: Annotated[
+        bool,
+        Field(
+            description="Record the time, cpu time, memory & data sizes of each stage of the run in a chrome trace."
+        ),
+    ] = True
+    cprofile: Annotated[
+        bool,
+        Field(
+            description="Profile every function call of the run with cProfile, slowing it down noticeably."
+        ),
+    ] = False
+    sampling: Annotated[
+        bool,
+        Field(
+            description="Sample the call stack of the run at regular intervals, a low overhead profile."
+        ),
+    ] = False
+    sampling_interval: Annotated[
+        PositiveFloat,
+        Field(description="Seconds between two samples of the sampling profiler."),
+    ] = 0.01
+    memory: Annotated[
+        bool,
+        Field(
+            description="Sample the memory of the run, attributing its peaks to the stages & their arrays, in a report & a timeline graph."
+        ),
+    ] = False
+    memory_interval: Annotated[
+        PositiveFloat,
+        Field(description="Seconds between two samples of the memory."),
+    ] = 0.1
+    tracemalloc: Annotated[
+        bool,
+        Field(
+            description="Also report the top allocation sites of python & numpy memory near the peak, slowing the run down."
+        ),
+    ] = False
+    memory_limit: Annotated[
+        Union[PositiveFloat, None],
+        Field(
+            description="Memory (MB) a stage expected to exceed is warned about, by default the memory of the machine or container."
+        ),
+    ] = None
@@ -0,0 +1,43 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from ..fixedkeras_model import FixedKerasModel as Model
+import pytest
+from copy import deepcopy
+
+TEST_CONFIG = {
+    "n_epochs": 100,
+    "batch_size": 32,
+    "verbose": True,
+    "shuffle": True,
+    "shuffle_buffer": None,
+    "cache": False,
+}
+
+
+class Test_Model:
+    def test_testConfig(self):
+        try:
+            Model(**TEST_CONFIG)
+            assert True
+        except Exception:
+            assert False
+
+    @pytest.mark.parametrize(
+        "key", [k for k, v in Model.model_fields.items() if v.is_required()]
+    )
+    def test_missing_required(self, key):
+        MODIFIED_CONFIG = deepcopy(TEST_CONFIG)
+        del MODIFIED_CONFIG[key]
+
+        try:
+            Model(**MODIFIED_CONFIG)
+            assert False
+        except Exception as e:
+            errs = e.errors()
+            assert len(errs) == 1
+            errs = errs[0]
+            assert errs["type"] == "missing"
+            assert errs["loc"][0] == key
@@ -27,6 +27,7 @@ TEST_CONFIG = {
             "AutoXGBoost",
             "AutoLGBM",
             "AutoKeras",
+            "FixedKeras",
         ],
         "encoding": None,
     },
@@ -48,6 +49,7 @@ TEST_CONFIG = {
             "AutoXGBoost",
             "AutoLGBM",
             "AutoKeras",
+            "FixedKeras",
         ],
         "encoding": None,
     },
@@ -174,10 +176,21 @@ class Test_Model:
 
         assert model.encoding is None
 
-    @pytest.mark.parametrize("autoModel", ["AutoKeras", "AutoLGBM", "AutoXGBoost"])
+    @pytest.mark.parametrize(
+        "autoModel", ["AutoKeras", "AutoLGBM", "AutoXGBoost", "FixedKeras"]
+    )
     def test_nulling_auto_config(self, problem_type, autoModel):
         MODIFIED_CONFIG = deepcopy(TEST_CONFIG[problem_type])
         MODIFIED_CONFIG["model_list"].remove(autoModel)
         model = Model(**MODIFIED_CONFIG)
 
         assert model.model_dump()[f"{autoModel.lower()}_config"] is None
+
+    def test_nulling_optuna_config(self, problem_type):
+        MODIFIED_CONFIG = deepcopy(TEST_CONFIG[problem_type])
+        model = Model(**MODIFIED_CONFIG)
+        assert model.optuna_config is None
+
+        MODIFIED_CONFIG["hyper_tuning"] = "optuna"
+        model = Model(**MODIFIED_CONFIG)
+        assert model.optuna_config is not None
@@ -0,0 +1,40 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from ..optuna_model import OptunaModel as Model
+import pytest
+from copy import deepcopy
+
+TEST_CONFIG = {
+    "pruner": "hyperband",
+    "n_parallel_trials": 2,
+    "timeout": 1000,
+}
+
+
+class Test_Model:
+    def test_testConfig(self):
+        try:
+            Model(**TEST_CONFIG)
+            assert True
+        except Exception:
+            assert False
+
+    @pytest.mark.parametrize(
+        "key", [k for k, v in Model.model_fields.items() if v.is_required()]
+    )
+    def test_missing_required(self, key):
+        MODIFIED_CONFIG = deepcopy(TEST_CONFIG)
+        del MODIFIED_CONFIG[key]
+
+        try:
+            Model(**MODIFIED_CONFIG)
+            assert False
+        except Exception as e:
+            errs = e.errors()
+            assert len(errs) == 1
+            errs = errs[0]
+            assert errs["type"] == "missing"
+            assert errs["loc"][0] == key
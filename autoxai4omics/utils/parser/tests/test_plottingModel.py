@@ -50,6 +50,19 @@ class Test_Model:
 
         assert model.top_feats_shap is None
         assert model.explanations_data is None
+        assert model.background_size_shap is None
+        assert model.background_method_shap is None
+        assert model.max_explained_shap is None
+        assert model.nsamples_shap is None
+
+    def test_shapDefaults(self):
+        MODIFIED_CONFIG = deepcopy(TEST_CONFIG)
+        MODIFIED_CONFIG.update(background_size_shap=None, background_method_shap=None)
+
+        model = Model(**MODIFIED_CONFIG)
+
+        assert model.background_size_shap == 5
+        assert model.background_method_shap == "kmeans"
 
     def test_permuteNulling(self):
         MODIFIED_CONFIG = deepcopy(TEST_CONFIG)
@@ -58,6 +71,30 @@ class Test_Model:
         model = Model(**MODIFIED_CONFIG)
 
         assert model.top_feats_permImp is None
+        assert model.n_repeats_permImp is None
+        assert model.adaptive_permImp is None
+        assert model.correlation_threshold_permImp is None
+
+    def test_permuteDefaults(self):
+        MODIFIED_CONFIG = deepcopy(TEST_CONFIG)
+        MODIFIED_CONFIG.update(
+            n_repeats_permImp=None, adaptive_permImp=None, initial_repeats_permImp=None
+        )
+
+        model = Model(**MODIFIED_CONFIG)
+
+        assert model.n_repeats_permImp == 5
+        assert model.adaptive_permImp is False
+        assert model.initial_repeats_permImp == 3
+
+    def test_adaptive_repeats(self):
+        MODIFIED_CONFIG = deepcopy(TEST_CONFIG)
+        MODIFIED_CONFIG.update(
+            adaptive_permImp=True, initial_repeats_permImp=10, n_repeats_permImp=5
+        )
+
+        with pytest.raises(ValueError, match="initial_repeats_permImp"):
+            Model(**MODIFIED_CONFIG)
 
     def test_validation_problem_type(self):
         model = Model(**TEST_CONFIG)
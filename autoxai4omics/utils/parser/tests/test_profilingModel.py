@@ -0,0 +1,55 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from ..profiling_model import ProfilingModel as Model
+import pytest
+from copy import deepcopy
+
+TEST_CONFIG = {
+    "trace": True,
+    "cprofile": False,
+    "sampling": True,
+    "sampling_interval": 0.05,
+    "memory": True,
+    "memory_interval": 0.5,
+    "tracemalloc": False,
+    "memory_limit": 16000,
+}
+
+
+class Test_Model:
+    def test_testConfig(self):
+        try:
+            Model(**TEST_CONFIG)
+            assert True
+        except Exception:
+            assert False
+
+    @pytest.mark.parametrize(
+        "key", [k for k, v in Model.model_fields.items() if v.is_required()]
+    )
+    def test_missing_required(self, key):
+        MODIFIED_CONFIG = deepcopy(TEST_CONFIG)
+        del MODIFIED_CONFIG[key]
+
+        try:
+            Model(**MODIFIED_CONFIG)
+            assert False
+        except Exception as e:
+            errs = e.errors()
+            assert len(errs) == 1
+            errs = errs[0]
+            assert errs["type"] == "missing"
+            assert errs["loc"][0] == key
+
+    @pytest.mark.parametrize(
+        "key", ["sampling_interval", "memory_interval", "memory_limit"]
+    )
+    @pytest.mark.parametrize("value", [0, -0.1])
+    def test_positive(self, key, value):
+        MODIFIED_CONFIG = deepcopy(TEST_CONFIG)
+        MODIFIED_CONFIG[key] = value
+        with pytest.raises(ValueError):
+            Model(**MODIFIED_CONFIG)
@@ -0,0 +1,334 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Union
+from utils.checkpoint import atomic_write_json
+from utils.memory_profiling import MemoryProfiler, peak_rss_mb, rss_mb
+from utils.scheduler import BYTES_PER_CELL, available_memory_mb, data_cells
+import cProfile
+import csv
+import functools
+import inspect
+import logging
+import numpy as np
+import os
+import pandas as pd
+import pstats
+import sys
+import threading
+import time
+
+omicLogger = logging.getLogger("OmicLogger")
+
+# the tracer recording the spans of the current run, None when not tracing
+_TRACER = None
+
+
+def array_sizes(obj) -> Union[dict, list, None]:
+    """
+    Shape & size (MB) of an array, dataframe or series, or of each of those in a tuple or list (e.g. the values returned
+    by a traced function). None if there are none.
+    """
+    if isinstance(obj, (np.ndarray, pd.DataFrame, pd.Series)):
+        nbytes = (
+            obj.memory_usage(index=False, deep=False).sum()
+            if isinstance(obj, pd.DataFrame)
+            else obj.nbytes
+        )
+        return {"shape": list(obj.shape), "mb": round(float(nbytes) / 1e6, 3)}
+    if isinstance(obj, (tuple, list)):
+        sizes = [array_sizes(o) for o in obj]
+        return sizes if any(s is not None for s in sizes) else None
+    return None
+
+
+########## TRACER ##########
+class Tracer(object):
+    """
+    Records the spans of a run as chrome trace events (https://ui.perfetto.dev or chrome://tracing), each with its
+    wall time, cpu time, resident memory at its end, peak resident memory so far and the sizes of the arrays attached
+    to it. The cpu time is that of the whole process (all its threads), not of the processes it started.
+
+    The `listeners` (e.g. the `MemoryProfiler`) are told when each span starts & ends, through their
+    `enter(name, args)` & `exit(name, event)` methods.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pid = os.getpid()
+        self.origin = time.perf_counter()
+        self.events = []
+        self.listeners = []
+        self._lock = threading.Lock()
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self.origin) * 1e6
+
+    @contextmanager
+    def span(self, name: str, cat: str = "pipeline", **args):
+        for listener in self.listeners:
+            listener.enter(name, args)
+        start, cpu_start = self._now_us(), time.process_time()
+        event = {"name": name, "cat": cat, "args": args}
+        try:
+            yield event["args"]
+        finally:
+            event.update(
+                ph="X",
+                ts=start,
+                dur=self._now_us() - start,
+                pid=self.pid,
+                tid=threading.get_ident(),
+            )
+            event["args"].update(
+                cpu_s=round(time.process_time() - cpu_start, 4),
+                rss_mb=round(rss_mb(), 1),
+                peak_rss_mb=round(peak_rss_mb(), 1),
+            )
+            with self._lock:
+                self.events.append(event)
+            for listener in self.listeners:
+                listener.exit(name, event)
+
+    def summary(self) -> list[dict]:
+        """Total wall & cpu seconds and calls per span name, slowest first"""
+        totals = {}
+        for event in self.events:
+            total = totals.setdefault(
+                event["name"],
+                {"name": event["name"], "calls": 0, "wall_s": 0, "cpu_s": 0},
+            )
+            total["calls"] += 1
+            total["wall_s"] += event["dur"] / 1e6
+            total["cpu_s"] += event["args"]["cpu_s"]
+        return sorted(totals.values(), key=lambda t: -t["wall_s"])
+
+    def to_dict(self) -> dict:
+        metadata = [
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": self.pid,
+                "args": {"name": self.name},
+            }
+        ]
+        return {
+            "traceEvents": metadata + sorted(self.events, key=lambda e: e["ts"]),
+            "displayTimeUnit": "ms",
+        }
+
+
+@contextmanager
+def _span(name: str, cat: str, args: dict):
+    tracer = _TRACER
+    if tracer is None:
+        yield {}
+        return
+
+    for k, v in args.items():
+        sizes = array_sizes(v)
+        if sizes is not None:
+            args[k] = sizes
+    with tracer.span(name, cat, **args) as span_args:
+        yield span_args
+
+
+def span(name: str, cat: str = "pipeline", **args):
+    """
+    Record the enclosed code as a span of the current trace, with the keyword `args` attached (arrays are recorded by
+    their sizes). Yields the dict of the span's args so more can be attached from within. Does nothing when not tracing.
+    """
+    return _span(name, cat, args)
+
+
+def traced(name: str, cat: str = "pipeline"):
+    """
+    Decorator recording each call of a function as a span, with the sizes of the arrays it is given (by argument name)
+    and of those it returns
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _TRACER is None:
+                return func(*args, **kwargs)
+            try:
+                bound = signature.bind(*args, **kwargs).arguments
+            except TypeError:
+                # left for the call itself to raise
+                bound = {}
+            inputs = {k: v for k, v in bound.items() if array_sizes(v) is not None}
+            with _span(name, cat, inputs) as span_args:
+                out = func(*args, **kwargs)
+                sizes = array_sizes(out)
+                if sizes is not None:
+                    span_args["returned"] = sizes
+                return out
+
+        return wrapper
+
+    return decorator
+
+
+########## SAMPLING ##########
+class SamplingProfiler(threading.Thread):
+    """
+    Low overhead statistical profiler: a thread sampling the call stack of `thread_id` every `interval` seconds,
+    counting the collapsed stacks ("outer;...;inner" function names) it finds them in.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.01):
+        super().__init__(daemon=True, name="SamplingProfiler")
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})"
+                )
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def write(self, path: Path) -> None:
+        """Write the samples in the collapsed stack format read by flame graph tools (e.g. speedscope)"""
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+########## CPROFILE ##########
+def write_cprofile_csv(prof: cProfile.Profile, path: Path) -> None:
+    """Write the cProfile statistics as a csv, a row per function, slowest (cumulative time) first"""
+    stats = pstats.Stats(prof).stats
+    rows = []
+    for (filename, lineno, function), (cc, nc, tt, ct, _) in stats.items():
+        rows.append(
+            [
+                nc if nc == cc else f"{nc}/{cc}",
+                round(tt, 6),
+                round(tt / nc, 6) if nc else 0,
+                round(ct, 6),
+                round(ct / cc, 6) if cc else 0,
+                f"{filename}:{lineno}({function})",
+            ]
+        )
+    rows.sort(key=lambda r: -r[3])
+
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            [
+                "ncalls",
+                "tottime",
+                "percall",
+                "cumtime",
+                "percall",
+                "filename:lineno(function)",
+            ]
+        )
+        writer.writerows(rows)
+
+
+########## PROFILER ##########
+class Profiler(object):
+    """
+    Profiles the run of a mode as set in the `profiling` entry of its config, writing to the experiment folder:
+
+    - `trace`: the stage spans to `performance_trace_<mode>.json`, a chrome trace
+    - `memory`: the memory per stage to `memory_profile_<mode>.json` & `memory_timeline_<mode>.png` (see
+      `MemoryProfiler`)
+    - `cprofile`: the deterministic profile of every function call to `time_profile.csv`
+    - `sampling`: the sampled call stacks of the main thread to `sampling_profile_<mode>.txt`
+    """
+
+    def __init__(self, config_dict: dict, experiment_folder: Path, mode: str):
+        self.config = config_dict.get("profiling") or {}
+        self.input_file = (config_dict.get("data") or {}).get("file_path")
+        self.experiment_folder = Path(experiment_folder)
+        self.mode = mode
+        self.tracer = None
+        self.memory = None
+        self.cprofile = None
+        self.sampler = None
+        self._run_span = None
+
+    def start(self) -> "Profiler":
+        global _TRACER
+        if self.config.get("trace", True) or self.config.get("memory", False):
+            self.tracer = _TRACER = Tracer(f"AutoXAI4Omics {self.mode}")
+            if self.config.get("memory", False):
+                self.memory = MemoryProfiler(
+                    self.config.get("memory_interval", 0.1),
+                    self.config.get("memory_limit") or available_memory_mb(),
+                    data_cells(self.input_file) * BYTES_PER_CELL / 1e6,
+                    self.config.get("tracemalloc", False),
+                )
+                self.tracer.listeners.append(self.memory)
+                self.memory.start()
+            self._run_span = span(self.mode, cat="mode")
+            self._run_span.__enter__()
+        if self.config.get("cprofile", False):
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+        if self.config.get("sampling", False):
+            self.sampler = SamplingProfiler(
+                threading.get_ident(), self.config.get("sampling_interval", 0.01)
+            )
+            self.sampler.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop profiling and write the profiles, also when the run failed so the stages up to the failure are kept"""
+        global _TRACER
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            write_cprofile_csv(
+                self.cprofile, self.experiment_folder / "time_profile.csv"
+            )
+            self.cprofile = None
+
+        if self.sampler is not None:
+            self.sampler.stop()
+            self.sampler.write(
+                self.experiment_folder / f"sampling_profile_{self.mode}.txt"
+            )
+            self.sampler = None
+
+        if self.tracer is None:
+            return
+        self._run_span.__exit__(None, None, None)
+        _TRACER = None
+
+        if self.memory is not None:
+            self.memory.stop()
+            self.memory.write(self.experiment_folder, self.mode)
+            self.memory = None
+
+        if self.config.get("trace", True):
+            path = self.experiment_folder / f"performance_trace_{self.mode}.json"
+            atomic_write_json(path, self.tracer.to_dict())
+            for total in self.tracer.summary()[:10]:
+                omicLogger.debug(
+                    f"{total['name']}: {total['wall_s']:.2f}s wall, {total['cpu_s']:.2f}s cpu, {total['calls']} calls"
+                )
+            omicLogger.info(f"Performance trace saved at {path}")
+        self.tracer = None
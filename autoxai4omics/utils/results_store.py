@@ -0,0 +1,132 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from datetime import datetime
+from pathlib import Path
+from typing import Union
+import json
+import logging
+import numpy as np
+import os
+import pandas as pd
+import uuid
+
+omicLogger = logging.getLogger("OmicLogger")
+
+SPLITS = ["Train", "Test"]
+
+
+def _to_json(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _from_json(value):
+    # the per class scores & confusion matrices are arrays
+    return np.array(value) if isinstance(value, list) else value
+
+
+def split_score_name(name: str) -> tuple[str, str]:
+    """Split an `evaluate_model` score name, e.g. "f1_score_PerClass_Test", into its metric & split"""
+    metric, split = name.rsplit("_", 1)
+    if split not in SPLITS:
+        raise ValueError(f"{name} does not end with one of {SPLITS}")
+    return metric, split
+
+
+class ResultsStore(object):
+    """
+    Append-only JSON lines store of model performance results, one record per (model, split, metric) holding its
+    `value` and the `run` that computed it. Saving a model's results only appends its records, the legacy wide csv
+    (a row per model, a `<metric>_<split>` column per score) is generated from the store once all models are done.
+
+    Every run appends to the same file, the views default to the records of the latest run.
+    """
+
+    def __init__(self, results_folder: Path, name: str):
+        self.path = Path(results_folder) / f"{name}.jsonl"
+        self.csv_path = Path(results_folder) / f"{name}.csv"
+        self.run = None
+
+    def start_run(self) -> str:
+        """Start a new run, the records appended from now on belong to it"""
+        self.run = f"{datetime.now():%Y%m%d%H%M%S}_{uuid.uuid4().hex[:8]}"
+        return self.run
+
+    def append(self, model_name: str, score_dict: dict) -> None:
+        """Append the scores of `model_name`, keyed as returned by `evaluate_model`"""
+        if self.run is None:
+            self.start_run()
+
+        time = datetime.now().isoformat(timespec="seconds")
+        with open(self.path, "a") as f:
+            for name, value in score_dict.items():
+                metric, split = split_score_name(name)
+                record = {
+                    "run": self.run,
+                    "time": time,
+                    "model": model_name,
+                    "split": split,
+                    "metric": metric,
+                    "value": _to_json(value),
+                }
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def records(self, run: Union[str, None] = "latest") -> pd.DataFrame:
+        """
+        The stored records as a long dataframe, of the given `run`, of the latest one by default or of all of them if
+        None. A model's records appended again within a run replace its earlier ones.
+        """
+        columns = ["run", "time", "model", "split", "metric", "value"]
+        if not self.path.exists():
+            return pd.DataFrame(columns=columns)
+
+        with open(self.path) as f:
+            df = pd.DataFrame.from_records(
+                [json.loads(line) for line in f if line.strip()], columns=columns
+            )
+        if df.empty or run is None:
+            return df
+
+        run = df["run"].iloc[-1] if run == "latest" else run
+        df = df[df["run"] == run]
+        return df.drop_duplicates(["model", "split", "metric"], keep="last")
+
+    def metrics(self) -> list[str]:
+        """The scalar metrics of the latest run, i.e. leaving out the per class scores & confusion matrices"""
+        df = self.records()
+        scalar = df["value"].map(lambda v: not isinstance(v, list))
+        return list(dict.fromkeys(df.loc[scalar, "metric"]))
+
+    def metric_frame(self, metric: str) -> pd.DataFrame:
+        """The train & test values of `metric` in the latest run, a row per model & a `<metric>_<split>` column each"""
+        df = self.records()
+        df = df[df["metric"] == metric]
+        wide = df.pivot(index="model", columns="split", values="value")
+        wide = wide.loc[list(dict.fromkeys(df["model"])), SPLITS].astype(float)
+        wide.columns = [f"{metric}_{split}" for split in SPLITS]
+        wide.columns.name = None
+        return wide
+
+    def to_frame(self) -> pd.DataFrame:
+        """The latest run as the legacy wide dataframe, in the order the models & scores were appended"""
+        df = self.records()
+        rows = {}
+        for model, metric, split, value in df[
+            ["model", "metric", "split", "value"]
+        ].itertuples(index=False):
+            rows.setdefault(model, {})[f"{metric}_{split}"] = _from_json(value)
+        return pd.DataFrame.from_records(list(rows.values()), index=list(rows.keys()))
+
+    def write_csv(self) -> Path:
+        """Write the legacy csv view of the latest run"""
+        self.to_frame().to_csv(self.csv_path, index_label="model")
+        omicLogger.info(f"Results saved at {self.csv_path}")
+        return self.csv_path
@@ -98,37 +98,6 @@ def save_fig(fig, fname, dpi=200, fig_format="png"):
     )
 
 
-def save_results(
-    results_folder,
-    df,
-    score_dict,
-    model_name,
-    fname,
-    suffix=None,
-    save_pkl=False,
-    save_csv=True,
-):
-    """
-    Store the results of the latest model and save this to csv
-    """
-    omicLogger.debug("Save results to file...")
-
-    # df = df.append(pd.Series(score_dict, name=model_name))
-    # TODO: remove above if below works
-    df = pd.concat([df, pd.DataFrame.from_records([score_dict], index=[model_name])])
-    fname = str(results_folder / fname)
-    # Add a suffix to the filename if provided
-    if suffix is not None:
-        fname += suffix
-    # Save as a csv
-    if save_csv:
-        df.to_csv(fname + ".csv", index_label="model")
-    # Pickle using pandas internal access to it
-    if save_pkl:
-        df.to_pickle(fname + ".pkl")
-    return df, fname
-
-
 def save_model(experiment_folder, model, model_name):
     """
     Save a given model to the model folder
@@ -0,0 +1,261 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from datetime import datetime
+from pathlib import Path
+from typing import Union
+from utils.checkpoint import atomic_write_json
+import json
+import logging
+import math
+import os
+import time
+
+omicLogger = logging.getLogger("OmicLogger")
+
+########## ESTIMATES ##########
+# memory of a warm worker with a mode imported, before any data is loaded
+WORKER_MEMORY_MB = 800
+# copies of the data held at once: raw, filtered, split, preprocessed & the search folds
+DATA_COPIES = 6
+BYTES_PER_CELL = 8
+# data cells worth giving a job one more core
+CELLS_PER_CORE = 1_000_000
+# extra memory of the models building a tensorflow graph
+MODEL_MEMORY_MB = {"AutoKeras": 1000, "FixedKeras": 500}
+# relative cost of fitting a model once, models not listed count 1
+MODEL_COST = {
+    "AutoKeras": 20,
+    "FixedKeras": 5,
+    "AutoXGBoost": 3,
+    "AutoLGBM": 2,
+    "RandomForestClassifier": 2,
+    "RandomForestRegressor": 2,
+    "AdaBoostClassifier": 2,
+    "AdaBoostRegressor": 2,
+    "SVC": 2,
+    "SVR": 2,
+}
+# the models running their own number of trials instead of the hyper_budget
+AUTO_TRIALS = {
+    "AutoKeras": "autokeras_config",
+    "AutoXGBoost": "autoxgboost_config",
+    "AutoLGBM": "autolgbm_config",
+}
+DEFAULT_TRIALS = 10
+
+
+def _count_lines(path: Path, chunk_size: int = 1 << 20) -> int:
+    lines = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            lines += chunk.count(b"\n")
+    return lines
+
+
+def data_cells(path: Union[Path, str, None]) -> int:
+    """
+    Number of values in an input file: rows x columns of a csv, or its size over 8 bytes for the other formats (e.g.
+    biom) as a rough upper bound. 0 if there is no such file.
+    """
+    if not path or not os.path.isfile(path):
+        return 0
+    if str(path).endswith(".csv"):
+        with open(path) as f:
+            n_columns = f.readline().count(",") + 1
+        return n_columns * max(_count_lines(path) - 1, 1)
+    return os.path.getsize(path) // BYTES_PER_CELL
+
+
+class JobEstimate(object):
+    """Memory (MB), cores and relative runtime `cost` expected for a config"""
+
+    def __init__(self, memory_mb: float, cores: int, cost: float, cells: int = 0):
+        self.memory_mb = memory_mb
+        self.cores = cores
+        self.cost = cost
+        self.cells = cells
+
+    def to_dict(self) -> dict:
+        return {
+            "memory_mb": round(self.memory_mb),
+            "cores": self.cores,
+            "cost": self.cost,
+            "cells": self.cells,
+        }
+
+
+def estimate_job(config_path: Path, max_cores: int) -> JobEstimate:
+    """
+    Estimate the needs of a config from the dimensions of its input file, its `model_list` & its tuning budget.
+
+    The memory is that of a worker plus a few copies of the data (plus one per core, as the parallel jobs of a search
+    get their own) and the graphs of the keras models. A job gets a core per million data values, up to `max_cores`,
+    as smaller ones gain little from more. The cost, used to run the longest jobs first, is the data size times the
+    number of model fits weighted by how expensive each model is. A config that cannot be read gets the smallest
+    estimate, it will fail quickly in its worker.
+    """
+    try:
+        with open(config_path) as f:
+            config = json.load(f)
+        data, ml = config.get("data", {}), config.get("ml", {})
+    except (OSError, ValueError, AttributeError):
+        return JobEstimate(WORKER_MEMORY_MB, 1, 0)
+
+    cells = data_cells(data.get("file_path"))
+    data_mb = cells * BYTES_PER_CELL / 1e6
+    cores = int(min(max_cores, max(1, math.ceil(cells / CELLS_PER_CORE))))
+
+    model_list = ml.get("model_list") or []
+    memory_mb = (
+        WORKER_MEMORY_MB
+        + data_mb * (DATA_COPIES + cores)
+        + sum(MODEL_MEMORY_MB.get(m, 0) for m in model_list)
+    )
+
+    budget = ml.get("hyper_budget") or DEFAULT_TRIALS
+    fits = 0
+    for model in model_list:
+        if model in AUTO_TRIALS:
+            trials = (ml.get(AUTO_TRIALS[model]) or {}).get("n_trials", DEFAULT_TRIALS)
+        else:
+            trials = budget
+        fits += MODEL_COST.get(model, 1) * trials
+    cost = max(cells, 1) * max(fits, 1)
+
+    return JobEstimate(memory_mb, cores, cost, cells)
+
+
+########## LIMITS ##########
+def available_cores() -> int:
+    """The cores this process may run on"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def available_memory_mb() -> float:
+    """The memory of the machine, or of the container's cgroup if it is limited"""
+    total = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    for cgroup_limit in [
+        "/sys/fs/cgroup/memory.max",
+        "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+    ]:
+        try:
+            with open(cgroup_limit) as f:
+                total = min(total, int(f.read().strip()))
+        except (OSError, ValueError):
+            # no such cgroup or no limit ("max")
+            continue
+    return total / 1e6
+
+
+class Resources(object):
+    """The memory & cores the running jobs are allowed to take up together"""
+
+    def __init__(self, memory_mb: float, cores: int):
+        self.memory_mb = memory_mb
+        self.cores = cores
+        self.used_memory_mb = 0
+        self.used_cores = 0
+
+    def fits(self, estimate: JobEstimate) -> bool:
+        return (
+            self.used_memory_mb + estimate.memory_mb <= self.memory_mb
+            and self.used_cores + estimate.cores <= self.cores
+        )
+
+    def take(self, estimate: JobEstimate) -> None:
+        self.used_memory_mb += estimate.memory_mb
+        self.used_cores += estimate.cores
+
+    def release(self, estimate: JobEstimate) -> None:
+        self.used_memory_mb -= estimate.memory_mb
+        self.used_cores -= estimate.cores
+
+
+########## STATUS ##########
+class BatchStatus(object):
+    """
+    Progress of a batch, rewritten atomically to a json file at every change so it can be watched while the batch
+    runs: the counts of configs per state, the throughput, an ETA from the cost of the remaining jobs, the resources in
+    use and the details of the running & finished jobs.
+    """
+
+    def __init__(
+        self,
+        path: Union[Path, None],
+        resources: Resources,
+        estimates: dict[Path, JobEstimate],
+    ):
+        self.path = Path(path) if path else None
+        self.resources = resources
+        self.total = len(estimates)
+        self.pending_cost = {str(p): e.cost for p, e in estimates.items()}
+        self.started = time.time()
+        self.running = {}
+        self.finished = {}
+        self.retries = 0
+
+    def start(self, config_path: Path, estimate: JobEstimate, attempt: int) -> None:
+        self.pending_cost.pop(str(config_path))
+        self.running[str(config_path)] = {
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "attempt": attempt,
+            **estimate.to_dict(),
+        }
+        self.write()
+
+    def retry(self, config_path: Path) -> None:
+        job = self.running.pop(str(config_path))
+        self.pending_cost[str(config_path)] = job["cost"]
+        self.retries += 1
+        self.write()
+
+    def finish(self, config_path: Path, result: dict) -> None:
+        job = self.running.pop(str(config_path))
+        self.finished[str(config_path)] = {
+            "cost": job["cost"],
+            "attempt": job["attempt"],
+            **result,
+        }
+        self.write()
+
+    def to_dict(self) -> dict:
+        elapsed = time.time() - self.started
+        done_cost = sum(r["cost"] for r in self.finished.values())
+        remaining_cost = sum(self.pending_cost.values()) + sum(
+            r["cost"] for r in self.running.values()
+        )
+        completed = sum(r["status"] == "completed" for r in self.finished.values())
+        return {
+            "started": datetime.fromtimestamp(self.started).isoformat(
+                timespec="seconds"
+            ),
+            "updated": datetime.now().isoformat(timespec="seconds"),
+            "elapsed_s": round(elapsed, 1),
+            "total": self.total,
+            "pending": len(self.pending_cost),
+            "running": len(self.running),
+            "completed": completed,
+            "failed": len(self.finished) - completed,
+            "retries": self.retries,
+            "configs_per_hour": round(len(self.finished) / elapsed * 3600, 2),
+            # the remaining cost at the rate the finished jobs were done
+            "eta_s": round(remaining_cost / done_cost * elapsed) if done_cost else None,
+            "resources": {
+                "memory_mb": round(self.resources.memory_mb),
+                "used_memory_mb": round(self.resources.used_memory_mb),
+                "cores": self.resources.cores,
+                "used_cores": self.resources.used_cores,
+            },
+            "running_jobs": self.running,
+            "finished_jobs": self.finished,
+        }
+
+    def write(self) -> None:
+        if self.path is not None:
+            atomic_write_json(self.path, self.to_dict())
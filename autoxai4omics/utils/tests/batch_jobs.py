@@ -0,0 +1,39 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""Stand-in mode for the batch tests, the config says what to do"""
+
+from pathlib import Path
+from utils import data_cache
+import json
+import os
+import signal
+
+
+def main(config_path=None, force=False):
+    with open(config_path) as f:
+        config = json.load(f)
+
+    if config["job"] == "fail":
+        raise ValueError("config failed")
+    elif config["job"] == "crash":
+        os._exit(3)
+    elif config["job"] == "oom" and not Path(config["out"]).exists():
+        # killed as by the OOM killer on the first attempt only
+        Path(config["out"]).write_text("{}")
+        os.kill(os.getpid(), signal.SIGKILL)
+
+    df = data_cache.read_csv(config["data"]["file_path"])
+    Path(config["out"]).write_text(
+        json.dumps(
+            {
+                "pid": os.getpid(),
+                "cached": len(data_cache._CACHE),
+                "rows": len(df),
+                "cores": os.environ["LOKY_MAX_CPU_COUNT"],
+                "force": force,
+            }
+        )
+    )
@@ -0,0 +1,190 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from types import SimpleNamespace
+import json
+import pandas as pd
+from .. import batch, data_cache, scheduler
+
+
+def _write_config(folder, name, job, data_file, ml=None):
+    path = folder / f"{name}.json"
+    path.write_text(
+        json.dumps(
+            {
+                "job": job,
+                "out": str(folder / f"{name}.out"),
+                "data": {"file_path": str(data_file)},
+                "ml": ml or {},
+            }
+        )
+    )
+    return path
+
+
+def _write_data(path, n_rows, n_cols=1):
+    pd.DataFrame({f"x{i}": range(n_rows) for i in range(n_cols)}).to_csv(
+        path, index=False
+    )
+    return path
+
+
+def test_run_batch(tmp_path):
+    data_a = _write_data(tmp_path / "a.csv", 3)
+    data_b = _write_data(tmp_path / "b.csv", 5)
+
+    configs = [
+        _write_config(tmp_path, "a1", "ok", data_a),
+        _write_config(tmp_path, "a2", "ok", data_a),
+        _write_config(tmp_path, "b1", "ok", data_b),
+        _write_config(tmp_path, "c_fail", "fail", data_a),
+        _write_config(tmp_path, "d_crash", "crash", data_a),
+        _write_config(tmp_path, "e_after", "ok", data_b),
+    ]
+    status_path = tmp_path / batch.STATUS_FILE
+    status_path.write_text("{}")
+    assert batch.find_configs(tmp_path) == configs
+
+    results = batch.run_batch(
+        configs,
+        "train",
+        n_workers=2,
+        memory_limit_mb=1e6,
+        core_limit=2,
+        status_path=status_path,
+        module_name="utils.tests.batch_jobs",
+    )
+
+    status = {p.split("/")[-1]: r["status"] for p, r in results.items()}
+    assert status == {
+        "a1.json": "completed",
+        "a2.json": "completed",
+        "b1.json": "completed",
+        "c_fail.json": "failed",
+        "d_crash.json": "failed",
+        "e_after.json": "completed",
+    }
+    assert "ValueError" in results[str(configs[3])]["error"]
+    assert "code 3" in results[str(configs[4])]["error"]
+
+    out = json.loads((tmp_path / "b1.out").read_text())
+    assert out["rows"] == 5
+    # small jobs are given a single core
+    assert out["cores"] == "1"
+    assert out["force"] is False
+
+    batch_status = json.loads(status_path.read_text())
+    assert batch_status["total"] == 6
+    assert (batch_status["completed"], batch_status["failed"]) == (4, 2)
+    assert batch_status["pending"] == batch_status["running"] == 0
+    assert batch_status["resources"]["used_cores"] == 0
+
+
+def test_oom_retry(tmp_path):
+    data = _write_data(tmp_path / "a.csv", 3)
+    config = _write_config(tmp_path, "oom", "oom", data)
+    status_path = tmp_path / batch.STATUS_FILE
+
+    results = batch.run_batch(
+        [config],
+        "train",
+        core_limit=1,
+        status_path=status_path,
+        module_name="utils.tests.batch_jobs",
+    )
+
+    assert results[str(config)]["status"] == "completed"
+    batch_status = json.loads(status_path.read_text())
+    assert batch_status["retries"] == 1
+    assert batch_status["finished_jobs"][str(config)]["attempt"] == 2
+
+
+def test_force(tmp_path):
+    data = _write_data(tmp_path / "a.csv", 3)
+    configs = [_write_config(tmp_path, "a", "ok", data)]
+
+    for mode, forced in [("plotting", True), ("predict", False)]:
+        batch.run_batch(
+            configs,
+            mode,
+            core_limit=1,
+            status_path=tmp_path / batch.STATUS_FILE,
+            module_name="utils.tests.batch_jobs",
+            force=True,
+        )
+
+        assert json.loads((tmp_path / "a.out").read_text())["force"] is forced
+
+
+def test_idle_worker():
+    workers = [
+        SimpleNamespace(busy=True, input=("a", None)),
+        SimpleNamespace(busy=False, input=("b", None)),
+        SimpleNamespace(busy=False, input=("a", None)),
+    ]
+    assert batch._idle_worker(workers, ("a", None)) is workers[2]
+    assert batch._idle_worker(workers, ("c", None)) is workers[1]
+    assert batch._idle_worker(workers[:1], ("a", None)) is None
+
+
+def test_estimate_job(tmp_path):
+    small = _write_data(tmp_path / "small.csv", 10, 10)
+    large = _write_data(tmp_path / "large.csv", 1000, 2000)
+    assert scheduler.data_cells(large) == 2_000_000
+
+    ml = {"hyper_budget": 10, "model_list": ["KNeighborsClassifier"]}
+    estimate_small = scheduler.estimate_job(
+        _write_config(tmp_path, "small", "ok", small, ml), max_cores=8
+    )
+    estimate_large = scheduler.estimate_job(
+        _write_config(tmp_path, "large", "ok", large, ml), max_cores=8
+    )
+    assert estimate_small.cores == 1
+    assert estimate_large.cores == 2
+    assert estimate_large.memory_mb > estimate_small.memory_mb
+    assert estimate_large.cost > estimate_small.cost
+
+    # more expensive models & larger budgets cost more
+    keras = scheduler.estimate_job(
+        _write_config(
+            tmp_path,
+            "keras",
+            "ok",
+            small,
+            {
+                "hyper_budget": 10,
+                "model_list": ["KNeighborsClassifier", "AutoKeras"],
+                "autokeras_config": {"n_trials": 20},
+            },
+        ),
+        max_cores=8,
+    )
+    assert keras.cost > estimate_small.cost
+    assert keras.memory_mb > estimate_small.memory_mb
+
+    resources = scheduler.Resources(memory_mb=2 * keras.memory_mb, cores=1)
+    assert resources.fits(keras)
+    resources.take(keras)
+    assert not resources.fits(estimate_small)
+    resources.release(keras)
+    assert resources.fits(estimate_small)
+
+
+def test_data_cache(tmp_path):
+    path = _write_data(tmp_path / "data.csv", 3)
+
+    data_cache.enable()
+    try:
+        df = data_cache.read_csv(path)
+        df.loc[0, "x0"] = 100
+        # callers get copies
+        assert data_cache.read_csv(path)["x0"].tolist() == [0, 1, 2]
+        assert len(data_cache._CACHE) == 1
+
+        # a modified file is parsed again
+        _write_data(path, 4)
+        assert len(data_cache.read_csv(path)) == 4
+    finally:
+        data_cache.disable()
@@ -0,0 +1,70 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+import numpy as np
+import pandas as pd
+from .. import checkpoint as ck
+
+
+class Test_fingerprint:
+    def test_same_values(self):
+        x = np.arange(12.0).reshape(3, 4)
+        assert ck.fingerprint(x, {"b": 1, "a": 2}) == ck.fingerprint(
+            x.copy(), {"a": 2, "b": 1}
+        )
+
+    def test_object_arrays_by_value(self):
+        y = np.array(["a", "b"], dtype=object)
+        assert ck.fingerprint(y) == ck.fingerprint(y.copy())
+        assert ck.fingerprint(pd.Series(y)) == ck.fingerprint(y)
+
+    def test_differences(self):
+        x = np.arange(12.0)
+        assert ck.fingerprint(x) != ck.fingerprint(x.reshape(3, 4))
+        assert ck.fingerprint(x) != ck.fingerprint(x.astype(np.float32))
+        assert ck.fingerprint("a", 1) != ck.fingerprint("a", 2)
+
+
+class Test_marker:
+    def test_valid(self, tmp_path):
+        artifact = tmp_path / "model.pkl"
+        artifact.write_bytes(b"model")
+        ck.write_marker(tmp_path, "rf", "key", [artifact])
+
+        assert ck.valid_marker(tmp_path, "rf", "key")
+        assert not ck.valid_marker(tmp_path, "rf", "other key")
+        assert not ck.valid_marker(tmp_path, "knn", "key")
+
+    def test_changed_artifact(self, tmp_path):
+        artifact = tmp_path / "model.pkl"
+        artifact.write_bytes(b"model")
+        ck.write_marker(tmp_path, "rf", "key", [artifact])
+
+        artifact.write_bytes(b"partial")
+        assert not ck.valid_marker(tmp_path, "rf", "key")
+        artifact.unlink()
+        assert not ck.valid_marker(tmp_path, "rf", "key")
+
+
+class Test_CandidateLog:
+    CANDIDATES = [{"a": 1}, {"a": 2}, {"a": 3}]
+
+    def test_roundtrip(self, tmp_path):
+        log = ck.CandidateLog(tmp_path / "search.jsonl")
+        assert log.completed(self.CANDIDATES) == {}
+
+        log.append([{"index": 1, "params": repr({"a": 2}), "scores": {"f1": 0.5}}])
+        assert log.completed(self.CANDIDATES) == {1: {"f1": 0.5}}
+        # other candidates do not pick up the logged scores
+        assert log.completed([{"a": 1}, {"a": 5}]) == {}
+
+    def test_interrupted_write(self, tmp_path):
+        log = ck.CandidateLog(tmp_path / "search.jsonl")
+        log.append([{"index": 0, "params": repr({"a": 1}), "scores": {"f1": 0.1}}])
+        with open(log.path, "a") as f:
+            f.write('{"index": 1, "par')
+
+        log.append([{"index": 2, "params": repr({"a": 3}), "scores": {"f1": 0.3}}])
+        assert log.completed(self.CANDIDATES) == {0: {"f1": 0.1}, 2: {"f1": 0.3}}
@@ -0,0 +1,115 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import time
+from .. import experiment_index as ei
+from ..results_store import ResultsStore
+
+
+def _experiment(tmp_path, name, f1):
+    folder = tmp_path / name
+    (folder / "results").mkdir(parents=True)
+    (folder / "models").mkdir()
+    (folder / "models" / "rf_best.pkl").write_bytes(b"model")
+    store = ResultsStore(folder / "results", "scores__performance_results_testset")
+    for model, score in f1.items():
+        store.append(
+            model,
+            {
+                "f1_score_Train": 1.0,
+                "f1_score_Test": score,
+                "f1_score_PerClass_Test": [score, score],
+            },
+        )
+
+    data = tmp_path / f"{name}.csv"
+    data.write_text(name)
+    config = {
+        "data": {
+            "name": name,
+            "file_path": data,
+            "metadata_file": None,
+        },
+        "ml": {"problem_type": "classification", "seed_num": 1},
+        "experiment_index": tmp_path / "index.db",
+    }
+    return config, folder
+
+
+class Test_index_run:
+    def test_not_configured(self, tmp_path):
+        config, folder = _experiment(tmp_path, "a", {"rf": 0.5})
+        config["experiment_index"] = None
+        assert ei.index_run(config, folder, "train", time.time()) is None
+        assert not (tmp_path / "index.db").exists()
+
+    def test_records(self, tmp_path):
+        config, folder = _experiment(tmp_path, "a", {"rf": 0.5, "knn": 0.4})
+        run_id = ei.index_run(config, folder, "train", time.time(), best_model="rf")
+
+        conn = ei.connect(tmp_path / "index.db")
+        runs = ei.query(conn, "SELECT * FROM runs")
+        assert list(runs["run_id"]) == [run_id]
+        assert runs.loc[0, "best_model"] == "rf"
+
+        metrics = ei.query(conn, "SELECT * FROM metrics WHERE value IS NOT NULL")
+        assert len(metrics) == 4
+        per_class = ei.query(conn, "SELECT * FROM metrics WHERE value IS NULL")
+        assert list(per_class["value_json"]) == ["[0.5, 0.5]", "[0.4, 0.4]"]
+
+        artifacts = ei.query(conn, "SELECT kind FROM artifacts")
+        assert set(artifacts["kind"]) == {"models", "results"}
+
+    def test_data_fingerprint_cached(self, tmp_path, monkeypatch):
+        config, folder = _experiment(tmp_path, "a", {"rf": 0.5})
+        hashed = []
+        file_fingerprint = ei.file_fingerprint
+        monkeypatch.setattr(
+            ei,
+            "file_fingerprint",
+            lambda *paths: hashed.append(paths) or file_fingerprint(*paths),
+        )
+        for _ in range(3):
+            ei.index_run(config, folder, "train", time.time())
+        # the unchanged input is hashed once
+        assert len(hashed) == 1
+
+        config["data"]["file_path"].write_text("changed")
+        ei.index_run(config, folder, "train", time.time())
+        assert len(hashed) == 2
+
+        conn = ei.connect(tmp_path / "index.db")
+        runs = ei.list_runs(conn)
+        assert runs["data_fingerprint"].nunique() == 2
+        assert runs["data_fingerprint"].iloc[-1] == file_fingerprint(
+            config["data"]["file_path"]
+        )
+
+    def test_concurrent_writers(self, tmp_path):
+        experiments = [
+            _experiment(tmp_path, f"rep_{i}", {"rf": i / 10, "knn": 0.5})
+            for i in range(8)
+        ]
+        with ThreadPoolExecutor(4) as executor:
+            run_ids = list(
+                executor.map(
+                    lambda e: ei.index_run(*e, "train", time.time(), best_model="rf"),
+                    experiments,
+                )
+            )
+        assert None not in run_ids
+
+        conn = ei.connect(tmp_path / "index.db")
+        assert len(ei.list_runs(conn)) == 8
+        assert len(ei.best_models(conn, "rep_%")) == 8
+
+        summary = ei.metric_summary(conn, "f1_score", name="rep_%")
+        assert summary.loc["rf", "count"] == 8
+        assert summary.loc["rf", "median"] == pytest.approx(0.35)
+        assert summary.loc["knn", "max"] == 0.5
+        # the per class scores are not part of the summary
+        assert list(ei.metric_summary(conn, "f1_score_PerClass").index) == []
@@ -0,0 +1,64 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+from pathlib import Path
+import json
+import pytest
+import subprocess
+import sys
+from .. import lazy
+
+# the dependencies only imported once a model, data type or plot needing them is used
+HEAVY_MODULES = [
+    "tensorflow",
+    "autokeras",
+    "shap",
+    "calour",
+    "optuna",
+    "lightgbm",
+    "xgboost",
+    "bioinfokit",
+]
+# the time they take to import is benchmarked by benchmarks/startup.py
+MODES = [
+    "mode_train_models",
+    "mode_testing_holdout",
+    "mode_plotting",
+    "mode_predict",
+    "mode_feature_selection",
+    "mode_config_duplicate",
+    "mode_batch",
+    "mode_query_index",
+]
+IMPORT_SCRIPT = """
+import json, sys
+import {mode}
+print(json.dumps(list(sys.modules)))
+"""
+
+
+def test_import_object():
+    from sklearn.ensemble import RandomForestClassifier
+
+    assert (
+        lazy.import_object("sklearn.ensemble:RandomForestClassifier")
+        is RandomForestClassifier
+    )
+    with pytest.raises(AttributeError):
+        lazy.import_object("sklearn.ensemble:NotAModel")
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_mode_startup(mode):
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT.format(mode=mode)],
+        cwd=Path(__file__).parents[2],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = json.loads(out.stdout.strip().splitlines()[-1])
+
+    assert not [m for m in HEAVY_MODULES if m in imported]
@@ -0,0 +1,82 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+import json
+import logging
+import numpy as np
+import time
+from .. import memory_profiling, profiling
+
+
+@profiling.traced("standardise")
+def _standardise(x):
+    # ~80MB held for a few samples
+    big = np.ones((10_000_000,))
+    time.sleep(0.1)
+    return x * big[0]
+
+
+def test_expected_memory_mb():
+    arrays = {"x_train": {"shape": [10, 10], "mb": 100}}
+    assert memory_profiling.expected_memory_mb("standardise", arrays, 500) == 800
+    # the SHAP values of each class
+    assert (
+        memory_profiling.expected_memory_mb("SVC SHAP values", arrays, 500, outputs=3)
+        == 1100
+    )
+    # the size of the input file when the stage is given no arrays
+    assert memory_profiling.expected_memory_mb("load", {}, 500, input_mb=10) == 530
+    assert memory_profiling.expected_memory_mb("plot", arrays, 500) is None
+
+
+def test_named_arrays():
+    args = {
+        "x": {"shape": [2, 2], "mb": 1},
+        "returned": [{"shape": [2], "mb": 1}, None],
+        "cpu_s": 0.1,
+    }
+    assert list(memory_profiling.named_arrays(args)) == ["x", "returned[0]"]
+
+
+def test_memory_profile(tmp_path, caplog):
+    x = np.ones((2_500_000,))
+    config = {
+        "trace": False,
+        "memory": True,
+        "memory_interval": 0.01,
+        "tracemalloc": True,
+        # 3 copies of the 20MB input go over it
+        "memory_limit": memory_profiling.rss_mb() + 50,
+    }
+    with caplog.at_level(logging.WARNING, logger="OmicLogger"):
+        profiler = profiling.Profiler({"profiling": config}, tmp_path, "train").start()
+        with profiling.span("outer"):
+            _standardise(x)
+        profiler.stop()
+    assert profiling._TRACER is None
+    assert "standardise is expected to take up" in caplog.text
+
+    report = json.loads((tmp_path / "memory_profile_train.json").read_text())
+    assert report["warnings"][0]["stage"] == "standardise"
+    assert report["peak"]["stage"] == "standardise"
+    assert report["peak"]["stack"] == ["train", "outer", "standardise"]
+    assert report["peak"]["arrays"]["x"] == {"shape": [2500000], "mb": 20.0}
+
+    stages = {s["name"]: s for s in report["stages"]}
+    assert stages["standardise"]["growth_mb"] > 60
+    assert stages["standardise"]["depth"] == 2
+    assert stages["standardise"]["arrays"]["returned"]["mb"] == 20.0
+    assert stages["outer"]["peak_rss_mb"] >= stages["standardise"]["peak_rss_mb"]
+    assert len(report["samples"]) > 5
+
+    assert report["top_allocators"]["stage"] == "standardise"
+    assert report["top_allocators"]["top"][0]["mb"] > 70
+    assert any(
+        "test_memory_profiling.py" in frame
+        for frame in report["top_allocators"]["top"][0]["traceback"]
+    )
+
+    assert (tmp_path / "memory_timeline_train.png").stat().st_size > 0
+    assert not (tmp_path / "performance_trace_train.json").exists()
@@ -0,0 +1,100 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+import csv
+import json
+import numpy as np
+import pandas as pd
+import time
+from .. import profiling
+
+
+@profiling.traced("stage")
+def _stage(n):
+    return np.zeros((n, 4)), pd.DataFrame({"a": range(n)}), "not an array"
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_no_tracer():
+    assert profiling._TRACER is None
+    with profiling.span("untraced") as args:
+        assert args == {}
+    x, df, _ = _stage(3)
+    assert x.shape == (3, 4)
+
+
+def test_trace(tmp_path):
+    profiler = profiling.Profiler({}, tmp_path, "train").start()
+    with profiling.span("load", x=np.ones((1000, 5))):
+        _stage(1000)
+        _busy(0.02)
+    profiler.stop()
+    assert profiling._TRACER is None
+
+    trace = json.loads((tmp_path / "performance_trace_train.json").read_text())
+    events = {e["name"]: e for e in trace["traceEvents"]}
+    assert events["process_name"]["ph"] == "M"
+
+    load, stage, run = events["load"], events["stage"], events["train"]
+    assert load["ph"] == "X"
+    assert load["args"]["x"] == {"shape": [1000, 5], "mb": 0.04}
+    assert load["dur"] >= 20000
+    assert load["args"]["cpu_s"] > 0
+    assert load["args"]["peak_rss_mb"] >= load["args"]["rss_mb"] > 0
+    # nested spans lie within their parent
+    assert run["ts"] <= load["ts"] <= stage["ts"]
+    assert (
+        stage["ts"] + stage["dur"] <= load["ts"] + load["dur"] <= run["ts"] + run["dur"]
+    )
+    assert stage["args"]["returned"] == [
+        {"shape": [1000, 4], "mb": 0.032},
+        {"shape": [1000, 1], "mb": 0.008},
+        None,
+    ]
+
+    assert not (tmp_path / "time_profile.csv").exists()
+    assert not (tmp_path / "sampling_profile_train.txt").exists()
+
+
+def test_span_on_failure(tmp_path):
+    profiler = profiling.Profiler({}, tmp_path, "train").start()
+    try:
+        with profiling.span("failing"):
+            raise ValueError()
+    except ValueError:
+        pass
+    profiler.stop()
+
+    trace = json.loads((tmp_path / "performance_trace_train.json").read_text())
+    assert "failing" in [e["name"] for e in trace["traceEvents"]]
+
+
+def test_cprofile_and_sampling(tmp_path):
+    config = {
+        "trace": False,
+        "cprofile": True,
+        "sampling": True,
+        "sampling_interval": 0.001,
+    }
+    profiler = profiling.Profiler({"profiling": config}, tmp_path, "train").start()
+    _busy(0.1)
+    profiler.stop()
+
+    assert not (tmp_path / "performance_trace_train.json").exists()
+
+    with open(tmp_path / "time_profile.csv") as f:
+        rows = list(csv.reader(f))
+    assert rows[0][0] == "ncalls" and rows[0][-1] == "filename:lineno(function)"
+    assert any("_busy" in row[-1] for row in rows[1:])
+
+    samples = (tmp_path / "sampling_profile_train.txt").read_text().splitlines()
+    assert samples
+    stack, count = samples[0].rsplit(" ", 1)
+    assert "_busy" in stack and int(count) > 0
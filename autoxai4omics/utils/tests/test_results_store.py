@@ -0,0 +1,81 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+import pytest
+import numpy as np
+import pandas as pd
+from ..results_store import ResultsStore, split_score_name
+
+SCORES = {
+    "rf": {
+        "f1_score_Train": np.float64(0.9),
+        "f1_score_Test": 0.8,
+        "f1_score_PerClass_Train": np.array([0.85, 0.95]),
+        "f1_score_PerClass_Test": np.array([0.75, 0.85]),
+        "confusion_matrix_Test": np.array([[3, 1], [0, 4]]),
+    },
+    "knn": {
+        "f1_score_Train": 0.7,
+        "f1_score_Test": 0.6,
+        "f1_score_PerClass_Train": np.array([0.65, 0.75]),
+        "f1_score_PerClass_Test": np.array([0.55, 0.65]),
+        "confusion_matrix_Test": np.array([[2, 2], [1, 3]]),
+    },
+}
+
+
+def _store(tmp_path):
+    store = ResultsStore(tmp_path, "scores")
+    store.start_run()
+    for model, scores in SCORES.items():
+        store.append(model, scores)
+    return store
+
+
+class Test_split_score_name:
+    def test_split(self):
+        assert split_score_name("f1_score_PerClass_Test") == (
+            "f1_score_PerClass",
+            "Test",
+        )
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            split_score_name("f1_score")
+
+
+class Test_ResultsStore:
+    def test_records(self, tmp_path):
+        records = _store(tmp_path).records()
+        assert len(records) == 10
+        assert set(records["split"]) == {"Train", "Test"}
+
+    def test_legacy_csv(self, tmp_path):
+        store = _store(tmp_path)
+        store.write_csv()
+
+        legacy = pd.concat(
+            [pd.DataFrame.from_records([s], index=[m]) for m, s in SCORES.items()]
+        )
+        legacy.to_csv(tmp_path / "legacy.csv", index_label="model")
+        assert (tmp_path / "legacy.csv").read_text() == store.csv_path.read_text()
+
+    def test_metrics(self, tmp_path):
+        store = _store(tmp_path)
+        assert store.metrics() == ["f1_score"]
+
+        frame = store.metric_frame("f1_score")
+        assert list(frame.index) == ["rf", "knn"]
+        assert list(frame.columns) == ["f1_score_Train", "f1_score_Test"]
+        assert frame.loc["rf", "f1_score_Train"] == 0.9
+
+    def test_latest_run(self, tmp_path):
+        store = _store(tmp_path)
+        store.start_run()
+        store.append("rf", {"f1_score_Train": 0.1, "f1_score_Test": 0.2})
+
+        assert list(store.records()["model"].unique()) == ["rf"]
+        assert len(store.records(run=None)) == 12
+        assert store.metric_frame("f1_score").loc["rf", "f1_score_Test"] == 0.2
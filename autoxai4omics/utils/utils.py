@@ -22,16 +22,15 @@ from typing import Union
 from utils.load import load_config
 from utils.parser.config_model import ConfigModel
 from utils.save import save_config
+from utils.vars import PLOT_DATA_FOLDER
 import argparse
-import cProfile
 import glob
-import io
 import joblib
 import logging
+import logging.config
 import numpy as np
 import os
 import pandas as pd
-import pstats
 import re
 import scipy.sparse
 import shutil
@@ -110,6 +109,11 @@ def create_cli_parser():
         required=True,
         help="Filename of the relevant config file. Automatically selects from configs/ subdirectory.",
     )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Make every plot again, including those the plot manifest records as up to date.",
+    )
     return parser
 
 
@@ -131,9 +135,15 @@ def get_config_path_from_cli():
     return config_path
 
 
-def initial_setup():
-    # get the path to the config from cli
-    config_path = get_config_path_from_cli()
+def initial_setup(config_path: Union[Path, str, None] = None):
+    """
+    Load and parse the config at `config_path` (from the cli if not given), then set up the seed, the experiment
+    folder, the logger and the custom models for it.
+    """
+    if config_path is None:
+        # get the path to the config from cli
+        config_path = get_config_path_from_cli()
+    config_path = Path(config_path)
     # load and parse the config located at the path
     config_model = ConfigModel(**load_config(config_path))
     config_dict = config_model.model_dump()
@@ -205,6 +215,8 @@ def copy_best_content(experiment_folder, best_models, collapse_tax):
         for path, subdirs, files in os.walk(str(experiment_folder))
         for name in files
     ]
+    # the data the figures are drawn from stays with them
+    fnames = [x for x in fnames if PLOT_DATA_FOLDER not in Path(x).parts]
     sl_fnames = sorted(
         [x for x in fnames if (best in x) and (".ipynb_checkpoints" not in x)]
     )
@@ -246,22 +258,6 @@ def copy_best_content(experiment_folder, best_models, collapse_tax):
     )
 
 
-def prof_to_csv(prof: cProfile.Profile, config_dict: dict):
-    out_stream = io.StringIO()
-    pstats.Stats(prof, stream=out_stream).print_stats()
-    result = out_stream.getvalue()
-    # chop off header lines
-    result = "ncalls" + result.split("ncalls")[-1]
-    lines = [",".join(line.rstrip().split(None, 5)) for line in result.split("\n")]
-    csv_lines = "\n".join(lines)
-
-    with open(
-        f"{config_dict['data']['save_path']}/results/{config_dict['data']['name']}/time_profile.csv",
-        "w+",
-    ) as f:
-        f.write(csv_lines)
-
-
 def transform_data(data, transformer):
     omicLogger.debug("Transforming given data according to given transformer...")
 
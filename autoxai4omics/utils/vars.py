@@ -14,3 +14,5 @@
 
 CLASSIFICATION = "classification"
 REGRESSION = "regression"
+# the folder of graphs/ holding the data the figures are drawn from
+PLOT_DATA_FOLDER = "plot_data"
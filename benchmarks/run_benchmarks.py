@@ -0,0 +1,428 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Benchmark the stages of the pipeline (loading & filtering, preprocessing, tuning, fitting, evaluation & SHAP) on the
+synthetic omic datasets of `synthetic.py`, in process, timing and memory profiling each stage with the `profiling`
+config entry. The results are written as json and compared against a stored baseline, e.g.
+
+    python benchmarks/run_benchmarks.py                                    # the smoke sizes against the baseline
+    python benchmarks/run_benchmarks.py --preset small --repeats 3
+    python benchmarks/run_benchmarks.py --sizes 500x20000 --data tabular
+    python benchmarks/run_benchmarks.py --save-baseline                    # store the results as the new baseline
+"""
+
+from argparse import ArgumentParser, Namespace
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BENCHMARKS = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARKS.parent / "autoxai4omics"))
+sys.path.insert(0, str(BENCHMARKS.parent))
+
+from benchmarks.synthetic import DATASETS  # noqa: E402
+from models.models import run_models  # noqa: E402
+from plotting.shap.plots_shap import select_explainer  # noqa: E402
+from utils.load import load_data, load_model  # noqa: E402
+from utils.ml.data_split import split_data  # noqa: E402
+from utils.ml.preprocessing import learn_ml_preprocessing  # noqa: E402
+from utils.parser.config_model import ConfigModel  # noqa: E402
+from utils.profiling import Profiler, span  # noqa: E402
+from utils.scheduler import available_cores, available_memory_mb  # noqa: E402
+from utils.utils import (  # noqa: E402
+    create_experiment_folders,
+    get_model_path,
+    setup_CustoeModel,
+)
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import sklearn  # noqa: E402
+
+omicLogger = logging.getLogger("OmicLogger")
+
+# samples x features
+PRESETS = {
+    "smoke": ["100x1000"],
+    "small": ["100x1000", "1000x10000"],
+    "full": ["100x1000", "1000x10000", "10000x100000"],
+}
+BASELINE = BENCHMARKS / "baseline.json"
+# metrics compared against the baseline, with the change below which they are considered noise
+COMPARED = {"wall_s": 0.05, "peak_rss_mb": 10, "growth_mb": 10}
+
+
+def parse_size(size: str) -> tuple[int, int]:
+    n_samples, n_features = size.lower().split("x")
+    return int(n_samples), int(n_features)
+
+
+@contextmanager
+def working_directory(folder: Path):
+    # the omic filters write intermediate files to the working directory
+    cwd = os.getcwd()
+    os.chdir(folder)
+    try:
+        yield
+    finally:
+        os.chdir(cwd)
+
+
+def make_config(partial: dict, name: str, folder: Path, n_features: int, args) -> dict:
+    """The full config of a benchmark run on a synthetic dataset, as parsed by the modes"""
+    config = {
+        **partial,
+        "data": {**partial["data"], "name": name, "save_path": str(folder)},
+        "ml": {
+            "problem_type": "classification",
+            "model_list": args.models,
+            "hyper_tuning": "random",
+            "hyper_budget": args.hyper_budget,
+            "seed_num": args.seed,
+            "standardize": True,
+            "feature_selection": {
+                "k": min(args.k, n_features),
+                "var_threshold": 0,
+                "method": {"name": "SelectKBest", "metric": "f_classif"},
+            },
+            "fit_scorer": "f1_score",
+            "scorer_list": ["f1_score"],
+        },
+        "plotting": {"plot_method": []},
+        "profiling": {
+            "trace": True,
+            "memory": True,
+            "memory_interval": args.memory_interval,
+        },
+    }
+    return ConfigModel(**config).model_dump()
+
+
+def run_pipeline(config_dict: dict, experiment_folder: Path, n_explain: int) -> None:
+    """The stages of `mode_train_models` up to the models, then the SHAP values of each on the test set"""
+    x, y, features_names = load_data(config_dict)
+    x_train, x_test, y_train, y_test = split_data(x, y, config_dict)
+    x, y, features_names, x_train, x_test, y_train = learn_ml_preprocessing(
+        config_dict,
+        experiment_folder,
+        features_names,
+        x_train,
+        x_test,
+        y_train,
+        y_test,
+    )
+    run_models(
+        config_dict=config_dict,
+        model_list=config_dict["ml"]["model_list"],
+        df_train=pd.DataFrame(),
+        df_test=pd.DataFrame(),
+        x_train=x_train,
+        y_train=y_train,
+        x_test=x_test,
+        y_test=y_test,
+        experiment_folder=experiment_folder,
+        fit_scorer=config_dict["ml"]["fit_scorer"],
+        hyper_tuning=config_dict["ml"]["hyper_tuning"],
+        hyper_budget=config_dict["ml"]["hyper_budget"],
+        problem_type=config_dict["ml"]["problem_type"],
+        seed_num=config_dict["ml"]["seed_num"],
+    )
+
+    explained = x_test[:n_explain]
+    for model_name in config_dict["ml"]["model_list"]:
+        model = load_model(model_name, get_model_path(experiment_folder, model_name))
+        with span(
+            f"{model_name} SHAP values",
+            cat="plot",
+            explained=explained,
+            outputs=len(np.unique(y_test)),
+        ):
+            explainer = select_explainer(
+                model,
+                model_name,
+                pd.DataFrame(x_train, columns=features_names),
+                config_dict["ml"]["problem_type"],
+            )
+            explainer.shap_values(explained)
+
+
+def stage_results(experiment_folder: Path) -> dict[str, dict]:
+    """The wall & cpu seconds, calls, peak memory & memory growth of each stage from the profiles of a run"""
+    with open(experiment_folder / "performance_trace_benchmark.json") as f:
+        trace = json.load(f)
+    with open(experiment_folder / "memory_profile_benchmark.json") as f:
+        memory = json.load(f)
+
+    stages = {}
+    for event in trace["traceEvents"]:
+        if event["ph"] != "X":
+            continue
+        name = "total" if event["cat"] == "mode" else event["name"]
+        stage = stages.setdefault(
+            name,
+            {"calls": 0, "wall_s": 0, "cpu_s": 0, "peak_rss_mb": 0, "growth_mb": 0},
+        )
+        stage["calls"] += 1
+        stage["wall_s"] += event["dur"] / 1e6
+        stage["cpu_s"] += event["args"]["cpu_s"]
+    for entry in memory["stages"]:
+        name = "total" if entry["depth"] == 0 else entry["name"]
+        if name in stages:
+            stages[name]["peak_rss_mb"] = max(
+                stages[name]["peak_rss_mb"], entry["peak_rss_mb"]
+            )
+            stages[name]["growth_mb"] = max(
+                stages[name]["growth_mb"], entry["growth_mb"]
+            )
+    return stages
+
+
+def run_benchmark(data_type: str, n_samples: int, n_features: int, args) -> list[dict]:
+    """Generate a dataset and run the pipeline on it `args.repeats` times, the median of each stage's measures"""
+    runs = []
+    for repeat in range(args.repeats):
+        folder = Path(tempfile.mkdtemp(prefix="bench_", dir=args.workdir))
+        try:
+            started = time.perf_counter()
+            partial = DATASETS[data_type](folder, n_samples, n_features, args.seed)
+            generated = time.perf_counter() - started
+
+            name = f"{data_type}_{n_samples}x{n_features}"
+            config_dict = make_config(partial, name, folder, n_features, args)
+            experiment_folder = create_experiment_folders(config_dict, None)
+            setup_CustoeModel(config_dict, experiment_folder)
+
+            with working_directory(folder):
+                profiler = Profiler(config_dict, experiment_folder, "benchmark").start()
+                try:
+                    run_pipeline(config_dict, experiment_folder, args.explain)
+                finally:
+                    profiler.stop()
+            runs.append(stage_results(experiment_folder))
+            omicLogger.info(
+                f"{name} run {repeat + 1}/{args.repeats}: {runs[-1]['total']['wall_s']:.1f}s "
+                f"(data generated in {generated:.1f}s)"
+            )
+        finally:
+            if not args.keep:
+                shutil.rmtree(folder, ignore_errors=True)
+
+    # the stages of every run, in the order they first ran
+    names = list(dict.fromkeys(name for run in runs for name in run))
+    results = []
+    for name in names:
+        measures = [run[name] for run in runs if name in run]
+        results.append(
+            {
+                "data_type": data_type,
+                "n_samples": n_samples,
+                "n_features": n_features,
+                "stage": name,
+                **{
+                    k: round(statistics.median(m[k] for m in measures), 4)
+                    for k in measures[0]
+                },
+            }
+        )
+    return results
+
+
+def machine_info() -> dict:
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "processor": platform.processor() or platform.machine(),
+        "cores": available_cores(),
+        "memory_mb": round(available_memory_mb()),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+    }
+
+
+def _key(result: dict) -> tuple:
+    return (
+        result["data_type"],
+        result["n_samples"],
+        result["n_features"],
+        result["stage"],
+    )
+
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[dict]:
+    """
+    Each measure of `COMPARED` against its value in the baseline: a regression (improvement) when it grew (shrank) by
+    more than `tolerance` times and by more than its noise floor
+    """
+    stored = {_key(r): r for r in baseline}
+    comparison = []
+    for result in results:
+        base = stored.get(_key(result))
+        if base is None:
+            continue
+        for metric, floor in COMPARED.items():
+            new, old = result[metric], base[metric]
+            ratio = new / old if old else float("inf") if new else 1.0
+            if new - old > floor and ratio > tolerance:
+                status = "regression"
+            elif old - new > floor and ratio < 1 / tolerance:
+                status = "improvement"
+            else:
+                status = "unchanged"
+            comparison.append(
+                {
+                    "data_type": result["data_type"],
+                    "n_samples": result["n_samples"],
+                    "n_features": result["n_features"],
+                    "stage": result["stage"],
+                    "metric": metric,
+                    "baseline": old,
+                    "value": new,
+                    "ratio": round(ratio, 3) if ratio != float("inf") else None,
+                    "status": status,
+                }
+            )
+    return comparison
+
+
+def print_report(results: list[dict], comparison: list[dict]) -> None:
+    table = pd.DataFrame(results).set_index(
+        ["data_type", "n_samples", "n_features", "stage"]
+    )
+    with pd.option_context(
+        "display.max_rows", None, "display.max_columns", None, "display.width", 200
+    ):
+        print(table)
+    changed = [c for c in comparison if c["status"] != "unchanged"]
+    if changed:
+        print("\nChanges against the baseline:")
+        with pd.option_context(
+            "display.max_rows", None, "display.max_columns", None, "display.width", 200
+        ):
+            print(pd.DataFrame(changed).to_string(index=False))
+    elif comparison:
+        print("\nNo changes against the baseline")
+
+
+def main(argv=None) -> int:
+    parser = ArgumentParser(description="AutoXAI4Omics benchmarks")
+    parser.add_argument("--preset", choices=list(PRESETS), default="smoke")
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        help="samples x features of the datasets, e.g. 100x1000, instead of those of the preset",
+    )
+    parser.add_argument(
+        "--data",
+        nargs="+",
+        choices=list(DATASETS),
+        default=list(DATASETS),
+        help="the synthetic data types",
+    )
+    parser.add_argument("--models", nargs="+", default=["RandomForestClassifier"])
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument(
+        "--no-warmup",
+        dest="warmup",
+        action="store_false",
+        help="skip the unrecorded run on the smallest dataset first",
+    )
+    parser.add_argument("--hyper-budget", type=int, default=2)
+    parser.add_argument("--k", type=int, default=100, help="features kept")
+    parser.add_argument(
+        "--explain", type=int, default=50, help="test samples explained by SHAP"
+    )
+    parser.add_argument("--seed", type=int, default=29292)
+    parser.add_argument("--memory-interval", type=float, default=0.05)
+    parser.add_argument(
+        "--workdir", help="where the datasets & experiments are written"
+    )
+    parser.add_argument(
+        "--keep", action="store_true", help="keep the datasets & experiments"
+    )
+    parser.add_argument(
+        "-o", "--output", help="the results file, by default in benchmarks/results"
+    )
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--tolerance", type=float, default=1.25)
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store the results as the baseline",
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="exit with 1 when a measure regressed against the baseline",
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(message)s")
+    omicLogger.setLevel(logging.INFO)
+    if args.workdir:
+        Path(args.workdir).mkdir(parents=True, exist_ok=True)
+
+    sizes = [parse_size(size) for size in args.sizes or PRESETS[args.preset]]
+    if args.warmup:
+        # the first run of the process also pays for the lazy imports & the growth of the allocator's pools
+        run_benchmark(
+            args.data[0],
+            *min(sizes, key=lambda s: s[0] * s[1]),
+            Namespace(**{**vars(args), "repeats": 1}),
+        )
+
+    results = []
+    for n_samples, n_features in sizes:
+        for data_type in args.data:
+            results += run_benchmark(data_type, n_samples, n_features, args)
+
+    baseline_path = Path(args.baseline)
+    comparison = []
+    if baseline_path.is_file():
+        with open(baseline_path) as f:
+            comparison = compare(results, json.load(f)["results"], args.tolerance)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "settings": {
+            k: v
+            for k, v in vars(args).items()
+            if k not in ["workdir", "keep", "output", "baseline", "save_baseline"]
+        },
+        "results": results,
+        "comparison": comparison,
+    }
+    output = (
+        Path(args.output)
+        if args.output
+        else BENCHMARKS
+        / "results"
+        / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(baseline_path, "w") as f:
+            json.dump({**report, "comparison": []}, f, indent=2)
+
+    print_report(results, comparison)
+    print(f"\nResults saved at {output}")
+    regressions = [c for c in comparison if c["status"] == "regression"]
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Benchmark the time it takes to import each mode, each in a fresh process, against a budget of about twice what it
+takes on a laptop. The heavy dependencies being imported lazily (see `autoxai4omics/utils/lazy.py`), a mode over its
+budget most likely imports one of them at the top of a module again, e.g.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --repeats 5 --modes mode_batch mode_query_index
+"""
+
+from argparse import ArgumentParser
+from pathlib import Path
+import json
+import statistics
+import subprocess
+import sys
+
+BENCHMARKS = Path(__file__).resolve().parent
+# seconds to import each mode, about twice what it takes on a laptop
+STARTUP_BUDGET_S = {
+    "mode_train_models": 3,
+    "mode_testing_holdout": 3,
+    "mode_plotting": 3,
+    "mode_predict": 3,
+    "mode_feature_selection": 3,
+    "mode_config_duplicate": 3,
+    "mode_batch": 1.5,
+    "mode_query_index": 1.5,
+}
+IMPORT_SCRIPT = """
+import time
+started = time.perf_counter()
+import {mode}
+print(time.perf_counter() - started)
+"""
+
+
+def import_seconds(mode: str) -> float:
+    """The seconds it takes a fresh process to import `mode`"""
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT.format(mode=mode)],
+        cwd=BENCHMARKS.parent / "autoxai4omics",
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = ArgumentParser(description="AutoXAI4Omics startup benchmark")
+    parser.add_argument(
+        "--modes", nargs="+", choices=list(STARTUP_BUDGET_S), default=None
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=3, help="imports timed per mode, the median kept"
+    )
+    parser.add_argument("-o", "--output", help="write the results as json")
+    args = parser.parse_args(argv)
+
+    results = []
+    for mode in args.modes or list(STARTUP_BUDGET_S):
+        seconds = statistics.median(import_seconds(mode) for _ in range(args.repeats))
+        results.append(
+            {
+                "mode": mode,
+                "seconds": seconds,
+                "budget_s": STARTUP_BUDGET_S[mode],
+                "over_budget": seconds > STARTUP_BUDGET_S[mode],
+            }
+        )
+        print(
+            f"{mode:<24} {seconds:6.2f}s / {STARTUP_BUDGET_S[mode]:.1f}s"
+            + (" OVER BUDGET" if results[-1]["over_budget"] else "")
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    return 1 if any(r["over_budget"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+# Copyright (c) 2025 IBM Corp.
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+
+"""
+Reproducible synthetic omic datasets for the benchmarks, written in the input formats of AutoXAI4Omics. Each has a
+binary `target` carried by its first `N_INFORMATIVE` features, so the models have something to learn.
+"""
+
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import scipy.sparse
+
+N_INFORMATIVE = 10
+# fraction of the microbiome counts that are not zero
+MICROBIOME_DENSITY = 0.05
+# features (rows) written to the csv files at once
+CHUNK_ROWS = 1000
+
+
+def _target(rng: np.random.Generator, n_samples: int) -> np.ndarray:
+    return rng.permutation(np.arange(n_samples) % 2)
+
+
+def _sample_ids(n_samples: int) -> list[str]:
+    return [f"S{i:06d}" for i in range(n_samples)]
+
+
+def _write_metadata(
+    path: Path, sample_ids: list[str], y: np.ndarray, sep: str = ","
+) -> None:
+    pd.DataFrame({"target": y}, index=pd.Index(sample_ids, name="SampleID")).to_csv(
+        path, sep=sep
+    )
+
+
+def _write_feature_table(
+    path: Path, feature_ids: list[str], sample_ids: list[str], rows
+) -> None:
+    """Write a features x samples csv (the layout of the gene expression & tabular inputs) chunk by chunk"""
+    with open(path, "w") as f:
+        f.write("," + ",".join(sample_ids) + "\n")
+        for start, chunk in rows:
+            pd.DataFrame(chunk, index=feature_ids[start : start + len(chunk)]).to_csv(
+                f, header=False
+            )
+
+
+def make_microbiome(
+    folder: Path, n_samples: int, n_features: int, seed: int = 0
+) -> dict:
+    """
+    Sparse OTU counts (`MICROBIOME_DENSITY` non zero) with a Greengenes like taxonomy, as a biom (HDF5) table and a tab
+    separated metadata file
+    """
+    from biom import Table
+    import h5py
+
+    rng = np.random.default_rng(seed)
+    y = _target(rng, n_samples)
+
+    counts = scipy.sparse.random(
+        n_features,
+        n_samples,
+        density=MICROBIOME_DENSITY,
+        format="csr",
+        random_state=rng,
+        data_rvs=lambda n: rng.negative_binomial(2, 0.05, n) + 1,
+    )
+    # the informative OTUs are present in every sample, more abundant in the positive class
+    informative = rng.negative_binomial(2, 0.05, (N_INFORMATIVE, n_samples)) + 1
+    informative[:, y == 1] *= 3
+    counts = scipy.sparse.vstack(
+        [scipy.sparse.csr_matrix(informative), counts[N_INFORMATIVE:]]
+    ).tocsr()
+
+    sample_ids = _sample_ids(n_samples)
+    feature_ids = [f"OTU{i:06d}" for i in range(n_features)]
+    taxonomy = [
+        {
+            "taxonomy": [
+                "k__Bacteria",
+                f"p__P{i % 10}",
+                f"c__C{i % 30}",
+                f"o__O{i % 100}",
+                f"f__F{i % 300}",
+                f"g__G{i % 1000}",
+                f"s__S{i}",
+            ]
+        }
+        for i in range(n_features)
+    ]
+    table = Table(counts, feature_ids, sample_ids, observation_metadata=taxonomy)
+
+    data_file = Path(folder) / "microbiome.biom"
+    with h5py.File(data_file, "w") as f:
+        table.to_hdf5(f, "AutoXAI4Omics benchmark")
+    metadata_file = Path(folder) / "microbiome_metadata.txt"
+    _write_metadata(metadata_file, sample_ids, y, sep="\t")
+
+    return {
+        "data": {
+            "file_path": str(data_file),
+            "metadata_file": str(metadata_file),
+            "target": "target",
+            "data_type": "microbiome",
+        },
+        "microbiome": {
+            "norm_reads": 1000,
+            "min_reads": 1000,
+            "filter_abundance": 10,
+            "filter_prevalence": 0.01,
+        },
+    }
+
+
+def make_gene_expression(
+    folder: Path, n_samples: int, n_features: int, seed: int = 0
+) -> dict:
+    """Negative binomial read counts per gene (rows) & sample (columns), over-dispersed as RNA-seq counts are"""
+    rng = np.random.default_rng(seed)
+    y = _target(rng, n_samples)
+    # the mean expression of each gene, log-normal across genes
+    means = rng.lognormal(3, 1.5, n_features)
+    means[:N_INFORMATIVE] = 100
+
+    def rows():
+        for start in range(0, n_features, CHUNK_ROWS):
+            mu = means[start : start + CHUNK_ROWS, None] * np.where(
+                (np.arange(start, min(start + CHUNK_ROWS, n_features)) < N_INFORMATIVE)[
+                    :, None
+                ]
+                & (y == 1),
+                3,
+                1,
+            )
+            # negative binomial of mean mu & dispersion 2
+            yield start, rng.negative_binomial(2, 2 / (2 + mu))
+
+    sample_ids = _sample_ids(n_samples)
+    data_file = Path(folder) / "gene_expression.csv"
+    _write_feature_table(
+        data_file, [f"GENE{i:06d}" for i in range(n_features)], sample_ids, rows()
+    )
+    metadata_file = Path(folder) / "gene_expression_metadata.csv"
+    _write_metadata(metadata_file, sample_ids, y)
+
+    return {
+        "data": {
+            "file_path": str(data_file),
+            "metadata_file": str(metadata_file),
+            "target": "target",
+            "data_type": "gene_expression",
+        },
+        "gene_expression": {
+            "expression_type": "COUNTS",
+            "filter_sample": 3,
+            "filter_genes": [0, 2],
+        },
+    }
+
+
+def make_tabular(folder: Path, n_samples: int, n_features: int, seed: int = 0) -> dict:
+    """Standard normal measurements per feature (rows) & sample (columns), shifted for the positive class"""
+    rng = np.random.default_rng(seed)
+    y = _target(rng, n_samples)
+
+    def rows():
+        for start in range(0, n_features, CHUNK_ROWS):
+            chunk = rng.standard_normal(
+                (min(CHUNK_ROWS, n_features - start), n_samples)
+            )
+            informative = np.arange(start, start + len(chunk)) < N_INFORMATIVE
+            chunk[np.ix_(informative, y == 1)] += 1
+            yield start, chunk.round(4)
+
+    sample_ids = _sample_ids(n_samples)
+    data_file = Path(folder) / "tabular.csv"
+    _write_feature_table(
+        data_file, [f"F{i:06d}" for i in range(n_features)], sample_ids, rows()
+    )
+    metadata_file = Path(folder) / "tabular_metadata.csv"
+    _write_metadata(metadata_file, sample_ids, y)
+
+    return {
+        "data": {
+            "file_path": str(data_file),
+            "metadata_file": str(metadata_file),
+            "target": "target",
+            "data_type": "tabular",
+        },
+        "tabular": {
+            "filter_tabular_sample": 3,
+            "filter_tabular_measurements": [0, 1],
+        },
+    }
+
+
+DATASETS = {
+    "microbiome": make_microbiome,
+    "gene_expression": make_gene_expression,
+    "tabular": make_tabular,
+}